@@ -1,5 +1,8 @@
 import streamlit as st
 
+from esg_ui.ingest import render_cache_stats
+from esg_ui.profiling import page_profile
+
 st.set_page_config(layout="wide")
 
 # --- PAGE SETUP ---
@@ -53,12 +56,14 @@ pg = st.navigation(
 
 
 # --- SHARED ON ALL PAGES ---
+render_cache_stats(st.sidebar)
 st.sidebar.markdown(
     "Created with ❤️ by [Symeon Papadopoulos](https://www.linkedin.com/in/symeon-papadopoulos-b242b1166/)"
 )
 
-# --- RUN NAVIGATION ---
-pg.run()
+# --- RUN NAVIGATION (timed per stage when the sidebar profile is on) ---
+with page_profile(pg.title):
+    pg.run()
 
 
 
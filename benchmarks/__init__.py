@@ -0,0 +1,21 @@
+"""
+Benchmarks of the pages' hot paths on synthetic data (``esg_core.synthetic``).
+
+    python -m benchmarks [--sizes 1k,10k,100k] [-k manpower] [--pages]
+        [--baseline benchmarks/results/<sha>.json] [--threshold 0.25]
+
+The benchmarks are grouped by page:
+
+  - ``bench_ingest``: the ESG extract, MAIN and L&D parsers and the upload cache;
+  - ``bench_comp_ben``: monthly headcount and the per-company KPIs;
+  - ``bench_hr``: the filter / active-on-date masks and the role classification;
+  - ``bench_od``: grouped training KPIs, facets and the cube;
+  - ``bench_manpower``: ``prepare_base`` and every derived-column kernel;
+  - ``bench_exports``: the XLSX / CSV downloads;
+  - ``bench_pages``: whole pages through AppTest (only with ``--pages``).
+
+Each run prints the wall time and the peak memory per benchmark and size. It
+stores them in ``benchmarks/results/<commit>.json`` and compares them with the
+previous result file; slowdowns above the threshold exit with status 1
+(``harness`` has the details).
+"""
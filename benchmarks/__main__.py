@@ -0,0 +1,96 @@
+"""Command line of the benchmark suite (see the package docstring)."""
+import argparse
+import importlib
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import pandas as pd
+
+from benchmarks import harness
+from benchmarks.fixtures import Fixtures
+
+SUITES = ["bench_ingest", "bench_comp_ben", "bench_hr", "bench_od", "bench_manpower", "bench_exports"]
+PAGE_SUITE = "bench_pages"
+
+EXIT_OK, EXIT_REGRESSION, EXIT_USAGE = 0, 1, 2
+
+_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_sizes(text: str) -> List[int]:
+    """'1k,10k,1m' → [1000, 10000, 1000000]."""
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        scale = _SUFFIXES.get(part[-1], 1)
+        try:
+            sizes.append(int(float(part[:-1] if scale > 1 else part) * scale))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid size {part!r} (use e.g. 1k, 10k, 1m)")
+    return sizes
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Time the pages' hot paths on synthetic data.")
+    parser.add_argument("--sizes", type=parse_sizes, default=parse_sizes("1k,10k,100k"),
+                        help="employees per synthetic dataset, comma-separated (default: 1k,10k,100k; 1m is opt-in)")
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="only benchmarks whose name contains this text (repeatable)")
+    parser.add_argument("--pages", action="store_true", help="also render whole pages with AppTest (slow)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark (default: %(default)s)")
+    parser.add_argument("--budget", type=float, default=2.0,
+                        help="stop repeating once a benchmark has run this many seconds (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="result file to compare with (default: the previous one in the results folder)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown / memory growth flagged as a regression (default: %(default)s)")
+    parser.add_argument("--results", default=str(harness.RESULTS_DIR), help="results folder (default: %(default)s)")
+    parser.add_argument("--no-save", action="store_true", help="do not write the result file")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    for suite in SUITES + ([PAGE_SUITE] if args.pages else []):
+        importlib.import_module(f"benchmarks.{suite}")
+    benches = [
+        b for b in harness.REGISTRY.values()
+        if not args.filter or any(f.lower() in b.name.lower() for f in args.filter)
+    ]
+    if args.list:
+        for b in benches:
+            print(f"{b.name}{'' if b.max_rows is None else f'  (≤ {b.max_rows:,} rows)'}")
+        return EXIT_OK
+    if not benches:
+        print("No benchmark matches the filter.", file=sys.stderr)
+        return EXIT_USAGE
+
+    current = harness.result_path(Path(args.results))
+    baseline_path = Path(args.baseline) if args.baseline else harness.latest_baseline(current, Path(args.results))
+    if args.baseline and not baseline_path.exists():
+        print(f"Baseline {baseline_path} not found.", file=sys.stderr)
+        return EXIT_USAGE
+
+    records, failures = harness.run(
+        benches, args.sizes, lambda rows: Fixtures(rows, seed=args.seed), repeat=args.repeat, budget=args.budget,
+    )
+    if records and not args.no_save:
+        print(f"\nSaved {harness.save_results(records, current, {'seed': args.seed})}")
+
+    regressions = pd.DataFrame()
+    if baseline_path is not None:
+        table = harness.comparison_table(harness.compare(records, harness.load_results(baseline_path), args.threshold))
+        regressions = table[table["regression"]]
+        print(f"\nAgainst {baseline_path.name}: {len(table):,} metrics compared, {len(regressions):,} regressions "
+              f"(threshold {args.threshold:.0%}).")
+        if not regressions.empty:
+            with pd.option_context("display.width", 200, "display.max_colwidth", 60):
+                print(regressions.drop(columns="regression").to_string(index=False, float_format="{:,.4f}".format))
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+    return EXIT_REGRESSION if failures or not regressions.empty else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
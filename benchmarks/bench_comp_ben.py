@@ -0,0 +1,50 @@
+"""Comp&Ben: monthly headcount tables, the activity matrix and the per-company KPIs."""
+from benchmarks.harness import benchmark
+from esg_core.currency import RateTable
+from esg_core.esg_extract import COMPANY, DEPARTURE, HIRE
+from esg_core.headcount import ActivityMatrix, monthly_headcount
+from esg_core.kpis import company_kpis, median_excluding_max, overall_pay_gap, overall_remuneration_ratio
+
+# the synthetic data ends on 2025-09-30: the last complete year
+YEAR = 2024
+START_YEAR, END_YEAR = 2020, 2025
+
+
+@benchmark("comp&ben: monthly headcount by company", "comp&ben")
+def headcount_company(fx):
+    df = fx.esg
+    return lambda: monthly_headcount(df, [COMPANY], HIRE, DEPARTURE, YEAR, YEAR)
+
+
+@benchmark("comp&ben: monthly headcount by division / department", "comp&ben")
+def headcount_grouped(fx):
+    df = fx.esg
+    return lambda: monthly_headcount(df, [COMPANY, "Division", "Department"], HIRE, DEPARTURE, START_YEAR, END_YEAR)
+
+
+@benchmark("comp&ben: activity matrix", "comp&ben")
+def activity(fx):
+    df = fx.esg
+    return lambda: ActivityMatrix.from_frame(df, HIRE, DEPARTURE, START_YEAR, END_YEAR)
+
+
+@benchmark("comp&ben: company_kpis", "comp&ben")
+def kpis(fx):
+    df = fx.esg
+    return lambda: company_kpis(df, YEAR)
+
+
+@benchmark("comp&ben: overall pay gap / remuneration ratio", "comp&ben")
+def overall(fx):
+    df, rates = fx.esg, RateTable.from_env()
+
+    def run():
+        overall_pay_gap(df, YEAR)
+        overall_remuneration_ratio(df, YEAR, rates)
+    return run
+
+
+@benchmark("comp&ben: median excluding max", "comp&ben")
+def median(fx):
+    df, rates = fx.esg, RateTable.from_env()
+    return lambda: median_excluding_max(df, YEAR, rates)
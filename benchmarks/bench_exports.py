@@ -0,0 +1,54 @@
+"""Downloads: the Manpower XLSX with totals, the Comp&Ben unpivoted headcount XLSX and the HR Data Analyst CSV."""
+import io
+
+import pandas as pd
+
+from benchmarks.bench_comp_ben import END_YEAR, START_YEAR
+from benchmarks.harness import benchmark
+from esg_core.esg_extract import COMPANY, DEPARTURE, HIRE
+from esg_core.headcount import monthly_headcount, unpivot_headcount
+from esg_core.manpower import with_totals
+from esg_core.salary import SALARY
+
+# xlsxwriter writes about 70k cells/s: 100k rows already take tens of seconds per run
+XLSX_MAX_ROWS = 100_000
+
+
+def _xlsx_bytes(df: pd.DataFrame, sheet_name: str) -> bytes:
+    """As the pages build their download buttons."""
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+    return buf.getvalue()
+
+
+@benchmark("exports: with_totals", "exports")
+def totals(fx):
+    df = fx.final
+    return lambda: with_totals(df)
+
+
+@benchmark("exports: manpower filtered + totals (xlsx)", "exports", max_rows=XLSX_MAX_ROWS)
+def manpower_xlsx(fx):
+    df = fx.final
+    return lambda: _xlsx_bytes(with_totals(df), "Filtered+Totals")
+
+
+@benchmark("exports: comp&ben unpivoted headcount (xlsx)", "exports", max_rows=XLSX_MAX_ROWS)
+def headcount_xlsx(fx):
+    group_cols = [COMPANY, "Division", "Department"]
+    table = monthly_headcount(fx.esg, group_cols, HIRE, DEPARTURE, START_YEAR, END_YEAR)
+    return lambda: _xlsx_bytes(unpivot_headcount(table, group_cols), "Unpivoted Headcount")
+
+
+@benchmark("exports: hr data analyst csv", "exports")
+def hr_csv(fx):
+    df = fx.esg
+
+    def run():
+        out = df.copy()
+        out[SALARY] = out[SALARY].apply(lambda x: f"{x:.2f}".replace(".", ",") if pd.notnull(x) else "")
+        buf = io.BytesIO()
+        out.to_csv(buf, index=False, encoding="iso-8859-7", sep=";")
+        return buf.getvalue()
+    return run
@@ -0,0 +1,71 @@
+"""HR Data Analyst: sidebar filter index and masks, the active-on-date mask and the role classification."""
+import pandas as pd
+
+from benchmarks.harness import benchmark
+from esg_core.esg_extract import BIRTH, COMPANY, DEPARTURE, HIRE
+from esg_core.filters import FilterIndex
+from esg_core.headcount import ActiveIndex
+from esg_core.roles import GRADE, JOB_PROPERTY, TITLE, classify_role, role_categories
+
+REFERENCE_DATE = pd.Timestamp("2024-12-31")
+FILTER_COLUMNS = [
+    COMPANY, "Πόλη", "Division", "Department", "Όνομα Φύλου",
+    "Job Property", "Σύμβαση", "Age Group", "Περιγραφή Αιτ. Αποχώρησης",
+]
+
+
+def _with_age_group(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` plus the page's 'Age Group' column."""
+    df = df.copy()
+    age = (REFERENCE_DATE - df[BIRTH]).dt.days // 365
+    df["Age Group"] = pd.cut(age, bins=[-1, 29, 50, float("inf")], labels=["<30", "30-50", ">50"])
+    return df
+
+
+def _company_101(df: pd.DataFrame) -> pd.DataFrame:
+    """The rows the page classifies: company 101, title and property lower-cased."""
+    df = df[df["Εταιρία"] == 101].copy()
+    df[TITLE] = df[TITLE].astype(str).str.lower()
+    df[JOB_PROPERTY] = df[JOB_PROPERTY].astype(str).str.lower()
+    return df
+
+
+@benchmark("hr: filter index", "hr")
+def filter_index(fx):
+    df = _with_age_group(fx.esg)
+    return lambda: FilterIndex.from_frame(df, FILTER_COLUMNS, dropna=False)
+
+
+@benchmark("hr: filter mask", "hr")
+def filter_mask(fx):
+    df = _with_age_group(fx.esg)
+    index = FilterIndex.from_frame(df, FILTER_COLUMNS, dropna=False)
+    active = ActiveIndex.from_frame(df, HIRE, DEPARTURE).mask(REFERENCE_DATE)
+    selections = {
+        COMPANY: index.options(COMPANY)[:2],
+        "Όνομα Φύλου": index.options("Όνομα Φύλου")[:1],
+        "Age Group": ["30-50"],
+    }
+    return lambda: df[index.mask(selections, within=active)]
+
+
+@benchmark("hr: active on date", "hr")
+def active_on_date(fx):
+    df = fx.esg
+
+    def run():
+        ActiveIndex.from_frame(df, HIRE, DEPARTURE).mask(REFERENCE_DATE)
+    return run
+
+
+@benchmark("hr: role_categories", "hr")
+def roles(fx):
+    df = _company_101(fx.esg)
+    return lambda: role_categories(df)
+
+
+@benchmark("hr: classify_role (row-wise)", "hr", max_rows=100_000)
+def roles_row_wise(fx):
+    """The per-row rules ``role_categories`` vectorizes, for reference."""
+    df = _company_101(fx.esg)
+    return lambda: df.apply(lambda r: classify_role(r[TITLE], r[JOB_PROPERTY], r[GRADE]), axis=1)
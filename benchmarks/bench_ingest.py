@@ -0,0 +1,71 @@
+"""Upload parsing: the ESG extract, the MAIN file (``read_any`` / ``read_clean``), the L&D file and the upload cache."""
+import tempfile
+
+from benchmarks.harness import benchmark
+from esg_core.esg_extract import read_esg_extract
+from esg_core.ingest_cache import IngestCache, NamedBytesIO
+from esg_core.manpower import clean_table, parse_table
+from esg_core.snapshots import SnapshotStore
+from esg_core.training import read_training
+
+# writing the .xlsx fixtures takes minutes beyond this (and 1M rows do not fit a sheet)
+XLSX_MAX_ROWS = 100_000
+
+
+def _upload(path):
+    """The file as the pages receive it: bytes in memory with the upload's name."""
+    data = path.read_bytes()
+    return lambda: NamedBytesIO(data, path.name)
+
+
+@benchmark("ingest: read_esg_extract (csv)", "ingest")
+def esg_extract_csv(fx):
+    upload = _upload(fx.esg_extract_csv)
+    return lambda: read_esg_extract(upload())
+
+
+@benchmark("ingest: read_esg_extract (xlsx)", "ingest", max_rows=XLSX_MAX_ROWS)
+def esg_extract_xlsx(fx):
+    upload = _upload(fx.esg_extract_xlsx)
+    return lambda: read_esg_extract(upload())
+
+
+@benchmark("ingest: read_any (csv)", "ingest")
+def read_any_csv(fx):
+    upload = _upload(fx.main_csv)
+    return lambda: parse_table(upload())
+
+
+@benchmark("ingest: read_any (xlsx)", "ingest", max_rows=XLSX_MAX_ROWS)
+def read_any_xlsx(fx):
+    upload = _upload(fx.main_xlsx)
+    return lambda: parse_table(upload())
+
+
+@benchmark("ingest: clean_table", "ingest")
+def clean(fx):
+    raw = parse_table(fx.main_csv)
+    return lambda: clean_table(raw.copy())
+
+
+@benchmark("ingest: load_and_preprocess_data (xlsx)", "ingest", max_rows=XLSX_MAX_ROWS)
+def training_xlsx(fx):
+    upload = _upload(fx.training_xlsx)
+    return lambda: read_training(upload())
+
+
+@benchmark("ingest: upload cache hit (memory)", "ingest")
+def cache_hit(fx):
+    data, name = fx.esg_extract_csv.read_bytes(), fx.esg_extract_csv.name
+    cache = IngestCache(max_bytes=1 << 40)
+    cache.load(data, read_esg_extract, name=name)
+    return lambda: cache.load(data, read_esg_extract, name=name)
+
+
+@benchmark("ingest: upload cache hit (snapshot)", "ingest")
+def snapshot_hit(fx):
+    data, name = fx.esg_extract_csv.read_bytes(), fx.esg_extract_csv.name
+    store = SnapshotStore(tempfile.mkdtemp(prefix="esg-bench-snapshots-"))
+    IngestCache(snapshots=store).load(data, read_esg_extract, name=name, schema="bench")
+    # a fresh in-memory cache per run: the first load of a new server process
+    return lambda: IngestCache(snapshots=store).load(data, read_esg_extract, name=name, schema="bench")
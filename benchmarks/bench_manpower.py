@@ -0,0 +1,46 @@
+"""Manpower: ``prepare_base``, every derived-column node (the ``compute_*`` kernels) and the whole graph."""
+from benchmarks.harness import Benchmark, add, benchmark
+from esg_core.dag import ColumnGraph
+from esg_core.manpower import DERIVED_NODES, derive_columns, final_frame, prepare_base
+
+
+@benchmark("manpower: prepare_base", "manpower")
+def base(fx):
+    df, projection_date = fx.main_clean, fx.params.projection_date
+    return lambda: prepare_base(df, projection_date)
+
+
+def _node_setup(node):
+    def setup(fx):
+        # the node's input columns, copied as ColumnGraph.run hands them over
+        df = fx.derived
+        present = [c for c in node.inputs if c in df.columns]
+        params = fx.params.graph_params(fx.contributions)
+        kwargs = {p: params[p] for p in node.params}
+        return lambda: node.func(df.loc[:, present].copy(), **kwargs)
+    return setup
+
+
+for _node in DERIVED_NODES:
+    add(Benchmark(f"manpower: {_node.func.__name__}", "manpower", _node_setup(_node)))
+
+
+@benchmark("manpower: derive_columns", "manpower")
+def derive(fx):
+    df, params, contributions = fx.base, fx.params, fx.contributions
+    return lambda: derive_columns(df, params, contributions)
+
+
+@benchmark("manpower: derive_columns (cached graph)", "manpower")
+def derive_cached(fx):
+    """A rerun with unchanged inputs: every node answered from the graph's cache."""
+    df, params, contributions = fx.base, fx.params, fx.contributions
+    graph = ColumnGraph(DERIVED_NODES)
+    derive_columns(df, params, contributions, graph=graph)
+    return lambda: derive_columns(df, params, contributions, graph=graph)
+
+
+@benchmark("manpower: final_frame", "manpower")
+def final(fx):
+    df = fx.derived
+    return lambda: final_frame(df)
@@ -0,0 +1,67 @@
+"""OD: grouped training KPIs with unique trainees, the faceted filters and the pre-aggregated cube."""
+from benchmarks.harness import benchmark
+from esg_core.cube import Cube
+from esg_core.distinct import distinct_by
+from esg_core.facets import FacetIndex
+
+# the page's filter / cube dimensions and measures
+DIMENSIONS = ["Country", "Company", "Year", "Division", "Department", "Job Property2", "Status", "Gender2"]
+MEASURES = ["Duration in Hours", "Cost (€)"]
+GROUP_BY = ["Company", "Division", "Gender2"]
+
+
+def _selections(df) -> dict:
+    return {"Company": list(df["Company"].cat.categories[:2]), "Gender2": ["Female"]}
+
+
+@benchmark("od: grouped aggregation", "od")
+def grouped(fx):
+    df = fx.training
+
+    def run():
+        out = df.groupby(GROUP_BY, observed=True).agg(
+            duration_in_hours_sum=("Duration in Hours", "sum"),
+            cost_sum=("Cost (€)", "sum"),
+        )
+        trainees = distinct_by(df, GROUP_BY, "Trainee ID")
+        out["unique_trainee_id_count"] = trainees["Distinct"]
+        out["trainees_in_other_groups"] = trainees["Shared"]
+        return out
+    return run
+
+
+@benchmark("od: facet index", "od")
+def facet_index(fx):
+    df = fx.training
+    return lambda: FacetIndex.from_frame(df, DIMENSIONS, "Trainee ID", as_text=True)
+
+
+@benchmark("od: facet counts", "od")
+def facet_counts(fx):
+    df = fx.training
+    index = FacetIndex.from_frame(df, DIMENSIONS, "Trainee ID", as_text=True)
+    selections = _selections(df)
+    return lambda: index.facets(selections)
+
+
+@benchmark("od: cube build", "od")
+def cube_build(fx):
+    df = fx.training
+    return lambda: Cube.from_frame(df, DIMENSIONS, MEASURES, "Trainee ID", as_text=True)
+
+
+@benchmark("od: cube rollup (exact)", "od")
+def cube_rollup(fx):
+    df = fx.training
+    cube = Cube.from_frame(df, DIMENSIONS, MEASURES, "Trainee ID", as_text=True)
+    selections = _selections(df)
+    return lambda: cube.rollup(selections, GROUP_BY)
+
+
+@benchmark("od: cube rollup (approximate)", "od")
+def cube_rollup_hll(fx):
+    df = fx.training
+    cube = Cube.from_frame(df, DIMENSIONS, MEASURES, "Trainee ID", as_text=True)
+    selections = _selections(df)
+    cube.sketch()
+    return lambda: cube.rollup(selections, GROUP_BY, approximate=True)
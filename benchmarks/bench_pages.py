@@ -0,0 +1,80 @@
+"""
+Whole pages, rendered headlessly with Streamlit's AppTest (``--pages``).
+
+The session is seeded with the frame the page keeps after an upload, so the
+timings cover everything after ingestion with the default sidebar values.
+"cold" clears the Streamlit caches first, as the first render after an
+upload does. "rerun" renders the same session again, as after a widget
+change that leaves the data alone.
+"""
+from pathlib import Path
+
+import streamlit as st
+from streamlit import config
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.harness import ROOT, Benchmark, add
+from esg_ui.esg_extract import SESSION_KEY
+
+VIEWS = Path(ROOT) / "views"
+# AppTest default is 3s per run
+TIMEOUT = 600
+# one cold render at 100k rows already takes minutes on the Manpower page
+PAGES_MAX_ROWS = 100_000
+
+# page file → session state seeded from the fixtures
+PAGES = {
+    "Comp&Ben.py": lambda fx: {SESSION_KEY: fx.esg, "file_saved": True},
+    "HR Data Analyst.py": lambda fx: {SESSION_KEY: fx.esg, "file_saved": True},
+    "OD.py": lambda fx: {"ld_training_data_df": fx.training},
+    "Manpower.py": lambda fx: {"base_df": fx.base},
+}
+
+
+def _quiet() -> None:
+    """Deprecation notices would bury the timings: log errors only (after the config is parsed, which resets the level)."""
+    config.get_option("logger.level")
+    config.set_option("logger.level", "error")
+    set_log_level("error")
+
+
+_quiet()
+
+
+def _app(page: str, state: dict) -> AppTest:
+    at = AppTest.from_file(str(VIEWS / page), default_timeout=TIMEOUT)
+    for key, value in state.items():
+        at.session_state[key] = value
+    return at
+
+
+def _checked(at: AppTest) -> AppTest:
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+def _cold(page: str, seed):
+    def setup(fx):
+        state = seed(fx)
+
+        def run():
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            _checked(_app(page, state).run())
+        return run
+    return setup
+
+
+def _rerun(page: str, seed):
+    def setup(fx):
+        at = _checked(_app(page, seed(fx)).run())
+        return lambda: _checked(at.run())
+    return setup
+
+
+for _page, _seed in PAGES.items():
+    _name = Path(_page).stem
+    add(Benchmark(f"pages: {_name} (cold)", "pages", _cold(_page, _seed), max_rows=PAGES_MAX_ROWS))
+    add(Benchmark(f"pages: {_name} (rerun)", "pages", _rerun(_page, _seed), max_rows=PAGES_MAX_ROWS))
@@ -0,0 +1,135 @@
+"""
+Synthetic inputs of one dataset size, built once and kept on disk.
+
+``rows`` is the number of employees of the ``esg_core.synthetic`` population.
+The ESG extract and the MAIN file have about that many rows; the L&D file has
+about ``trainings_per_employee`` times more. Files are written under
+``.cache/<rows>-<seed>-<generator hash>/`` on first use. Writing .xlsx is
+slow (about 70k cells/s), so the first run at 100k rows takes a few minutes.
+A change to the generator gives new cache folders; delete ``.cache/`` to
+reclaim the space.
+
+Frames are built lazily and cached on the object. A benchmark must not modify
+a frame in place; it copies first, as the pages do.
+"""
+import hashlib
+import inspect
+from functools import cached_property
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from esg_core import synthetic
+from esg_core.batch import load_contributions, load_params
+from esg_core.dtypes import compact_frame
+from esg_core.esg_extract import read_esg_extract
+from esg_core.manpower import clean_table, derive_columns, final_frame, parse_table, prepare_base
+from esg_core.synthetic import SyntheticConfig
+from esg_core.training import prepare_training
+
+CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+
+
+def _generator_hash() -> str:
+    return hashlib.sha1(inspect.getsource(synthetic).encode()).hexdigest()[:8]
+
+
+class Fixtures:
+    """Synthetic files and prepared frames for ``rows`` employees."""
+
+    def __init__(self, rows: int, seed: int = 0, cache_dir=CACHE_DIR):
+        self.rows = int(rows)
+        self.config = SyntheticConfig(rows=self.rows, seed=seed)
+        self.dir = Path(cache_dir) / f"{self.rows}-{seed}-{_generator_hash()}"
+        # the Manpower page defaults
+        self.params = load_params(None)
+
+    def _file(self, name: str, build: Callable[[], pd.DataFrame], write) -> Path:
+        path = self.dir / name
+        if not path.exists():
+            self.dir.mkdir(parents=True, exist_ok=True)
+            # write to a temporary name first, so an interrupted run leaves no half-written fixture
+            tmp = path.with_name(f"tmp-{path.name}")
+            write(build(), tmp)
+            tmp.replace(path)
+        return path
+
+    # ── raw layouts ─────────────────────────────────────────────────────────
+    @cached_property
+    def people(self) -> pd.DataFrame:
+        return synthetic.employees(self.config)
+
+    @cached_property
+    def esg_extract_raw(self) -> pd.DataFrame:
+        return synthetic.esg_extract(self.config, self.people)
+
+    @cached_property
+    def main_raw(self) -> pd.DataFrame:
+        """All companies' MAIN rows as one file."""
+        return synthetic.manpower_main(self.config, self.people)
+
+    @cached_property
+    def training_raw(self) -> pd.DataFrame:
+        return synthetic.ld_training(self.config, self.people)
+
+    # ── files ───────────────────────────────────────────────────────────────
+    @property
+    def esg_extract_csv(self) -> Path:
+        return self._file("esg_extract.csv", lambda: self.esg_extract_raw, synthetic.write_csv)
+
+    @property
+    def esg_extract_xlsx(self) -> Path:
+        return self._file("esg_extract.xlsx", lambda: self.esg_extract_raw, synthetic.write_xlsx)
+
+    @property
+    def main_csv(self) -> Path:
+        return self._file("main.csv", lambda: self.main_raw, synthetic.write_csv)
+
+    @property
+    def main_xlsx(self) -> Path:
+        return self._file("main.xlsx", lambda: self.main_raw, synthetic.write_xlsx)
+
+    @property
+    def contributions_csv(self) -> Path:
+        return self._file(
+            "contributions.csv", lambda: synthetic.manpower_contributions(self.config, self.people), synthetic.write_csv,
+        )
+
+    @property
+    def training_xlsx(self) -> Path:
+        return self._file("ld_training.xlsx", lambda: self.training_raw, synthetic.write_xlsx)
+
+    # ── prepared frames (what the pages hold after upload) ──────────────────
+    @cached_property
+    def esg(self) -> pd.DataFrame:
+        """The ESG extract through ``read_esg_extract`` (HR Data Analyst / Comp&Ben)."""
+        return read_esg_extract(self.esg_extract_csv)
+
+    @cached_property
+    def main_clean(self) -> pd.DataFrame:
+        return clean_table(parse_table(self.main_csv))
+
+    @cached_property
+    def base(self) -> pd.DataFrame:
+        """``prepare_base`` output, compacted as the Manpower page stores it."""
+        df = prepare_base(self.main_clean, self.params.projection_date)
+        return compact_frame(df.reset_index(drop=True), ids=["Hrms Id"])
+
+    @cached_property
+    def contributions(self) -> pd.DataFrame:
+        return load_contributions(str(self.contributions_csv))
+
+    @cached_property
+    def derived(self) -> pd.DataFrame:
+        """``base`` with every derived budget column."""
+        return derive_columns(self.base, self.params, self.contributions)
+
+    @cached_property
+    def final(self) -> pd.DataFrame:
+        return final_frame(self.derived)
+
+    @cached_property
+    def training(self) -> pd.DataFrame:
+        """The L&D rows through ``prepare_training`` (OD), without the .xlsx round trip: 1M employees do not fit a sheet."""
+        return prepare_training(self.training_raw)
@@ -0,0 +1,244 @@
+"""
+Benchmark registry, measurement and result history.
+
+A benchmark is a setup function registered with :func:`benchmark`. It gets the
+:class:`benchmarks.fixtures.Fixtures` of one dataset size and returns the
+callable to time, so generating, writing and preparing the inputs stay out of
+the timings.
+
+Each (benchmark, size) pair is measured as follows:
+
+  - one run under ``tracemalloc`` for the peak memory; it doubles as the
+    warm-up. Allocations made by NumPy and Python are counted. Arrow buffers
+    (pandas string columns, Feather reads) are not, so string-heavy steps
+    read low;
+  - then timed runs with the garbage collector off, as ``timeit`` does. The
+    runs stop at ``repeat`` runs, or once ``budget`` seconds are spent, with
+    at least one run. The fastest run and the median run are both kept.
+
+Results are stored as one JSON file per commit under ``results/``. The file
+is ``<short sha>.json``, or ``<short sha>-dirty.json`` when tracked files are
+modified. Running again on the same commit replaces the records it re-measures
+and keeps the others, so sizes can be added one run at a time.
+:func:`compare` flags a regression when a record is slower, or peaks higher,
+than the baseline by more than ``threshold``. Differences below the noise
+floors are ignored.
+"""
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# smaller differences are never regressions (timer and allocator noise)
+MIN_SECONDS_DELTA = 0.005
+MIN_PEAK_DELTA_MB = 1.0
+
+MB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """One registered benchmark (``max_rows``: largest dataset size it runs on, None for all)."""
+    name: str
+    group: str
+    setup: Callable
+    max_rows: Optional[int] = None
+
+
+REGISTRY: Dict[str, Benchmark] = {}
+
+
+def add(bench: Benchmark) -> Benchmark:
+    if bench.name in REGISTRY:
+        raise ValueError(f"Duplicate benchmark name {bench.name!r}.")
+    REGISTRY[bench.name] = bench
+    return bench
+
+
+def benchmark(name: str, group: str, max_rows: Optional[int] = None):
+    """Register ``setup(fixtures) -> callable`` as the benchmark ``name``."""
+    def register(setup):
+        add(Benchmark(name, group, setup, max_rows))
+        return setup
+    return register
+
+
+@dataclass
+class Record:
+    """Measurement of one benchmark on one dataset size (``seconds``: fastest run)."""
+    name: str
+    group: str
+    rows: int
+    seconds: float
+    median: float
+    runs: int
+    peak_mb: float
+
+
+@dataclass
+class Comparison:
+    """One metric of one record against the baseline (``ratio``: new / old)."""
+    name: str
+    rows: int
+    metric: str
+    old: float
+    new: float
+    ratio: float
+    regression: bool
+
+
+def measure(fn: Callable[[], object], repeat: int = 5, budget: float = 2.0) -> Tuple[List[float], int]:
+    """Run times of ``fn`` (see the module docstring) and its tracemalloc peak in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    times: List[float] = []
+    while len(times) < max(repeat, 1) and (not times or sum(times) < budget):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    return times, peak
+
+
+def run(benches: Sequence[Benchmark], sizes: Sequence[int], fixtures_for: Callable[[int], object],
+        repeat: int = 5, budget: float = 2.0, log=print) -> Tuple[List[Record], List[str]]:
+    """Every benchmark on every size it allows. Returns the records and the failures."""
+    records, failures = [], []
+    for rows in sizes:
+        fixtures = fixtures_for(rows)
+        for bench in benches:
+            if bench.max_rows is not None and rows > bench.max_rows:
+                continue
+            try:
+                fn = bench.setup(fixtures)
+                times, peak = measure(fn, repeat=repeat, budget=budget)
+            except Exception as exc:  # one broken benchmark must not hide the others
+                failures.append(f"{bench.name} @ {rows:,}: {type(exc).__name__}: {exc}")
+                log(f"  FAILED {bench.name} @ {rows:,} rows: {type(exc).__name__}: {exc}")
+                continue
+            record = Record(
+                bench.name, bench.group, rows, min(times), statistics.median(times), len(times), round(peak / MB, 3),
+            )
+            records.append(record)
+            log(f"  {bench.name:<58} {rows:>9,} rows {record.seconds * 1000:>10.1f} ms {record.peak_mb:>9.1f} MB")
+    return records, failures
+
+
+# ── history ─────────────────────────────────────────────────────────────────
+def git_commit(root: Path = ROOT) -> Tuple[str, bool]:
+    """Short HEAD sha and whether tracked files are modified ("unknown" outside git)."""
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=root, capture_output=True, text=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return sha, bool(status.strip())
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "executable": sys.executable,
+    }
+
+
+def result_path(results_dir: Path = RESULTS_DIR, root: Path = ROOT) -> Path:
+    sha, dirty = git_commit(root)
+    return Path(results_dir) / f"{sha}{'-dirty' if dirty else ''}.json"
+
+
+def load_results(path) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_results(records: Sequence[Record], path, extra: Optional[dict] = None) -> Path:
+    """Write (or merge into) the result file ``path``; records re-measured replace the stored ones."""
+    path = Path(path)
+    previous = load_results(path)["results"] if path.exists() else []
+    measured = {(r.name, r.rows) for r in records}
+    kept = [r for r in previous if (r["name"], r["rows"]) not in measured]
+    sha, dirty = git_commit()
+    payload = {
+        "commit": sha,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        **(extra or {}),
+        "results": sorted(kept + [asdict(r) for r in records], key=lambda r: (r["group"], r["name"], r["rows"])),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def latest_baseline(current: Path, results_dir: Path = RESULTS_DIR) -> Optional[Path]:
+    """The most recent result file other than ``current`` (by its stored timestamp), or None."""
+    candidates = []
+    for path in Path(results_dir).glob("*.json"):
+        if path.resolve() == Path(current).resolve():
+            continue
+        try:
+            candidates.append((load_results(path)["timestamp"], path))
+        except (OSError, ValueError, KeyError):
+            continue
+    return max(candidates)[1] if candidates else None
+
+
+def compare(records: Sequence[Record], baseline: dict, threshold: float = 0.25) -> List[Comparison]:
+    """Time and peak memory of ``records`` against the matching (name, rows) records of ``baseline``."""
+    old = {(r["name"], r["rows"]): r for r in baseline.get("results", [])}
+    out = []
+    for rec in records:
+        base = old.get((rec.name, rec.rows))
+        if base is None:
+            continue
+        for metric, floor in (("seconds", MIN_SECONDS_DELTA), ("peak_mb", MIN_PEAK_DELTA_MB)):
+            before, after = float(base[metric]), float(getattr(rec, metric))
+            ratio = after / before if before > 0 else float("inf") if after > 0 else 1.0
+            out.append(Comparison(
+                rec.name, rec.rows, metric, before, after, ratio,
+                regression=ratio > 1 + threshold and after - before > floor,
+            ))
+    return out
+
+
+def comparison_table(comparisons: Sequence[Comparison]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [asdict(c) for c in comparisons],
+        columns=["name", "rows", "metric", "old", "new", "ratio", "regression"],
+    )
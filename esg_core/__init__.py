@@ -0,0 +1,6 @@
+"""
+Computation helpers shared by the Streamlit pages in ``views/``.
+
+Nothing in this package imports Streamlit, so every module can be used from
+scripts, batch jobs and benchmarks as well as from the pages.
+"""
@@ -0,0 +1,270 @@
+"""
+Monte Carlo attrition (and optional replacement hiring) for the 2026 budget.
+
+The deterministic budget assumes every employee without a Retire Date stays
+the whole budget year. Here each such employee leaves during the year with an
+annual probability taken from a per-group rate table (e.g. Division × Job
+Property), either configured by hand or derived from the departures recorded
+in an ESG extract (``historical_attrition_rates``).
+
+Departure times follow a constant hazard λ = -ln(1 - rate) from MAX(Hiring,
+Jan 1). Only the (trial, employee) pairs that actually leave are pushed
+through the batched budget chain (``esg_core.budget.payroll_chain``) and
+their change against the baseline is accumulated per trial, so a trial
+costs O(leavers) rather than O(employees). With ``replace_leavers`` every
+leaver is followed by a hire on the same salary after ``vacancy_months``.
+
+Trials run in fixed-size batches with one ``SeedSequence`` child per batch,
+so results depend only on the seed and the number of trials — not on
+``n_workers`` (batches can be spread over a process pool).
+"""
+import io
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from esg_core.budget import BudgetInputs, BudgetParams, payroll_chain
+
+PERCENTILES = (10, 50, 90)
+_DAY = np.timedelta64(1, "D")
+
+
+def group_labels(frame: pd.DataFrame, keys: Sequence[str]) -> pd.DataFrame:
+    """Group key columns as stripped strings, blanks as '(blank)' (the rate-table convention)."""
+    return frame[list(keys)].astype(object).where(frame[list(keys)].notna(), "(blank)").astype(str).apply(
+        lambda s: s.str.strip()
+    )
+
+
+def historical_attrition_rates(
+    extract: pd.DataFrame,
+    keys: Sequence[str],
+    years: Sequence[int],
+    hire_col: str = "Hire Date",
+    retire_col: str = "Retire Date",
+) -> pd.DataFrame:
+    """
+    Annual attrition rate per group over ``years``: leavers among the employees
+    active on Jan 1 of each year, divided by that Jan 1 headcount (pooled over years).
+    Returns ``keys`` + Headcount, Leavers, Rate (a single "All" row without keys).
+    """
+    H = pd.to_datetime(extract[hire_col], errors="coerce")
+    R = pd.to_datetime(extract[retire_col], errors="coerce")
+    if keys:
+        labels = group_labels(extract, keys)
+    else:  # one company-wide rate
+        keys = ["All"]
+        labels = pd.DataFrame({"All": "All"}, index=extract.index)
+
+    parts = []
+    for year in years:
+        start, end = pd.Timestamp(int(year), 1, 1), pd.Timestamp(int(year), 12, 31)
+        at_start = (H <= start) & (R.isna() | (R >= start))
+        left = at_start & (R >= start) & (R <= end)
+        parts.append(
+            labels.assign(Headcount=at_start.astype(int), Leavers=left.astype(int))
+            .groupby(list(keys), sort=True)[["Headcount", "Leavers"]].sum()
+        )
+    if not parts:
+        return pd.DataFrame(columns=[*keys, "Headcount", "Leavers", "Rate"])
+
+    table = pd.concat(parts).groupby(level=list(range(len(keys)))).sum().reset_index()
+    table["Rate"] = np.where(table["Headcount"] > 0, table["Leavers"] / table["Headcount"].clip(lower=1), 0.0)
+    return table
+
+
+def employee_rates(frame: pd.DataFrame, rates: pd.DataFrame, keys: Sequence[str], default_rate: float) -> np.ndarray:
+    """Annual attrition rate per row of ``frame`` from a ``keys`` + Rate table (missing → default)."""
+    if not keys or rates is None or rates.empty:
+        return np.full(len(frame), float(default_rate))
+    lookup = group_labels(rates, keys).assign(Rate=pd.to_numeric(rates["Rate"], errors="coerce").to_numpy())
+    lookup = lookup.drop_duplicates(subset=list(keys)).set_index(list(keys))["Rate"]
+    labels = group_labels(frame, keys)
+    index = pd.MultiIndex.from_frame(labels) if len(keys) > 1 else pd.Index(labels[keys[0]])
+    found = lookup.reindex(index).to_numpy(dtype=float)
+    return np.clip(np.where(np.isnan(found), float(default_rate), found), 0.0, 1.0)
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    trials: int = 1000
+    seed: int = 0
+    replace_leavers: bool = False
+    vacancy_months: float = 2.0
+    n_workers: int = 1
+    batch_trials: int = 100
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Per-trial totals plus baseline/mean/percentile summaries."""
+    trial_totals: pd.DataFrame                 # one row per trial
+    summary: pd.DataFrame                      # metric × (Baseline, Mean, P10, P50, P90)
+    by_level: Dict[str, pd.DataFrame] = field(default_factory=dict)  # groups × (Baseline, Mean, P10, P50, P90)
+    seconds: float = 0.0
+
+
+def _simulate_batch(payload: dict) -> np.ndarray:
+    """
+    One batch of trials. Returns (n_trials, 3 + ΣG): payroll delta, months delta,
+    leavers, then the payroll delta per group of every breakdown level.
+    """
+    n_trials = payload["n_trials"]
+    params: BudgetParams = payload["params"]
+    idx = payload["eligible"]
+    hire, cost, grade, rate = payload["hire"], payload["cost"], payload["grade"], payload["rate"]
+    levels = payload["levels"]
+    width = 3 + sum(g for _, g in levels)
+    out = np.zeros((n_trials, width))
+    if len(idx) == 0:
+        return out
+
+    rng = np.random.default_rng(payload["seed"])
+    year_start = np.datetime64(f"{params.budget_year}-01-01", "D")
+    days_in_year = int((np.datetime64(f"{params.budget_year + 1}-01-01", "D") - year_start) / _DAY)
+
+    # Constant hazard from MAX(H, Jan 1); departure day offset (from Jan 1) per trial × employee
+    start_offset = np.maximum((hire[idx].astype("datetime64[D]") - year_start) / _DAY, 0.0)
+    with np.errstate(divide="ignore"):
+        hazard = -np.log1p(-np.minimum(payload["p"][idx], 1.0 - 1e-12))
+        t_years = -np.log(rng.random((n_trials, len(idx)))) / hazard
+    depart = start_offset + np.floor(t_years * days_in_year)
+    trial, j = np.nonzero(depart < days_in_year)
+    if len(trial) == 0:
+        return out
+    rows = idx[j]
+    retire_new = (year_start + depart[trial, j].astype(np.int64) * _DAY).astype("datetime64[ns]")
+
+    new = payroll_chain(hire[rows], retire_new, cost[rows], grade[rows], rate[rows], params)
+    d_payroll = np.nan_to_num(new["payroll"], nan=0.0) - payload["base_payroll"][rows]
+    d_months = np.nan_to_num(new["months"], nan=0.0) - payload["base_months"][rows]
+    t_all, rows_all = trial, rows
+
+    if payload["replace_leavers"]:
+        hire_rep = retire_new + np.timedelta64(int(round(payload["vacancy_months"] * 30.42)), "D")
+        in_year = hire_rep < (year_start + days_in_year * _DAY)
+        if in_year.any():
+            rep_rows = rows[in_year]
+            rep = payroll_chain(
+                hire_rep[in_year], np.full(int(in_year.sum()), np.datetime64("NaT", "ns")),
+                cost[rep_rows], grade[rep_rows], rate[rep_rows], params,
+            )
+            d_payroll = np.concatenate([d_payroll, np.nan_to_num(rep["payroll"], nan=0.0)])
+            d_months = np.concatenate([d_months, np.nan_to_num(rep["months"], nan=0.0)])
+            t_all = np.concatenate([trial, trial[in_year]])
+            rows_all = np.concatenate([rows, rep_rows])
+
+    out[:, 0] = np.bincount(t_all, weights=d_payroll, minlength=n_trials)
+    out[:, 1] = np.bincount(t_all, weights=d_months, minlength=n_trials)
+    out[:, 2] = np.bincount(trial, minlength=n_trials)
+    col = 3
+    for codes, n_groups in levels:
+        flat = t_all * n_groups + codes[rows_all]
+        out[:, col:col + n_groups] = np.bincount(flat, weights=d_payroll, minlength=n_trials * n_groups).reshape(
+            n_trials, n_groups
+        )
+        col += n_groups
+    return out
+
+
+def _summary(baseline, samples: np.ndarray) -> pd.DataFrame:
+    """Rows = metrics/groups, columns Baseline, Mean, P10, P50, P90 (samples: trials × rows)."""
+    pct = np.percentile(samples, PERCENTILES, axis=0)
+    table = pd.DataFrame({"Baseline": baseline, "Mean": samples.mean(axis=0)})
+    for p, values in zip(PERCENTILES, pct):
+        table[f"P{p}"] = values
+    return table.round(2)
+
+
+def simulate_attrition(
+    frame: pd.DataFrame,
+    rates: np.ndarray,
+    params: BudgetParams,
+    config: SimulationConfig = SimulationConfig(),
+    groups: Optional[pd.DataFrame] = None,
+) -> SimulationResult:
+    """
+    Run ``config.trials`` attrition trials over ``frame`` (Hiring/Retire Date,
+    monthly salary, Grade, Contributions%) with per-row annual ``rates``.
+    Employees that already have a Retire Date keep it.
+    """
+    t0 = time.perf_counter()
+    inputs = BudgetInputs.from_frame(frame, active_months_col=None)
+    base = payroll_chain(inputs.hire, inputs.retire, inputs.monthly_cost, inputs.grade, inputs.rate, params)
+    base_payroll = np.nan_to_num(base["payroll"], nan=0.0)
+    base_months = np.nan_to_num(base["months"], nan=0.0)
+
+    year_end = np.datetime64(f"{params.budget_year}-12-31", "ns")
+    p = np.clip(np.asarray(rates, dtype=float), 0.0, 1.0)
+    eligible = np.flatnonzero(
+        np.isnat(inputs.retire) & ~np.isnat(inputs.hire) & (inputs.hire <= year_end) & (p > 0)
+    )
+
+    level_codes = {}
+    if groups is not None:
+        for col in groups.columns:
+            labels = group_labels(groups.reset_index(drop=True), [col])[col]
+            codes, uniques = pd.factorize(labels, sort=True)
+            level_codes[col] = (codes, pd.Index(uniques, name=col))
+
+    common = dict(
+        params=params, eligible=eligible, p=p, hire=inputs.hire,
+        cost=inputs.monthly_cost, grade=inputs.grade, rate=inputs.rate,
+        base_payroll=base_payroll, base_months=base_months,
+        replace_leavers=config.replace_leavers, vacancy_months=config.vacancy_months,
+        levels=[(codes, len(uniques)) for codes, uniques in level_codes.values()],
+    )
+    n_batches = max(1, math.ceil(config.trials / config.batch_trials))
+    seeds = np.random.SeedSequence(config.seed).spawn(n_batches)
+    payloads = [
+        dict(common, seed=seeds[b], n_trials=min(config.batch_trials, config.trials - b * config.batch_trials))
+        for b in range(n_batches)
+    ]
+    if config.n_workers > 1 and n_batches > 1:
+        with ProcessPoolExecutor(max_workers=config.n_workers) as pool:
+            chunks = list(pool.map(_simulate_batch, payloads))
+    else:
+        chunks = [_simulate_batch(payload) for payload in payloads]
+    deltas = np.vstack(chunks)
+
+    base_total = base_payroll.sum()
+    trial_totals = pd.DataFrame({
+        "Trial": np.arange(1, len(deltas) + 1),
+        "FY PAYROLL COST BUDGET 2026": base_total + deltas[:, 0],
+        "FY Months Budget 26": base_months.sum() + deltas[:, 1],
+        "Leavers": deltas[:, 2].astype(int),
+    })
+    summary = _summary(
+        [base_total, base_months.sum(), 0.0],
+        trial_totals[["FY PAYROLL COST BUDGET 2026", "FY Months Budget 26", "Leavers"]].to_numpy(dtype=float),
+    )
+    summary.index = ["FY PAYROLL COST BUDGET 2026", "FY Months Budget 26", "Leavers"]
+
+    by_level = {}
+    col = 3
+    for name, (codes, uniques) in level_codes.items():
+        n_groups = len(uniques)
+        base_groups = np.bincount(codes, weights=base_payroll, minlength=n_groups)
+        samples = base_groups[None, :] + deltas[:, col:col + n_groups]
+        table = _summary(base_groups, samples)
+        table.index = uniques
+        by_level[name] = table
+        col += n_groups
+
+    return SimulationResult(trial_totals, summary, by_level, time.perf_counter() - t0)
+
+
+def simulation_workbook(result: SimulationResult) -> bytes:
+    """XLSX with the summary, one sheet per breakdown level and the per-trial totals."""
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
+        result.summary.to_excel(writer, sheet_name="Summary")
+        for level, table in result.by_level.items():
+            table.to_excel(writer, sheet_name=str(level)[:31])
+        result.trial_totals.to_excel(writer, index=False, sheet_name="Trials")
+    return buf.getvalue()
@@ -0,0 +1,279 @@
+"""
+Manpower budget for a folder of MAIN files, without the page:
+
+    python -m esg_core.batch EXPORTS_DIR [--params params.json]
+        [--contributions contributions.xlsx] [--out budget_out] [--workers 4]
+
+Every MAIN file (.xlsx / .xls / .csv) goes through the same stages as on the
+Manpower page (``esg_core.manpower``: parse → clean → prepare_base → derived
+columns → final_frame) in a process pool, one file per task. The output
+folder gets
+
+  - one workbook per company (``<Company>.xlsx``, the final columns plus the
+    TOTAL row, as the page's "Filtered + Totals" download);
+  - ``Group Manpower Budget.xlsx``: every company's rows with a TOTAL row
+    ("Group"), the per-company sums ("Companies") and the run log ("Files").
+
+The parameters file is JSON with the sidebar fields; the percentages are
+given as on the page (3.0 for 3 %) and missing fields keep the page defaults:
+
+    {"projection_date": "2025-10-01", "no_increase_cutoff": "2025-08-01",
+     "effective_increase_date": "2026-05-01", "salary_increase_pct": 3.0,
+     "salary_increase_pct2": 5.0, "payroll_periods": 14}
+
+Each file is logged with its row counts, timing and notices. A file that
+cannot be read or lacks a REQUIRED_COLUMNS column is a schema error: it is
+left out of the outputs and the exit code is 1, as for a file whose
+computation fails (2 for a bad command line, parameters or contributions
+file).
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from esg_core.manpower import (
+    SALARY_COL, ManpowerParams, clean_table, derive_columns, final_frame, parse_table, prepare_base, with_totals,
+)
+from esg_core.notices import Notice, collect
+
+log = logging.getLogger("esg_core.batch")
+
+INPUT_SUFFIXES = (".xlsx", ".xls", ".csv")
+# columns every prepared MAIN file needs for the budget columns
+REQUIRED_COLUMNS = ["Hrms Id", SALARY_COL, "Hiring Date"]
+GROUP_WORKBOOK = "Group Manpower Budget.xlsx"
+
+DEFAULT_PARAMS = {
+    "projection_date": "2025-10-01",
+    "no_increase_cutoff": "2025-08-01",
+    "effective_increase_date": "2026-05-01",
+    "salary_increase_pct": 3.0,
+    "salary_increase_pct2": 5.0,
+    "payroll_periods": 14,
+}
+
+EXIT_OK, EXIT_SCHEMA, EXIT_USAGE = 0, 1, 2
+
+
+class SchemaError(ValueError):
+    """An input file that cannot be read or misses required columns."""
+
+
+@dataclass
+class FileResult:
+    """Outcome of one MAIN file; ``frame`` is None when ``error`` is set."""
+    path: str
+    rows_read: int = 0
+    rows_out: int = 0
+    seconds: float = 0.0
+    frame: Optional[pd.DataFrame] = None
+    notices: List[Notice] = field(default_factory=list)
+    error: str = ""
+
+
+def load_params(path: Optional[str]) -> ManpowerParams:
+    """:class:`ManpowerParams` from a JSON parameters file (module docstring); None → page defaults."""
+    values = dict(DEFAULT_PARAMS)
+    if path:
+        with open(path, encoding="utf-8") as fh:
+            given = json.load(fh)
+        unknown = sorted(set(given) - set(DEFAULT_PARAMS))
+        if unknown:
+            raise ValueError(f"unknown parameter(s) in {path}: {', '.join(unknown)}")
+        values.update(given)
+    return ManpowerParams(
+        projection_date=pd.Timestamp(values["projection_date"]),
+        no_increase_cutoff=pd.Timestamp(values["no_increase_cutoff"]).date(),
+        effective_increase_date=pd.Timestamp(values["effective_increase_date"]).date(),
+        inc_pct=float(values["salary_increase_pct"]) / 100.0,
+        inc_pct2=float(values["salary_increase_pct2"]) / 100.0,
+        payroll_periods=int(values["payroll_periods"]),
+    )
+
+
+def load_contributions(path: str, sheet_name=0, header_row: int = 0) -> pd.DataFrame:
+    """The 'Hrms Id' / 'Contributions' table of a CONTRIBUTIONS file, checked as on the page."""
+    df = parse_table(path, sheet_name=sheet_name, header_row=header_row)
+    if "Αριθμός μητρώου" in df.columns and "Hrms Id" not in df.columns:
+        df = df.rename(columns={"Αριθμός μητρώου": "Hrms Id"})
+    if "Hrms Id" not in df.columns:
+        raise SchemaError(f"{path}: the contributions file must contain 'Αριθμός μητρώου' (or 'Hrms Id').")
+    if "Contributions" not in df.columns:
+        raise SchemaError(f"{path}: the contributions file must contain a 'Contributions' column.")
+    df["Hrms Id"] = df["Hrms Id"].astype(str).str.strip()
+    return df[["Hrms Id", "Contributions"]]
+
+
+def input_files(folder: str) -> List[Path]:
+    """MAIN files of ``folder`` by name (Excel lock files "~$…" left out)."""
+    return sorted(
+        p for p in Path(folder).iterdir()
+        if p.is_file() and p.suffix.lower() in INPUT_SUFFIXES and not p.name.startswith("~$")
+    )
+
+
+def run_file(path: str, params: ManpowerParams, contributions: Optional[pd.DataFrame] = None,
+             sheet_name=0, header_row: int = 0) -> FileResult:
+    """One MAIN file through every stage (the process-pool task; never raises)."""
+    result = FileResult(str(path))
+    t0 = time.perf_counter()
+    try:
+        with collect() as notices:
+            try:
+                df = clean_table(parse_table(path, sheet_name=sheet_name, header_row=header_row))
+            except Exception as exc:
+                raise SchemaError(f"cannot read the file: {exc}") from exc
+            result.rows_read = len(df)
+            df = prepare_base(df, params.projection_date)
+            missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+            if missing:
+                raise SchemaError(f"missing column(s) {', '.join(map(repr, missing))}")
+            result.frame = final_frame(derive_columns(df.reset_index(drop=True), params, contributions))
+            result.rows_out = len(result.frame)
+    except SchemaError as exc:
+        result.error = str(exc)
+    except Exception as exc:  # a failing file must not take the other files down with it
+        result.error = f"failed: {type(exc).__name__}: {exc}"
+        result.frame = None
+    finally:
+        result.notices = list(notices)
+        result.seconds = time.perf_counter() - t0
+    return result
+
+
+def run_files(paths: Sequence, params: ManpowerParams, contributions: Optional[pd.DataFrame] = None,
+              workers: Optional[int] = None, sheet_name=0, header_row: int = 0) -> List[FileResult]:
+    """:func:`run_file` for every path (in a process pool unless ``workers`` is 1), results in ``paths`` order."""
+    args = [(str(p), params, contributions, sheet_name, header_row) for p in paths]
+    if workers == 1 or len(args) <= 1:
+        return [run_file(*a) for a in args]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_file, *a) for a in args]
+        return [f.result() for f in futures]
+
+
+def company_frames(results: Sequence[FileResult]) -> List[Tuple[str, pd.DataFrame]]:
+    """Rows of the successful files per 'Company' (the file name when the column is missing), by company name."""
+    parts = {}
+    for r in results:
+        if r.frame is None:
+            continue
+        if "Company" in r.frame.columns:
+            for company, rows in r.frame.groupby(r.frame["Company"].astype(str).str.strip(), sort=False):
+                parts.setdefault(company, []).append(rows)
+        else:
+            parts.setdefault(Path(r.path).stem, []).append(r.frame)
+    return [(company, pd.concat(frames, ignore_index=True)) for company, frames in sorted(parts.items())]
+
+
+def file_log(results: Sequence[FileResult]) -> pd.DataFrame:
+    """One row per input file: rows read / written, seconds, notices and the error (if any)."""
+    return pd.DataFrame({
+        "File": [Path(r.path).name for r in results],
+        "Rows Read": [r.rows_read for r in results],
+        "Rows Written": [r.rows_out for r in results],
+        "Seconds": [round(r.seconds, 3) for r in results],
+        "Notices": ["\n".join(n.message for n in r.notices) for r in results],
+        "Error": [r.error for r in results],
+    })
+
+
+def safe_filename(name: str) -> str:
+    return re.sub(r'[<>:"/\\|?*\x00-\x1f]+', "_", name).strip(" .") or "company"
+
+
+def write_outputs(results: Sequence[FileResult], out_dir: str) -> List[Path]:
+    """Per-company workbooks and the group workbook (module docstring) in ``out_dir``; the paths written."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    companies = company_frames(results)
+    written = []
+    for company, df in companies:
+        path = out / f"{safe_filename(company)}.xlsx"
+        with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+            with_totals(df).to_excel(writer, index=False, sheet_name="Data")
+        written.append(path)
+
+    group = pd.concat([df for _, df in companies], ignore_index=True) if companies else pd.DataFrame()
+    numeric_cols = group.select_dtypes(include=["number"]).columns.tolist()
+    summary = pd.DataFrame(
+        [{"Company": company, "Employees": len(df), **df[numeric_cols].sum(numeric_only=True).round(2)}
+         for company, df in companies],
+        columns=["Company", "Employees", *numeric_cols],
+    )
+    path = out / GROUP_WORKBOOK
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        with_totals(group).to_excel(writer, index=False, sheet_name="Group")
+        summary.to_excel(writer, index=False, sheet_name="Companies")
+        file_log(results).to_excel(writer, index=False, sheet_name="Files")
+    written.append(path)
+    return written
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m esg_core.batch",
+        description="Manpower budget workbooks for a folder of MAIN manpower files.",
+    )
+    parser.add_argument("inputs", help="folder with the MAIN manpower files (.xlsx, .xls, .csv)")
+    parser.add_argument("--params", help="JSON parameters file (defaults: the page's sidebar defaults)")
+    parser.add_argument("--contributions", help="CONTRIBUTIONS file ('Hrms Id' / 'Αριθμός μητρώου' + 'Contributions')")
+    parser.add_argument("--out", default="budget_out", help="output folder (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count; 1 = no pool)")
+    parser.add_argument("--sheet", default="0", help="Excel sheet name or 0-based index (default: first sheet)")
+    parser.add_argument("--header-row", type=int, default=0, help="0-based header row of Excel files")
+    parser.add_argument("-v", "--verbose", action="store_true", help="also log every notice")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    sheet_name = int(args.sheet) if args.sheet.isdigit() else args.sheet
+
+    if not os.path.isdir(args.inputs):
+        log.error("%s is not a folder", args.inputs)
+        return EXIT_USAGE
+    try:
+        params = load_params(args.params)
+        contributions = None
+        if args.contributions:
+            contributions = load_contributions(args.contributions, sheet_name=0, header_row=0)
+    except (OSError, ValueError) as exc:
+        log.error("%s", exc)
+        return EXIT_USAGE
+
+    paths = input_files(args.inputs)
+    if not paths:
+        log.error("no .xlsx / .xls / .csv files in %s", args.inputs)
+        return EXIT_USAGE
+    log.info("%d file(s), budget year %d, %s workers", len(paths), params.budget_year, args.workers or os.cpu_count())
+
+    t0 = time.perf_counter()
+    results = run_files(paths, params, contributions, workers=args.workers, sheet_name=sheet_name, header_row=args.header_row)
+    for r in results:
+        name = Path(r.path).name
+        if r.error:
+            log.error("%s: schema error: %s (%.2fs)", name, r.error, r.seconds)
+        else:
+            log.info("%s: %d rows read, %d rows written in %.2fs (%d notices)",
+                     name, r.rows_read, r.rows_out, r.seconds, len(r.notices))
+        for n in r.notices:
+            log.debug("%s: %s%s", name, f"{n.source}: " if n.source else "", n.message)
+
+    for path in write_outputs(results, args.out):
+        log.info("wrote %s", path)
+    failed = sum(1 for r in results if r.error)
+    log.info("%d of %d file(s) done in %.2fs", len(results) - failed, len(results), time.perf_counter() - t0)
+    return EXIT_SCHEMA if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
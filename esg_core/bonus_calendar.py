@@ -0,0 +1,287 @@
+"""
+Bonus calendar: the date-derived arrays behind the Manpower budget columns.
+
+Everything in here depends only on the Hiring/Retire dates and an anchor
+(projection date or budget year), never on salaries, rates or increase
+percentages. The calendars are memoized on a hash of the two date columns,
+so a sidebar change that does not touch dates reuses the arrays, and the
+kernels that share the same anchor ("Months Projection 25" and "FY Gross
+Salary Projection For 25"; "FY Months Budget 26" and "Annual Gross Salary
+FY Budget 2026") compute them once between them.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from esg_core.yearfrac import as_days, clip_dates, roundup, yearfrac_30360_us
+
+CACHE_SIZE = 16
+
+_cache: "OrderedDict[tuple, object]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ProjectionCalendar:
+    """Arrays for the current-year ("25") projection, anchored on the projection date."""
+    base_months: float
+    retire_months: np.ndarray
+    hire_months: np.ndarray
+    retire_hiring: np.ndarray
+    # Months Projection 25: JulyPart denominator stops at DecBonusDate.
+    july_part: np.ndarray
+    bonus_months: np.ndarray
+    months_projection: np.ndarray
+    # FY Gross Salary Projection For 25: JulyPart denominator runs to MAX(SafeRetire, DecBonusDate).
+    july_part_salary: np.ndarray
+    bonus_months_salary: np.ndarray
+    result_months_salary: np.ndarray
+
+
+@dataclass(frozen=True)
+class BudgetCalendar:
+    """April/July/Dec bonus parts for one budget year."""
+    april_part: np.ndarray
+    july_part: np.ndarray
+    # DecPart falls back to the pro-rata share for H <= DecDate (FY Months Budget 26)
+    # or for H >= StartCurrYear (Annual Gross Salary FY Budget 2026).
+    dec_part: np.ndarray
+    dec_part_from_start: np.ndarray
+
+
+def dates_key(hire: pd.Series, retire: pd.Series) -> str:
+    """Content hash of the Hiring/Retire date columns (index ignored)."""
+    h = hashlib.sha1()
+    for s in (hire, retire):
+        h.update(pd.util.hash_pandas_object(pd.Series(s), index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def _memoized(key: tuple, build):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = build()
+    with _cache_lock:
+        _cache[key] = value
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def _frozen(arr) -> np.ndarray:
+    arr = np.asarray(arr, dtype=float)
+    arr.setflags(write=False)
+    return arr
+
+
+def _ratio_roundup(num, den, scale: float, decimals: int = 1) -> np.ndarray:
+    """ROUNDUP((num / den) * scale; decimals), 0 where num/den is blank or den <= 0."""
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    valid = ~np.isnan(num) & ~np.isnan(den) & (den > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(valid, (num / np.where(valid, den, 1.0)) * scale, 0.0)
+    return roundup(ratio, decimals)
+
+
+def projection_calendar(hire: pd.Series, retire: pd.Series, projection_date) -> ProjectionCalendar:
+    """Memoized :class:`ProjectionCalendar` for these dates and projection date."""
+    prodate = pd.to_datetime(projection_date)
+    key = ("projection", dates_key(hire, retire), prodate)
+    return _memoized(key, lambda: _build_projection_calendar(hire, retire, prodate))
+
+
+def budget_calendar(hire: pd.Series, retire: pd.Series, budget_year: int) -> BudgetCalendar:
+    """Memoized :class:`BudgetCalendar` for these dates and budget year."""
+    key = ("budget", dates_key(hire, retire), int(budget_year))
+    return _memoized(key, lambda: build_budget_calendar(hire, retire, int(budget_year)))
+
+
+def _build_projection_calendar(H: pd.Series, R: pd.Series, prodate: pd.Timestamp) -> ProjectionCalendar:
+    H = pd.to_datetime(H, errors="coerce")
+    R = pd.to_datetime(R, errors="coerce")
+
+    CurrYear   = prodate.year
+    PrevYear   = CurrYear - 1
+    BudgetYear = CurrYear + 1
+
+    # Anchors
+    StartCurrYear = pd.Timestamp(CurrYear, 1, 1)
+    EndCurYear    = pd.Timestamp(CurrYear, 12, 31)
+    DecBonusDate  = pd.Timestamp(CurrYear, 12, 31)
+    JulyBonusDate = pd.Timestamp(CurrYear, 7, 31)  # end of July
+    AprilVac      = pd.Timestamp(CurrYear, 4, 1)
+    Christmther   = pd.Timestamp(CurrYear, 5, 1)   # threshold for Christmas bonus logic
+
+    YearH = H.dt.year
+    YearR = R.dt.year
+    Hd = as_days(H)
+    Rd = as_days(R)
+
+    # Base months (30/360 US)
+    BaseMonths   = float(yearfrac_30360_us(prodate, EndCurYear) * 12.0)
+    RetireMonths = yearfrac_30360_us(prodate, Rd) * 12.0
+    HireMonths   = yearfrac_30360_us(Hd, EndCurYear) * 12.0
+    RetireHiring = yearfrac_30360_us(Hd, Rd) * 12.0
+
+    # ---------- JulyPart ----------
+    # SafeRetire = R if present else DecBonusDate; the numerator always ends at MIN(SafeRetire, DecBonusDate)
+    july_num_end = clip_dates(Rd, upper=DecBonusDate, fill=DecBonusDate)
+    july_num = np.where(
+        H < JulyBonusDate,
+        yearfrac_30360_us(JulyBonusDate, july_num_end),
+        yearfrac_30360_us(clip_dates(Hd, lower=StartCurrYear), july_num_end),
+    )
+    is_july_eligible = (H >= AprilVac).to_numpy()
+
+    def _july_part(july_den):
+        return np.where(is_july_eligible, _ratio_roundup(july_num, july_den, 0.5, decimals=2), 0.0)
+
+    # Months Projection 25 clamps SafeRetire at DecBonusDate first, so its denominator is constant
+    JulyPart = _july_part(yearfrac_30360_us(StartCurrYear, DecBonusDate))
+    JulyPartSalary = _july_part(
+        yearfrac_30360_us(StartCurrYear, clip_dates(Rd, lower=DecBonusDate, fill=DecBonusDate))
+    )
+
+    # ---------- BonusMonths ----------
+    # piece = yearfrac(MAX(H, Christmther), MIN(R, EOMONTH(DecBonusDate))) * 12 / 8, blanks → bounds
+    full_xmas = ((H <= Christmther) & (R.isna() | (R >= DecBonusDate))).to_numpy()
+    piece_vec = yearfrac_30360_us(
+        clip_dates(Hd, lower=Christmther, fill=Christmther),
+        clip_dates(Rd, upper=DecBonusDate, fill=DecBonusDate),
+    ) * 12.0 / 8.0
+
+    def _bonus_months(july_part):
+        return np.where(full_xmas, 1.0 + july_part, piece_vec + july_part).astype(float)
+
+    BonusMonths = _bonus_months(JulyPart)
+    BonusMonthsSalary = _bonus_months(JulyPartSalary)
+
+    # ---------- NoRetire / RetireCalc (IFS) ----------
+    hired_budget_year = (YearH == BudgetYear)
+    hired_up_to_prev = (YearH < PrevYear) | (YearH == PrevYear)
+    hired_curr_year = (YearH == CurrYear)
+    hired_after_prodate = (H > prodate)
+    hired_by_prodate = (H <= prodate)
+
+    cond1 = (YearH <= CurrYear) & (R <= prodate)
+    cond2 = (YearH < PrevYear) & (YearR == CurrYear)
+    cond3 = (YearH == PrevYear) & (YearR == CurrYear)
+    cond4 = (YearH == CurrYear) & (YearR == CurrYear)
+    cond5 = (YearH == CurrYear) & (YearR == BudgetYear)
+    cond6 = (YearH <= PrevYear) & (YearR == BudgetYear)
+
+    def _projected_months(bonus_months):
+        NoRetire = np.where(
+            hired_budget_year, 0.0,
+            np.where(
+                hired_up_to_prev,
+                BaseMonths + bonus_months,
+                np.where(
+                    hired_curr_year,
+                    np.where(hired_after_prodate, HireMonths + bonus_months, BaseMonths + bonus_months),
+                    0.0
+                )
+            )
+        ).astype(float)
+
+        RetireCalc = np.where(
+            cond1, 0.0,
+            np.where(
+                cond2 | cond3, RetireMonths + bonus_months,
+                np.where(
+                    cond4, np.where(hired_by_prodate, RetireMonths + bonus_months, RetireHiring + bonus_months),
+                    np.where(
+                        cond5, np.where(hired_by_prodate, BaseMonths + bonus_months, HireMonths + bonus_months),
+                        np.where(
+                            cond6, BaseMonths + bonus_months,
+                            np.nan
+                        )
+                    )
+                )
+            )
+        ).astype(float)
+
+        # ROUNDUP(IF(YearH = BudgetYear, 0, IF(R present, RetireCalc, NoRetire)), 1)
+        raw = np.where(hired_budget_year, 0.0, np.where(R.notna(), RetireCalc, NoRetire)).astype(float)
+        return roundup(raw, 1)
+
+    return ProjectionCalendar(
+        base_months=BaseMonths,
+        retire_months=_frozen(RetireMonths),
+        hire_months=_frozen(HireMonths),
+        retire_hiring=_frozen(RetireHiring),
+        july_part=_frozen(JulyPart),
+        bonus_months=_frozen(BonusMonths),
+        months_projection=_frozen(_projected_months(BonusMonths)),
+        july_part_salary=_frozen(JulyPartSalary),
+        bonus_months_salary=_frozen(BonusMonthsSalary),
+        result_months_salary=_frozen(_projected_months(BonusMonthsSalary)),
+    )
+
+
+def build_budget_calendar(H, R, CurrYear: int) -> BudgetCalendar:
+    """
+    Unmemoized :class:`BudgetCalendar`, for one-off date arrays (e.g. simulated
+    retire dates) that would only churn the cache.
+    """
+    H = pd.to_datetime(H, errors="coerce")
+    R = pd.to_datetime(R, errors="coerce")
+
+    StartCurrYear = pd.Timestamp(CurrYear, 1, 1)
+    AprilDate     = pd.Timestamp(CurrYear, 4, 30)
+    JulyDate      = pd.Timestamp(CurrYear, 7, 1)
+    DecDate       = pd.Timestamp(CurrYear, 12, 31)
+    ChristmasThr  = pd.Timestamp(CurrYear, 5, 1)
+
+    Hd = as_days(H)
+    Rd = as_days(R)
+    h_from_start = clip_dates(Hd, lower=StartCurrYear, fill=StartCurrYear)  # MAX(H, Start), blank → Start
+
+    # Booleans
+    EmployedOnApril = (H <= StartCurrYear) & (R.isna() | (R >= AprilDate))
+    EmployedOnJuly  = (H <= StartCurrYear) & (R.isna() | (R >= JulyDate))
+    EmployedOnDec   = (H <= ChristmasThr)  & (R.isna() | (R >= DecDate))
+
+    # AprilPart
+    # IF(EmployedOnApril; 0.5; IF(H < AprilDate; ROUNDUP( yearfrac(MAX(H,Start), MIN(April,R)) / yearfrac(Start,April) * 0.5 ;1); 0))
+    april_num = yearfrac_30360_us(h_from_start, clip_dates(Rd, upper=AprilDate, fill=AprilDate))
+    april_den = yearfrac_30360_us(StartCurrYear, AprilDate)  # constant
+    AprilPart = np.where(
+        EmployedOnApril, 0.5,
+        np.where(H < AprilDate, _ratio_roundup(april_num, april_den, 0.5), 0.0)
+    ).astype(float)
+
+    # JulyPart
+    # IF(EmployedOnJuly; 0.5; IF(H<=DecDate; ROUNDUP(yearfrac(MAX(H,Start), MIN(Dec,R)) / yearfrac(Start, MAX(Dec,R)) * 0.5;1); 0))
+    july_num = yearfrac_30360_us(h_from_start, clip_dates(Rd, upper=DecDate, fill=DecDate))
+    july_den = yearfrac_30360_us(StartCurrYear, clip_dates(Rd, lower=DecDate, fill=DecDate))
+    JulyPart = np.where(
+        EmployedOnJuly, 0.5,
+        np.where(H <= DecDate, _ratio_roundup(july_num, july_den, 0.5), 0.0)
+    ).astype(float)
+
+    # DecPart
+    # IF(EmployedOnDec; 1; IF(<fallback>; ROUNDUP(yearfrac(MAX(H,Start), MIN(Dec,R)) / yearfrac(ChristmasThr, MAX(Dec,R)) * 1;1); 0))
+    dec_den = yearfrac_30360_us(ChristmasThr, clip_dates(Rd, lower=DecDate, fill=DecDate))
+    dec_ratio = _ratio_roundup(july_num, dec_den, 1.0)  # same numerator as JulyPart
+    DecPart = np.where(EmployedOnDec, 1.0, np.where(H <= DecDate, dec_ratio, 0.0)).astype(float)
+    DecPartFromStart = np.where(EmployedOnDec, 1.0, np.where(H >= StartCurrYear, dec_ratio, 0.0)).astype(float)
+
+    return BudgetCalendar(
+        april_part=_frozen(AprilPart),
+        july_part=_frozen(JulyPart),
+        dec_part=_frozen(DecPart),
+        dec_part_from_start=_frozen(DecPartFromStart),
+    )
@@ -0,0 +1,301 @@
+"""
+Array kernels for the 2026 payroll budget (FY Months Budget 26, Annual Gross
+Salary, employer contributions, FY PAYROLL COST BUDGET 2026).
+
+Per-employee inputs are 1-D arrays of length N. The increase parameters
+(``inc_pct``, ``inc_pct2``, ``effective_increase_date``, ``no_increase_cutoff``)
+may be scalars, giving (N,) results exactly as the Manpower page computes them,
+or 1-D arrays of S scenarios, giving (N, S) results in one broadcast pass.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from esg_core.bonus_calendar import build_budget_calendar
+
+BONUS_RATE = 0.04166  # from the budget sheet (0,04166)
+RATE_PLUS_30 = 0.1879  # + 30 per active month
+RATE_PLUS_25 = 0.1738  # + 25 per active month
+
+
+def _numeric(series: pd.Series) -> pd.Series:
+    """Decimal-comma tolerant numeric coercion ('0,1879' → 0.1879, text → NaN)."""
+    return pd.to_numeric(series.astype(str).str.replace(",", ".", regex=False), errors="coerce")
+
+
+@dataclass(frozen=True)
+class BudgetInputs:
+    """Per-employee arrays the 2026 budget kernels read, coerced like the page does."""
+    hire: np.ndarray            # datetime64[ns]
+    retire: np.ndarray          # datetime64[ns]
+    active_months: np.ndarray   # FY Months Budget 26, NaN → 0
+    monthly_cost: np.ndarray    # NaN → 0
+    grade: np.ndarray           # NaN where missing / text
+    rate: np.ndarray            # Contributions%, NaN where missing
+
+    def __len__(self) -> int:
+        return len(self.hire)
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        active_months_col: Optional[str] = "FY Months Budget 26",
+        monthly_cost_col: str = "Monthly Gross Salary (Current)",
+        grade_col: str = "Grade",
+        rate_col: Optional[str] = "Contributions%",
+    ) -> "BudgetInputs":
+        n = len(df)
+        nan = pd.Series(np.nan, index=df.index)
+        grade = (
+            pd.to_numeric(df[grade_col].astype(str).str.replace(",", ".", regex=False).str.strip(), errors="coerce")
+            if grade_col in df.columns else nan
+        )
+        return cls(
+            hire=pd.to_datetime(df["Hiring Date"], errors="coerce").to_numpy(dtype="datetime64[ns]"),
+            retire=pd.to_datetime(df["Retire Date"], errors="coerce").to_numpy(dtype="datetime64[ns]"),
+            active_months=(
+                pd.to_numeric(df[active_months_col], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+                if active_months_col else np.zeros(n)
+            ),
+            monthly_cost=_numeric(df[monthly_cost_col]).fillna(0.0).to_numpy(dtype=float),
+            grade=grade.to_numpy(dtype=float),
+            rate=(
+                _numeric(df[rate_col]).to_numpy(dtype=float)
+                if rate_col and rate_col in df.columns else np.full(n, np.nan)
+            ),
+        )
+
+    def take(self, positions) -> "BudgetInputs":
+        """Subset of employees (e.g. after the page filters)."""
+        return BudgetInputs(*(getattr(self, f)[positions] for f in self.__dataclass_fields__))
+
+
+def _scenario_dates(values) -> pd.DatetimeIndex:
+    if isinstance(values, (list, tuple, np.ndarray, pd.Series, pd.Index)):
+        return pd.DatetimeIndex(pd.to_datetime(list(values)))
+    return pd.DatetimeIndex([pd.to_datetime(values)])
+
+
+def _plus_one_year(dates: pd.DatetimeIndex) -> np.ndarray:
+    return pd.DatetimeIndex([d + relativedelta(years=1) for d in dates]).to_numpy(dtype="datetime64[ns]")
+
+
+def _is_scalar(*values) -> bool:
+    return all(np.ndim(v) == 0 and not isinstance(v, (list, tuple)) for v in values)
+
+
+def annual_gross_2026(
+    inputs: BudgetInputs,
+    april_part: np.ndarray,
+    dec_part: np.ndarray,
+    effective_increase_date,
+    no_increase_cutoff,
+    inc_pct,
+    inc_pct2,
+) -> np.ndarray:
+    """
+    'Annual Gross Salary FY Budget 2026'.
+
+    ``april_part`` / ``dec_part`` come from ``bonus_calendar.budget_calendar`` for
+    YEAR(effective_increase_date): shape (N,), or (N, S) when the scenarios span
+    several years.
+    """
+    scalar = _is_scalar(effective_increase_date, no_increase_cutoff, inc_pct, inc_pct2)
+
+    inc = np.atleast_1d(np.asarray(inc_pct, dtype=float))[None, :]
+    inc2 = np.atleast_1d(np.asarray(inc_pct2, dtype=float))[None, :]
+    inc_start = _scenario_dates(effective_increase_date)
+    h5 = _scenario_dates(no_increase_cutoff)
+    one_year_after_h5 = _plus_one_year(h5)[None, :]
+    one_year_after_yrdt = _plus_one_year(inc_start)[None, :]
+    h5 = h5.to_numpy(dtype="datetime64[ns]")[None, :]
+
+    H = inputs.hire[:, None]
+    R = inputs.retire[:, None]
+    r_missing = np.isnat(R)
+    ActiveMonths = inputs.active_months[:, None]
+    MonthlyCost = inputs.monthly_cost[:, None]
+    AprilPart = april_part if np.ndim(april_part) == 2 else np.asarray(april_part)[:, None]
+    DecPart = dec_part if np.ndim(dec_part) == 2 else np.asarray(dec_part)[:, None]
+
+    # --- Per-row increase rule: if Grade == 0.1 -> inc_pct2 else inc_pct ---
+    inc_used = np.where(np.isclose(inputs.grade, 0.1, atol=1e-9)[:, None], inc2, inc)
+
+    # --- Factors ---
+    AprilFactor = 1.0
+    dec_factor_cond = (H <= h5) & (r_missing | (R > one_year_after_h5))
+    DecFactor = np.where(dec_factor_cond, 1.0 + inc_used, 1.0)
+
+    # --- BaseCost (split at MONTH(IncStart)-0.5) ---
+    inc_split = (np.asarray(inc_start.month, dtype=float) - 0.5)[None, :]
+    pre_increase_months = np.minimum(ActiveMonths, inc_split)
+    post_increase_months = np.maximum(ActiveMonths - inc_split, 0.0)
+
+    basecost_condition = (H <= h5) & (r_missing | (R > one_year_after_yrdt))
+    BaseCost_all = np.where(
+        basecost_condition,
+        pre_increase_months * MonthlyCost + post_increase_months * MonthlyCost * (1.0 + inc_used),
+        ActiveMonths * MonthlyCost,
+    )
+    BaseCost_all = np.round(BaseCost_all, 2)
+
+    # --- Allowances ---
+    Allowances_all = np.round(
+        MonthlyCost * BONUS_RATE * (AprilPart * AprilFactor + DecPart * DecFactor),
+        2,
+    )
+
+    # Zero out rows with no active months
+    Total_all = np.round(BaseCost_all + Allowances_all, 2)
+    Total = np.where(ActiveMonths > 0, Total_all, 0.0)
+    return Total[:, 0] if scalar else Total
+
+
+def employer_contrib_2026(annual_gross: np.ndarray, rate: np.ndarray, active_months: np.ndarray) -> np.ndarray:
+    """
+    'Annual Employer's Contributions For 2026' = annual × rate
+    (+ 30/month at rate 0.1879, + 25/month at rate 0.1738). NaN where the rate is missing.
+    """
+    annual = np.nan_to_num(np.asarray(annual_gross, dtype=float), nan=0.0)
+    rate = np.asarray(rate, dtype=float)
+    months = np.nan_to_num(np.asarray(active_months, dtype=float), nan=0.0)
+    if annual.ndim == 2:
+        rate = rate[:, None]
+        months = months[:, None]
+    base = annual * rate
+    add_30 = np.where(np.isclose(rate, RATE_PLUS_30, atol=1e-6), 30.0 * months, 0.0)
+    add_25 = np.where(np.isclose(rate, RATE_PLUS_25, atol=1e-6), 25.0 * months, 0.0)
+    return np.round(base + add_30 + add_25, 2)
+
+
+def payroll_cost_2026(annual_gross: np.ndarray, employer_contrib: np.ndarray) -> np.ndarray:
+    """'FY PAYROLL COST BUDGET 2026' = annual gross + employer contributions."""
+    return np.round(np.asarray(annual_gross, dtype=float) + np.asarray(employer_contrib, dtype=float), 2)
+
+
+def fy_months_budget_26(
+    hire,
+    retire,
+    budget_year: int,
+    full_periods: float,
+    april_part: np.ndarray,
+    july_part: np.ndarray,
+    dec_part: np.ndarray,
+    divisor: float = 30.42,
+) -> np.ndarray:
+    """
+    'FY Months Budget 26' (paid months incl. bonus parts) for ``budget_year``.
+
+    ``april_part`` / ``july_part`` / ``dec_part`` are the ``BudgetCalendar``
+    arrays of the same dates and year (``dec_part``: the H <= Dec fallback).
+    """
+    H = pd.Series(pd.to_datetime(np.asarray(hire), errors="coerce"))
+    R = pd.Series(pd.to_datetime(np.asarray(retire), errors="coerce"))
+
+    CurrYear = int(budget_year)
+    PrevYear = CurrYear - 1
+    StartCurrYear = pd.Timestamp(CurrYear, 1, 1)
+    EndCurrYear = pd.Timestamp(CurrYear, 12, 31)
+    FullPeriods = float(full_periods)
+    Divisor = float(divisor)
+
+    BonusMonths = (april_part + july_part + dec_part).astype(float)
+    YearH = H.dt.year
+
+    # NoRetire
+    # IF(H <= Start) THEN
+    #     IF(BonusMonths > 1.89; FullPeriods; (FullPeriods - 2) + BonusMonths)
+    # ELSE IF(YEAR(H) = CurrYear)
+    #     (EndCurrYear - H)/Divisor + BonusMonths
+    # ELSE 0
+    days_end_minus_h = (EndCurrYear - H).dt.days
+    days_end_minus_h = days_end_minus_h.where(~pd.isna(days_end_minus_h), 0)
+
+    NoRetire = np.where(
+        H <= StartCurrYear,
+        np.where(BonusMonths > 1.89, FullPeriods, (FullPeriods - 2.0) + BonusMonths),
+        np.where(YearH == CurrYear, (days_end_minus_h / Divisor) + BonusMonths, 0.0),
+    ).astype(float)
+
+    # RetireCalc
+    # IF(R=""; 0; IFS(
+    #   YEAR(H) <= PrevYear & YEAR(R) <= PrevYear → 0
+    #   YEAR(H) <= PrevYear & YEAR(R) = CurrYear → (R - Start)/Div + BonusMonths
+    #   YEAR(H) = CurrYear  & YEAR(R) = CurrYear → (R - H)    /Div + BonusMonths
+    #   TRUE → NA()
+    # ))
+    YearR = R.dt.year
+    days_r_minus_start = (R - StartCurrYear).dt.days
+    days_r_minus_h = (R - H).dt.days
+
+    cond1 = R.isna()
+    cond2 = (~R.isna()) & (YearH <= PrevYear) & (YearR <= PrevYear)
+    cond3 = (~R.isna()) & (YearH <= PrevYear) & (YearR == CurrYear)
+    cond4 = (~R.isna()) & (YearH == CurrYear) & (YearR == CurrYear)
+
+    RetireCalc = np.where(
+        cond1, 0.0,
+        np.where(
+            cond2, 0.0,
+            np.where(
+                cond3, (days_r_minus_start / Divisor) + BonusMonths,
+                np.where(cond4, (days_r_minus_h / Divisor) + BonusMonths, np.nan),  # TRUE; NA()
+            ),
+        ),
+    ).astype(float)
+
+    # Final: ROUND(IF(R<>""; RetireCalc; NoRetire); 1)
+    final_val = np.where(~R.isna(), RetireCalc, NoRetire)
+    return np.round(final_val.astype(float), 1)
+
+
+@dataclass(frozen=True)
+class BudgetParams:
+    """The sidebar parameters the 2026 budget chain depends on."""
+    budget_year: int
+    full_periods: float
+    effective_increase_date: pd.Timestamp
+    no_increase_cutoff: pd.Timestamp
+    inc_pct: float
+    inc_pct2: float
+
+
+def payroll_chain(hire, retire, monthly_cost, grade, rate, params: BudgetParams) -> dict:
+    """
+    FY Months Budget 26 → Annual Gross → Employer's Contributions → FY PAYROLL COST
+    BUDGET 2026 for plain per-row arrays (no memoized calendars), e.g. rows with
+    simulated retire dates. Returns the four arrays keyed by short names.
+    """
+    hire = pd.to_datetime(np.asarray(hire), errors="coerce").to_numpy(dtype="datetime64[ns]")
+    retire = pd.to_datetime(np.asarray(retire), errors="coerce").to_numpy(dtype="datetime64[ns]")
+
+    cal = build_budget_calendar(hire, retire, params.budget_year)
+    months = fy_months_budget_26(
+        hire, retire, params.budget_year, params.full_periods, cal.april_part, cal.july_part, cal.dec_part
+    )
+
+    inc_year = pd.to_datetime(params.effective_increase_date).year
+    inc_cal = cal if inc_year == params.budget_year else build_budget_calendar(hire, retire, inc_year)
+    inputs = BudgetInputs(
+        hire=hire,
+        retire=retire,
+        active_months=np.nan_to_num(months, nan=0.0),
+        monthly_cost=np.nan_to_num(np.asarray(monthly_cost, dtype=float), nan=0.0),
+        grade=np.asarray(grade, dtype=float),
+        rate=np.asarray(rate, dtype=float),
+    )
+    annual = annual_gross_2026(
+        inputs, inc_cal.april_part, inc_cal.dec_part_from_start,
+        params.effective_increase_date, params.no_increase_cutoff, params.inc_pct, params.inc_pct2,
+    )
+    employer = employer_contrib_2026(annual, inputs.rate, inputs.active_months)
+    return {
+        "months": months,
+        "annual_gross": annual,
+        "employer_contrib": employer,
+        "payroll": payroll_cost_2026(annual, employer),
+    }
@@ -0,0 +1,122 @@
+"""
+Column-role detection for exports whose headers vary between systems.
+
+The pages recognise some columns by a marker value they contain rather than
+by name (the column holding "ΑΝΔΡΑΣ" is the gender column, the one holding
+"DIVISION" is the division, …). Detection here is cheap and done once per
+export layout:
+
+1. headers first — a role whose name is already a header is resolved;
+2. only text columns are searched, each on a bounded sample of its distinct
+   values (joined once, then a plain substring test per marker), instead of
+   stringifying the full column once per marker;
+3. the resolved ``{column: role}`` mapping is memoized on a fingerprint of
+   the header row (names and dtype kinds) and the markers, so later uploads of
+   the same layout skip the scan for the roles already found. Only found roles
+   are memoized: a role is found from the data, and a later upload with the
+   same headers may hold the marker an earlier one lacked, so the missing
+   roles are searched again on every upload.
+
+A column takes at most one role; markers are tried in order and each takes
+the first matching column that is still free. Matching is a literal,
+case-sensitive substring test.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Mapping, Sequence
+
+import pandas as pd
+
+CACHE_SIZE = 64
+SAMPLE_DISTINCT = 20000
+
+_SEP = "\x1f"
+
+_cache: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def header_fingerprint(df: pd.DataFrame, markers: Mapping[str, str]) -> str:
+    """Hash of the header row (names + dtype kinds) and the marker → role table."""
+    h = hashlib.sha1()
+    for col, dtype in zip(df.columns, df.dtypes):
+        h.update(f"{col}{_SEP}{dtype.kind}{_SEP}".encode("utf-8"))
+    h.update(repr(list(markers.items())).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _is_text(series: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def _distinct_text(series: pd.Series, sample: int) -> str:
+    values = pd.unique(series.dropna().to_numpy())[:sample]
+    return _SEP.join(map(str, values))
+
+
+def detect_roles(
+    df: pd.DataFrame,
+    markers: Mapping[str, str],
+    sample: int = SAMPLE_DISTINCT,
+    skip_roles: Sequence[str] = (),
+    taken: Sequence[str] = (),
+) -> Dict[str, str]:
+    """
+    ``{column: role}`` for the ``markers`` (marker value → role name) found in
+    ``df``. ``skip_roles`` / ``taken`` exclude roles and columns resolved elsewhere.
+    """
+    headers = set(map(str, df.columns))
+    used = set(taken)
+    found: Dict[str, str] = {}
+    texts: Dict[int, str] = {}
+    for value, role in markers.items():
+        if role in headers or role in skip_roles or role in found.values():
+            continue
+        for i, col in enumerate(df.columns):
+            if col in used or col in found:
+                continue
+            series = df.iloc[:, i]
+            if not _is_text(series):
+                continue
+            if i not in texts:
+                texts[i] = _distinct_text(series, sample)
+            if value in texts[i]:
+                found[col] = role
+                break
+    return found
+
+
+def resolve_roles(df: pd.DataFrame, markers: Mapping[str, str], sample: int = SAMPLE_DISTINCT) -> Dict[str, str]:
+    """:func:`detect_roles`, with the roles found memoized per header layout."""
+    key = header_fingerprint(df, markers)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            cached = dict(cached)
+    mapping = cached or {}
+    headers = set(map(str, df.columns))
+    missing = [role for role in markers.values() if role not in headers and role not in mapping.values()]
+    if cached is not None and not missing:
+        return mapping
+    found = detect_roles(df, markers, sample, skip_roles=list(mapping.values()), taken=list(mapping))
+    mapping.update(found)
+    if cached is None or found:
+        with _cache_lock:
+            _cache[key] = dict(mapping)
+            _cache.move_to_end(key)
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return mapping
+
+
+def rename_by_markers(df: pd.DataFrame, markers: Mapping[str, str], sample: int = SAMPLE_DISTINCT) -> pd.DataFrame:
+    """``df`` with the columns found by :func:`resolve_roles` renamed to their roles."""
+    mapping = resolve_roles(df, markers, sample)
+    return df.rename(columns=mapping) if mapping else df
@@ -0,0 +1,185 @@
+"""
+Conversion of local-currency amounts to EUR.
+
+Rates live in a :class:`RateTable`: one row per company and validity period
+(``Company``, ``Currency``, ``Valid From``, ``Rate`` = EUR per unit of local
+currency). A period runs from its ``Valid From`` date until the next period of
+the same company; a row without ``Valid From`` is valid from the beginning.
+
+Conversion is column-wise:
+
+* without dates, every company maps to its latest rate through a categorical
+  code lookup;
+* with dates (one per row, or one for all rows), rates are joined with
+  ``merge_asof`` on the date, so a multi-year history converts in one pass at
+  the rate valid on each row's date. Dates before a company's first period
+  use that first period; missing dates use the latest rate.
+
+Companies that are not in the table are taken to report in EUR (rate 1.0).
+"""
+import os
+from typing import Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+COMPANY = "Company"
+CURRENCY = "Currency"
+VALID_FROM = "Valid From"
+RATE = "Rate"
+COLUMNS = [COMPANY, CURRENCY, VALID_FROM, RATE]
+
+# EUR per unit of local currency; the defaults the Comp&Ben sidebar starts from
+DEFAULT_RATES = {
+    "ALUMIL YU INDUSTRY SA": 0.0085,
+    "ALUMIL ALBANIA Sh.P.K": 0.0103,
+    "ALUMIL ROM INDUSTRY SA": 0.1968,
+    "ALUMIL MISR FOR TRADING S.A.E.": 0.0176,
+    "ALPRO VLASENICA A.D.": 0.5100,
+    "ALUMIL MIDDLE EAST JLT": 0.2300,
+}
+DEFAULT_CURRENCIES = {
+    "ALUMIL YU INDUSTRY SA": "RSD",
+    "ALUMIL ALBANIA Sh.P.K": "ALL",
+    "ALUMIL ROM INDUSTRY SA": "RON",
+    "ALUMIL MISR FOR TRADING S.A.E.": "EGP",
+    "ALPRO VLASENICA A.D.": "BAM",
+    "ALUMIL MIDDLE EAST JLT": "AED",
+}
+
+_MIN_DATE = np.datetime64("1900-01-01", "s")
+
+
+def _as_seconds(values) -> pd.Series:
+    # one resolution on both sides of merge_asof; [s] holds 9999-12-31 placeholders
+    return pd.Series(pd.to_datetime(values, errors="coerce")).astype("datetime64[s]")
+
+
+def read_rate_table(file_like) -> pd.DataFrame:
+    """
+    Parse a rate table from CSV (``;`` or ``,`` separated) or Excel. Needs
+    ``Company`` and ``Rate``; ``Valid From`` and ``Currency`` are optional.
+    Decimal commas in ``Rate`` are accepted.
+    """
+    name = getattr(file_like, "name", str(file_like)).lower()
+    if name.endswith((".xlsx", ".xls")):
+        raw = pd.read_excel(file_like)
+    else:
+        raw = pd.read_csv(file_like, sep=None, engine="python")
+    raw.columns = [str(c).strip() for c in raw.columns]
+    missing = {COMPANY, RATE} - set(raw.columns)
+    if missing:
+        raise ValueError(f"rate table is missing column(s): {', '.join(sorted(missing))}")
+    return RateTable(raw).table
+
+
+class RateTable:
+    """Dated EUR exchange rates per company (see the module docstring)."""
+
+    def __init__(self, table: pd.DataFrame):
+        table = table.copy()
+        for col in (CURRENCY, VALID_FROM):
+            if col not in table.columns:
+                table[col] = pd.NA if col == CURRENCY else pd.NaT
+        rate = table[RATE]
+        if not pd.api.types.is_numeric_dtype(rate):
+            rate = pd.to_numeric(rate.astype(str).str.replace(",", ".", regex=False), errors="coerce")
+        table[RATE] = rate.astype(float)
+        table[COMPANY] = table[COMPANY].astype(str).str.strip()
+        table[VALID_FROM] = _as_seconds(table[VALID_FROM]).to_numpy()
+        table = table.dropna(subset=[RATE])
+        # periods in date order within each company; companies keep their order of appearance
+        table = table[COLUMNS].assign(_company=pd.factorize(table[COMPANY])[0])
+        table = table.sort_values(["_company", VALID_FROM], na_position="first", kind="mergesort")
+        self.table = table.drop(columns="_company").reset_index(drop=True)
+
+    @classmethod
+    def from_rates(cls, rates: Mapping[str, float], currencies: Optional[Mapping[str, str]] = None) -> "RateTable":
+        """One open-ended period per company."""
+        currencies = currencies or {}
+        return cls(pd.DataFrame({
+            COMPANY: list(rates),
+            CURRENCY: [currencies.get(c) for c in rates],
+            VALID_FROM: pd.NaT,
+            RATE: list(rates.values()),
+        }))
+
+    @classmethod
+    def from_env(cls) -> "RateTable":
+        """The table in ESG_FX_RATES_FILE when set, else :data:`DEFAULT_RATES`."""
+        path = os.environ.get("ESG_FX_RATES_FILE")
+        if path:
+            return cls(read_rate_table(path))
+        return cls.from_rates(DEFAULT_RATES, DEFAULT_CURRENCIES)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @property
+    def companies(self) -> list:
+        return list(self.table[COMPANY].unique())
+
+    def latest(self) -> pd.Series:
+        """Current rate per company (its latest period)."""
+        return self.table.groupby(COMPANY, sort=False)[RATE].last()
+
+    def with_latest(self, rates: Mapping[str, float]) -> "RateTable":
+        """Copy with the latest period of each company in ``rates`` set to the given rate (new companies added)."""
+        table = self.table.copy()
+        last = table.groupby(COMPANY, sort=False).tail(1)
+        last_rows = pd.Series(last.index, index=last[COMPANY])
+        new_rows = []
+        for company, rate in rates.items():
+            if company in last_rows.index:
+                table.loc[last_rows[company], RATE] = float(rate)
+            else:
+                new_rows.append({COMPANY: company, CURRENCY: None, VALID_FROM: pd.NaT, RATE: float(rate)})
+        if new_rows:
+            table = pd.concat([table, pd.DataFrame(new_rows)], ignore_index=True)
+        return RateTable(table)
+
+    def rates_for(self, companies, dates=None) -> np.ndarray:
+        """
+        EUR rate per row. ``dates``: None (latest rates), one date for all rows,
+        or one date per row.
+        """
+        companies = pd.Series(companies).reset_index(drop=True)
+        latest = self.latest()
+        # categorical lookup: code -1 (unknown company) picks the trailing 1.0
+        codes = pd.Categorical(companies, categories=latest.index).codes
+        current = np.append(latest.to_numpy(dtype=float), 1.0)[codes]
+        if dates is None or self.table[VALID_FROM].isna().all():
+            return current
+
+        if np.ndim(dates) == 0:
+            dates = np.repeat(pd.Timestamp(dates).to_datetime64(), len(companies))
+        when = _as_seconds(dates).reset_index(drop=True)
+        if len(when) != len(companies):
+            raise ValueError("dates must be a scalar or have one entry per company")
+        dated = when.notna().to_numpy() & (codes >= 0)
+        if not dated.any():
+            return current
+
+        left = pd.DataFrame({
+            "_row": np.flatnonzero(dated),
+            COMPANY: companies[dated].astype(str).to_numpy(),
+            "_when": when[dated].to_numpy(),
+        }).sort_values("_when", kind="mergesort")
+        right = self.table[[COMPANY, VALID_FROM, RATE]].copy()
+        right[COMPANY] = right[COMPANY].astype(str)
+        right[VALID_FROM] = right[VALID_FROM].fillna(pd.Timestamp(_MIN_DATE)).astype("datetime64[s]")
+        right = right.sort_values(VALID_FROM, kind="mergesort")
+        joined = pd.merge_asof(left, right, left_on="_when", right_on=VALID_FROM, by=COMPANY, direction="backward")
+
+        # before a company's first period: use that first period
+        first = self.table.groupby(COMPANY, sort=False)[RATE].first()
+        rate = joined[RATE].fillna(joined[COMPANY].map(first))
+        out = current.copy()
+        out[joined["_row"].to_numpy()] = rate.to_numpy(dtype=float)
+        return out
+
+    def to_eur(self, amounts, companies, dates=None) -> pd.Series:
+        """``amounts`` × the EUR rate of each row's company (and date); keeps ``amounts``' index."""
+        amounts = pd.Series(amounts)
+        rates = self.rates_for(companies, dates)
+        return pd.Series(pd.to_numeric(amounts, errors="coerce").to_numpy(dtype=float) * rates, index=amounts.index, name=amounts.name)
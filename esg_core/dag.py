@@ -0,0 +1,229 @@
+"""
+Dependency-tracked recompute of derived DataFrame columns.
+
+A page declares its derived columns as ``Node`` objects: each node names the
+parameters and input columns it reads and the columns it writes. ``ColumnGraph``
+orders the nodes by their column dependencies and, on every ``run``, gives each
+column a version token:
+
+  - base columns: a content hash of the column (values + index);
+  - derived columns: the key of the node run that produced them.
+
+A node's key is the hash of its parameter values and its input column versions,
+so a node only recomputes when something it actually reads has changed. Results
+are kept per node in a small LRU, which makes toggling a widget back and forth
+free as well. ``last_run`` records which nodes ran and how long each took;
+nodes that run are also ``esg_core.profiling`` stages, named after their
+function.
+
+Notices a node raises (``esg_core.notices``) are kept with its cached result
+and raised again whenever the result is reused, so a caller collecting them
+sees the same warnings on every run.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from esg_core.notices import Notice, collect, emit
+from esg_core.profiling import stage
+
+MISSING = "<missing>"
+
+
+@dataclass(frozen=True)
+class Node:
+    """
+    One derived-column step.
+
+    ``func(frame, **params)`` receives a copy of the input columns that exist in
+    the current frame and returns a DataFrame; the ``outputs`` it contains are
+    taken over (a missing output means the step skipped, e.g. after a warning).
+    """
+    name: str
+    func: Callable[..., pd.DataFrame]
+    inputs: Tuple[str, ...] = ()
+    params: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class NodeRun:
+    """What happened to one node on the last ``ColumnGraph.run``."""
+    name: str
+    ran: bool
+    seconds: float
+    outputs: Tuple[str, ...]
+    missing_inputs: Tuple[str, ...]
+    notices: Tuple[Notice, ...] = ()
+
+
+def _sha1(*parts) -> str:
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else repr(part).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def column_version(series: pd.Series) -> str:
+    """Content token of one column (values, dtype and index)."""
+    try:
+        hashed = pd.util.hash_pandas_object(series, index=True).to_numpy()
+    except TypeError:
+        # unhashable cells (lists, dicts…) → fall back to their string form
+        hashed = pd.util.hash_pandas_object(series.astype(str), index=True).to_numpy()
+    return _sha1(str(series.dtype), hashed.tobytes())
+
+
+def param_token(value) -> str:
+    """Stable token for a parameter value; frames/series are hashed by content."""
+    if isinstance(value, pd.DataFrame):
+        return _sha1(*(column_version(value[c]) for c in value.columns), tuple(map(str, value.columns)))
+    if isinstance(value, pd.Series):
+        return column_version(value)
+    if isinstance(value, np.ndarray):
+        return _sha1(str(value.dtype), value.shape, np.ascontiguousarray(value).tobytes())
+    return _sha1(type(value).__name__, value)
+
+
+def _toposort(nodes: Sequence[Node]) -> List[Node]:
+    """Order nodes so producers run before consumers (declaration order otherwise)."""
+    producer: Dict[str, str] = {}
+    for node in nodes:
+        for col in node.outputs:
+            if col in producer:
+                raise ValueError(f"Column '{col}' is produced by both '{producer[col]}' and '{node.name}'.")
+            producer[col] = node.name
+
+    by_name = {node.name: node for node in nodes}
+    if len(by_name) != len(nodes):
+        raise ValueError("Node names must be unique.")
+    deps = {
+        node.name: {producer[c] for c in node.inputs if c in producer and producer[c] != node.name}
+        for node in nodes
+    }
+
+    ordered: List[Node] = []
+    done: set = set()
+    pending = [node.name for node in nodes]
+    while pending:
+        # take the first declared node whose producers are all done
+        name = next((name for name in pending if deps[name] <= done), None)
+        if name is None:
+            raise ValueError(f"Cycle between nodes: {pending}")
+        ordered.append(by_name[name])
+        done.add(name)
+        pending.remove(name)
+    return ordered
+
+
+class ColumnGraph:
+    """Runs a set of ``Node`` objects over a base frame, recomputing only stale nodes."""
+
+    def __init__(self, nodes: Sequence[Node], cache_size: int = 4):
+        self.nodes = _toposort(nodes)
+        self.cache_size = cache_size
+        # per node: key → (output arrays, notices raised while computing them)
+        self._cache: Dict[str, "OrderedDict[str, tuple]"] = {n.name: OrderedDict() for n in self.nodes}
+        self._lock = threading.Lock()
+        self.last_run: List[NodeRun] = []
+
+    def clear(self) -> None:
+        with self._lock:
+            for entries in self._cache.values():
+                entries.clear()
+            self.last_run = []
+
+    def _lookup(self, name: str, key: str) -> Optional[tuple]:
+        with self._lock:
+            entries = self._cache[name]
+            if key in entries:
+                entries.move_to_end(key)
+                return entries[key]
+        return None
+
+    def _store(self, name: str, key: str, values: tuple) -> None:
+        with self._lock:
+            entries = self._cache[name]
+            entries[key] = values
+            entries.move_to_end(key)
+            while len(entries) > self.cache_size:
+                entries.popitem(last=False)
+
+    def run(self, base: pd.DataFrame, params: Mapping[str, object]) -> pd.DataFrame:
+        """
+        Return ``base`` plus every derived column. ``base`` itself is not modified.
+        Raises ``KeyError`` if a node needs a parameter that was not supplied.
+        """
+        df = base.copy()
+        versions: Dict[str, str] = {}
+        param_tokens: Dict[str, str] = {}
+        runs: List[NodeRun] = []
+
+        def version_of(col: str) -> str:
+            if col not in versions:
+                versions[col] = column_version(df[col]) if col in df.columns else MISSING
+            return versions[col]
+
+        for node in self.nodes:
+            for p in node.params:
+                if p not in param_tokens:
+                    param_tokens[p] = param_token(params[p])
+            present = tuple(c for c in node.inputs if c in df.columns)
+            missing = tuple(c for c in node.inputs if c not in df.columns)
+            key = _sha1(
+                node.name,
+                tuple((p, param_tokens[p]) for p in node.params),
+                tuple((c, version_of(c)) for c in node.inputs),
+            )
+
+            cached = self._lookup(node.name, key)
+            ran = cached is None
+            t0 = time.perf_counter()
+            if ran:
+                frame = df.loc[:, list(present)].copy()
+                with collect() as raised, stage(node.func.__name__, rows_in=len(frame)) as timed:
+                    result = timed.out(node.func(frame, **{p: params[p] for p in node.params}))
+                values = {
+                    col: result[col].array
+                    for col in node.outputs
+                    if result is not None and col in result.columns
+                }
+                bad = [col for col, arr in values.items() if len(arr) != len(df)]
+                if bad:
+                    raise ValueError(f"Node '{node.name}' changed the row count of {bad}.")
+                cached = (values, tuple(Notice(n.message, n.level, n.source or node.name) for n in raised))
+                self._store(node.name, key, cached)
+            cached, notices = cached
+            for notice in notices:
+                emit(notice)
+            for col, values in cached.items():
+                # hand out a copy so edits downstream never reach the cache
+                df[col] = pd.Series(values.copy(), index=df.index, name=col)
+                versions[col] = _sha1(key, col)
+            runs.append(NodeRun(node.name, ran, time.perf_counter() - t0, tuple(cached), missing, notices))
+
+        self.last_run = runs
+        return df
+
+    def last_run_frame(self) -> pd.DataFrame:
+        """``last_run`` as a small table for a debug view."""
+        return pd.DataFrame(
+            [
+                {
+                    "Node": r.name,
+                    "Status": "ran" if r.ran else "cached",
+                    "Time (ms)": round(r.seconds * 1000.0, 2),
+                    "Outputs": ", ".join(r.outputs),
+                    "Missing inputs": ", ".join(r.missing_inputs),
+                    "Notices": len(r.notices),
+                }
+                for r in self.last_run
+            ]
+        )
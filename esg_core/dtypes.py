@@ -0,0 +1,94 @@
+"""
+Compact in-memory dtypes for the canonical frames.
+
+``compact_frame`` runs at the end of ingestion, so cached and snapshotted
+frames already carry the lean types:
+
+* low-cardinality text dimensions (company, division, city, gender, …)
+  become ``category``: one small integer code per row plus one copy of each
+  distinct label;
+* ID columns become ``category`` too — integer codes with the IDs as the
+  lookup table (``series.cat.codes`` / ``series.cat.categories``), while
+  ``isin``, ``==`` and display keep working on the ID text;
+* either conversion is kept only when it is smaller than the text column (an
+  ID that is unique per row saves nothing over Arrow-backed strings);
+* ``int64`` columns are narrowed to ``int32`` when their values fit; not
+  further, so the pages' arithmetic (× 26 day rates, × 12 months) keeps
+  its headroom. Floats stay ``float64``: salary sums in ``float32`` drift in
+  the cents, and years with gaps need the NaN.
+
+The dtype and deep size of every column before compaction is kept in
+``df.attrs[ATTRS_KEY]`` (attrs survive copies, filters and snapshots), so
+:func:`memory_report` can show before/after bytes per column on any frame
+derived from the compacted one.
+
+Grouping on categorical columns must pass ``observed=True`` (pandas < 3
+defaults to one row per *declared* category, including unused ones).
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+ATTRS_KEY = "compaction"
+
+REPORT_COLUMNS = ["Column", "Before dtype", "After dtype", "Before bytes", "After bytes", "Saved bytes"]
+
+
+def _is_text(series: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def _as_category(series: pd.Series, size: int) -> pd.Series:
+    converted = series.astype("category")
+    return converted if converted.memory_usage(deep=True, index=False) < size else series
+
+
+def _narrow_int(series: pd.Series) -> pd.Series:
+    info = np.iinfo(np.int32)
+    if series.dtype.itemsize > 4 and (series.empty or (info.min <= series.min() and series.max() <= info.max)):
+        return series.astype(np.int32)
+    return series
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    categories: Sequence[str] = (),
+    ids: Sequence[str] = (),
+) -> pd.DataFrame:
+    """
+    ``df`` with the listed text ``categories`` and ``ids`` as ``category``
+    (where that is smaller) and integer columns narrowed (see the module
+    docstring). Missing columns are skipped; ``df`` itself is not modified.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    before: Dict[str, list] = {
+        str(col): [str(dtype), int(usage.iloc[i])] for i, (col, dtype) in enumerate(df.dtypes.items())
+    }
+    out = df.copy(deep=False)
+    listed = set(categories) | set(ids)
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if isinstance(series, pd.DataFrame):
+            continue  # duplicate header: leave both as they are
+        if col in listed and _is_text(series):
+            out[col] = _as_category(series, int(usage.iloc[i]))
+        elif pd.api.types.is_integer_dtype(series) and isinstance(series.dtype, np.dtype):
+            out[col] = _narrow_int(series)
+    out.attrs[ATTRS_KEY] = before
+    return out
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Before/after dtype and deep bytes per column of ``df``. Columns added after
+    compaction (or frames never compacted) report their current size on both sides.
+    """
+    before = df.attrs.get(ATTRS_KEY, {})
+    usage = df.memory_usage(deep=True, index=False)
+    rows = []
+    for i, (col, dtype) in enumerate(df.dtypes.items()):
+        after = int(usage.iloc[i])
+        dtype_before, bytes_before = before.get(str(col), (str(dtype), after))
+        rows.append([str(col), dtype_before, str(dtype), int(bytes_before), after, int(bytes_before) - after])
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
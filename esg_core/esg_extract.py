@@ -0,0 +1,107 @@
+"""
+Canonical employee table from the ESG HR extract.
+
+The HR Data Analyst and Comp&Ben pages both work on the same export (CSV,
+ISO-8859-7, ``;``-delimited; Excel and UTF-8 are accepted too). ``read_esg_extract``
+turns it into one typed frame that both pages read:
+
+  - marker-based column roles (gender, job property, city, contract,
+    division, department; see ``esg_core.columns``);
+  - birth / hire / departure dates parsed as dd/mm/YYYY (invalid → NaT),
+    plus Hire Year and Departure Year;
+  - employee ID as stripped text under "Αριθμός μητρώου" (renamed from
+    "Κωδικός εργαζόμενου" when needed);
+  - contract types PERMANENT / TEMPORARY translated to their Greek labels;
+  - "Ονομαστικός μισθός" normalized to monthly amounts (``esg_core.salary``)
+    and "ΜΙΚΤΕΣ ΑΠΟΔ" (gross earnings) parsed to numbers;
+  - organisation dimensions and the employee ID stored as ``category``
+    (``esg_core.dtypes``; group on them with ``observed=True``).
+
+Page-specific columns (age groups, EUR conversions, …) are derived on top by
+the pages and never written back.
+"""
+import pandas as pd
+
+from esg_core.columns import rename_by_markers
+from esg_core.dtypes import compact_frame
+from esg_core.salary import SALARY, normalize_salary, parse_decimal
+
+COMPANY = "Περιγραφή εταιρίας"
+EMPLOYEE_ID = "Αριθμός μητρώου"
+BIRTH = "Ημ/νία γέννησης"
+HIRE = "Ημ/νία πρόσληψης"
+DEPARTURE = "Ημ/νία αποχώρησης"
+CONTRACT_TYPE = "Σύμβαση"
+GROSS = "ΜΙΚΤΕΣ ΑΠΟΔ"
+
+DATE_COLUMNS = [BIRTH, DEPARTURE, HIRE]
+CATEGORY_COLUMNS = [
+    COMPANY, "Division", "Department", "Πόλη", CONTRACT_TYPE, "Job Property",
+    "Όνομα Φύλου", "Περιγραφή Αιτ. Αποχώρησης",
+]
+DATE_FORMAT = "%d/%m/%Y"
+
+# marker value → column role, for columns whose header differs between exports
+ROLE_MARKERS = {
+    "ΑΝΔΡΑΣ": "Όνομα Φύλου",
+    "OPERATIONAL": "Job Property",
+    "ΕΥΚΑΡΠΙΑ": "Πόλη",
+    "ΑΟΡΙΣΤΟΥ ΧΡΟΝΟΥ": CONTRACT_TYPE,
+    "DIVISION": "Division",
+    "ΕΠΑΝΑΤΙΜΟΛΟΓΗΣΗ": "Department",
+}
+CONTRACT_LABELS = {
+    "PERMANENT": "ΑΟΡΙΣΤΟΥ ΧΡΟΝΟΥ",
+    "TEMPORARY": "ΟΡΙΣΜΕΝΟΥ ΧΡΟΝΟΥ",
+}
+
+
+def _rewound(file_like):
+    if hasattr(file_like, "seek"):
+        file_like.seek(0)
+    return file_like
+
+
+def _read_csv(file_like, encoding: str) -> pd.DataFrame:
+    return pd.read_csv(_rewound(file_like), encoding=encoding, delimiter=";")
+
+
+def _read_raw(file_like) -> pd.DataFrame:
+    name = getattr(file_like, "name", str(file_like)).lower()
+    if name.endswith(".xlsx"):
+        return pd.read_excel(file_like)
+    if name.endswith(".csv"):
+        try:
+            return _read_csv(file_like, "iso-8859-7")
+        except UnicodeDecodeError:
+            return _read_csv(file_like, "utf-8")
+    # extension unclear: CSV first, then Excel
+    for encoding in ("iso-8859-7", "utf-8"):
+        try:
+            return _read_csv(file_like, encoding)
+        except Exception:
+            pass
+    return pd.read_excel(_rewound(file_like))
+
+
+def read_esg_extract(file_like) -> pd.DataFrame:
+    """Parse and clean one ESG HR extract (see the module docstring)."""
+    df = rename_by_markers(_read_raw(file_like), ROLE_MARKERS)
+
+    for col in DATE_COLUMNS:
+        df[col] = pd.to_datetime(df[col], format=DATE_FORMAT, errors="coerce")
+    df["Hire Year"] = df[HIRE].dt.year
+    df["Departure Year"] = df[DEPARTURE].dt.year
+
+    if "Κωδικός εργαζόμενου" in df.columns and EMPLOYEE_ID not in df.columns:
+        df = df.rename(columns={"Κωδικός εργαζόμενου": EMPLOYEE_ID})
+    df[EMPLOYEE_ID] = df[EMPLOYEE_ID].astype(str).str.strip()
+
+    if CONTRACT_TYPE in df.columns:
+        df[CONTRACT_TYPE] = df[CONTRACT_TYPE].replace(CONTRACT_LABELS)
+
+    if SALARY in df.columns:
+        df[SALARY] = normalize_salary(df)
+    if GROSS in df.columns:
+        df[GROSS] = parse_decimal(df[GROSS])
+    return compact_frame(df, categories=CATEGORY_COLUMNS, ids=[EMPLOYEE_ID])
@@ -0,0 +1,156 @@
+"""
+Row filters for the sidebar multiselects, as precomputed bitsets.
+
+A :class:`FilterIndex` is built once per dataset over its filter columns:
+each column is factorized once (labels in order of first appearance; missing
+values are left out, or kept as one NaN label with ``dropna=False``), and
+every (column, label) pair gets a bit-packed row mask (one bit per row,
+``np.packbits``). A selection is then
+
+* OR of the selected labels' bitsets within a column,
+* AND across columns (and with any caller mask, e.g. "active on date"),
+
+on packed bytes, and only the final mask is unpacked and used to index the
+frame once — instead of one ``isin`` and one intermediate frame per filter.
+Option lists come from the same labels; ``options(col, within=mask)`` lists
+only the labels still present under a mask, for cascading filters.
+
+Columns with more than ``MAX_BITSET_LABELS`` distinct values keep only their
+codes and are matched with ``np.isin`` on the codes. The bitsets are built in
+row chunks, so building them never holds more than ``BITSET_CHUNK_BYTES`` of
+unpacked one-hot rows.
+"""
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+MAX_BITSET_LABELS = 256
+BITSET_CHUNK_BYTES = 8 * 2**20
+
+
+def _is_na(value) -> bool:
+    return not isinstance(value, (list, tuple, np.ndarray)) and bool(pd.isna(value))
+
+
+def _text_labels(codes: np.ndarray, uniques) -> tuple:
+    """Re-factorize ``uniques`` as stripped text (values equal as text share a label; NaN stays NaN)."""
+    text = [u if _is_na(u) else str(u).strip() for u in uniques]
+    remap, labels = pd.factorize(np.array(text, dtype=object), use_na_sentinel=False)
+    codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1) if len(remap) else codes
+    return codes, list(labels)
+
+
+def factorize_labels(values: Iterable, as_text: bool = False, dropna: bool = True) -> tuple:
+    """
+    ``(codes, labels)`` for one column: int64 codes into ``labels`` (order of
+    first appearance; -1 = missing unless ``dropna=False``). With ``as_text``
+    the labels are stripped strings.
+    """
+    codes, uniques = pd.factorize(pd.Series(values).to_numpy(), use_na_sentinel=dropna)
+    codes = np.asarray(codes, dtype=np.int64)
+    if as_text:
+        return _text_labels(codes, uniques)
+    return codes, list(uniques)
+
+
+def _packed_onehot(codes: np.ndarray, n_labels: int) -> np.ndarray:
+    """(n_labels, ceil(rows / 8)) packed row masks, one per code (-1 sets no bit)."""
+    n = len(codes)
+    packed = np.zeros((n_labels, (n + 7) // 8), dtype=np.uint8)
+    if not n_labels:
+        return packed
+    labels = np.arange(n_labels)[:, None]
+    # a multiple of 8 rows, so every chunk packs into whole bytes
+    chunk = max(8, BITSET_CHUNK_BYTES // n_labels // 8 * 8)
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        packed[:, start // 8:(stop + 7) // 8] = np.packbits(codes[None, start:stop] == labels, axis=1)
+    return packed
+
+
+class FilterIndex:
+    """(column, label) → packed row mask (see the module docstring)."""
+
+    def __init__(self, columns: Mapping[str, Iterable], as_text: bool = False, dropna: bool = True):
+        self._codes: Dict[str, np.ndarray] = {}
+        self._labels: Dict[str, List] = {}
+        self._lookup: Dict[str, Dict] = {}
+        self._na_code: Dict[str, int] = {}
+        self._bits: Dict[str, np.ndarray] = {}
+        n = None
+        for col, values in columns.items():
+            codes, labels = factorize_labels(values, as_text=as_text, dropna=dropna)
+            if n is None:
+                n = len(codes)
+            elif len(codes) != n:
+                raise ValueError(f"column '{col}' has {len(codes)} rows, expected {n}")
+            self._codes[col] = codes
+            self._labels[col] = labels
+            self._lookup[col] = {label: i for i, label in enumerate(labels) if not _is_na(label)}
+            na = [i for i, label in enumerate(labels) if _is_na(label)]
+            if na:
+                self._na_code[col] = na[0]
+            if len(labels) <= MAX_BITSET_LABELS:
+                self._bits[col] = _packed_onehot(codes, len(labels))
+        self._n = n or 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Sequence[str], as_text: bool = False, dropna: bool = True) -> "FilterIndex":
+        return cls({col: df[col] for col in columns if col in df.columns}, as_text=as_text, dropna=dropna)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __contains__(self, col) -> bool:
+        return col in self._codes
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._codes)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(c.nbytes for c in self._codes.values()) + sum(b.nbytes for b in self._bits.values())
+
+    def options(self, col: str, within: Optional[np.ndarray] = None) -> List:
+        """Labels of ``col`` in order of first appearance; with ``within``, only those on the masked rows."""
+        labels = self._labels[col]
+        if within is None:
+            return list(labels)
+        codes = self._codes[col][np.asarray(within, dtype=bool)]
+        present = np.bincount(codes[codes >= 0], minlength=len(labels)) > 0
+        return [label for label, keep in zip(labels, present) if keep]
+
+    def _pack(self, mask) -> np.ndarray:
+        mask = np.asarray(mask, dtype=bool)
+        if len(mask) != self._n:
+            raise ValueError(f"mask has {len(mask)} rows, expected {self._n}")
+        return np.packbits(mask)
+
+    def bits(self, col: str, values: Iterable) -> np.ndarray:
+        """Packed mask of the rows whose ``col`` is any of ``values`` (unknown values match nothing)."""
+        lookup, na = self._lookup[col], self._na_code.get(col)
+        codes = [na if _is_na(v) else lookup.get(v) for v in values]
+        codes = [c for c in codes if c is not None]
+        if col in self._bits:
+            if not codes:
+                return np.zeros(self._bits[col].shape[1], dtype=np.uint8)
+            return np.bitwise_or.reduce(self._bits[col][codes], axis=0)
+        return self._pack(np.isin(self._codes[col], codes))
+
+    def mask(self, selections: Mapping[str, Optional[Iterable]], within: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Bool row mask: every column with a non-empty selection matches one of
+        its selected values, AND ``within`` when given. Empty selections do not filter.
+        """
+        packed = None if within is None else self._pack(within)
+        for col, values in selections.items():
+            values = list(values or ())
+            if not values:
+                continue
+            b = self.bits(col, values)
+            packed = b if packed is None else packed & b
+        if packed is None:
+            return np.ones(self._n, dtype=bool)
+        return np.unpackbits(packed, count=self._n).astype(bool)
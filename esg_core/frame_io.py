@@ -0,0 +1,80 @@
+"""
+DataFrame <-> disk in Arrow IPC (Feather v2) format.
+
+Arrow keeps datetime, categorical and numeric dtypes and the index, and files
+can be memory-mapped on read. Frames Arrow cannot represent (mixed-type object
+columns, non-string or duplicate column names, …) fall back to pickle, so a
+write never fails just because of an odd upload. pyarrow ships with Streamlit;
+without it every frame takes the pickle path.
+
+Unpickling runs code, so the pickle fallback is only for directories nobody
+else can write to. Callers storing frames anywhere else pass
+``allow_pickle=False``: such frames are then not written, and ``.pkl`` files
+are not read.
+"""
+import os
+import pickle
+from typing import Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow comes with streamlit
+    pa = None
+
+ARROW_SUFFIX = ".arrow"
+PICKLE_SUFFIX = ".pkl"
+
+
+def _arrow_safe(df: pd.DataFrame) -> bool:
+    cols = list(df.columns)
+    return pa is not None and all(isinstance(c, str) for c in cols) and len(set(cols)) == len(cols)
+
+
+def write_frame(df: pd.DataFrame, base_path: str, allow_pickle: bool = True) -> Tuple[str, int]:
+    """
+    Write ``df`` to ``base_path`` + ``.arrow`` (or ``.pkl`` as fallback).
+    Returns (path written, size in bytes). Files are written atomically.
+    Raises ValueError when Arrow cannot store ``df`` and ``allow_pickle`` is False.
+    """
+    if _arrow_safe(df):
+        path = base_path + ARROW_SUFFIX
+        tmp = path + ".tmp"
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+            return path, os.path.getsize(path)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError, ValueError):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    if not allow_pickle:
+        raise ValueError("Arrow cannot store this frame and the pickle fallback is disabled")
+    path = base_path + PICKLE_SUFFIX
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        pickle.dump(df, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path, os.path.getsize(path)
+
+
+def read_frame(path: str, memory_map: bool = True, allow_pickle: bool = True) -> pd.DataFrame:
+    """Read a frame written by :func:`write_frame` (with ``allow_pickle`` False, only ``.arrow`` files)."""
+    if path.endswith(ARROW_SUFFIX):
+        source = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+        with source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+    if not allow_pickle:
+        raise ValueError(f"refusing to unpickle {path}")
+    with open(path, "rb") as fh:
+        return pickle.load(fh)
+
+
+def remove_frame(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
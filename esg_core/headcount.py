@@ -0,0 +1,302 @@
+"""
+Monthly headcount from [hire, departure) intervals.
+
+An employee counts in month M when hired before the first day of the next
+month and not departed before it (no departure date, or departure on/after
+that day) — the rule the Comp&Ben page used to evaluate row by row for every
+month. Here each employee is reduced to the half-open range of month indices
+in which they are active, found with two ``searchsorted`` calls against the
+month boundaries, so:
+
+* per-employee flags are one broadcast comparison (employees × months), and
+* grouped counts are an event sweep (+1 at the first active month, −1 after
+  the last, cumulative sum along the months) that never materializes the
+  employees × months matrix.
+
+Per-employee activity that has to be kept around (the employee-level table)
+lives in an :class:`ActivityMatrix` — one bit per employee and month — rather
+than as one column per month on the page's DataFrame.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from esg_core.yearfrac import as_days
+
+
+def month_starts(start_year: int, end_year: int) -> pd.DatetimeIndex:
+    """First day of every month from January ``start_year`` to December ``end_year``."""
+    return pd.date_range(f"{start_year}-01-01", f"{end_year}-12-31", freq="MS")
+
+
+def month_labels(months: pd.DatetimeIndex) -> List[str]:
+    """Column labels used by the pages, e.g. "2024-01"."""
+    return list(months.strftime("%Y-%m"))
+
+
+def active_month_range(hire, departure, months: pd.DatetimeIndex):
+    """
+    (first, stop) month indices per employee: active for ``first <= m < stop``.
+
+    Month m is tested at its boundary b = first day of month m+1:
+    ``hire < b`` and (no departure or ``departure >= b``). Missing hire dates
+    are never active.
+    """
+    boundaries = as_days(months + pd.offsets.MonthBegin(1))
+    h = as_days(hire)
+    d = as_days(departure)
+    n_months = len(boundaries)
+    # first boundary strictly after the hire date
+    first = np.where(np.isnat(h), n_months, np.searchsorted(boundaries, h, side="right"))
+    # boundaries up to and including the departure date count
+    stop = np.where(np.isnat(d), n_months, np.searchsorted(boundaries, d, side="right"))
+    return first, np.maximum(stop, first)
+
+
+def active_flags(hire, departure, months: pd.DatetimeIndex) -> np.ndarray:
+    """(employees × months) bool matrix of the headcount rule."""
+    first, stop = active_month_range(hire, departure, months)
+    m = np.arange(len(months))
+    return (first[:, None] <= m) & (m < stop[:, None])
+
+
+def monthly_headcount(
+    df: pd.DataFrame,
+    group_cols: Sequence[str],
+    hire_col: str,
+    departure_col: str,
+    start_year: int,
+    end_year: int,
+) -> pd.DataFrame:
+    """
+    Active employees per group and month: ``group_cols`` + one column per month.
+
+    Groups follow ``df.groupby(group_cols)``: sorted keys, rows with a missing
+    key left out.
+    """
+    group_cols = list(group_cols)
+    months = month_starts(start_year, end_year)
+    labels = month_labels(months)
+
+    grouped = df.groupby(group_cols, sort=True, observed=True)
+    codes = grouped.ngroup()
+    keys = grouped.size().index
+    valid = codes.notna().to_numpy()
+    codes = codes.to_numpy()[valid].astype(np.int64)
+
+    first, stop = active_month_range(df[hire_col].to_numpy()[valid], df[departure_col].to_numpy()[valid], months)
+    n_groups, n_months = len(keys), len(months)
+    events = np.zeros((n_groups, n_months + 1), dtype=np.int64)
+    np.add.at(events, (codes, first), 1)
+    np.add.at(events, (codes, stop), -1)
+    counts = np.cumsum(events[:, :n_months], axis=1)
+
+    table = pd.DataFrame(counts, index=keys, columns=labels)
+    return table.reset_index()
+
+
+def unpivot_headcount(table: pd.DataFrame, group_cols: Sequence[str]) -> pd.DataFrame:
+    """
+    Long format of a ``monthly_headcount`` table: ``group_cols`` + Month + Headcount,
+    month-major like ``DataFrame.melt``.
+    """
+    group_cols = list(group_cols)
+    month_cols = [c for c in table.columns if c not in group_cols]
+    n_rows = len(table)
+    long = {col: np.tile(table[col].to_numpy(), len(month_cols)) for col in group_cols}
+    long["Month"] = np.repeat(month_cols, n_rows)
+    long["Headcount"] = table[month_cols].to_numpy().T.ravel()
+    return pd.DataFrame(long)
+
+
+@dataclass(frozen=True)
+class ActivityMatrix:
+    """
+    Employees × months activity, bit-packed along the month axis (8 months per
+    byte). Rows follow ``index`` (the source frame's index), columns ``months``.
+    Only materialize it (``to_frame``) for the slice that is shown or exported.
+    """
+    bits: np.ndarray
+    months: pd.DatetimeIndex
+    index: pd.Index
+
+    CHUNK_ROWS = 65536
+
+    @classmethod
+    def from_intervals(cls, hire, departure, months: pd.DatetimeIndex, index: Optional[pd.Index] = None) -> "ActivityMatrix":
+        first, stop = active_month_range(hire, departure, months)
+        m = np.arange(len(months))
+        bits = np.empty((len(first), (len(months) + 7) // 8), dtype=np.uint8)
+        for a in range(0, len(first), cls.CHUNK_ROWS):
+            b = a + cls.CHUNK_ROWS
+            flags = (first[a:b, None] <= m) & (m < stop[a:b, None])
+            bits[a:b] = np.packbits(flags, axis=1)
+        return cls(bits, months, pd.RangeIndex(len(first)) if index is None else index)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, hire_col: str, departure_col: str, start_year: int, end_year: int) -> "ActivityMatrix":
+        return cls.from_intervals(df[hire_col], df[departure_col], month_starts(start_year, end_year), df.index)
+
+    def __len__(self) -> int:
+        return self.bits.shape[0]
+
+    @property
+    def labels(self) -> List[str]:
+        return month_labels(self.months)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def to_bool(self, rows=None) -> np.ndarray:
+        """Unpacked (rows × months) bool matrix; ``rows`` is any NumPy row selector."""
+        bits = self.bits if rows is None else self.bits[rows]
+        return np.unpackbits(bits, axis=1, count=len(self.months)).astype(bool)
+
+    def to_frame(self, rows=None) -> pd.DataFrame:
+        """Wide bool frame ("YYYY-MM" columns) for the selected rows."""
+        index = self.index if rows is None else self.index[rows]
+        return pd.DataFrame(self.to_bool(rows), index=index, columns=self.labels)
+
+    def month_totals(self) -> np.ndarray:
+        """Active employees per month."""
+        return self.group_sum(np.zeros(len(self), dtype=np.int64), 1)[0]
+
+    def group_sum(self, codes: np.ndarray, n_groups: int) -> np.ndarray:
+        """
+        (n_groups × months) active counts; ``codes`` assigns each row to a group
+        (negative = left out), e.g. ``df.groupby(...).ngroup()``.
+        """
+        codes = np.asarray(codes)
+        counts = np.zeros((n_groups, len(self.months)), dtype=np.int64)
+        for a in range(0, len(self), self.CHUNK_ROWS):
+            b = a + self.CHUNK_ROWS
+            c = codes[a:b]
+            keep = c >= 0
+            if not keep.any():
+                continue
+            c = c[keep].astype(np.int64)
+            order = np.argsort(c, kind="stable")
+            c = c[order]
+            starts = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+            unpacked = np.unpackbits(self.bits[a:b][keep][order], axis=1, count=len(self.months))
+            counts[c[starts]] += np.add.reduceat(unpacked, starts, axis=0, dtype=np.int64)
+        return counts
+
+
+class ActiveIndex:
+    """
+    Point-in-time headcount: who is active on day D — hired on/before D and not
+    departed on/before D (the monthly rule above with the boundary at D + 1).
+
+    Built once per dataset: hire and departure dates are kept as day numbers
+    sorted within each group (e.g. company), so a headcount is two
+    ``searchsorted`` calls per group and the active rows come from a prefix of
+    the hire-ordered rows instead of a scan of the whole frame. Rows that can
+    never be active (no hire date, departure before hire) are dropped up front.
+
+    Positions refer to the rows of the source (0 … n-1), for ``iloc`` / masks.
+    ``hire=None`` means everyone counts as hired (departure-only filters).
+    """
+
+    _SHIFT = 2**31  # day numbers are shifted into [0, 2**32) and packed after the group code
+    _SPAN = 2**32
+
+    def __init__(self, hire, departure, groups=None):
+        dep = as_days(departure)
+        n = len(dep)
+        top = self._SHIFT - 1
+        dep_day = np.where(np.isnat(dep), top, np.clip(dep.astype(np.int64), -top, top))
+        if hire is None:
+            hire_day = np.full(n, -top, dtype=np.int64)
+            valid = np.ones(n, dtype=bool)
+        else:
+            h = as_days(hire)
+            hire_day = np.clip(np.where(np.isnat(h), 0, h.astype(np.int64)), -top, top)
+            valid = ~np.isnat(h) & (dep_day > hire_day)
+
+        if groups is None:
+            codes, self.groups = np.zeros(n, dtype=np.int64), pd.Index([None])
+        else:
+            codes, uniques = pd.factorize(pd.Series(groups).to_numpy(), use_na_sentinel=True)
+            self.groups = pd.Index(uniques)
+        # bucket 0 holds rows without a group; they still count towards the total
+        bucket = np.asarray(codes, dtype=np.int64) + (0 if groups is None else 1)
+        self._grouped = groups is not None
+        self._n_buckets = len(self.groups) + (1 if self._grouped else 0)
+        self._n = n
+
+        rows = np.flatnonzero(valid)
+        b = bucket[rows]
+        hire_keys = b * self._SPAN + (hire_day[rows] + self._SHIFT)
+        order = np.argsort(hire_keys, kind="stable")
+        self._hire_keys = hire_keys[order]
+        self._hire_rows = rows[order]
+        self._hire_dep = dep_day[rows][order]
+        self._dep_keys = np.sort(b * self._SPAN + (dep_day[rows] + self._SHIFT))
+        firsts = np.arange(self._n_buckets + 1, dtype=np.int64) * self._SPAN
+        self._hire_starts = np.searchsorted(self._hire_keys, firsts)
+        self._dep_starts = np.searchsorted(self._dep_keys, firsts)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, hire_col: Optional[str], departure_col: str, group_col: Optional[str] = None) -> "ActiveIndex":
+        return cls(
+            None if hire_col is None else df[hire_col],
+            df[departure_col],
+            None if group_col is None else df[group_col],
+        )
+
+    def __len__(self) -> int:
+        return self._n
+
+    @staticmethod
+    def _day(date) -> int:
+        day = as_days(date)
+        if np.isnat(day):
+            raise ValueError(f"not a date: {date!r}")
+        return int(day.astype(np.int64))
+
+    def _buckets(self, group) -> np.ndarray:
+        if group is None:
+            return np.arange(self._n_buckets)
+        if not self._grouped:
+            raise ValueError("index was built without groups")
+        code = self.groups.get_indexer([group])[0]
+        return np.array([], dtype=np.int64) if code < 0 else np.array([code + 1])
+
+    def _hired_stop(self, buckets: np.ndarray, day: int) -> np.ndarray:
+        return np.searchsorted(self._hire_keys, buckets * self._SPAN + (day + self._SHIFT), side="right")
+
+    def _bucket_counts(self, day: int) -> np.ndarray:
+        buckets = np.arange(self._n_buckets)
+        hired = self._hired_stop(buckets, day) - self._hire_starts[:-1]
+        # valid rows depart after they are hired, so everyone departed by D was hired by D
+        departed = np.searchsorted(self._dep_keys, buckets * self._SPAN + (day + self._SHIFT), side="right") - self._dep_starts[:-1]
+        return (hired - departed).astype(np.int64)
+
+    def counts(self, date) -> pd.Series:
+        """Active rows per group on ``date`` (rows without a group left out)."""
+        active = self._bucket_counts(self._day(date))
+        return pd.Series(active[1:] if self._grouped else active, index=self.groups, name="Headcount")
+
+    def count(self, date, group=None) -> int:
+        """Active rows on ``date``, overall or for one group."""
+        active = self._bucket_counts(self._day(date))
+        return int(active[self._buckets(group)].sum())
+
+    def positions(self, date, group=None) -> np.ndarray:
+        """Sorted positions of the rows active on ``date``."""
+        day = self._day(date)
+        buckets = self._buckets(group)
+        stops = self._hired_stop(buckets, day)
+        picked = [np.arange(self._hire_starts[b], s) for b, s in zip(buckets, stops)]
+        sel = np.concatenate(picked) if picked else np.array([], dtype=np.int64)
+        return np.sort(self._hire_rows[sel[self._hire_dep[sel] > day]])
+
+    def mask(self, date, group=None) -> np.ndarray:
+        """Bool mask over the source rows: active on ``date``."""
+        out = np.zeros(self._n, dtype=bool)
+        out[self.positions(date, group)] = True
+        return out
@@ -0,0 +1,257 @@
+"""
+Content-addressed, size-bounded cache of parsed uploads.
+
+Entries are keyed on the SHA-256 of the uploaded bytes plus the loader (its
+name and code) and the parse options (sheet, header row, …), so re-uploading
+an identical file — from any page or any user session — skips the parse,
+while a different sheet/header or an edited loader parses again.
+
+Parsed frames are held in memory up to ``max_bytes`` (measured with
+``memory_usage(deep=True)``) and evicted least-recently-used first. With a
+spill directory configured, evicted frames are written there as Arrow IPC
+(``esg_core.frame_io``) and reloaded on the next hit; the spill directory has
+its own size budget. Callers always get a copy, never the cached object.
+
+Spill files are indexed in memory only, so the directory is private to one
+cache: by default a fresh ``mkdtemp`` folder (mode 0700) removed at exit; a
+configured directory is created 0700 and emptied of spill files left by an
+earlier process. Frames Arrow cannot store are dropped instead of pickled,
+and nothing is ever unpickled from the spill directory.
+
+Loads that pass a ``schema`` version are also backed by a persistent
+:class:`esg_core.snapshots.SnapshotStore`: a miss in memory and spill is
+served from the snapshot when one exists, and a fresh parse is snapshotted.
+
+Configuration (environment, read by :func:`IngestCache.from_env`):
+  ESG_CACHE_MAX_MB        in-memory budget, default 512
+  ESG_CACHE_SPILL_DIR     spill directory, default a private temp folder per process ("" disables spilling)
+  ESG_CACHE_SPILL_MAX_MB  spill directory budget, default 2048
+"""
+import atexit
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from esg_core.frame_io import ARROW_SUFFIX, PICKLE_SUFFIX, read_frame, remove_frame, write_frame
+from esg_core.snapshots import SnapshotStore, snapshot_key
+
+MB = 2**20
+SPILL_PREFIX = "esg_ingest_cache-"
+
+
+class NamedBytesIO(io.BytesIO):
+    """BytesIO with the ``name`` attribute loaders use to pick a parser."""
+
+    def __init__(self, data: bytes, name: str = ""):
+        super().__init__(data)
+        self.name = name
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    snapshot_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    spills: int = 0
+    entries: int = 0
+    bytes_held: int = 0
+    spilled_entries: int = 0
+    spilled_bytes: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def loader_token(loader: Callable) -> str:
+    """Identity of a loader function, changing whenever its code changes."""
+    code = getattr(loader, "__code__", None)
+    h = hashlib.sha1(f"{getattr(loader, '__module__', '')}.{getattr(loader, '__qualname__', repr(loader))}".encode())
+    if code is not None:
+        h.update(code.co_code)
+        h.update(repr(code.co_consts).encode())
+    return h.hexdigest()[:16]
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class IngestCache:
+    """Thread-safe LRU of parsed DataFrames with a memory budget and optional disk spill."""
+
+    def __init__(
+        self,
+        max_bytes: int = 512 * MB,
+        spill_dir: Optional[str] = None,
+        spill_max_bytes: int = 2048 * MB,
+        snapshots: Optional[SnapshotStore] = None,
+    ):
+        self.max_bytes = int(max_bytes)
+        self.snapshots = snapshots
+        self.spill_dir = spill_dir or None
+        self.spill_max_bytes = int(spill_max_bytes)
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, mode=0o700, exist_ok=True)
+            _remove_spill_files(self.spill_dir)
+        self._mem: "OrderedDict[str, tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._disk: "OrderedDict[str, tuple[str, int]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._stats = CacheStats()
+
+    @classmethod
+    def from_env(cls) -> "IngestCache":
+        spill_dir = os.environ.get("ESG_CACHE_SPILL_DIR")
+        if spill_dir is None:
+            spill_dir = tempfile.mkdtemp(prefix=SPILL_PREFIX)
+            atexit.register(shutil.rmtree, spill_dir, ignore_errors=True)
+        return cls(
+            max_bytes=float(os.environ.get("ESG_CACHE_MAX_MB", 512)) * MB,
+            spill_dir=spill_dir or None,
+            spill_max_bytes=float(os.environ.get("ESG_CACHE_SPILL_MAX_MB", 2048)) * MB,
+            snapshots=SnapshotStore.from_env(),
+        )
+
+    # ── keys ────────────────────────────────────────────────────────────────
+    @staticmethod
+    def make_key(data_hash: str, loader: Callable, options: dict) -> str:
+        opts = repr(sorted((k, repr(v)) for k, v in options.items()))
+        return hashlib.sha256(f"{data_hash}|{loader_token(loader)}|{opts}".encode()).hexdigest()
+
+    # ── public API ──────────────────────────────────────────────────────────
+    def load(self, data: bytes, loader: Callable[..., object], name: str = "", schema: Optional[str] = None, **options):
+        """
+        ``loader(NamedBytesIO(data, name), **options)`` through the cache.
+        DataFrame results are cached and returned as copies; anything else
+        (``None`` after a validation error, dict of sheets, …) is returned uncached.
+        With ``schema`` set, results are also kept as persistent snapshots.
+        """
+        data_hash = content_hash(data)
+        key = self.make_key(data_hash, loader, options)
+        cached = self._get(key)
+        if cached is not None:
+            return cached.copy()
+
+        # one parse per key even when several sessions upload the same file at once
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                cached = self._get(key, count=False)
+                if cached is not None:
+                    return cached.copy()
+                snap_key = snapshot_key(data_hash, schema, key) if schema and self.snapshots else None
+                if snap_key:
+                    snap = self.snapshots.get(snap_key)
+                    if snap is not None:
+                        with self._lock:
+                            self._stats.snapshot_hits += 1
+                        self._put(key, snap)
+                        return snap.copy()
+                with self._lock:
+                    self._stats.misses += 1
+                result = loader(NamedBytesIO(data, name), **options)
+                if isinstance(result, pd.DataFrame):
+                    self._put(key, result)
+                    if snap_key:
+                        self.snapshots.put(snap_key, result)
+                    return result.copy()
+                return result
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+    def clear(self, snapshots: bool = True) -> None:
+        with self._lock:
+            self._mem.clear()
+            for path, _ in self._disk.values():
+                remove_frame(path)
+            self._disk.clear()
+            self._stats = CacheStats()
+        if snapshots and self.snapshots:
+            self.snapshots.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            s = CacheStats(**self._stats.as_dict())
+            s.entries = len(self._mem)
+            s.bytes_held = sum(n for _, n in self._mem.values())
+            s.spilled_entries = len(self._disk)
+            s.spilled_bytes = sum(n for _, n in self._disk.values())
+            return s
+
+    # ── internals ───────────────────────────────────────────────────────────
+    def _get(self, key: str, count: bool = True) -> Optional[pd.DataFrame]:
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                if count:
+                    self._stats.hits += 1
+                return self._mem[key][0]
+            spilled = self._disk.pop(key, None)
+        if spilled is None:
+            return None
+        path, _ = spilled
+        try:
+            df = read_frame(path, allow_pickle=False)
+        except Exception:
+            remove_frame(path)
+            return None
+        remove_frame(path)
+        with self._lock:
+            if count:
+                self._stats.disk_hits += 1
+        self._put(key, df)
+        return df
+
+    def _put(self, key: str, df: pd.DataFrame) -> None:
+        nbytes = frame_nbytes(df)
+        to_spill = []
+        with self._lock:
+            self._mem[key] = (df, nbytes)
+            self._mem.move_to_end(key)
+            held = sum(n for _, n in self._mem.values())
+            # keep at least the newest entry even if it alone exceeds the budget
+            while held > self.max_bytes and len(self._mem) > 1:
+                old_key, (old_df, old_n) = self._mem.popitem(last=False)
+                held -= old_n
+                self._stats.evictions += 1
+                to_spill.append((old_key, old_df))
+        for old_key, old_df in to_spill:
+            self._spill(old_key, old_df)
+
+    def _spill(self, key: str, df: pd.DataFrame) -> None:
+        if not self.spill_dir:
+            return
+        try:
+            path, size = write_frame(df, os.path.join(self.spill_dir, key), allow_pickle=False)
+        except (OSError, ValueError):
+            # Arrow cannot store it: the frame is dropped and parsed again on the next load
+            return
+        with self._lock:
+            self._disk[key] = (path, size)
+            self._stats.spills += 1
+            while sum(n for _, n in self._disk.values()) > self.spill_max_bytes and len(self._disk) > 1:
+                _, (old_path, _) = self._disk.popitem(last=False)
+                remove_frame(old_path)
+
+
+def _remove_spill_files(folder: str) -> None:
+    """Delete spill files (and unfinished writes) an earlier process left in ``folder``."""
+    for name in os.listdir(folder):
+        if name.endswith((ARROW_SUFFIX, PICKLE_SUFFIX, ARROW_SUFFIX + ".tmp", PICKLE_SUFFIX + ".tmp")):
+            remove_frame(os.path.join(folder, name))
@@ -0,0 +1,267 @@
+"""
+Per-company KPIs for the Comp&Ben page in a few grouped passes.
+
+The page used to loop over every company and boolean-filter the whole frame
+once per company for each KPI (pay gap, remuneration ratio, turnover,
+headcount, top decile). Here every KPI is a boolean mask or value column over
+the whole frame, reduced with one ``groupby(company)`` each, and everything
+ends up in one tidy table (:attr:`CompanyKPIs.metrics`, one row per company).
+``turnover_table`` and ``pay_gap_table`` cut the layouts the page displays
+out of it; ``overall_pay_gap``, ``overall_remuneration_ratio`` and
+``median_excluding_max`` give the all-company figures.
+
+Definitions (``year`` = the selected year):
+  headcount    hired on/before the date and not departed on/before it,
+               at 31/12 of year-1 (start) and 31/12 of year (end)
+  departures   departure in ``year`` with reason "VOLUNTARY DEPARTURE",
+               containing "involuntary" or containing "retirement"
+               (IDs in ``excluded_departure_ids`` are left out)
+  pay gap      (mean male − mean female) / mean male of Ονομαστικός μισθός,
+               salaries > 0 of employees active between 01/01 and 30/09
+  remuneration max ΜΙΚΤΕΣ ΑΠΟΔ / median of the remaining values (all
+               occurrences of the max left out), employees hired by 01/01
+               and still employed after 31/12
+  top decile   highest ΜΙΚΤΕΣ ΑΠΟΔ, ceil(10 %) of the employees active at 31/12
+"""
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from esg_core.dag import param_token
+from esg_core.esg_extract import COMPANY, DEPARTURE, EMPLOYEE_ID, GROSS, HIRE
+from esg_core.headcount import ActiveIndex
+from esg_core.salary import SALARY, parse_decimal
+
+SURNAME = "Επώνυμο"
+NAME = "Ονομα"
+GENDER = "Όνομα Φύλου"
+REASON = "Περιγραφή Αιτ. Αποχώρησης"
+MALE, FEMALE = "ΑΝΔΡΑΣ", "ΓΥΝΑΙΚΑ"
+
+KPI_COLUMNS = [COMPANY, EMPLOYEE_ID, SURNAME, NAME, HIRE, DEPARTURE, GENDER, SALARY, GROSS, REASON]
+
+TURNOVER_COLS = [
+    "Start of Period Headcount", "End of Period Headcount", "Average Employees",
+    "Voluntary Departures", "Involuntary Departures", "Retirement Departures",
+    "Voluntary Turnover (%)", "Involuntary Turnover (%)", "Retirement Turnover (%)", "Total Turnover (%)",
+]
+PAY_COLS = [
+    "Pay Gap Employees", "Mean Salary (Male)", "Mean Salary (Female)", "Gender Pay Gap (%)",
+    "Remuneration Employees", "Max Gross Earnings", "Median Gross Earnings (Excluding Max)", "Annual Remuneration Ratio",
+]
+
+
+@dataclass(frozen=True)
+class CompanyKPIs:
+    """``metrics``: one row per company (TURNOVER_COLS + PAY_COLS); ``top_decile``: one row per top earner."""
+    year: int
+    metrics: pd.DataFrame
+    top_decile: pd.DataFrame
+    # companies of the pay-gap table, in the order the page lists them
+    pay_companies: List = field(default_factory=list)
+
+
+def dataset_token(df: pd.DataFrame) -> str:
+    """Content hash of the columns the KPIs read, for caching results per dataset."""
+    return param_token(df[[c for c in KPI_COLUMNS if c in df.columns]])
+
+
+def _round2(values: pd.Series) -> pd.Series:
+    # Python's round(), as the per-company loop used
+    return values.map(lambda v: round(v, 2))
+
+
+def _amount(series: pd.Series) -> pd.Series:
+    """Numeric column as is; text parsed with decimal commas ('1234,56' → 1234.56, junk → NaN)."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    return pd.to_numeric(series.astype(str).str.replace(",", ".", regex=False), errors="coerce")
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    return df[name] if name in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+
+
+def company_kpis(
+    df: pd.DataFrame,
+    year: int,
+    exclude_ids: Iterable[str] = (),
+    excluded_departure_ids: Iterable[str] = (),
+) -> CompanyKPIs:
+    """All per-company KPIs for ``year`` (see the module docstring)."""
+    df = df[~df[EMPLOYEE_ID].astype(str).isin(set(exclude_ids))]
+    companies = pd.Index(df[COMPANY].unique().tolist())  # plain labels, also when COMPANY is categorical
+    company = df[COMPANY]
+    hire = df[HIRE]
+    dep = pd.to_datetime(df[DEPARTURE], errors="coerce")
+    no_dep = dep.isna()
+
+    # ── headcount & departures ──────────────────────────────────────────────
+    start_of_period = pd.Timestamp(f"{year - 1}-12-31")
+    end_of_period = pd.Timestamp(f"{year}-12-31")
+    active = ActiveIndex(hire, dep, company)
+    active_end = active.mask(end_of_period)
+    reason = _column(df, REASON)
+    counted = ~df[EMPLOYEE_ID].astype(str).isin(set(excluded_departure_ids)) & (dep.dt.year == year)
+    flags = pd.DataFrame({
+        "Voluntary Departures": counted & (reason == "VOLUNTARY DEPARTURE"),
+        "Involuntary Departures": counted & reason.str.contains("involuntary", case=False, na=False),
+        "Retirement Departures": counted & reason.str.contains("retirement", case=False, na=False),
+    })
+    metrics = flags.groupby(company, sort=False, observed=True).sum().reindex(companies, fill_value=0).astype(np.int64)
+    metrics.insert(0, "Start of Period Headcount", active.counts(start_of_period).reindex(companies, fill_value=0))
+    metrics.insert(1, "End of Period Headcount", active.counts(end_of_period).reindex(companies, fill_value=0))
+
+    average = (metrics["Start of Period Headcount"] + metrics["End of Period Headcount"]) / 2
+    metrics.insert(2, "Average Employees", _round2(average))
+    rates = {}
+    for kind in ["Voluntary", "Involuntary", "Retirement"]:
+        rates[kind] = (metrics[f"{kind} Departures"] / average * 100).where(average > 0, 0.0)
+        metrics[f"{kind} Turnover (%)"] = _round2(rates[kind])
+    metrics["Total Turnover (%)"] = _round2(rates["Voluntary"] + rates["Involuntary"] + rates["Retirement"])
+
+    # ── gender pay gap ──────────────────────────────────────────────────────
+    salary = _amount(df[SALARY]).astype(float)
+    pay_window = (
+        salary.notna() & (salary > 0)
+        & (hire <= pd.Timestamp(f"{year}-09-30"))
+        & (no_dep | (dep >= pd.Timestamp(f"{year}-01-01")))
+    )
+    means = salary[pay_window].groupby([company[pay_window], _column(df, GENDER)[pay_window]], sort=False, observed=True).mean().unstack()
+    male = means[MALE] if MALE in means.columns else pd.Series(np.nan, index=means.index)
+    female = means[FEMALE] if FEMALE in means.columns else pd.Series(np.nan, index=means.index)
+    metrics["Pay Gap Employees"] = pay_window.groupby(company, sort=False, observed=True).sum().reindex(companies, fill_value=0)
+    metrics["Mean Salary (Male)"] = male.reindex(companies)
+    metrics["Mean Salary (Female)"] = female.reindex(companies)
+    metrics["Gender Pay Gap (%)"] = ((male - female) / male * 100).reindex(companies)
+
+    # ── annual remuneration ratio ───────────────────────────────────────────
+    gross = _amount(df[GROSS])
+    rem_window = (hire <= pd.Timestamp(f"{year}-01-01")) & (no_dep | (dep > end_of_period))
+    valid = rem_window & gross.notna()
+    g = gross[valid]
+    g_company = company[valid]
+    g_max = g.groupby(g_company, sort=False, observed=True).transform("max")
+    rest = g[g != g_max]
+    n_valid = g.groupby(g_company, sort=False, observed=True).size().reindex(companies, fill_value=0)
+    top = g.groupby(g_company, sort=False, observed=True).max().reindex(companies)
+    median_rest = rest.groupby(g_company[g != g_max], sort=False, observed=True).median().reindex(companies)
+    metrics["Remuneration Employees"] = rem_window.groupby(company, sort=False, observed=True).sum().reindex(companies, fill_value=0)
+    metrics["Max Gross Earnings"] = top
+    metrics["Median Gross Earnings (Excluding Max)"] = median_rest
+    metrics["Annual Remuneration Ratio"] = (top / median_rest).where((n_valid > 1) & (median_rest > 0))
+
+    metrics.index.name = COMPANY
+    metrics = metrics.reset_index()
+
+    # the page lists the companies with pay-gap rows, in order of appearance, that also have remuneration rows
+    rem_employees = metrics.set_index(COMPANY)["Remuneration Employees"]
+    pay_companies = [c for c in company[pay_window].unique() if rem_employees.get(c, 0) > 0]
+
+    # ── top decile of ΜΙΚΤΕΣ ΑΠΟΔ among employees active at year end ───────
+    ranked = df[active_end].assign(_order=pd.Categorical(company[active_end], categories=companies).codes, _gross=gross[active_end])
+    ranked = ranked[ranked["_order"] >= 0].sort_values(["_order", "_gross"], ascending=[True, False], na_position="last", kind="mergesort")
+    rank = ranked.groupby("_order", sort=False).cumcount()
+    size = ranked.groupby("_order", sort=False)["_order"].transform("size")
+    top_rows = ranked[rank < np.ceil(size * 0.1)]
+    top_decile = pd.DataFrame({
+        COMPANY: top_rows[COMPANY].to_numpy(),
+        EMPLOYEE_ID: _column(top_rows, EMPLOYEE_ID).to_numpy(),
+        SURNAME: _column(top_rows, SURNAME).to_numpy(),
+        NAME: _column(top_rows, NAME).to_numpy(),
+        "Συνολικές Αποδοχές": top_rows["_gross"].to_numpy(),
+    })
+
+    return CompanyKPIs(year, metrics, top_decile, pay_companies)
+
+
+def turnover_table(kpis: CompanyKPIs) -> pd.DataFrame:
+    """Headcount / departures / turnover per company plus a TOTAL row."""
+    table = kpis.metrics[[COMPANY, *TURNOVER_COLS]].copy()
+    sums = {col: table[col].sum() for col in TURNOVER_COLS[:6]}  # per column, so counts stay integers
+    avg = sums["Average Employees"]
+    exits = sums["Voluntary Departures"] + sums["Involuntary Departures"] + sums["Retirement Departures"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = {
+            COMPANY: "TOTAL",
+            "Start of Period Headcount": sums["Start of Period Headcount"],
+            "End of Period Headcount": sums["End of Period Headcount"],
+            "Average Employees": round(avg, 2),
+            "Voluntary Departures": sums["Voluntary Departures"],
+            "Involuntary Departures": sums["Involuntary Departures"],
+            "Retirement Departures": sums["Retirement Departures"],
+            "Voluntary Turnover (%)": round((sums["Voluntary Departures"] / avg) * 100, 2),
+            "Involuntary Turnover (%)": round((sums["Involuntary Departures"] / avg) * 100, 2),
+            "Retirement Turnover (%)": round((sums["Retirement Departures"] / avg) * 100, 2),
+            "Total Turnover (%)": round((exits / avg) * 100, 2),
+        }
+    return pd.concat([table, pd.DataFrame([total])], ignore_index=True)
+
+
+def pay_gap_table(kpis: CompanyKPIs) -> pd.DataFrame:
+    """Gender pay gap and annual remuneration ratio per company."""
+    table = kpis.metrics.set_index(COMPANY).loc[kpis.pay_companies, ["Gender Pay Gap (%)", "Annual Remuneration Ratio"]]
+    return table.reset_index()
+
+
+# ── overall (all companies together) ────────────────────────────────────────
+def overall_pay_gap(df: pd.DataFrame, year: int) -> Optional[float]:
+    """Gender pay gap (%) over all companies, same window as the per-company one; None without both genders."""
+    salary = df[SALARY].astype(float)
+    dep = pd.to_datetime(df[DEPARTURE], errors="coerce")
+    window = (
+        salary.notna() & (salary > 0)
+        & (df[HIRE] <= pd.Timestamp(f"{year}-09-30"))
+        & (dep.isna() | (dep >= pd.Timestamp(f"{year}-01-01")))
+    )
+    means = salary[window].groupby(df[GENDER][window], observed=True).mean()
+    if MALE in means and FEMALE in means:
+        return ((means[MALE] - means[FEMALE]) / means[MALE]) * 100
+    return None
+
+
+def overall_remuneration_ratio(df: pd.DataFrame, year: int, rates) -> Tuple[Optional[float], pd.DataFrame]:
+    """
+    Max / median-of-the-rest of ΜΙΚΤΕΣ ΑΠΟΔ converted to EUR (``rates``: an
+    ``esg_core.currency.RateTable``, rates at 31/12 of ``year``) over all
+    companies, and the rows it used (with an 'Annual Salary EUR' column).
+    None with fewer than two salaries or a zero median.
+    """
+    rows = df.copy()
+    rows[GROSS] = parse_decimal(rows[GROSS])
+    rows = rows.dropna(subset=[GROSS])
+    rows = rows[rows[GROSS] > 0]
+
+    start_of_year = pd.Timestamp(f"{year}-01-01")
+    end_of_year = pd.Timestamp(f"{year}-12-31")
+    rows["Annual Salary EUR"] = rates.to_eur(rows[GROSS], rows[COMPANY], end_of_year).round(0).astype("Int64")
+
+    dep = pd.to_datetime(rows[DEPARTURE], errors="coerce")
+    rows = rows[(rows[HIRE] <= start_of_year) & (dep.isna() | (dep > end_of_year))]
+
+    salaries = rows["Annual Salary EUR"].dropna()
+    if len(salaries) > 1:
+        highest = salaries.max()
+        median = salaries[salaries != highest].median()
+        return (highest / median if median > 0 else None), rows
+    return None, rows
+
+
+def median_excluding_max(df: pd.DataFrame, year: int, rates=None) -> pd.DataFrame:
+    """
+    Median ΜΙΚΤΕΣ ΑΠΟΔ (numeric) per company without its top earner, over the
+    employees not departed by the end of ``year``; with ``rates`` also in EUR
+    (rates at 31/12 of ``year``).
+    """
+    dep = pd.to_datetime(df[DEPARTURE], errors="coerce")
+    rows = df[dep.isna() | (dep.dt.year > year)]
+    rows = rows.loc[~rows.index.isin(rows.groupby(COMPANY, observed=True)[GROSS].idxmax())]
+    table = rows.groupby(COMPANY, observed=True)[GROSS].median().reset_index()
+    table = table.rename(columns={GROSS: "Median Salary (Excluding Max)"})
+    if rates is not None:
+        table["Median Salary (Excluding Max) in EUR"] = rates.to_eur(
+            table["Median Salary (Excluding Max)"], table[COMPANY], pd.Timestamp(f"{year}-12-31")
+        )
+    return table
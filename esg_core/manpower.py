@@ -0,0 +1,734 @@
+"""
+Manpower budget computations, without Streamlit.
+
+The MAIN manpower file goes through three stages:
+
+  1. ``parse_table`` + ``clean_table``: read Excel/CSV, standardize the Greek /
+     English headers, coerce dates and parse salaries;
+  2. ``prepare_base``: keep the employees still employed on the projection date
+     with their primary cost center (one row per Hrms Id), build the cost
+     center and the booking-code override flag;
+  3. ``DERIVED_NODES`` run by an ``esg_core.dag.ColumnGraph`` (or
+     ``derive_columns``): the projection / budget columns, from the
+     parameters in :class:`ManpowerParams`.
+
+Every parameter is an argument — nothing reads page globals — and problems
+that only skip a step are reported through ``esg_core.notices``.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from esg_core.bonus_calendar import budget_calendar, projection_calendar
+from esg_core.budget import BudgetInputs, annual_gross_2026, employer_contrib_2026, fy_months_budget_26, payroll_cost_2026
+from esg_core.columns import rename_by_markers
+from esg_core.dag import ColumnGraph, Node
+from esg_core.headcount import ActiveIndex
+from esg_core.notices import notify
+from esg_core.salary import normalize_salary
+
+DATE_CANDIDATES = [
+    "Ημ/νία γέννησης", "Ημ/νία αποχώρησης", "Ημ/νία πρόσληψης",
+    "Hiring Date", "Retire Date", "Date", "Date of Birth", "Hire Date"
+]
+
+SALARY_COL = "Monthly Gross Salary (Current)"
+
+
+@dataclass(frozen=True)
+class ManpowerParams:
+    """The sidebar parameters of the Manpower page (rates as fractions, e.g. 0.03 for 3 %)."""
+    projection_date: pd.Timestamp
+    no_increase_cutoff: pd.Timestamp
+    effective_increase_date: pd.Timestamp
+    inc_pct: float
+    inc_pct2: float
+    payroll_periods: int = 14
+
+    @property
+    def budget_year(self) -> int:
+        return pd.Timestamp(self.projection_date).year + 1
+
+    @property
+    def budget_base_date(self) -> pd.Timestamp:
+        return pd.Timestamp(self.budget_year, 1, 1)
+
+    def graph_params(self, contributions: Optional[pd.DataFrame] = None) -> dict:
+        """Parameters of ``DERIVED_NODES`` (``contributions``: 'Hrms Id' / 'Contributions' table or None)."""
+        return {
+            "contributions": contributions,
+            "projection_date": pd.Timestamp(self.projection_date),
+            "fy_base_date": self.budget_base_date,
+            "full_periods": self.payroll_periods,
+            "effective_increase_date": self.effective_increase_date,
+            "no_increase_cutoff": self.no_increase_cutoff,
+            "inc_pct": self.inc_pct,
+            "inc_pct2": self.inc_pct2,
+        }
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Reading & cleaning
+# ───────────────────────────────────────────────────────────────────────────────
+def parse_table(source, sheet_name=None, header_row=0) -> pd.DataFrame:
+    """Read Excel/CSV robustly (Greek encodings, ; or , delimiters); ``source`` is a path or a file object with ``.name``."""
+    name = str(getattr(source, "name", source)).lower()
+
+    if name.endswith(".xlsx") or name.endswith(".xls"):
+        return pd.read_excel(source, sheet_name=sheet_name, header=header_row)
+
+    # CSV fallbacks
+    for enc, delim in [("iso-8859-7", ";"), ("utf-8", ";"), ("utf-8", ",")]:
+        try:
+            return pd.read_csv(source, encoding=enc, delimiter=delim)
+        except Exception:
+            pass
+    raise ValueError("Could not read the uploaded file as CSV/Excel.")
+
+def coerce_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce known date columns (Greek & English) with dayfirst=True."""
+    for c in DATE_CANDIDATES:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], errors="coerce", dayfirst=True)
+
+    # Derived years (works regardless of which naming is present)
+    if "Ημ/νία πρόσληψης" in df.columns and "Hire Year" not in df.columns:
+        df["Hire Year"] = pd.to_datetime(df["Ημ/νία πρόσληψης"], errors="coerce", dayfirst=True).dt.year
+    if "Ημ/νία αποχώρησης" in df.columns and "Departure Year" not in df.columns:
+        df["Departure Year"] = pd.to_datetime(df["Ημ/νία αποχώρησης"], errors="coerce", dayfirst=True).dt.year
+    if "Hire Date" in df.columns and "Hire Year" not in df.columns:
+        df["Hire Year"] = pd.to_datetime(df["Hire Date"], errors="coerce").dt.year
+    if "Retire Date" in df.columns and "Departure Year" not in df.columns:
+        df["Departure Year"] = pd.to_datetime(df["Retire Date"], errors="coerce").dt.year
+    return df
+
+def find_and_rename_column_with_exact_value(df: pd.DataFrame, value: str, new_name: str) -> pd.DataFrame:
+    """
+    Find the first column that contains an EXACT row value (stripped) == `value`,
+    then rename that column to `new_name`. Handles mixed dtypes safely.
+    """
+    target = str(value).strip()
+    for col in df.columns:
+        series = df[col]
+        if not isinstance(series, pd.Series):
+            continue
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            try:
+                if series.dropna().astype(str).str.strip().eq(target).any():
+                    if new_name not in df.columns:
+                        df = df.rename(columns={col: new_name})
+                    break
+            except Exception:
+                pass
+    return df
+
+def standardize_columns(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """Heuristic + explicit (Greek → English) header renames shared by the MAIN file and the ESG extract."""
+    # Heuristic renames (optional + SAFE)
+    rename_conditions = {
+        "DATA ANALYST": "Job Title",
+        "ΠΑΠΑΔΟΠΟΥΛ": "Surname",
+        "ΓΕΩΡΓΙΟΣ": "Name",
+        "DIVISION": "Division",
+        "ΑΛΟΥΜΥΛ Α.Ε.": "Company",
+        "ΕΠΑΝΑΤΙΜΟΛΟΓΗΣΗ": "Department"
+    }
+    df_raw = rename_by_markers(df_raw, rename_conditions)
+
+    # Explicit renames (Greek → English)
+    explicit_rename_map = {
+        "Ημ/νία γέννησης": "Date of Birth",
+        "Ημ/νία πρόσληψης": "Hire Date",
+        "Ημ/νία αποχώρησης": "Retire Date",
+        "Κωδικός εργαζόμενου": "Hrms Id",
+        "Κωδικός εργαζομένου": "Hrms Id",      # variant
+        "Εταιρία": "Company_code",
+        "Περιγραφή εταιρίας": "Company",
+        "Επώνυμο": "Surname",
+        "Ονομα": "Name",
+        "Όνομα": "Name",
+        "GRADE": "Grade",
+    }
+    df_raw = df_raw.rename(columns=explicit_rename_map)
+    df_raw = drop_dup_named_cols(df_raw)
+
+    df_raw = find_and_rename_column_with_exact_value(df_raw, "ADMINISTRATIVE", "Job Property")
+    return df_raw
+
+
+def clean_table(df: pd.DataFrame) -> pd.DataFrame:
+    """standardize_columns + coerce_dates + normalize_salary (decimal commas, day rates ×26)."""
+    df = coerce_dates(standardize_columns(df))
+    if "Ονομαστικός μισθός" in df.columns:
+        df["Ονομαστικός μισθός"] = normalize_salary(df)
+    return df
+
+
+def normalize_code(series: pd.Series) -> pd.Series:
+    """
+    Extract the first 5-digit booking code from each cell.
+    Examples:
+      '40,602'     -> '40602'
+      '40602,0'    -> '40602'
+      '40.602,0'   -> '40602'
+      'Κωδ: 40602' -> '40602'
+    """
+    s = series.astype(str).str.strip()
+    # Replace all non-digits with a space, then extract the first 5-digit token
+    s = s.str.replace(r"\D+", " ", regex=True)
+    code5 = s.str.extract(r"(\d{5})", expand=False)
+    return code5
+
+# Booking codes whose employer contribution rate overrides the CONTRIBUTIONS file
+BOOKING_CODE_COL = "Κωδικός Κράτησης"
+OVERRIDE_MAP = {
+    "40602": 0.1879,
+    "40603": 0.1879,
+    "40380": 0.1879,
+    "40084": 0.1879,
+    "40510": 0.1738,  # new case
+}
+OVERRIDE_CODES = set(OVERRIDE_MAP.keys())
+
+# --- Helper: drop duplicate-named columns, keep first ---
+def drop_dup_named_cols(df: pd.DataFrame) -> pd.DataFrame:
+    return df.loc[:, ~pd.Index(df.columns).duplicated()].copy()
+
+
+def prepare_base(df: pd.DataFrame, projection_date: pd.Timestamp, active: Optional[ActiveIndex] = None) -> pd.DataFrame:
+    """
+    Filtering rules and base columns of a cleaned MAIN file (stage 2 of the
+    module docstring). ``active`` may be a cached ``ActiveIndex`` over
+    'Retire Date' (no hire column) to skip rebuilding it.
+    """
+    df = df.copy()
+
+    # 1) Retire Date
+    if "Retire Date" in df.columns:
+        # still employed on the projection date: no retire date, or retiring on/after it
+        df = df[(active or ActiveIndex(None, df["Retire Date"])).mask(projection_date - pd.Timedelta(days=1))]
+    else:
+        notify("'Retire Date' column not found; skipping retire-date filter.")
+
+    # 2) Είναι το κύριο Κ.Κ. = 1
+    primary_col = "Είναι το κύριο Κ.Κ."
+    if primary_col in df.columns:
+        mask_primary = (df[primary_col] == 1) | (df[primary_col] == True)
+        try:
+            mask_primary = mask_primary | (df[primary_col].astype(str).str.strip() == "1")
+        except Exception:
+            pass
+        df = df[mask_primary]
+    else:
+        notify(f"'{primary_col}' column not found; skipping primary cost center filter.")
+
+    # 3) Remove duplicates by Hrms Id
+    if "Hrms Id" in df.columns:
+        df["Hrms Id"] = df["Hrms Id"].astype(str).str.strip()
+        df = df.drop_duplicates(subset=["Hrms Id"])
+    else:
+        notify("'Hrms Id' column not found after renaming; cannot drop duplicates on it.")
+
+    # Salary & Cost Center
+    if "Ονομαστικός μισθός" in df.columns:
+        df = df.rename(columns={"Ονομαστικός μισθός": "Monthly Gross Salary (Current)"})
+        # already parsed and day rates ×26 by normalize_salary in clean_table
+    else:
+        notify("Column 'Ονομαστικός μισθός' not found for salary conversion.")
+
+    # Cost Center concat
+    if "Κέντρο Κόστους" in df.columns and "Περιγραφή Κέντρου Κόστους" in df.columns:
+        df["Cost Center"] = (
+            df["Κέντρο Κόστους"].astype(str).str.strip()
+            + " - "
+            + df["Περιγραφή Κέντρου Κόστους"].astype(str).str.strip()
+        )
+    elif "Κέντρο Κόστους" in df.columns:
+        df["Cost Center"] = df["Κέντρο Κόστους"].astype(str).str.strip()
+    elif "Περιγραφή Κέντρου Κόστους" in df.columns:
+        df["Cost Center"] = df["Περιγραφή Κέντρου Κόστους"].astype(str).str.strip()
+
+    # Override setup (normalized code + initial flag)
+    if BOOKING_CODE_COL in df.columns:
+        df["Κωδικός Κράτησης (norm)"] = normalize_code(df[BOOKING_CODE_COL])
+        df["Contrib Override Applied"] = np.where(df["Κωδικός Κράτησης (norm)"].isin(OVERRIDE_CODES), "Yes", "No")
+    else:
+        df["Κωδικός Κράτησης (norm)"] = np.nan
+        df["Contrib Override Applied"] = np.nan
+        notify("'Κωδικός Κράτησης' not found in MAIN file; override flag cannot be computed.")
+
+    # The derived-column kernels all read 'Hiring Date'
+    if "Hire Date" in df.columns and "Hiring Date" not in df.columns:
+        df = df.rename(columns={"Hire Date": "Hiring Date"})
+    return df
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Derived-column kernels
+# ───────────────────────────────────────────────────────────────────────────────
+def compute_employer_contrib(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute employer contribution amount from Contributions% and Monthly Gross Salary (Current).
+    Rules:
+      - If rate == 0.1738 → rate*salary + 25
+      - If rate == 0.1879 → rate*salary + 30
+      - Else → rate*salary
+    Writes: "Monthly Employer's Contributions" (rounded to 2 decimals).
+    """
+    need = {"Monthly Gross Salary (Current)", "Contributions%"}
+    if not need.issubset(df.columns):
+        notify("Missing columns to compute employer contributions (need salary & Contributions%).")
+        return df
+
+    rate = pd.to_numeric(df["Contributions%"], errors="coerce")
+    salary = pd.to_numeric(df["Monthly Gross Salary (Current)"], errors="coerce")
+
+    base = rate * salary
+    add_25 = np.isclose(rate, 0.1738, atol=1e-6)
+    add_30 = np.isclose(rate, 0.1879, atol=1e-6)
+
+    amount = np.where(add_25, rate * salary + 25, base)
+    amount = np.where(add_30, rate * salary + 30, amount)
+
+    df["Monthly Employer's Contributions"] = np.round(amount, 2)
+    return df
+
+def compute_months_projection_25(df: pd.DataFrame, projection_date: pd.Timestamp) -> pd.DataFrame:
+    """
+    Python translation of your revised Excel LET() for 'Months Projection 25',
+    with robust datetime handling to avoid int↔Timestamp comparisons.
+    """
+    # Ensure expected columns
+    if "Hiring Date" not in df.columns:
+        if "Hire Date" in df.columns:
+            df = df.rename(columns={"Hire Date": "Hiring Date"})
+        else:
+            notify("Cannot compute 'Months Projection 25' (missing 'Hiring Date').")
+            return df
+    if "Retire Date" not in df.columns:
+        notify("Cannot compute 'Months Projection 25' (missing 'Retire Date').")
+        return df
+
+    # JulyPart / BonusMonths / Retire-Hire months all come from the shared bonus calendar
+    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
+    R = pd.to_datetime(df["Retire Date"], errors="coerce")
+    calendar = projection_calendar(H, R, projection_date)
+
+    df["Months Projection 25"] = calendar.months_projection.copy()
+    return df
+
+
+def compute_fy_months_budget_26(df: pd.DataFrame, fy_base_date: pd.Timestamp, full_periods: int, divisor: float = 30.42) -> pd.DataFrame:
+    """
+    Excel -> Python for 'FY Months Budget 26'.
+
+    Mapping:
+      CurrYear = YEAR(fy_base_date)
+      PrevYear = CurrYear - 1
+      StartCurrYear = 1/1/CurrYear
+      EndCurrYear   = 12/31/CurrYear
+      FullPeriods   = 12
+      Divisor       = 30.42  (days per month)
+    """
+    if "Hiring Date" not in df.columns:
+        if "Hire Date" in df.columns:
+            df = df.rename(columns={"Hire Date": "Hiring Date"})
+        else:
+            notify("Missing 'Hiring Date' for FY Months Budget 26.")
+            return df
+    if "Retire Date" not in df.columns:
+        notify("Missing 'Retire Date' for FY Months Budget 26.")
+        return df
+
+    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
+    R = pd.to_datetime(df["Retire Date"], errors="coerce")
+
+    CurrYear = pd.to_datetime(fy_base_date).year
+
+    # April/July/Dec parts come from the shared bonus calendar for this budget year
+    calendar = budget_calendar(H, R, CurrYear)
+
+    df["FY Months Budget 26"] = fy_months_budget_26(
+        H, R, CurrYear, full_periods,
+        calendar.april_part, calendar.july_part, calendar.dec_part,
+        divisor=divisor,
+    )
+    return df
+
+def compute_fy_gross_salary_projection_25(
+    df: pd.DataFrame,
+    projection_date: pd.Timestamp,
+    monthly_cost_col: str = "Monthly Gross Salary (Current)",
+) -> pd.DataFrame:
+    """
+    Excel LET() → Python for 'FY Gross Salary Projection For 25'.
+
+    Depends on:
+      - Hiring Date, Retire Date (datetime columns)
+      - Monthly cost column (default: 'Monthly Gross Salary (Current)')
+
+    Uses the same JulyPart / BonusMonths / ResultMonths logic as Months Projection 25,
+    then computes:
+      TotalCost = ResultMonths * MonthlyCost + XmasOnlyMonths * MonthlyCost * BonusRate
+    with BonusRate = 0.04166 and rounds to 2 decimals.
+    """
+    # ---- Preconditions ----
+    if "Hiring Date" not in df.columns:
+        if "Hire Date" in df.columns:
+            df = df.rename(columns={"Hire Date": "Hiring Date"})
+        else:
+            notify("Missing 'Hiring Date' — cannot compute FY Gross Salary Projection For 25.")
+            return df
+    if "Retire Date" not in df.columns:
+        notify("Missing 'Retire Date' — cannot compute FY Gross Salary Projection For 25.")
+        return df
+    if monthly_cost_col not in df.columns:
+        notify(f"Missing '{monthly_cost_col}' — cannot compute FY Gross Salary Projection For 25.")
+        return df
+
+    # Ensure numeric monthly cost
+    df[monthly_cost_col] = pd.to_numeric(
+        df[monthly_cost_col].astype(str).str.replace(",", ".", regex=False),
+        errors="coerce"
+    )
+
+    # ---- Row dates → shared bonus calendar (same arrays as Months Projection 25) ----
+    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
+    R = pd.to_datetime(df["Retire Date"], errors="coerce")
+    calendar = projection_calendar(H, R, projection_date)
+
+    # ResultMonths = ROUNDUP(IF(YearH = BudgetYear, 0, IF(R present, RetireCalc, NoRetire)), 1)
+    ResultMonths = calendar.result_months_salary
+
+    # XmasOnlyMonths = BonusMonths - JulyPart
+    XmasOnlyMonths = (calendar.bonus_months_salary - calendar.july_part_salary).astype(float)
+
+    # ---- Cost calculation ----
+    BonusRate = 0.04166  # from your sheet (0,04166)
+    monthly_cost = df[monthly_cost_col].astype(float)
+
+    TotalCost = np.round(
+        ResultMonths * monthly_cost + XmasOnlyMonths * monthly_cost * BonusRate,
+        2
+    )
+
+    df["FY Gross Salary Projection For 25"] = TotalCost
+    return df
+
+def compute_annual_gross_salary_fy_budget_2026(
+    df: pd.DataFrame,
+    effective_increase_date: pd.Timestamp,      # IncStart == YearDate
+    no_increase_cutoff: pd.Timestamp,           # H5
+    inc_pct: float,                             # e.g., 0.10
+    inc_pct2: float,                            # Grade 0.1 rows, e.g. 0.05
+    active_months_col: str = "FY Months Budget 26",
+    monthly_cost_col: str = "Monthly Gross Salary (Current)",
+    grade_col: str = "Grade",
+) -> pd.DataFrame:
+    # --- Preconditions ---
+    if "Hiring Date" not in df.columns and "Hire Date" in df.columns:
+        df = df.rename(columns={"Hire Date": "Hiring Date"})
+    for col in ["Hiring Date", "Retire Date", active_months_col, monthly_cost_col]:
+        if col not in df.columns:
+            notify(f"Missing '{col}' — cannot compute Annual Gross Salary FY Budget 2026.")
+            return df
+
+    # --- Row data & numerics (same coercions as the scenario sweep) ---
+    inputs = BudgetInputs.from_frame(
+        df, active_months_col=active_months_col, monthly_cost_col=monthly_cost_col,
+        grade_col=grade_col, rate_col=None,
+    )
+
+    # --- Bonus parts (April/Dec) from the shared bonus calendar ---
+    CurrYear = pd.to_datetime(effective_increase_date).year
+    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
+    R = pd.to_datetime(df["Retire Date"], errors="coerce")
+    calendar = budget_calendar(H, R, CurrYear)
+
+    # BaseCost split at MONTH(IncStart)-0.5, allowances, zero for rows without active months
+    Total = annual_gross_2026(
+        inputs, calendar.april_part, calendar.dec_part_from_start,
+        effective_increase_date, no_increase_cutoff, inc_pct, inc_pct2,
+    )
+
+    df["Annual Gross Salary FY Budget 2026"] = Total
+    return df
+
+def merge_contributions(df: pd.DataFrame, contributions) -> pd.DataFrame:
+    """
+    Look up each employee's rate in the CONTRIBUTIONS file ('Hrms Id' → 'Contributions')
+    and apply the booking-code overrides.
+    Writes: "Contributions%", "Contrib Override Applied".
+    Without a contributions file, "Contributions%" stays empty (NaN).
+    """
+    if contributions is None:
+        if "Contributions%" not in df.columns:
+            df["Contributions%"] = np.nan
+        return df
+    if "Hrms Id" not in df.columns:
+        notify("'Hrms Id' missing in MAIN file; cannot merge the contributions file.")
+        df["Contributions%"] = np.nan
+        return df
+
+    contrib_col = "Contributions"
+    lookup = contributions.drop_duplicates(subset=["Hrms Id"]).set_index("Hrms Id")[contrib_col]
+    rate = pd.to_numeric(
+        df["Hrms Id"].map(lookup).astype(str).str.replace(",", ".", regex=False),
+        errors="coerce"
+    )
+
+    if "Κωδικός Κράτησης (norm)" in df.columns:
+        code = df["Κωδικός Κράτησης (norm)"]
+        is_override = code.isin(OVERRIDE_CODES)
+        df["Contributions%"] = np.where(is_override, code.map(OVERRIDE_MAP), rate).astype(float)
+        df["Contrib Override Applied"] = np.where(is_override, "Yes", "No")
+    else:
+        notify("Normalized booking code column missing; using contributions as-is.")
+        df["Contributions%"] = rate
+    return df
+
+def compute_fy_employer_contrib_projection_25(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    'FY Employer's Contributions Projection 25' = monthly employer contribution × Months Projection 25.
+    """
+    contrib_amount_col = None
+    for cand in ["Monthly Employer's Contributions", "Monthly Employer'S Contributions"]:
+        if cand in df.columns:
+            contrib_amount_col = cand
+            break
+    if contrib_amount_col is None:
+        notify("Can't compute FY Employer's Contributions Projection 25 (monthly contribution amount not found).")
+        return df
+    if "Months Projection 25" not in df.columns:
+        notify("Can't compute FY Employer's Contributions Projection 25 (Months Projection 25 missing).")
+        return df
+
+    amt = pd.to_numeric(df[contrib_amount_col], errors="coerce")
+    months = pd.to_numeric(df["Months Projection 25"], errors="coerce")
+    df["FY Employer's Contributions Projection 25"] = np.round(amt * months, 2)
+    return df
+
+def compute_total_payroll_projection_25(df: pd.DataFrame) -> pd.DataFrame:
+    """'Total Payroll Projection Cost 25' = FY gross salary 25 + FY employer's contributions 25."""
+    gross_col = "FY Gross Salary Projection For 25"
+    employer_col = "FY Employer's Contributions Projection 25"
+    if gross_col in df.columns and employer_col in df.columns:
+        df["Total Payroll Projection Cost 25"] = np.round(
+            pd.to_numeric(df[gross_col], errors="coerce") +
+            pd.to_numeric(df[employer_col], errors="coerce"),
+            2
+        )
+    else:
+        notify("Missing required columns to compute 'Total Payroll Projection Cost 25'.")
+    return df
+
+def compute_annual_employer_contrib_2026(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    'Annual Employer's Contributions For 2026' = annual gross × rate,
+    plus 30/month for rate 0.1879 and 25/month for rate 0.1738.
+    """
+    need_cols = ["Contributions%", "Annual Gross Salary FY Budget 2026", "FY Months Budget 26"]
+    missing = [c for c in need_cols if c not in df.columns]
+    if missing:
+        notify(f"Missing columns for 'Annual Employer's Contributions For 2026': {missing}")
+        return df
+
+    rate   = pd.to_numeric(df["Contributions%"].astype(str).str.replace(",", ".", regex=False), errors="coerce")
+    annual = pd.to_numeric(df["Annual Gross Salary FY Budget 2026"], errors="coerce")
+    months = pd.to_numeric(df["FY Months Budget 26"], errors="coerce")
+    df["Annual Employer's Contributions For 2026"] = employer_contrib_2026(
+        annual.to_numpy(dtype=float), rate.to_numpy(dtype=float), months.to_numpy(dtype=float)
+    )
+    return df
+
+def compute_fy_payroll_cost_budget_2026(df: pd.DataFrame) -> pd.DataFrame:
+    """'FY PAYROLL COST BUDGET 2026' = annual gross 2026 + annual employer's contributions 2026."""
+    gross_col = "Annual Gross Salary FY Budget 2026"
+    employer_col = "Annual Employer's Contributions For 2026"
+    if gross_col in df.columns and employer_col in df.columns:
+        df["FY PAYROLL COST BUDGET 2026"] = payroll_cost_2026(
+            pd.to_numeric(df[gross_col], errors="coerce").to_numpy(dtype=float),
+            pd.to_numeric(df[employer_col], errors="coerce").to_numpy(dtype=float),
+        )
+    else:
+        notify(f"Missing one of the required columns: '{gross_col}' or '{employer_col}'")
+    return df
+
+def compute_annual_training_cost(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Annual Training Cost (based on Grade)
+    Excel: IF(Grade<>"", IFS(Grade<8,25, Grade<=9,150, Grade<=13,250, Grade<=18,450, Grade<=23,500), 0)
+    """
+    if "Grade" in df.columns:
+        # coerce grade robustly (handles "0,1", "19", "19.0", text etc.)
+        grade_num = pd.to_numeric(
+            df["Grade"].astype(str).str.replace(",", ".", regex=False).str.strip(),
+            errors="coerce"
+        )
+
+        df["Annual Training Cost"] = np.select(
+            [
+                grade_num.notna() & (grade_num < 8),
+                grade_num.notna() & (grade_num <= 9),
+                grade_num.notna() & (grade_num <= 13),
+                grade_num.notna() & (grade_num <= 18),
+                grade_num.notna() & (grade_num <= 23),
+            ],
+            [
+                25,
+                150,
+                250,
+                450,
+                500,
+            ],
+            default=0
+        ).astype(float)
+    else:
+        notify("'Grade' column not found; cannot compute Annual Training Cost.")
+        df["Annual Training Cost"] = 0.0
+    return df
+
+def compute_annual_meal_allowance(df: pd.DataFrame, meal_col: str = "ΚΑΡΤΑ ΣΙΤΙΣΗΣ") -> pd.DataFrame:
+    """
+    Annual Meal Allowance / Coupons Cost
+    Rule:
+      ΚΑΡΤΑ ΣΙΤΙΣΗΣ = 3  -> 1488
+      ΚΑΡΤΑ ΣΙΤΙΣΗΣ = 4  -> 744
+      else              -> 0
+    """
+    if meal_col in df.columns:
+        meal_val = pd.to_numeric(
+            df[meal_col].astype(str).str.replace(",", ".", regex=False).str.strip(),
+            errors="coerce"
+        )
+
+        df["Annual Meal Allowance/ Coupons Cost"] = np.select(
+            [meal_val.eq(3), meal_val.eq(4)],
+            [1488, 744],
+            default=0
+        ).astype(float)
+    else:
+        notify(f"'{meal_col}' column not found; setting Annual Meal Allowance/ Coupons Cost = 0.")
+        df["Annual Meal Allowance/ Coupons Cost"] = 0.0
+    return df
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Derived-column graph
+# Each node lists the parameters and the columns it reads, so a parameter
+# change only recomputes the nodes downstream of it (see esg_core.dag).
+# ───────────────────────────────────────────────────────────────────────────────
+DERIVED_NODES = [
+    Node(
+        "Contributions merge", merge_contributions,
+        inputs=("Hrms Id", "Κωδικός Κράτησης (norm)", "Contributions%", "Contrib Override Applied"),
+        params=("contributions",),
+        outputs=("Contributions%", "Contrib Override Applied"),
+    ),
+    Node(
+        "Monthly employer's contributions", compute_employer_contrib,
+        inputs=(SALARY_COL, "Contributions%"),
+        outputs=("Monthly Employer's Contributions",),
+    ),
+    Node(
+        "Months Projection 25", compute_months_projection_25,
+        inputs=("Hiring Date", "Retire Date"),
+        params=("projection_date",),
+        outputs=("Months Projection 25",),
+    ),
+    Node(
+        "FY Months Budget 26", compute_fy_months_budget_26,
+        inputs=("Hiring Date", "Retire Date"),
+        params=("fy_base_date", "full_periods"),
+        outputs=("FY Months Budget 26",),
+    ),
+    Node(
+        "FY Gross Salary Projection 25", compute_fy_gross_salary_projection_25,
+        inputs=("Hiring Date", "Retire Date", SALARY_COL),
+        params=("projection_date",),
+        outputs=("FY Gross Salary Projection For 25",),
+    ),
+    Node(
+        "Annual Gross Salary 2026", compute_annual_gross_salary_fy_budget_2026,
+        inputs=("Hiring Date", "Retire Date", "FY Months Budget 26", SALARY_COL, "Grade"),
+        params=("effective_increase_date", "no_increase_cutoff", "inc_pct", "inc_pct2"),
+        outputs=("Annual Gross Salary FY Budget 2026",),
+    ),
+    Node(
+        "FY Employer's Contributions 25", compute_fy_employer_contrib_projection_25,
+        inputs=("Monthly Employer's Contributions", "Monthly Employer'S Contributions", "Months Projection 25"),
+        outputs=("FY Employer's Contributions Projection 25",),
+    ),
+    Node(
+        "Total Payroll Projection 25", compute_total_payroll_projection_25,
+        inputs=("FY Gross Salary Projection For 25", "FY Employer's Contributions Projection 25"),
+        outputs=("Total Payroll Projection Cost 25",),
+    ),
+    Node(
+        "Annual Employer's Contributions 2026", compute_annual_employer_contrib_2026,
+        inputs=("Contributions%", "Annual Gross Salary FY Budget 2026", "FY Months Budget 26"),
+        outputs=("Annual Employer's Contributions For 2026",),
+    ),
+    Node(
+        "FY Payroll Cost Budget 2026", compute_fy_payroll_cost_budget_2026,
+        inputs=("Annual Gross Salary FY Budget 2026", "Annual Employer's Contributions For 2026"),
+        outputs=("FY PAYROLL COST BUDGET 2026",),
+    ),
+    Node(
+        "Annual Training Cost", compute_annual_training_cost,
+        inputs=("Grade",),
+        outputs=("Annual Training Cost",),
+    ),
+    Node(
+        "Annual Meal Allowance", compute_annual_meal_allowance,
+        inputs=("ΚΑΡΤΑ ΣΙΤΙΣΗΣ",),
+        outputs=("Annual Meal Allowance/ Coupons Cost",),
+    ),
+]
+
+FINAL_ORDER = [
+    "Company", "Hrms Id", "Surname", "Name", "Division", "Department",
+    "Job Title", "Job Property", "Grade", "Hiring Date", "Retire Date",
+    "Cost Center", "Monthly Gross Salary (Current)",
+    "Contrib Override Applied", "Contributions%",
+    "Monthly Employer's Contributions", "Months Projection 25",
+    "FY Months Budget 26", "FY Gross Salary Projection For 25",
+    "FY Employer's Contributions Projection 25",
+    "Total Payroll Projection Cost 25",
+    "Annual Gross Salary FY Budget 2026",
+    "Annual Employer's Contributions For 2026",
+    "FY PAYROLL COST BUDGET 2026", "Annual Training Cost", "Annual Meal Allowance/ Coupons Cost"
+]
+
+
+def derive_columns(base: pd.DataFrame, params: ManpowerParams, contributions: Optional[pd.DataFrame] = None,
+                   graph: Optional[ColumnGraph] = None) -> pd.DataFrame:
+    """``base`` plus every derived column (pass a long-lived ``graph`` to reuse its node cache)."""
+    graph = graph or ColumnGraph(DERIVED_NODES)
+    return graph.run(base, params=params.graph_params(contributions))
+
+
+def final_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """The FINAL_ORDER columns present in ``df`` (duplicate names dropped), 'Hire Date' as 'Hiring Date'."""
+    if "Hire Date" in df.columns and "Hiring Date" not in df.columns:
+        df = df.rename(columns={"Hire Date": "Hiring Date"})
+    df = drop_dup_named_cols(df)
+    return df[[c for c in FINAL_ORDER if c in df.columns]].copy()
+
+
+DIM_COLS = ["Company", "Division", "Department", "Cost Center"]
+
+
+def with_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` plus a TOTAL row: numeric columns summed (rounded to 2), "TOTAL" in the first DIM_COLS column present."""
+    numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
+    totals = df[numeric_cols].sum(numeric_only=True)
+    row = {c: "" for c in df.columns}
+    for dim in DIM_COLS:
+        if dim in df.columns:
+            row[dim] = "TOTAL"
+            break
+    for c in numeric_cols:
+        row[c] = round(float(totals.get(c, 0.0)), 2)
+    return pd.concat([df, pd.DataFrame([row])], ignore_index=True)
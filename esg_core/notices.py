@@ -0,0 +1,65 @@
+"""
+Structured warnings from the computations, instead of UI calls.
+
+Code in ``esg_core`` reports a problem it can work around (a missing column,
+a skipped step) with :func:`notify`. Whoever runs the computation decides how
+to show it:
+
+  - inside ``with collect() as notices:`` the :class:`Notice` objects are
+    appended to ``notices`` (a page renders them, a batch job logs them);
+  - anywhere else they go through Python's ``warnings`` module as
+    :class:`EsgWarning`, so scripts and process pools see them as usual.
+
+The collector is a ``ContextVar``, so concurrent sessions (threads) and nested
+collectors each get their own notices.
+"""
+import warnings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+WARNING = "warning"
+INFO = "info"
+ERROR = "error"
+
+
+class EsgWarning(UserWarning):
+    """Category of the notices raised outside a :func:`collect` block."""
+
+
+@dataclass(frozen=True)
+class Notice:
+    """One message from a computation: ``level`` is WARNING, INFO or ERROR; ``source`` names the step."""
+    message: str
+    level: str = WARNING
+    source: str = ""
+
+
+_collector: ContextVar[Optional[List[Notice]]] = ContextVar("esg_notices", default=None)
+
+
+def emit(notice: Notice) -> None:
+    """Hand ``notice`` to the active collector, or to ``warnings.warn``."""
+    sink = _collector.get()
+    if sink is not None:
+        sink.append(notice)
+    else:
+        prefix = f"{notice.source}: " if notice.source else ""
+        warnings.warn(f"{prefix}{notice.message}", EsgWarning, stacklevel=3)
+
+
+def notify(message: str, level: str = WARNING, source: str = "") -> None:
+    """Report a recoverable problem (see the module docstring)."""
+    emit(Notice(message, level, source))
+
+
+@contextmanager
+def collect() -> Iterator[List[Notice]]:
+    """Collect the notices raised inside the block into the yielded list."""
+    notices: List[Notice] = []
+    token = _collector.set(notices)
+    try:
+        yield notices
+    finally:
+        _collector.reset(token)
@@ -0,0 +1,222 @@
+"""
+Per-stage timing and memory records, without Streamlit.
+
+Code marks its expensive steps as named stages:
+
+    with stage("monthly headcount", rows_in=len(df)) as s:
+        table = s.out(monthly_headcount(df, ...))
+
+or decorates a function with :func:`profiled`. Whoever runs the code decides
+whether anything is recorded, as with ``esg_core.notices``:
+
+  - inside ``with record() as records:`` every stage appends a
+    :class:`StageRecord` to ``records``. A record holds the wall time, the
+    rows in and out (when given) and, with ``trace_memory``, the
+    ``tracemalloc`` peak above the memory in use when the stage started;
+  - anywhere else a stage costs one ``ContextVar`` lookup and records nothing.
+
+Stages nest. An inner stage's time and memory are part of the outer stage's,
+and ``depth`` keeps the nesting for display. ``record(prefix="Manpower")``
+qualifies the stage names ("Manpower: compute_fy_months_budget_26"), so core
+code names its stages without knowing the page.
+
+``tracemalloc`` traces the whole process. When several sessions record memory
+at once, each peak also contains the other sessions' allocations. Tracing
+slows pure-Python loops (row-wise ``apply``) by a few times. Arrow buffers
+(pandas string columns) are not traced. :func:`append_jsonl` keeps the
+records as JSON lines for offline analysis.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+MB = 1024 * 1024
+
+TABLE_COLUMNS = ["Stage", "Time (ms)", "Share (%)", "Rows in", "Rows out", "Peak (MB)"]
+
+
+@dataclass(frozen=True)
+class StageRecord:
+    """One finished stage (``peak_mb`` is None without memory tracing; ``depth`` 0 for outermost stages)."""
+    stage: str
+    seconds: float
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    peak_mb: Optional[float] = None
+    depth: int = 0
+    started: float = 0.0
+
+
+@dataclass
+class _Recording:
+    records: List[StageRecord]
+    prefix: str
+    trace_memory: bool
+    # open stages, innermost last
+    stack: List["Stage"] = field(default_factory=list)
+
+
+_recording: ContextVar[Optional[_Recording]] = ContextVar("esg_profiling", default=None)
+
+# tracemalloc is process-wide: started by the first recording that traces memory, stopped by the last
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+def _start_tracing() -> None:
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+
+
+def _stop_tracing() -> None:
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def count_rows(obj) -> Optional[int]:
+    """Rows of a frame / series / array, True values of a boolean mask, None for anything else."""
+    if obj is None:
+        return None
+    if isinstance(obj, np.ndarray) and obj.dtype == bool:
+        return int(obj.sum())
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index, np.ndarray)):
+        return len(obj)
+    return None
+
+
+class Stage:
+    """Handle of an open stage: set ``rows_out`` directly or pass the result through :meth:`out`."""
+
+    def __init__(self, name: str, rows_in: Optional[int] = None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+        self._base = 0
+        self._peak = 0
+
+    def out(self, result):
+        """``result``, after taking its row count as ``rows_out``."""
+        self.rows_out = count_rows(result)
+        return result
+
+
+@contextmanager
+def stage(name: str, rows_in=None) -> Iterator[Stage]:
+    """Record the block as the stage ``name`` (``rows_in``: a row count or anything :func:`count_rows` takes)."""
+    rec = _recording.get()
+    handle = Stage(name, rows_in if rows_in is None or isinstance(rows_in, int) else count_rows(rows_in))
+    if rec is None:
+        yield handle
+        return
+
+    tracing = rec.trace_memory and tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        # the enclosing stage keeps the peak it has seen so far before the counter restarts
+        if rec.stack:
+            rec.stack[-1]._peak = max(rec.stack[-1]._peak, peak)
+        tracemalloc.reset_peak()
+        handle._base = handle._peak = current
+    depth = len(rec.stack)
+    rec.stack.append(handle)
+    started = time.time()
+    t0 = time.perf_counter()
+    try:
+        yield handle
+    finally:
+        seconds = time.perf_counter() - t0
+        rec.stack.pop()
+        peak_mb = None
+        if tracing:
+            handle._peak = max(handle._peak, tracemalloc.get_traced_memory()[1])
+            peak_mb = round(max(handle._peak - handle._base, 0) / MB, 3)
+            if rec.stack:
+                rec.stack[-1]._peak = max(rec.stack[-1]._peak, handle._peak)
+        name = f"{rec.prefix}: {handle.name}" if rec.prefix else handle.name
+        rec.records.append(StageRecord(name, seconds, handle.rows_in, handle.rows_out, peak_mb, depth, started))
+
+
+def profiled(name: Optional[str] = None):
+    """
+    Decorator: every call is a stage (default name: the function's name). Rows in
+    are counted on the first argument, rows out on the return value.
+    """
+    def decorate(func: Callable) -> Callable:
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _recording.get() is None:
+                return func(*args, **kwargs)
+            with stage(label, rows_in=args[0] if args else None) as s:
+                return s.out(func(*args, **kwargs))
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def record(prefix: str = "", trace_memory: bool = True) -> Iterator[List[StageRecord]]:
+    """Collect the stages finished inside the block into the yielded list (in finishing order)."""
+    records: List[StageRecord] = []
+    if trace_memory:
+        _start_tracing()
+    token = _recording.set(_Recording(records, prefix, trace_memory))
+    try:
+        yield records
+    finally:
+        _recording.reset(token)
+        if trace_memory:
+            _stop_tracing()
+
+
+def records_frame(records: Sequence[StageRecord]) -> pd.DataFrame:
+    """
+    The stages in starting order, nested names indented under their stage.
+    "Share (%)" is the share of the total time of the outermost stages.
+    """
+    ordered = sorted(records, key=lambda r: (r.started, r.depth))
+    total = sum(r.seconds for r in records if r.depth == 0)
+    return pd.DataFrame(
+        [
+            {
+                "Stage": ("\u2003" * (r.depth - 1) + "↳ " if r.depth else "") + r.stage,
+                "Time (ms)": round(r.seconds * 1000.0, 1),
+                "Share (%)": round(100.0 * r.seconds / total, 1) if total else None,
+                "Rows in": r.rows_in,
+                "Rows out": r.rows_out,
+                "Peak (MB)": r.peak_mb,
+            }
+            for r in ordered
+        ],
+        columns=TABLE_COLUMNS,
+    ).astype({"Rows in": "Int64", "Rows out": "Int64"})
+
+
+def append_jsonl(records: Sequence[StageRecord], path: str, **context) -> int:
+    """Append one JSON line per record to ``path`` (``context``: fields added to every line, e.g. page, run). Returns the lines written."""
+    if not records:
+        return 0
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    logged = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+    with open(path, "a", encoding="utf-8") as fh:
+        for r in records:
+            fh.write(json.dumps({"logged": logged, **context, **asdict(r)}, ensure_ascii=False) + "\n")
+    return len(records)
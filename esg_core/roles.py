@@ -0,0 +1,87 @@
+"""
+Role categories from job title, job property and grade.
+
+Rules, first match wins (title and property compared lower-case, grade parsed
+with a decimal comma, unparsable → 0):
+
+  title contains "trainee"                                      → Trainee
+  title contains "director"                                     → Director
+  title contains "commercial unit developer" and grade > 17     → Manager
+  title contains manager / head / ceo and grade ≥ 20            → Director
+  title contains manager / head / supervisor / lead / executive
+  and grade > 16                                                → Manager
+  property "administrative"                                     → Office Worker
+  property "operational"                                        → Worker
+  otherwise                                                     → None
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+TITLE = "Περιγραφή Θέσης Εργασίας"
+JOB_PROPERTY = "Job Property"
+GRADE = "GRADE"
+
+
+def parse_grade(value) -> float:
+    """Grade as a number ('17,5' → 17.5); anything unparsable → 0."""
+    try:
+        return float(str(value).replace(",", "."))
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def classify_role(title: str, job_property: str, grade) -> Optional[str]:
+    """Role category of one employee (see the module docstring)."""
+    title = str(title).lower()
+    prop = str(job_property).lower()
+    grade = parse_grade(grade)
+    if "trainee" in title:
+        return "Trainee"
+    elif "director" in title:
+        return "Director"
+    elif "commercial unit developer" in title and grade > 17:
+        return "Manager"
+    elif ("manager" in title or "head" in title or "ceo" in title) and grade >= 20:
+        return "Director"
+    elif any(w in title for w in ("manager", "head", "supervisor", "lead", "executive")) and grade > 16:
+        return "Manager"
+    elif prop == "administrative":
+        return "Office Worker"
+    elif prop == "operational":
+        return "Worker"
+    return None
+
+
+def role_categories(df: pd.DataFrame, title_col: str = TITLE, property_col: str = JOB_PROPERTY, grade_col: str = GRADE) -> pd.Series:
+    """:func:`classify_role` for every row of ``df`` at once (object Series, None when unclassified)."""
+    # missing text matches nothing (pandas ≥ 3 keeps NaN through astype(str))
+    title = df[title_col].astype(str).str.lower().fillna("")
+    prop = df[property_col].astype(str).str.lower().fillna("")
+    if grade_col in df.columns:
+        codes, uniques = pd.factorize(df[grade_col], use_na_sentinel=False)
+        grade = np.array([parse_grade(u) for u in uniques], dtype=float)[codes] if len(uniques) else np.zeros(0)
+    else:
+        grade = np.zeros(len(df))
+
+    def has(*words):
+        out = np.zeros(len(df), dtype=bool)
+        for w in words:
+            out |= title.str.contains(w, regex=False).to_numpy(dtype=bool)
+        return out
+
+    rules = [
+        (has("trainee"), "Trainee"),
+        (has("director"), "Director"),
+        (has("commercial unit developer") & (grade > 17), "Manager"),
+        (has("manager", "head", "ceo") & (grade >= 20), "Director"),
+        (has("manager", "head", "supervisor", "lead", "executive") & (grade > 16), "Manager"),
+        ((prop == "administrative").to_numpy(dtype=bool), "Office Worker"),
+        ((prop == "operational").to_numpy(dtype=bool), "Worker"),
+    ]
+    result = np.full(len(df), None, dtype=object)
+    # last rule first, so the first matching rule is the one left standing
+    for mask, label in reversed(rules):
+        result[mask] = label
+    return pd.Series(result, index=df.index, dtype=object)
@@ -0,0 +1,83 @@
+"""
+Salary normalization shared by the pages: one vectorized pass from the raw
+"Ονομαστικός μισθός" column to monthly amounts.
+
+1. Parse: numeric columns pass through; text is parsed with decimal commas
+   ("1234,56" and "1.234,56" → 1234.56; "1234.56" and "1,234.56" read the
+   same way; junk → NaN).
+2. Day rates → monthly: the amount is multiplied by ``multiplier`` (26 working
+   days) when the contract type ("Περιγραφή Σύμβασης") is one of
+   ``day_rate_contracts``. Rows without a contract type (or extracts without
+   the column) fall back to the amount heuristic: 0 < amount < ``day_rate_below``
+   is a day rate.
+
+The pages run this inside their upload loaders, so the result is cached and
+snapshotted with the rest of the preprocessing (see ``esg_ui.ingest``).
+"""
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+
+import numpy as np
+import pandas as pd
+
+SALARY = "Ονομαστικός μισθός"
+CONTRACT = "Περιγραφή Σύμβασης"
+
+DAY_RATE_CONTRACTS = frozenset({
+    "ΑΛΜ - ΗΜΕΡΟΜΙΣΘΙΟΙ",
+    "ΜΕΤΑΛΛΟΥ ΗΜΕΡΟΜΙΣΘΙΟΙ 1Η ΚΑΤΗΓΟΡΙΑ",
+    "ΜΕΤΑΛΛΟΥ ΗΜΕΡΟΜΙΣΘΙΟΙ 2Η ΚΑΤΗΓΟΡΙΑ",
+})
+
+
+@dataclass(frozen=True)
+class SalaryRules:
+    day_rate_contracts: FrozenSet[str] = DAY_RATE_CONTRACTS
+    multiplier: float = 26
+    # amounts in (0, day_rate_below) count as day rates where the contract type is unknown; None disables
+    day_rate_below: Optional[float] = 90
+
+
+DEFAULT_RULES = SalaryRules()
+
+
+def parse_decimal(series: pd.Series) -> pd.Series:
+    """Numbers from a column that may hold decimal-comma text; numeric columns pass through as float."""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype(float)
+    text = series.astype(str).str.strip()
+    # with both separators the last one is the decimal point: "1.234,56" / "1,234.56"
+    last_comma = text.str.rfind(",")
+    last_dot = text.str.rfind(".")
+    both = (last_comma >= 0) & (last_dot >= 0)
+    text = text.mask(both & (last_comma > last_dot), text.str.replace(".", "", regex=False))
+    text = text.mask(both & (last_dot > last_comma), text.str.replace(",", "", regex=False))
+    return pd.to_numeric(text.str.replace(",", ".", regex=False), errors="coerce").astype(float)
+
+
+def day_rate_mask(amount: pd.Series, contract: Optional[pd.Series], rules: SalaryRules = DEFAULT_RULES) -> np.ndarray:
+    """Rows whose amount is a day rate (see the module docstring)."""
+    if contract is None:
+        known = np.zeros(len(amount), dtype=bool)
+        listed = known
+    else:
+        kind = contract.astype(str).str.strip().str.upper()
+        known = (contract.notna() & (kind != "")).to_numpy()
+        listed = kind.isin(rules.day_rate_contracts).to_numpy()
+    if rules.day_rate_below is None:
+        return listed
+    small = ((amount > 0) & (amount < rules.day_rate_below)).to_numpy()
+    return listed | (~known & small)
+
+
+def normalize_salary(
+    df: pd.DataFrame,
+    salary_col: str = SALARY,
+    contract_col: str = CONTRACT,
+    rules: SalaryRules = DEFAULT_RULES,
+) -> pd.Series:
+    """Monthly salary per row of ``df`` (same index); NaN where the amount does not parse."""
+    amount = parse_decimal(df[salary_col])
+    contract = df[contract_col] if contract_col in df.columns else None
+    mask = day_rate_mask(amount, contract, rules)
+    return amount.where(~mask, amount * rules.multiplier)
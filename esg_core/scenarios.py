@@ -0,0 +1,166 @@
+"""
+Scenario sweep for the 2026 payroll budget.
+
+Evaluates FY PAYROLL COST BUDGET 2026 for a grid of what-if parameters
+(increase %, effective date of the increase, no-increase cutoff) in one pass:
+the per-employee arrays are broadcast against the scenario axis
+(employees × scenarios) with the same kernels the Manpower page uses for a
+single scenario (``esg_core.budget``). The scenario axis is processed in chunks
+so the (N, S) temporaries stay within a memory budget.
+"""
+import io
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from esg_core.bonus_calendar import budget_calendar
+from esg_core.budget import BudgetInputs, annual_gross_2026, employer_contrib_2026, payroll_cost_2026
+
+DEFAULT_MAX_BYTES = 256 * 2**20
+# (N, S) float64 arrays alive at once in annual_gross_2026 + employer/payroll steps
+_TEMPORARIES = 16
+
+PARAM_COLS = ["inc_pct", "inc_pct2", "effective_increase_date", "no_increase_cutoff"]
+TOTAL_COLS = [
+    "Annual Gross Salary FY Budget 2026",
+    "Annual Employer's Contributions For 2026",
+    "FY PAYROLL COST BUDGET 2026",
+]
+
+
+def scenario_grid(
+    inc_pcts: Iterable[float],
+    effective_dates: Iterable,
+    cutoffs: Iterable,
+    inc_pct2s: Iterable[float] = (0.05,),
+) -> pd.DataFrame:
+    """Cartesian product of the parameter lists, one row per scenario (S01, S02, …)."""
+    rows = list(itertools.product(inc_pcts, inc_pct2s, effective_dates, cutoffs))
+    grid = pd.DataFrame(rows, columns=PARAM_COLS)
+    grid["inc_pct"] = grid["inc_pct"].astype(float)
+    grid["inc_pct2"] = grid["inc_pct2"].astype(float)
+    grid["effective_increase_date"] = pd.to_datetime(grid["effective_increase_date"])
+    grid["no_increase_cutoff"] = pd.to_datetime(grid["no_increase_cutoff"])
+    grid.insert(0, "Scenario", [f"S{i + 1:02d}" for i in range(len(grid))])
+    return grid
+
+
+def scenario_chunk_size(n_employees: int, n_scenarios: int, max_bytes: int = DEFAULT_MAX_BYTES) -> int:
+    """Scenarios per chunk so that the (N, chunk) temporaries fit in ``max_bytes``."""
+    per_scenario = max(1, n_employees) * 8 * _TEMPORARIES
+    return int(max(1, min(n_scenarios, max_bytes // per_scenario)))
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """Per-scenario totals plus one (groups × scenarios) payroll table per breakdown level."""
+    scenarios: pd.DataFrame
+    breakdowns: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    chunk_size: int = 0
+    seconds: float = 0.0
+
+
+def _group_codes(labels: pd.Series):
+    """Factorized group labels (blank → '(blank)') with the row order that sorts them."""
+    values = labels.astype(object).where(labels.notna(), "(blank)").astype(str).str.strip()
+    codes, uniques = pd.factorize(values, sort=True)
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(codes) else np.array([], int)
+    return order, starts, pd.Index(uniques, name=labels.name)
+
+
+def sweep_payroll_budget(
+    inputs: BudgetInputs,
+    scenarios: pd.DataFrame,
+    groups: Optional[pd.DataFrame] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> SweepResult:
+    """
+    FY PAYROLL COST BUDGET 2026 for every row of ``scenarios`` (see ``scenario_grid``).
+
+    ``groups`` holds one column per breakdown level (e.g. Company, Division,
+    Cost Center) aligned with ``inputs``. Totals skip NaN like the page's totals
+    row: employees without a contributions rate count in the gross total only
+    and add nothing to the employer contributions, the payroll cost or its
+    group breakdowns.
+    """
+    t0 = time.perf_counter()
+    n, s = len(inputs), len(scenarios)
+    chunk = scenario_chunk_size(n, s, max_bytes)
+
+    inc = scenarios["inc_pct"].to_numpy(dtype=float)
+    inc2 = scenarios["inc_pct2"].to_numpy(dtype=float)
+    eff = pd.DatetimeIndex(pd.to_datetime(scenarios["effective_increase_date"]))
+    cut = pd.DatetimeIndex(pd.to_datetime(scenarios["no_increase_cutoff"]))
+
+    # April/Dec bonus parts depend on YEAR(effective date) only → one calendar per year
+    hire, retire = pd.Series(inputs.hire), pd.Series(inputs.retire)
+    calendars = {int(y): budget_calendar(hire, retire, int(y)) for y in np.unique(eff.year)}
+
+    levels = {} if groups is None else {col: _group_codes(groups[col].reset_index(drop=True)) for col in groups.columns}
+    totals = np.zeros((s, len(TOTAL_COLS)))
+    by_level = {col: np.zeros((len(labels), s)) for col, (_, _, labels) in levels.items()}
+
+    for a in range(0, s, chunk):
+        b = min(a + chunk, s)
+        years = eff.year[a:b]
+        if len(set(years)) == 1:
+            cal = calendars[int(years[0])]
+            april, dec = cal.april_part, cal.dec_part_from_start
+        else:
+            april = np.stack([calendars[int(y)].april_part for y in years], axis=1)
+            dec = np.stack([calendars[int(y)].dec_part_from_start for y in years], axis=1)
+
+        annual = annual_gross_2026(inputs, april, dec, eff[a:b], cut[a:b], inc[a:b], inc2[a:b])
+        employer = employer_contrib_2026(annual, inputs.rate, inputs.active_months)
+        payroll = np.nan_to_num(payroll_cost_2026(annual, employer), nan=0.0)
+
+        totals[a:b, 0] = annual.sum(axis=0)
+        totals[a:b, 1] = np.nansum(employer, axis=0)
+        totals[a:b, 2] = payroll.sum(axis=0)
+        for col, (order, starts, _) in levels.items():
+            if len(starts):
+                by_level[col][:, a:b] = np.add.reduceat(payroll[order], starts, axis=0)
+
+    table = scenarios.reset_index(drop=True).copy()
+    for j, col in enumerate(TOTAL_COLS):
+        table[col] = np.round(totals[:, j], 2)
+    names = table["Scenario"].tolist()
+    breakdowns = {
+        col: pd.DataFrame(np.round(by_level[col], 2), index=labels, columns=names)
+        for col, (_, _, labels) in levels.items()
+    }
+    return SweepResult(table, breakdowns, chunk, time.perf_counter() - t0)
+
+
+def comparison_table(result: SweepResult) -> pd.DataFrame:
+    """
+    One table for export: a "Total" row, then every group of every breakdown
+    level, with one FY PAYROLL COST BUDGET 2026 column per scenario.
+    """
+    names = result.scenarios["Scenario"].tolist()
+    total = result.scenarios.set_index("Scenario")["FY PAYROLL COST BUDGET 2026"]
+    parts = [pd.DataFrame([["Total", "All", *total.reindex(names).tolist()]], columns=["Level", "Group", *names])]
+    for level, frame in result.breakdowns.items():
+        part = frame.reset_index()
+        part.columns = ["Group", *names]
+        part.insert(0, "Level", level)
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+def comparison_workbook(result: SweepResult) -> bytes:
+    """XLSX with the comparison table and the scenario definitions + totals."""
+    scenarios = result.scenarios.copy()
+    for col in ["effective_increase_date", "no_increase_cutoff"]:
+        scenarios[col] = pd.to_datetime(scenarios[col]).dt.date
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
+        comparison_table(result).to_excel(writer, index=False, sheet_name="Comparison")
+        scenarios.to_excel(writer, index=False, sheet_name="Scenarios")
+    return buf.getvalue()
@@ -0,0 +1,128 @@
+"""
+Persistent snapshots of preprocessed uploads.
+
+After a page has parsed and cleaned an upload (renames, date coercion, …) the
+resulting frame is written once to a local store as Arrow IPC / Feather v2
+(``esg_core.frame_io``) and memory-mapped back on every later load — across
+sessions and server restarts — so the CSV/xlsx parse and the cleaning
+heuristics run once per file. Datetime, categorical and numeric dtypes
+round-trip unchanged, so nothing is re-coerced after a snapshot hit.
+
+Snapshots are keyed by the upload's content hash plus a schema version chosen
+by the page (e.g. ``"comp_ben/1"``); bump the version whenever the cleaning
+logic changes the output. Least-recently-used snapshots are pruned once the
+store exceeds its size budget.
+
+The store directory outlives the process and its location is configurable,
+so it is created 0700 and holds Arrow files only: frames Arrow cannot store
+are not snapshotted, and nothing is ever unpickled from it.
+
+Configuration (environment, read by :func:`SnapshotStore.from_env`):
+  ESG_SNAPSHOT_DIR     store directory, default ~/.cache/esg_automation/snapshots ("" disables snapshots)
+  ESG_SNAPSHOT_MAX_MB  store budget, default 4096
+"""
+import hashlib
+import os
+import re
+import threading
+from typing import Optional
+
+import pandas as pd
+
+from esg_core.frame_io import ARROW_SUFFIX, read_frame, remove_frame, write_frame
+
+MB = 2**20
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "esg_automation", "snapshots")
+
+
+def snapshot_key(content_hash: str, schema: str, extra: str = "") -> str:
+    """File stem for one snapshot: readable schema prefix + hash of (content, schema, extra)."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", schema).strip("_") or "snapshot"
+    digest = hashlib.sha256(f"{content_hash}|{schema}|{extra}".encode()).hexdigest()
+    return f"{slug}-{digest}"
+
+
+class SnapshotStore:
+    """Directory of Arrow/Feather snapshots with an LRU size budget."""
+
+    def __init__(self, root: str = DEFAULT_DIR, max_bytes: int = 4096 * MB):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        os.makedirs(root, mode=0o700, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["SnapshotStore"]:
+        root = os.environ.get("ESG_SNAPSHOT_DIR", DEFAULT_DIR)
+        if not root:
+            return None
+        try:
+            return cls(root, max_bytes=float(os.environ.get("ESG_SNAPSHOT_MAX_MB", 4096)) * MB)
+        except OSError:
+            return None
+
+    def _path(self, key: str) -> Optional[str]:
+        path = os.path.join(self.root, key + ARROW_SUFFIX)
+        return path if os.path.exists(path) else None
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """The snapshot for ``key`` (memory-mapped read), or None."""
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            df = read_frame(path, memory_map=True, allow_pickle=False)
+        except Exception:
+            # truncated / written by an incompatible version: drop it and re-parse
+            remove_frame(path)
+            return None
+        try:
+            os.utime(path)  # mtime doubles as last-used time for pruning
+        except OSError:
+            pass
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> Optional[str]:
+        """
+        Write ``df`` as the snapshot for ``key``; returns the path, or None when
+        the disk write failed or Arrow cannot store ``df`` (it is then not snapshotted).
+        """
+        try:
+            path, _ = write_frame(df, os.path.join(self.root, key), allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        self.prune()
+        return path
+
+    def entries(self) -> pd.DataFrame:
+        """One row per snapshot: Key, Bytes, Last used."""
+        rows = []
+        for name in os.listdir(self.root):
+            stem, suffix = os.path.splitext(name)
+            if suffix != ARROW_SUFFIX:
+                continue
+            try:
+                st = os.stat(os.path.join(self.root, name))
+            except FileNotFoundError:
+                continue
+            rows.append((stem, os.path.join(self.root, name), st.st_size, pd.Timestamp(st.st_mtime, unit="s")))
+        return pd.DataFrame(rows, columns=["Key", "Path", "Bytes", "Last used"])
+
+    def total_bytes(self) -> int:
+        return int(self.entries()["Bytes"].sum())
+
+    def prune(self) -> None:
+        """Delete least-recently-used snapshots until the store fits ``max_bytes``."""
+        with self._lock:
+            entries = self.entries().sort_values("Last used")
+            excess = int(entries["Bytes"].sum()) - self.max_bytes
+            for path, size in zip(entries["Path"], entries["Bytes"]):
+                if excess <= 0:
+                    break
+                remove_frame(path)
+                excess -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.entries()["Path"]:
+                remove_frame(path)
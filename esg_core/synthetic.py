@@ -0,0 +1,410 @@
+"""
+Seeded synthetic HR data in the layouts the loaders read, for scale tests
+and benchmarks (no real payroll data leaves the company).
+
+One employee population (:func:`employees`, typed and clean) is drawn from a
+:class:`SyntheticConfig` and rendered into each export layout:
+
+  - :func:`esg_extract`: the ESG HR extract of the HR Data Analyst and
+    Comp&Ben pages (``esg_core.esg_extract``) — Greek headers, marker values
+    (ΑΝΔΡΑΣ, OPERATIONAL, ΕΥΚΑΡΠΙΑ, ΑΟΡΙΣΤΟΥ ΧΡΟΝΟΥ, … DIVISION,
+    ΕΠΑΝΑΤΙΜΟΛΟΓΗΣΗ), dd/mm/YYYY dates, decimal-comma amounts and day rates
+    for the day-rate contracts; written as ISO-8859-7 ``;`` CSV;
+  - :func:`manpower_main` / :func:`manpower_contributions`: the MAIN and
+    CONTRIBUTIONS files of the Manpower page (``esg_core.manpower``) —
+    "Κωδικός Κράτησης" in its various spellings, "Είναι το κύριο Κ.Κ." with
+    extra rows for secondary cost centers, meal cards, grades like "0,1";
+  - :func:`ld_training`: the L&D training file of the OD page (one row per
+    completed training of an employee).
+
+``dirty_rate`` is the share of cells replaced by the junk the loaders have to
+survive (blank / impossible dates, unparsable salaries, padded IDs, missing
+org values). The same config and seed always give the same files.
+
+``python -m esg_core.synthetic OUT_DIR --rows 100000`` writes a full set (see
+:func:`write_dataset`), including one MAIN file per company for
+``python -m esg_core.batch``.
+"""
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from esg_core.batch import safe_filename
+from esg_core.currency import DEFAULT_RATES
+from esg_core.manpower import OVERRIDE_CODES
+from esg_core.salary import DAY_RATE_CONTRACTS
+
+# company → country; non-EUR companies are paid in their DEFAULT_RATES currency
+COMPANY_COUNTRIES = {
+    "ALUMIL ALUMINIUM INDUSTRY S.A.": "Greece",
+    "ALUMIL YU INDUSTRY SA": "Serbia",
+    "ALUMIL ROM INDUSTRY SA": "Romania",
+    "ALUMIL ALBANIA Sh.P.K": "Albania",
+    "ALPRO VLASENICA A.D.": "Bosnia and Herzegovina",
+    "ALUMIL MISR FOR TRADING S.A.E.": "Egypt",
+    "ALUMIL MIDDLE EAST JLT": "United Arab Emirates",
+}
+# company codes ("Εταιρία"); 101 is the Greek parent the HR page classifies roles for
+COMPANY_CODES = {company: code for company, code in zip(COMPANY_COUNTRIES, [101, 201, 301, 401, 501, 601, 701])}
+DIVISIONS = ["PRODUCTION DIVISION", "SALES DIVISION", "FINANCE DIVISION", "SUPPLY CHAIN DIVISION", "HR DIVISION"]
+DEPARTMENTS = ["ΕΠΑΝΑΤΙΜΟΛΟΓΗΣΗ", "ΛΟΓΙΣΤΗΡΙΟ", "ΠΑΡΑΓΩΓΗ", "ΑΠΟΘΗΚΗ", "ΠΩΛΗΣΕΙΣ", "ΜΙΣΘΟΔΟΣΙΑ"]
+CITIES = ["ΕΥΚΑΡΠΙΑ", "ΚΙΛΚΙΣ", "ΘΕΣΣΑΛΟΝΙΚΗ", "ΑΘΗΝΑ", "ΣΕΡΡΕΣ"]
+SURNAMES = ["ΠΑΠΑΔΟΠΟΥΛΟΣ", "ΓΕΩΡΓΙΟΥ", "ΝΙΚΟΛΑΟΥ", "ΙΩΑΝΝΙΔΗΣ", "ΑΝΤΩΝΙΟΥ", "ΔΗΜΗΤΡΙΟΥ", "ΚΩΝΣΤΑΝΤΙΝΙΔΗΣ"]
+NAMES = ["ΓΕΩΡΓΙΟΣ", "ΜΑΡΙΑ", "ΙΩΑΝΝΗΣ", "ΕΛΕΝΗ", "ΚΩΝΣΤΑΝΤΙΝΟΣ", "ΑΙΚΑΤΕΡΙΝΗ", "ΔΗΜΗΤΡΙΟΣ"]
+OFFICE_CONTRACT = "ΥΠΑΛΛΗΛΟΙ"
+TRAININGS = ["HEALTH & SAFETY", "LEADERSHIP", "EXCEL ADVANCED", "ISO 9001", "GDPR", "FORKLIFT LICENSE"]
+
+MALE, FEMALE = "ΑΝΔΡΑΣ", "ΓΥΝΑΙΚΑ"
+CSV_ENCODING = "iso-8859-7"
+# data rows an .xlsx sheet can hold
+MAX_XLSX_ROWS = 1_048_575
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """Size and shape of a synthetic dataset (rates are fractions of rows / cells)."""
+    rows: int = 10_000
+    companies: Tuple[str, ...] = tuple(COMPANY_COUNTRIES)
+    seed: int = 0
+    hire_start: str = "2000-01-01"
+    # last day of the data: no hire or departure after it
+    as_of: str = "2025-09-30"
+    departure_rate: float = 0.3
+    dirty_rate: float = 0.01
+    # Manpower MAIN rows repeated for a secondary cost center (Είναι το κύριο Κ.Κ. = 0)
+    secondary_cc_rate: float = 0.05
+    # mean completed trainings per employee in the L&D file
+    trainings_per_employee: float = 3.0
+
+    def rng(self, stream: int) -> np.random.Generator:
+        """Independent generator per layout, so adding one layout does not shift the others."""
+        return np.random.default_rng([self.seed, stream])
+
+
+def _dates(rng: np.random.Generator, start, end, n: int) -> pd.Series:
+    lo, hi = pd.Timestamp(start).value // 86_400_000_000_000, pd.Timestamp(end).value // 86_400_000_000_000
+    return pd.Series(pd.to_datetime(rng.integers(lo, hi + 1, n), unit="D"))
+
+
+def _text_dates(dates: pd.Series) -> pd.Series:
+    """dd/mm/YYYY text ("" for NaT); each distinct date is formatted once."""
+    codes, uniques = pd.factorize(dates)
+    text = np.append(np.asarray(uniques.strftime("%d/%m/%Y"), dtype=object), "")
+    return pd.Series(text[codes], index=dates.index)
+
+
+_CENTS = np.array([f",{i:02d}" for i in range(100)])
+_THREE_DIGITS = np.array([f"{i:03d}" for i in range(1000)])
+
+
+def _decimal_comma(values: pd.Series, rng: np.random.Generator) -> pd.Series:
+    """Amounts as text, "1234,56" or "1.234,56" at random (both spellings occur in the exports)."""
+    cents = np.round(values.to_numpy(dtype=float) * 100).astype(np.int64)
+    whole, decimals = cents // 100, _CENTS[cents % 100]
+    plain = np.char.add(whole.astype(str), decimals)
+    grouped = np.char.add(np.char.add((whole // 1000).astype(str), "."), np.char.add(_THREE_DIGITS[whole % 1000], decimals))
+    thousands = (whole >= 1000) & (rng.random(len(whole)) < 0.5)
+    return pd.Series(np.where(thousands, grouped, plain).astype(object), index=values.index)
+
+
+def _dirty(series: pd.Series, rng: np.random.Generator, rate: float, junk: Sequence) -> pd.Series:
+    """``series`` with a ``rate`` share of its cells replaced by values from ``junk``."""
+    hit = rng.random(len(series)) < rate
+    if not hit.any():
+        return series
+    out = series.astype(object).copy()
+    out[hit] = np.asarray(junk, dtype=object)[rng.integers(0, len(junk), int(hit.sum()))]
+    return out
+
+
+def employees(config: SyntheticConfig) -> pd.DataFrame:
+    """The clean, typed population every layout is rendered from (one row per employee)."""
+    rng = config.rng(0)
+    n = config.rows
+    as_of = pd.Timestamp(config.as_of)
+
+    company = rng.choice(np.asarray(config.companies, dtype=object), n)
+    operational = rng.random(n) < 0.6
+    # grades: 0.1 for trainees, 1-12 on the shop floor, 5-23 in the offices
+    grade = np.where(operational, rng.integers(1, 13, n), rng.integers(5, 24, n)).astype(float)
+    grade[rng.random(n) < 0.02] = 0.1
+
+    title = np.select(
+        [grade == 0.1, grade >= 20, grade > 16, operational],
+        [
+            "TRAINEE",
+            rng.choice(["DIRECTOR", "HEAD OF OPERATIONS", "CEO"], n, p=[0.6, 0.38, 0.02]),
+            rng.choice(["MANAGER", "SUPERVISOR", "TEAM LEAD", "SALES EXECUTIVE"], n),
+            rng.choice(["ΕΡΓΑΤΗΣ", "ΧΕΙΡΙΣΤΗΣ ΜΗΧΑΝΗΜΑΤΩΝ", "ΑΠΟΘΗΚΑΡΙΟΣ"], n),
+        ],
+        default=rng.choice(["ΥΠΑΛΛΗΛΟΣ", "HR DATA ANALYST", "ACCOUNTANT", "COMMERCIAL UNIT DEVELOPER"], n),
+    )
+    contract = np.where(operational, rng.choice(sorted(DAY_RATE_CONTRACTS), n), OFFICE_CONTRACT)
+
+    # monthly EUR grows with the grade; paid in the company's currency
+    monthly_eur = (850 + 140 * grade) * rng.lognormal(0, 0.15, n)
+    eur_rate = pd.Series(company).map(DEFAULT_RATES).fillna(1.0).to_numpy()
+    monthly = monthly_eur / eur_rate
+
+    hire = _dates(rng, config.hire_start, as_of, n)
+    birth = hire - pd.to_timedelta(rng.integers(20 * 365, 55 * 365, n), unit="D")
+    leaves = rng.random(n) < config.departure_rate
+    departure = hire + pd.to_timedelta(rng.integers(30, 15 * 365, n), unit="D")
+    departure = departure.where(leaves & (departure <= as_of))
+    age_at_departure = (departure - birth).dt.days / 365.25
+    reason = np.where(
+        departure.isna(), "",
+        np.where(age_at_departure >= 60, "RETIREMENT",
+                 rng.choice(["VOLUNTARY DEPARTURE", "INVOLUNTARY DEPARTURE"], n, p=[0.7, 0.3])),
+    )
+    # gross earnings of the last year, 14 salaries pro rata to the months worked
+    year_start = as_of - pd.DateOffset(years=1)
+    worked = (departure.fillna(as_of).clip(upper=as_of) - hire.clip(lower=year_start)).dt.days.clip(lower=0) / 365.25
+
+    return pd.DataFrame({
+        "id": rng.permutation(n) + 10_000,
+        "company": company,
+        "country": pd.Series(company).map(COMPANY_COUNTRIES).fillna("Greece").to_numpy(),
+        # companies outside COMPANY_CODES get 901, 902, … in config order
+        "company_code": pd.Series(company).map(
+            {**{c: 901 + i for i, c in enumerate(config.companies)}, **COMPANY_CODES}
+        ).to_numpy(),
+        "surname": rng.choice(SURNAMES, n),
+        "name": rng.choice(NAMES, n),
+        "gender": rng.choice([MALE, FEMALE], n, p=[0.65, 0.35]),
+        "job_property": np.where(operational, "OPERATIONAL", "ADMINISTRATIVE"),
+        "city": rng.choice(CITIES, n),
+        "permanent": rng.random(n) < 0.85,
+        "division": rng.choice(DIVISIONS, n),
+        "department": rng.choice(DEPARTMENTS, n),
+        "title": title,
+        "grade": grade,
+        "contract": contract,
+        "monthly": monthly,
+        # day-rate contracts are exported as the day rate
+        "salary": np.where(np.isin(contract, list(DAY_RATE_CONTRACTS)), monthly / 26, monthly),
+        "gross": monthly * 14 * np.minimum(worked.to_numpy(), 1.0),
+        "birth": birth,
+        "hire": hire,
+        "departure": departure,
+        "reason": reason,
+        "cost_center": rng.integers(100, 130, n),
+        "booking_code": np.where(rng.random(n) < 0.1, rng.choice(sorted(OVERRIDE_CODES), n),
+                                 rng.integers(41000, 49999, n).astype(str)),
+        "meal_card": rng.choice([0, 3, 4], n, p=[0.5, 0.3, 0.2]),
+    })
+
+
+def esg_extract(config: SyntheticConfig, people: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """The ESG HR extract (all text, as exported; see the module docstring)."""
+    people = employees(config) if people is None else people
+    rng, rate = config.rng(1), config.dirty_rate
+    n = len(people)
+    # subsidiaries export the contract type in English
+    greek = people["company"].eq("ALUMIL ALUMINIUM INDUSTRY S.A.").to_numpy()
+    contract_type = np.where(
+        people["permanent"],
+        np.where(greek, "ΑΟΡΙΣΤΟΥ ΧΡΟΝΟΥ", "PERMANENT"),
+        np.where(greek, "ΟΡΙΣΜΕΝΟΥ ΧΡΟΝΟΥ", "TEMPORARY"),
+    )
+    ids = people["id"].astype(str)
+    padded = rng.random(n) < rate
+    return pd.DataFrame({
+        "Κωδικός εργαζόμενου": ids.mask(padded, " " + ids + " "),
+        "Επώνυμο": people["surname"],
+        "Ονομα": people["name"],
+        "Εταιρία": people["company_code"],
+        "Περιγραφή εταιρίας": people["company"],
+        "Φύλο": people["gender"],
+        "Ιδιότητα": people["job_property"],
+        "Πόλη κατοικίας": people["city"],
+        "Τύπος σύμβασης": contract_type,
+        "Div": people["division"],
+        "Τμήμα": _dirty(people["department"], rng, rate, [None]),
+        "Περιγραφή Θέσης Εργασίας": people["title"],
+        "GRADE": people["grade"].map("{:g}".format).str.replace(".", ",", regex=False),
+        "Περιγραφή Σύμβασης": people["contract"],
+        "Ονομαστικός μισθός": _dirty(_decimal_comma(people["salary"], rng), rng, rate, ["", "-", "N/A"]),
+        "ΜΙΚΤΕΣ ΑΠΟΔ": _dirty(_decimal_comma(people["gross"], rng), rng, rate, ["", "0,00"]),
+        "Ημ/νία γέννησης": _text_dates(people["birth"]),
+        "Ημ/νία πρόσληψης": _dirty(_text_dates(people["hire"]), rng, rate, ["", "31/02/2020", "00/00/0000"]),
+        "Ημ/νία αποχώρησης": _dirty(_text_dates(people["departure"]), rng, rate, ["31/02/2020", "-"]),
+        "Περιγραφή Αιτ. Αποχώρησης": people["reason"],
+    })
+
+
+def _booking_code_text(codes: pd.Series, rng: np.random.Generator) -> pd.Series:
+    """Booking codes in the spellings found in MAIN files ('40602', '40,602', '40602,0', 'Κωδ: 40602', …)."""
+    style = rng.integers(0, 5, len(codes))
+    return pd.Series(np.select(
+        [style == 1, style == 2, style == 3, style == 4],
+        [codes.str[:2] + "," + codes.str[2:], codes + ",0", codes.str[:2] + "." + codes.str[2:] + ",0", "Κωδ: " + codes],
+        default=codes,
+    ), index=codes.index)
+
+
+def manpower_main(config: SyntheticConfig, people: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """The Manpower MAIN file (see the module docstring); secondary cost centers follow their primary row."""
+    people = employees(config) if people is None else people
+    rng, rate = config.rng(2), config.dirty_rate
+    n = len(people)
+
+    # one extra row per employee with a secondary cost center
+    secondary = np.flatnonzero(rng.random(n) < config.secondary_cc_rate)
+    order = np.sort(np.r_[np.arange(n), secondary], kind="stable")
+    primary = np.r_[True, order[1:] != order[:-1]]
+    rows = people.iloc[order].reset_index(drop=True)
+    m = len(rows)
+
+    cost_center = rows["cost_center"].where(primary, rows["cost_center"] + 100)
+    # the primary flag as a number or as text, as the exports spell it
+    flag = pd.Series(rng.choice(np.array([1, "1"], dtype=object), m)).where(primary, 0)
+    return pd.DataFrame({
+        "Κωδικός εργαζομένου": rows["id"].astype(str),
+        "Εταιρία": rows["company_code"],
+        "Περιγραφή εταιρίας": rows["company"],
+        "Επώνυμο": rows["surname"],
+        "Ονομα": rows["name"],
+        "Div": rows["division"],
+        "Τμήμα": _dirty(rows["department"], rng, rate, [None]),
+        "Περιγραφή Θέσης Εργασίας": rows["title"],
+        "Ιδιότητα": rows["job_property"],
+        "GRADE": _dirty(rows["grade"].map("{:g}".format).str.replace(".", ",", regex=False), rng, rate, ["", "-"]),
+        "Περιγραφή Σύμβασης": rows["contract"],
+        "Ημ/νία πρόσληψης": _text_dates(rows["hire"]),
+        "Ημ/νία αποχώρησης": _dirty(_text_dates(rows["departure"]), rng, rate, ["31/02/2020", "-"]),
+        "Είναι το κύριο Κ.Κ.": flag,
+        "Κέντρο Κόστους": cost_center,
+        "Περιγραφή Κέντρου Κόστους": "CC " + cost_center.astype(str),
+        "Ονομαστικός μισθός": _dirty(_decimal_comma(rows["salary"], rng), rng, rate, ["", "-"]),
+        "ΚΑΡΤΑ ΣΙΤΙΣΗΣ": rows["meal_card"],
+        "Κωδικός Κράτησης": _dirty(_booking_code_text(rows["booking_code"], rng), rng, rate, ["", None]),
+    })
+
+
+def manpower_contributions(config: SyntheticConfig, people: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """The CONTRIBUTIONS file: employer rate per employee ('Αριθμός μητρώου', 'Contributions' as "0,2229")."""
+    people = employees(config) if people is None else people
+    rng = config.rng(3)
+    rate = rng.choice([0.2229, 0.2179, 0.1879, 0.2479], len(people), p=[0.6, 0.2, 0.1, 0.1])
+    return pd.DataFrame({
+        "Αριθμός μητρώου": people["id"].astype(str),
+        "Contributions": pd.Series(rate).map("{:.4f}".format).str.replace(".", ",", regex=False),
+    })
+
+
+def ld_training(config: SyntheticConfig, people: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """The L&D file of the OD page: one row per completed training (Poisson count per employee)."""
+    people = employees(config) if people is None else people
+    rng, rate = config.rng(4), config.dirty_rate
+    per_employee = rng.poisson(config.trainings_per_employee, len(people))
+    rows = people.iloc[np.repeat(np.arange(len(people)), per_employee)].reset_index(drop=True)
+    m = len(rows)
+
+    # completed while employed (and by as_of)
+    end = rows["departure"].fillna(pd.Timestamp(config.as_of))
+    span = (end - rows["hire"]).dt.days.clip(lower=0).to_numpy()
+    completed = rows["hire"] + pd.to_timedelta((rng.random(m) * span).astype(np.int64), unit="D")
+    hours = rng.choice([2, 4, 8, 16, 24, 40], m, p=[0.25, 0.3, 0.25, 0.1, 0.05, 0.05]).astype(float)
+    gender = rows["gender"].map({MALE: "Male", FEMALE: "Female"})
+    job_property = rows["job_property"].map({"OPERATIONAL": "Blue Collar", "ADMINISTRATIVE": "White Collar"})
+
+    return pd.DataFrame({
+        "Country": rows["country"],
+        "Company": rows["company"],
+        "Year": completed.dt.year,
+        "Division": _dirty(rows["division"], rng, rate, [None]),
+        "Department": rows["department"],
+        "Job Property": rows["job_property"],
+        "Job Property2": job_property,
+        "Status": np.where(rows["departure"].isna(), "Active", "Inactive"),
+        "Gender2": gender,
+        "Training Title": rng.choice(TRAININGS, m),
+        "Duration in Hours": hours,
+        "Cost (€)": np.round(hours * rng.uniform(8, 40, m), 2),
+        "Trainee ID": rows["id"],
+        "Completion Date": _dirty(completed.astype(object), rng, rate, ["", "TBD"]),
+    })
+
+
+def write_csv(df: pd.DataFrame, path) -> Path:
+    """``df`` as an ISO-8859-7, ``;``-delimited CSV (the ESG extract format)."""
+    df.to_csv(path, sep=";", index=False, encoding=CSV_ENCODING)
+    return Path(path)
+
+
+def write_xlsx(df: pd.DataFrame, path, sheet_name: str = "Sheet1") -> Path:
+    """``df`` as one .xlsx sheet (slow: about 70k cells/s; CSV is much faster where the loader takes it)."""
+    if len(df) > MAX_XLSX_ROWS:
+        raise ValueError(f"{len(df):,} rows do not fit in one .xlsx sheet ({MAX_XLSX_ROWS:,}); write a CSV instead.")
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+    return Path(path)
+
+
+def write_dataset(out_dir, config: SyntheticConfig, main_format: str = "xlsx") -> Dict[str, Path]:
+    """
+    Every layout of one population under ``out_dir``: ``esg_extract.csv``,
+    ``manpower/<company>.<main_format>`` (one MAIN file per company, the
+    input folder of ``esg_core.batch``), ``contributions.<main_format>`` and
+    ``ld_training.xlsx``. Returns the paths by layout (MAIN files by company).
+    """
+    people = employees(config)
+    main = manpower_main(config, people)
+    contributions = manpower_contributions(config, people)
+    training = ld_training(config, people)
+    # fail before writing anything
+    for name, df, fmt in [("MAIN", main, main_format), ("CONTRIBUTIONS", contributions, main_format), ("L&D", training, "xlsx")]:
+        if fmt == "xlsx" and len(df) > MAX_XLSX_ROWS:
+            raise ValueError(f"the {name} file would have {len(df):,} rows, more than one .xlsx sheet holds ({MAX_XLSX_ROWS:,}).")
+
+    out = Path(out_dir)
+    (out / "manpower").mkdir(parents=True, exist_ok=True)
+    write = write_csv if main_format == "csv" else write_xlsx
+    paths = {"esg_extract": write_csv(esg_extract(config, people), out / "esg_extract.csv")}
+    for company, rows in main.groupby("Περιγραφή εταιρίας", sort=True):
+        paths[company] = write(rows, out / "manpower" / f"{safe_filename(company)}.{main_format}")
+    paths["contributions"] = write(contributions, out / f"contributions.{main_format}")
+    paths["ld_training"] = write_xlsx(training, out / "ld_training.xlsx")
+    return paths
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    defaults = SyntheticConfig()
+    parser = argparse.ArgumentParser(prog="python -m esg_core.synthetic", description="Write a synthetic HR dataset.")
+    parser.add_argument("out", help="output folder")
+    parser.add_argument("--rows", type=int, default=defaults.rows, help="employees (default: %(default)s)")
+    parser.add_argument("--companies", nargs="+", default=list(defaults.companies), help="company names")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--hire-start", default=defaults.hire_start, help="earliest hire date (default: %(default)s)")
+    parser.add_argument("--as-of", default=defaults.as_of, help="last day of the data (default: %(default)s)")
+    parser.add_argument("--departure-rate", type=float, default=defaults.departure_rate)
+    parser.add_argument("--dirty-rate", type=float, default=defaults.dirty_rate)
+    parser.add_argument("--trainings", type=float, default=defaults.trainings_per_employee,
+                        help="mean trainings per employee in the L&D file (default: %(default)s)")
+    parser.add_argument("--main-format", choices=["xlsx", "csv"], default="xlsx",
+                        help="MAIN / CONTRIBUTIONS file format (csv for more rows than a sheet holds)")
+    args = parser.parse_args(argv)
+
+    config = SyntheticConfig(
+        rows=args.rows, companies=tuple(args.companies), seed=args.seed, hire_start=args.hire_start,
+        as_of=args.as_of, departure_rate=args.departure_rate, dirty_rate=args.dirty_rate,
+        trainings_per_employee=args.trainings,
+    )
+    try:
+        paths = write_dataset(args.out, config, main_format=args.main_format)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    for path in paths.values():
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
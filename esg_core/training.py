@@ -0,0 +1,52 @@
+"""
+Training (L&D) table of the OD page, without Streamlit.
+
+The L&D export is one Excel sheet with one row per completed training.
+``prepare_training`` turns it into the frame the OD page filters and groups:
+
+  - "Completion Date" parsed as a date; rows without a valid one are dropped;
+  - "Year" as text, so the year filter compares labels;
+  - filter / grouping dimensions and the trainee ID stored as ``category``
+    (``esg_core.dtypes``; group on them with ``observed=True``).
+"""
+from typing import List
+
+import pandas as pd
+
+from esg_core.dtypes import compact_frame
+
+TRAINEE_ID = "Trainee ID"
+COMPLETION_DATE = "Completion Date"
+
+REQUIRED_COLUMNS = [
+    "Country", "Company", "Year", "Division", "Department",
+    "Job Property", "Status", "Duration in Hours", "Cost (€)", TRAINEE_ID, COMPLETION_DATE,
+]
+# Filter / grouping dimensions, kept as categories
+CATEGORY_COLUMNS = [
+    "Country", "Company", "Year", "Division", "Department",
+    "Job Property", "Job Property2", "Status", "Gender2",
+]
+
+
+def missing_columns(df: pd.DataFrame) -> List[str]:
+    """The REQUIRED_COLUMNS that ``df`` lacks, in order."""
+    return [col for col in REQUIRED_COLUMNS if col not in df.columns]
+
+
+def prepare_training(df: pd.DataFrame) -> pd.DataFrame:
+    """Clean one L&D sheet that has every required column (see the module docstring)."""
+    df = df.copy()
+    df[COMPLETION_DATE] = pd.to_datetime(df[COMPLETION_DATE], errors="coerce")
+    df = df.dropna(subset=[COMPLETION_DATE])
+    df["Year"] = df["Year"].astype(str)
+    return compact_frame(df, categories=CATEGORY_COLUMNS, ids=[TRAINEE_ID])
+
+
+def read_training(source) -> pd.DataFrame:
+    """Read and clean an L&D workbook; ValueError when a required column is missing."""
+    df = pd.read_excel(source)
+    missing = missing_columns(df)
+    if missing:
+        raise ValueError(f"The following required columns are missing: {', '.join(missing)}")
+    return prepare_training(df)
@@ -0,0 +1,95 @@
+"""
+Vectorized Excel-style date arithmetic (YEARFRAC, EOMONTH, ROUNDUP).
+
+Every function accepts scalars (Timestamp / date / NaT) or whole columns
+(Series, DatetimeIndex, datetime64 arrays) and works on ``datetime64[D]``
+arrays internally. NaT never raises: it is carried as a mask and comes back
+as NaN (fractions) or NaT (dates). Scalar inputs return scalars.
+"""
+import numpy as np
+import pandas as pd
+
+_EPOCH = np.datetime64(0, "D")
+
+
+def _out(arr):
+    """Return a NumPy scalar for 0-d results, the array otherwise."""
+    return arr[()] if isinstance(arr, np.ndarray) and arr.ndim == 0 else arr
+
+
+def as_days(values) -> np.ndarray:
+    """Coerce dates (scalar or column) to a ``datetime64[D]`` array; invalid → NaT."""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+        return values.astype("datetime64[D]")
+    converted = pd.to_datetime(values, errors="coerce")
+    if converted is pd.NaT:
+        return np.array("NaT", dtype="datetime64[D]")
+    if isinstance(converted, pd.Timestamp):
+        return np.array(converted.to_datetime64()).astype("datetime64[D]")
+    # keep the parsed unit (pandas ≥ 2 may give [s]/[us]) so far-future placeholders like 9999-12-31 don't overflow [ns]
+    return np.asarray(converted).astype("datetime64[D]")
+
+
+def ymd(days: np.ndarray):
+    """
+    Split a ``datetime64[D]`` array into (year, month, day) int64 arrays.
+    NaT positions are decomposed as 1970-01-01; mask them with ``np.isnat``.
+    """
+    days = np.where(np.isnat(days), _EPOCH, days)
+    months = days.astype("datetime64[M]")
+    years = days.astype("datetime64[Y]")
+    y = years.astype(np.int64) + 1970
+    m = (months - years).astype(np.int64) + 1
+    d = (days - months).astype(np.int64) + 1
+    return y, m, d
+
+
+def yearfrac_30360_us(start, end):
+    """Excel YEARFRAC(start, end, 0): US (NASD) 30/360. NaN where either date is NaT."""
+    s = as_days(start)
+    e = as_days(end)
+    y1, m1, d1 = ymd(s)
+    y2, m2, d2 = ymd(e)
+    # US (NASD) 30/360 rules
+    d1 = np.where(d1 == 31, 30, d1)
+    d2 = np.where((d2 == 31) & (d1 == 30), 30, d2)
+    frac = ((360 * (y2 - y1)) + (30 * (m2 - m1)) + (d2 - d1)) / 360.0
+    return _out(np.where(np.isnat(s) | np.isnat(e), np.nan, frac))
+
+
+def yearfrac_act365(start, end):
+    """Excel YEARFRAC(start, end, 3): actual days / 365. NaN where either date is NaT."""
+    s = as_days(start)
+    e = as_days(end)
+    days = (e - s).astype("timedelta64[D]")
+    frac = np.where(np.isnat(days), np.nan, days.astype(np.float64)) / 365.0
+    return _out(frac)
+
+
+def eomonth(dates, months: int = 0):
+    """Excel EOMONTH(dates, months): last day of the month after the offset (NaT stays NaT)."""
+    d = as_days(dates)
+    first_of_next = d.astype("datetime64[M]") + (months + 1)
+    return _out(first_of_next.astype("datetime64[D]") - 1)
+
+
+def roundup(x, decimals: int = 1):
+    """Excel ROUNDUP(x, decimals) as implemented by the budget sheets: ceil at N decimals."""
+    factor = 10 ** decimals
+    return _out(np.ceil(np.asarray(x, dtype=np.float64) * factor) / factor)
+
+
+def clip_dates(dates, lower=None, upper=None, fill=None) -> np.ndarray:
+    """
+    MAX(dates, lower) / MIN(dates, upper) on ``datetime64[D]`` arrays.
+    NaT entries are replaced by ``fill`` first (left as NaT when ``fill`` is None).
+    """
+    d = as_days(dates)
+    if fill is not None:
+        d = np.where(np.isnat(d), as_days(fill), d)
+    nat = np.isnat(d)
+    if lower is not None:
+        d = np.where(nat, d, np.maximum(d, as_days(lower)))
+    if upper is not None:
+        d = np.where(nat, d, np.minimum(d, as_days(upper)))
+    return d
@@ -0,0 +1,7 @@
+"""
+Streamlit glue shared by the pages in ``views/``.
+
+Process-wide singletons (``st.cache_resource``) and small reusable panels live
+here; the computations they wrap stay in ``esg_core``, which never imports
+Streamlit.
+"""
@@ -0,0 +1,47 @@
+"""
+Exchange-rate inputs shared by the pages.
+
+The base :class:`esg_core.currency.RateTable` (ESG_FX_RATES_FILE, or the
+built-in defaults) is loaded once per server process; a dated table uploaded
+in the sidebar goes through the shared upload cache.
+"""
+from typing import Optional, Sequence
+
+import streamlit as st
+
+from esg_core.currency import RateTable, read_rate_table
+from esg_ui.ingest import cached_read
+
+
+@st.cache_resource
+def base_rate_table() -> RateTable:
+    return RateTable.from_env()
+
+
+def exchange_rate_inputs(companies: Optional[Sequence[str]] = None, container=st.sidebar, key: str = "fx") -> RateTable:
+    """
+    "💱 Set Exchange Rates" expander: an optional dated rate table upload plus
+    one input per company for its current rate. Returns the resulting table.
+    """
+    table = base_rate_table()
+    with container.expander("💱 Set Exchange Rates"):
+        uploaded = st.file_uploader(
+            "Dated rate table (optional)", type=["csv", "xlsx"], key=f"{key}_table",
+            help="Columns: Company, Rate (EUR per unit of local currency), optionally Currency and Valid From.",
+        )
+        if uploaded is not None:
+            try:
+                table = RateTable(cached_read(uploaded, read_rate_table))
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                st.caption(f"{len(table):,} rate periods loaded; the inputs below set each company's latest rate.")
+
+        latest = table.latest()
+        rates = {}
+        for company in (table.companies if companies is None else companies):
+            rates[company] = st.number_input(
+                f"{company}", min_value=0.0, format="%.4f", step=0.0001,
+                value=float(latest.get(company, 1.0)),
+            )
+    return table.with_latest(rates)
@@ -0,0 +1,46 @@
+"""
+The ESG HR extract shared by the HR Data Analyst and Comp&Ben pages.
+
+One upload (on either page) is parsed once through the upload cache and kept
+once per session under ``SESSION_KEY``; both pages read that frame and only
+add their own derived columns to shallow copies of it.
+"""
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from esg_core.esg_extract import read_esg_extract
+from esg_ui.ingest import cached_read
+
+# Bump when esg_core.esg_extract changes its output (invalidates stored snapshots)
+SNAPSHOT_SCHEMA = "esg_extract/3"
+
+SESSION_KEY = "esg_extract_df"
+NAME_KEY = "esg_extract_name"
+FILE_ID_KEY = "esg_extract_file_id"
+
+
+def load_esg_extract(uploaded_file) -> pd.DataFrame:
+    return cached_read(uploaded_file, read_esg_extract, schema=SNAPSHOT_SCHEMA)
+
+
+def esg_extract_uploader(label: str = "Choose a CSV file", key: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    File uploader for the extract. A new upload replaces the session's
+    extract; without one the extract loaded on either page is returned (or None).
+    Treat the result as read-only.
+    """
+    uploaded_file = st.file_uploader(label, type="csv", key=key)
+    if uploaded_file is not None:
+        file_id = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+        if st.session_state.get(FILE_ID_KEY) != file_id or SESSION_KEY not in st.session_state:
+            st.session_state[SESSION_KEY] = load_esg_extract(uploaded_file)
+            st.session_state[NAME_KEY] = uploaded_file.name
+            st.session_state[FILE_ID_KEY] = file_id
+    return st.session_state.get(SESSION_KEY)
+
+
+def esg_extract_name(default: str = "") -> str:
+    """File name of the session's extract."""
+    return st.session_state.get(NAME_KEY, default)
@@ -0,0 +1,83 @@
+"""
+Per-dataset indexes shared across reruns and sessions.
+
+Indexes are built once per column contents (``st.cache_resource``, keyed on a
+content hash of the columns they read) and reused by every widget change that
+only moves a date or a filter.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from esg_core.cube import Cube
+from esg_core.dag import param_token
+from esg_core.facets import FacetIndex
+from esg_core.filters import FilterIndex
+from esg_core.headcount import ActiveIndex
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _active_index(token: str, roles: tuple, _hire, _departure, _groups) -> ActiveIndex:
+    # the columns are not hashed: token identifies their contents
+    return ActiveIndex(_hire, _departure, _groups)
+
+
+def active_index(df: pd.DataFrame, hire_col: Optional[str], departure_col: str, group_col: Optional[str] = None) -> ActiveIndex:
+    """:class:`ActiveIndex` over ``df``'s rows, rebuilt only when the date/group columns change."""
+    cols = [c for c in (hire_col, departure_col, group_col) if c is not None]
+    return _active_index(
+        param_token(df[cols]),
+        (hire_col, departure_col, group_col),
+        None if hire_col is None else df[hire_col],
+        df[departure_col],
+        None if group_col is None else df[group_col],
+    )
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _filter_index(token: str, columns: tuple, as_text: bool, dropna: bool, _frame) -> FilterIndex:
+    return FilterIndex.from_frame(_frame, columns, as_text=as_text, dropna=dropna)
+
+
+def filter_index(df: pd.DataFrame, columns: Sequence[str], as_text: bool = False, dropna: bool = True) -> FilterIndex:
+    """:class:`FilterIndex` over ``df``'s filter ``columns`` (missing ones skipped), rebuilt only when they change."""
+    cols = tuple(c for c in columns if c in df.columns)
+    return _filter_index(param_token(df[list(cols)]), cols, as_text, dropna, df[list(cols)])
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _facet_index(token: str, columns: tuple, distinct_col, as_text: bool, _frame) -> FacetIndex:
+    return FacetIndex.from_frame(_frame, columns, distinct_col, as_text=as_text)
+
+
+def facet_index(df: pd.DataFrame, columns: Sequence[str], distinct_col: Optional[str] = None, as_text: bool = False) -> FacetIndex:
+    """:class:`FacetIndex` over ``df``'s filter ``columns`` (+ ``distinct_col``), rebuilt only when they change."""
+    cols = tuple(c for c in columns if c in df.columns)
+    read = list(cols) + ([distinct_col] if distinct_col is not None else [])
+    return _facet_index(param_token(df[read]), cols, distinct_col, as_text, df[read])
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _olap_cube(token: str, dims: tuple, measures: tuple, distinct_col, as_text: bool, _frame, _rows) -> Cube:
+    frame = _frame if _rows is None else _frame[_rows]
+    return Cube.from_frame(frame, dims, measures, distinct_col, as_text=as_text)
+
+
+def olap_cube(
+    df: pd.DataFrame,
+    dims: Sequence[str],
+    measures: Sequence[str],
+    distinct_col: Optional[str] = None,
+    as_text: bool = False,
+    rows: Optional[np.ndarray] = None,
+) -> Cube:
+    """:class:`Cube` over ``df`` (only the ``rows`` mask when given), rebuilt only when its columns or ``rows`` change."""
+    dims = tuple(c for c in dims if c in df.columns)
+    read = [*dims, *measures] + ([distinct_col] if distinct_col is not None else [])
+    token = param_token(df[read])
+    if rows is not None:
+        rows = np.asarray(rows, dtype=bool)
+        token = param_token((token, param_token(rows)))
+    return _olap_cube(token, dims, tuple(measures), distinct_col, as_text, df[read], rows)
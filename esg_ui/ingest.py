@@ -0,0 +1,82 @@
+"""
+Uploaded-file parsing through the shared :class:`esg_core.ingest_cache.IngestCache`.
+
+One cache per server process (``st.cache_resource``), so every page and every
+session hits the same entries when the same file is uploaded again. The sidebar
+panels here report on the cache and on the memory of the loaded frames.
+"""
+import streamlit as st
+
+from esg_core.dtypes import memory_report
+from esg_core.ingest_cache import IngestCache
+from esg_core.profiling import stage
+
+
+@st.cache_resource
+def ingest_cache() -> IngestCache:
+    return IngestCache.from_env()
+
+
+def cached_read(uploaded_file, loader, schema=None, **options):
+    """
+    ``loader(file_like, **options)`` keyed on the uploaded bytes + loader + options.
+    The loader receives a fresh in-memory file with the upload's ``name``.
+    Pass a ``schema`` version to keep the result as a persistent snapshot
+    (bump it whenever the loader's output changes).
+    """
+    data = uploaded_file.getvalue()
+    name = getattr(uploaded_file, "name", "")
+    with stage(f"read upload: {name or 'file'}") as timed:
+        return timed.out(ingest_cache().load(data, loader, name=name, schema=schema, **options))
+
+
+def _fmt_bytes(n: int) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024 or unit == "GB":
+            return f"{n:,.0f} {unit}" if unit == "B" else f"{n:,.1f} {unit}"
+        n /= 1024
+
+
+def render_cache_stats(container=st.sidebar):
+    """Hits / misses / bytes held / evictions of the upload cache, with a clear button."""
+    cache = ingest_cache()
+    s = cache.stats()
+    with container.expander("🗄️ Upload cache", expanded=False):
+        c1, c2 = st.columns(2)
+        c1.metric(
+            "Hits", f"{s.hits + s.disk_hits + s.snapshot_hits:,}",
+            help=f"{s.disk_hits:,} reloaded from spill, {s.snapshot_hits:,} from snapshots",
+        )
+        c2.metric("Misses", f"{s.misses:,}")
+        c1.metric("In memory", _fmt_bytes(s.bytes_held), help=f"{s.entries:,} files, budget {_fmt_bytes(cache.max_bytes)}")
+        c2.metric("Evictions", f"{s.evictions:,}")
+        if cache.spill_dir:
+            st.caption(f"Spilled: {s.spilled_entries:,} files, {_fmt_bytes(s.spilled_bytes)}")
+        if cache.snapshots:
+            snaps = cache.snapshots.entries()
+            st.caption(f"Snapshots: {len(snaps):,} files, {_fmt_bytes(int(snaps['Bytes'].sum()))}")
+        if st.button("Clear upload cache", key="ingest_cache_clear", help="Also deletes the processed snapshots."):
+            cache.clear()
+            st.rerun()
+
+
+def render_memory_report(df, container=st.sidebar, key="memory"):
+    """
+    "🧮 Memory" expander: deep bytes of ``df`` before / after dtype compaction
+    (``esg_core.dtypes``), in total and per column.
+    """
+    report = memory_report(df)
+    before, after = int(report["Before bytes"].sum()), int(report["After bytes"].sum())
+    with container.expander("🧮 Memory", expanded=False):
+        c1, c2 = st.columns(2)
+        c1.metric("Before", _fmt_bytes(before))
+        c2.metric(
+            "After", _fmt_bytes(after),
+            delta=f"-{_fmt_bytes(before - after)}" if before > after else None, delta_color="inverse",
+        )
+        st.caption(f"{len(df):,} rows × {len(report):,} columns")
+        if st.toggle("Per column", key=f"{key}_columns"):
+            st.dataframe(
+                report.sort_values("Saved bytes", ascending=False),
+                hide_index=True, use_container_width=True,
+            )
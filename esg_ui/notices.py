@@ -0,0 +1,27 @@
+"""
+Show ``esg_core.notices`` on a page.
+
+Core computations report skipped steps as :class:`esg_core.notices.Notice`
+objects; a page collects them around the call and renders them here, in the
+place its own ``st.warning`` calls used to be.
+"""
+from typing import Iterable
+
+import streamlit as st
+
+from esg_core.notices import ERROR, INFO, Notice
+
+
+def render_notices(notices: Iterable[Notice], container=st) -> None:
+    """One ``st.warning`` / ``st.info`` / ``st.error`` per notice (repeats shown once)."""
+    seen = set()
+    for notice in notices:
+        if (notice.level, notice.message) in seen:
+            continue
+        seen.add((notice.level, notice.message))
+        if notice.level == ERROR:
+            container.error(notice.message)
+        elif notice.level == INFO:
+            container.info(notice.message)
+        else:
+            container.warning(f"⚠️ {notice.message}")
@@ -0,0 +1,53 @@
+"""
+Per-rerun stage profile in the sidebar (``esg_core.profiling``).
+
+``ESG_Analysis.py`` runs every page inside :func:`page_profile`. The
+"⏱️ Profile" expander has a toggle, off by default. When it is on, the page
+run is recorded as the "total" stage, with every stage the page and the core
+code mark nested under it. The expander then shows the table of the run that
+just finished. The records can also be appended to a JSONL file:
+ESG_PROFILE_LOG, or ``esg_profile.jsonl`` in the temp folder.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator
+
+import streamlit as st
+
+from esg_core.profiling import append_jsonl, record, records_frame, stage
+
+LOG_PATH = os.environ.get("ESG_PROFILE_LOG", os.path.join(tempfile.gettempdir(), "esg_profile.jsonl"))
+RUN_KEY = "profile_run"
+
+
+@contextmanager
+def page_profile(page: str, container=st.sidebar) -> Iterator[None]:
+    """Record the block (one page run) as the stages of ``page`` when the sidebar toggle is on."""
+    with container.expander("⏱️ Profile", expanded=False):
+        enabled = st.toggle(
+            "Profile this page", value=False, key="profile_enabled",
+            help="Time every marked stage of each rerun (wall time, rows in / out, peak memory).",
+        )
+        trace_memory = st.checkbox(
+            "Trace memory", value=True, key="profile_memory", disabled=not enabled,
+            help="tracemalloc peaks per stage; slows Python-level loops down a few times.",
+        )
+        log = st.checkbox("Append to JSONL log", value=False, key="profile_log", disabled=not enabled, help=LOG_PATH)
+        table = st.empty()
+    if not enabled:
+        yield
+        return
+
+    run = st.session_state[RUN_KEY] = st.session_state.get(RUN_KEY, 0) + 1
+    with record(prefix=page, trace_memory=trace_memory) as records:
+        # also on st.stop(): the stages up to it are still shown
+        try:
+            with stage("total"):
+                yield
+        finally:
+            with table.container():
+                st.dataframe(records_frame(records), hide_index=True, use_container_width=True)
+                st.caption(f"Run {run:,} · {len(records):,} stages")
+            if log:
+                append_jsonl(records, LOG_PATH, page=page, run=run)
@@ -0,0 +1,6 @@
+"""
+Regression tests of the ``esg_core`` kernels against the row-wise page code
+they replaced (``tests.reference``), on small seeded synthetic frames.
+
+    python -m pytest -q tests
+"""
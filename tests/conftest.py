@@ -0,0 +1,42 @@
+"""Shared synthetic frames: one small seeded dataset per test session."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import Fixtures
+
+ROWS = 1500
+SEED = 7
+
+
+@pytest.fixture(scope="session")
+def fixtures(tmp_path_factory) -> Fixtures:
+    return Fixtures(ROWS, seed=SEED, cache_dir=tmp_path_factory.mktemp("synthetic"))
+
+
+@pytest.fixture(scope="session")
+def date_pairs() -> pd.DataFrame:
+    """
+    Hiring / Retire dates that hit the formula edges: the 31st and other
+    month ends, 29/02, the anchors themselves, retirements before hiring and
+    blanks.
+    """
+    rng = np.random.default_rng(SEED)
+    n = 4000
+
+    def dates(lo, hi, blank):
+        days = rng.integers(pd.Timestamp(lo).value // 86_400_000_000_000, pd.Timestamp(hi).value // 86_400_000_000_000, n)
+        s = pd.Series(pd.to_datetime(days, unit="D"))
+        month_end = rng.random(n) < 0.2
+        s[month_end] = s[month_end] + pd.offsets.MonthEnd(0)
+        return s.mask(rng.random(n) < blank)
+
+    hire = dates("2018-01-01", "2027-06-30", 0.05)
+    retire = dates("2023-01-01", "2028-12-31", 0.6)
+    anchors = pd.to_datetime([
+        "2024-02-29", "2025-01-01", "2025-04-01", "2025-04-30", "2025-05-01", "2025-07-01", "2025-07-31",
+        "2025-10-01", "2025-12-31", "2026-01-01", "2026-04-30", "2026-05-01", "2026-12-31",
+    ])
+    hire[: len(anchors)] = anchors
+    retire[len(anchors): 2 * len(anchors)] = anchors
+    return pd.DataFrame({"Hiring Date": hire, "Retire Date": retire})
@@ -0,0 +1,192 @@
+"""
+The Comp&Ben page's KPIs as they stood before ``esg_core.kpis`` and
+``esg_core.headcount``: one boolean filter of the whole frame per company,
+and one ``apply(axis=1)`` per month. Kept only as the oracle for the grouped
+versions. Page globals (``year``, the excluded IDs) became arguments; nothing
+else changed.
+"""
+import math
+
+import pandas as pd
+
+
+def calculate_gender_pay_gap(df, year):
+    df['Ονομαστικός μισθός'] = df['Ονομαστικός μισθός'].astype(float)
+    df = df.dropna(subset=['Ονομαστικός μισθός'])  # Remove null salary values
+    df = df[df['Ονομαστικός μισθός'] > 0]  # Exclude zero salaries
+    start_of_2024 = pd.Timestamp(f"{year}-01-01")
+    end_of_2024 = pd.Timestamp(f"{year}-09-30")
+    df_2024 = df[
+        (df['Ημ/νία πρόσληψης'] <= end_of_2024) &
+        ((df['Ημ/νία αποχώρησης'].isna()) | (df['Ημ/νία αποχώρησης'] >= start_of_2024))
+    ]
+
+    results = []
+    for company in df_2024['Περιγραφή εταιρίας'].unique():
+        company_df = df_2024[df_2024['Περιγραφή εταιρίας'] == company]
+        gender_salary = company_df.groupby('Όνομα Φύλου')['Ονομαστικός μισθός'].mean()
+
+        if 'ΑΝΔΡΑΣ' in gender_salary and 'ΓΥΝΑΙΚΑ' in gender_salary:
+            male_median = gender_salary['ΑΝΔΡΑΣ']
+            female_median = gender_salary['ΓΥΝΑΙΚΑ']
+            gender_pay_gap = ((male_median - female_median) / male_median) * 100
+        else:
+            gender_pay_gap = None
+
+        results.append({'Περιγραφή εταιρίας': company, 'Gender Pay Gap (%)': gender_pay_gap})
+
+    return pd.DataFrame(results)
+
+
+def calculate_annual_remuneration_ratio(df, year):
+    # ΜΙΚΤΕΣ ΑΠΟΔ already numeric here (read_esg_extract parses it)
+    df['Annual Salary'] = df['ΜΙΚΤΕΣ ΑΠΟΔ']
+
+    end_of_2024 = pd.Timestamp(f"{year}-12-31")
+    start_of_2024 = pd.Timestamp(f"{year}-01-01")
+
+    df_2024 = df[
+        (df['Ημ/νία πρόσληψης'] <= start_of_2024) &
+        ((df['Ημ/νία αποχώρησης'].isna()) | (df['Ημ/νία αποχώρησης'] > end_of_2024))
+    ]
+
+    results = []
+    for company in df_2024['Περιγραφή εταιρίας'].unique():
+        company_df = df_2024[df_2024['Περιγραφή εταιρίας'] == company]
+
+        valid_salaries = company_df['Annual Salary'].dropna()
+        if len(valid_salaries) > 1:
+            highest_salary = valid_salaries.max()
+            median_salary = valid_salaries[valid_salaries != highest_salary].median()
+
+            annual_rem_ratio = highest_salary / median_salary if median_salary > 0 else None
+        else:
+            annual_rem_ratio = None
+
+        results.append({'Περιγραφή εταιρίας': company, 'Annual Remuneration Ratio': annual_rem_ratio})
+
+    return pd.DataFrame(results)
+
+
+def calculate_monthly_headcount_year(df, start_year=2020, end_year=2030):
+    months = pd.date_range(f'{start_year}-01-01', f'{end_year}-12-31', freq='MS')
+
+    for month in months:
+        next_month = month + pd.offsets.MonthBegin(1)
+        col_name = month.strftime("%Y-%m")
+
+        df[col_name] = df.apply(
+            lambda row: (row['Ημ/νία πρόσληψης'] < next_month) and
+                        (pd.isna(row['Ημ/νία αποχώρησης']) or row['Ημ/νία αποχώρησης'] >= next_month),
+            axis=1
+        )
+
+    return df
+
+
+def calculate_combined_metrics(df, year, exclude_ids=(), excluded_ids=()):
+    start_of_period = pd.Timestamp(f"{year-1}-12-31")
+    end_of_period = pd.Timestamp(f"{year}-12-31")
+
+    df = df[~df['Αριθμός μητρώου'].astype(str).isin(set(exclude_ids))]
+
+    results = []
+    companies = df['Περιγραφή εταιρίας'].unique()
+
+    for company in companies:
+        company_df = df[df['Περιγραφή εταιρίας'] == company]
+
+        start_headcount = company_df[
+            (company_df['Ημ/νία πρόσληψης'] <= start_of_period) &
+            ((company_df['Ημ/νία αποχώρησης'].isna()) | (company_df['Ημ/νία αποχώρησης'] > start_of_period))
+        ].shape[0]
+
+        end_headcount = company_df[
+            (company_df['Ημ/νία πρόσληψης'] <= end_of_period) &
+            ((company_df['Ημ/νία αποχώρησης'].isna()) | (company_df['Ημ/νία αποχώρησης'] > end_of_period))
+        ].shape[0]
+
+        average_employees = (start_headcount + end_headcount) / 2
+
+        departures_df = company_df[~company_df['Αριθμός μητρώου'].astype(str).isin(set(excluded_ids))]
+
+        voluntary_exits = departures_df[
+            (departures_df['Περιγραφή Αιτ. Αποχώρησης'] == "VOLUNTARY DEPARTURE") &
+            (departures_df['Ημ/νία αποχώρησης'].dt.year == year)
+        ].shape[0]
+
+        involuntary_exits = departures_df[
+            (departures_df['Περιγραφή Αιτ. Αποχώρησης'].str.contains('involuntary', case=False, na=False)) &
+            (departures_df['Ημ/νία αποχώρησης'].dt.year == year)
+        ].shape[0]
+
+        retirements_exits = departures_df[
+            (departures_df['Περιγραφή Αιτ. Αποχώρησης'].str.contains('retirement', case=False, na=False)) &
+            (departures_df['Ημ/νία αποχώρησης'].dt.year == year)
+        ].shape[0]
+
+        voluntary_turnover = (voluntary_exits / average_employees * 100) if average_employees > 0 else 0
+        involuntary_turnover = (involuntary_exits / average_employees * 100) if average_employees > 0 else 0
+        retirement_turnover = (retirements_exits / average_employees * 100) if average_employees > 0 else 0
+        total_turnover = voluntary_turnover + involuntary_turnover + retirement_turnover
+
+        results.append({
+            'Περιγραφή εταιρίας': company,
+            'Start of Period Headcount': start_headcount,
+            'End of Period Headcount': end_headcount,
+            'Average Employees': round(average_employees, 2),
+            'Voluntary Departures': voluntary_exits,
+            'Involuntary Departures': involuntary_exits,
+            'Retirement Departures': retirements_exits,
+            'Voluntary Turnover (%)': round(voluntary_turnover, 2),
+            'Involuntary Turnover (%)': round(involuntary_turnover, 2),
+            'Retirement Turnover (%)': round(retirement_turnover, 2),
+            'Total Turnover (%)': round(total_turnover, 2)
+        })
+
+    results_df = pd.DataFrame(results)
+    totals = pd.DataFrame([{
+        'Περιγραφή εταιρίας': 'TOTAL',
+        'Start of Period Headcount': results_df['Start of Period Headcount'].sum(),
+        'End of Period Headcount': results_df['End of Period Headcount'].sum(),
+        'Average Employees': round(results_df['Average Employees'].sum(), 2),
+        'Voluntary Departures': results_df['Voluntary Departures'].sum(),
+        'Involuntary Departures': results_df['Involuntary Departures'].sum(),
+        'Retirement Departures': results_df['Retirement Departures'].sum(),
+        'Voluntary Turnover (%)': round((results_df['Voluntary Departures'].sum() / results_df['Average Employees'].sum()) * 100, 2),
+        'Involuntary Turnover (%)': round((results_df['Involuntary Departures'].sum() / results_df['Average Employees'].sum()) * 100, 2),
+        'Retirement Turnover (%)': round((results_df['Retirement Departures'].sum() / results_df['Average Employees'].sum()) * 100, 2),
+        'Total Turnover (%)': round((
+            (results_df['Voluntary Departures'].sum() +
+             results_df['Involuntary Departures'].sum() +
+             results_df['Retirement Departures'].sum()) / results_df['Average Employees'].sum()) * 100, 2)
+    }])
+    return pd.concat([results_df, totals], ignore_index=True)
+
+
+def get_top_10_percent_employees(df, year):
+    results = []
+    companies = df['Περιγραφή εταιρίας'].unique()
+
+    end_of_2024 = pd.Timestamp(f"{year}-12-31")
+    df_2024 = df[
+        (df['Ημ/νία πρόσληψης'] <= end_of_2024) &
+        ((df['Ημ/νία αποχώρησης'].isna()) | (df['Ημ/νία αποχώρησης'] > end_of_2024))
+    ]
+
+    for company in companies:
+        company_df = df_2024[df_2024['Περιγραφή εταιρίας'] == company]
+        sorted_df = company_df.sort_values(by='ΜΙΚΤΕΣ ΑΠΟΔ', ascending=False)
+        top_10_percent_count = math.ceil(len(sorted_df) * 0.1)
+        top_10_percent_df = sorted_df.head(top_10_percent_count)
+
+        for _, row in top_10_percent_df.iterrows():
+            results.append({
+                'Περιγραφή εταιρίας': company,
+                'Αριθμός μητρώου': row['Αριθμός μητρώου'],
+                'Επώνυμο': row['Επώνυμο'],
+                'Ονομα': row['Ονομα'],
+                'Συνολικές Αποδοχές': row['ΜΙΚΤΕΣ ΑΠΟΔ']
+            })
+
+    return pd.DataFrame(results)
@@ -0,0 +1,58 @@
+"""
+The HR Data Analyst and Comp&Ben row-wise rules as they stood before
+``esg_core.roles`` and ``esg_core.salary``. Kept only as the oracle for the
+vectorized versions.
+"""
+import pandas as pd
+
+DAY_RATE_CONTRACTS = {
+    'ΑΛΜ - ΗΜΕΡΟΜΙΣΘΙΟΙ',
+    'ΜΕΤΑΛΛΟΥ ΗΜΕΡΟΜΙΣΘΙΟΙ 1Η ΚΑΤΗΓΟΡΙΑ',
+    'ΜΕΤΑΛΛΟΥ ΗΜΕΡΟΜΙΣΘΙΟΙ 2Η ΚΑΤΗΓΟΡΙΑ'
+}
+
+
+def classify_role(row):
+    title = str(row['Περιγραφή Θέσης Εργασίας']).lower()
+    prop = str(row['Job Property']).lower()
+    raw_grade = row.get('GRADE', '0')
+
+    try:
+        grade = float(str(raw_grade).replace(',', '.'))
+    except (ValueError, TypeError):
+        grade = 0
+
+    if 'trainee' in title:
+        return 'Trainee'
+    elif 'director' in title:
+        return 'Director'
+    elif 'commercial unit developer' in title and grade > 17:
+        return 'Manager'
+    elif ('manager' in title or 'head' in title or 'ceo' in title) and grade >= 20:
+        return 'Director'
+    elif ('manager' in title or 'head' in title or 'supervisor' in title or 'lead' in title or 'executive' in title) and grade > 16:
+        return 'Manager'
+    elif prop == 'administrative':
+        return 'Office Worker'
+    elif prop == 'operational':
+        return 'Worker'
+    else:
+        return None
+
+
+def monthly_salary(df):
+    """Comp&Ben's salary step: decimal-comma parse, then ×26 for the day-rate contracts."""
+    if df['Ονομαστικός μισθός'].dtype == 'object':
+        salary = pd.to_numeric(
+            df['Ονομαστικός μισθός'].astype(str).str.replace(',', '.', regex=False),
+            errors='coerce'
+        )
+    else:
+        salary = pd.to_numeric(df['Ονομαστικός μισθός'], errors='coerce')
+    df = df.assign(**{'Ονομαστικός μισθός': salary})
+    return df.apply(
+        lambda row: row['Ονομαστικός μισθός'] * 26
+        if str(row.get('Περιγραφή Σύμβασης', '')).strip().upper() in DAY_RATE_CONTRACTS
+        else row['Ονομαστικός μισθός'],
+        axis=1
+    )
@@ -0,0 +1,792 @@
+"""
+The Manpower page's budget formulas as they stood before ``esg_core.manpower``:
+row-wise, one scalar 30/360 YEARFRAC per date pair. Kept only as the oracle
+for the vectorized kernels. The page's globals became arguments
+(``payroll_periods`` → ``full_periods``, ``salary_increase_pct2`` →
+``inc_pct2``) and ``st.warning`` became ``warnings.warn``; nothing else
+changed.
+"""
+import warnings
+from calendar import monthrange
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+OVERRIDE_MAP = {
+    "40602": 0.1879,
+    "40603": 0.1879,
+    "40380": 0.1879,
+    "40084": 0.1879,
+    "40510": 0.1738,
+}
+
+
+def compute_employer_contrib(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute employer contribution amount from Contributions% and Monthly Gross Salary (Current).
+    Rules:
+      - If rate == 0.1738 → rate*salary + 25
+      - If rate == 0.1879 → rate*salary + 30
+      - Else → rate*salary
+    Writes: "Monthly Employer's Contributions" (rounded to 2 decimals).
+    """
+    need = {"Monthly Gross Salary (Current)", "Contributions%"}
+    if not need.issubset(df.columns):
+        warnings.warn("⚠️ Missing columns to compute employer contributions (need salary & Contributions%).")
+        return df
+
+    rate = pd.to_numeric(df["Contributions%"], errors="coerce")
+    salary = pd.to_numeric(df["Monthly Gross Salary (Current)"], errors="coerce")
+
+    base = rate * salary
+    add_25 = np.isclose(rate, 0.1738, atol=1e-6)
+    add_30 = np.isclose(rate, 0.1879, atol=1e-6)
+
+    amount = np.where(add_25, rate * salary + 25, base)
+    amount = np.where(add_30, rate * salary + 30, amount)
+
+    df["Monthly Employer's Contributions"] = np.round(amount, 2)
+    return df
+
+
+def eomonth(dt: pd.Timestamp, months: int = 0) -> pd.Timestamp:
+    """Excel-like EOMONTH(dt, months). Returns last day of month after offset."""
+    if pd.isna(dt):
+        return pd.NaT
+    y = dt.year + (dt.month - 1 + months) // 12
+    m = (dt.month - 1 + months) % 12 + 1
+    last_day = monthrange(y, m)[1]
+    return pd.Timestamp(y, m, last_day)
+
+def yearfrac_30360_us(start, end):
+    if pd.isna(start) or pd.isna(end):
+        return np.nan
+    y1, m1, d1 = start.year, start.month, start.day
+    y2, m2, d2 = end.year, end.month, end.day
+    # US (NASD) 30/360 rules
+    if d1 == 31: d1 = 30
+    if d2 == 31 and d1 == 30: d2 = 30
+    return ((360*(y2 - y1)) + (30*(m2 - m1)) + (d2 - d1)) / 360.0
+
+
+def roundup(x, decimals=1):
+    if pd.isna(x):
+        return np.nan
+    factor = 10 ** decimals
+    return np.ceil(x * factor) / factor
+
+
+def compute_months_projection_25(df: pd.DataFrame, projection_date: pd.Timestamp) -> pd.DataFrame:
+    """
+    Python translation of your revised Excel LET() for 'Months Projection 25',
+    with robust datetime handling to avoid int↔Timestamp comparisons.
+    """
+    # Ensure expected columns
+    if "Hiring Date" not in df.columns:
+        if "Hire Date" in df.columns:
+            df = df.rename(columns={"Hire Date": "Hiring Date"})
+        else:
+            warnings.warn("⚠️ Cannot compute 'Months Projection 25' (missing 'Hiring Date').")
+            return df
+    if "Retire Date" not in df.columns:
+        warnings.warn("⚠️ Cannot compute 'Months Projection 25' (missing 'Retire Date').")
+        return df
+
+    # Scalars from projection_date (prodate)
+    prodate    = pd.to_datetime(projection_date)
+    CurrYear   = prodate.year
+    PrevYear   = CurrYear - 1
+    BudgetYear = CurrYear + 1
+
+    # Anchors
+    StartCurrYear = pd.Timestamp(CurrYear, 1, 1)
+    EndCurYear    = pd.Timestamp(CurrYear, 12, 31)
+    DecBonusDate  = pd.Timestamp(CurrYear, 12, 31)
+    JulyBonusDate = pd.Timestamp(CurrYear, 7, 31)  # end of July
+    AprilVac      = pd.Timestamp(CurrYear, 4, 1)
+    Christmther   = pd.Timestamp(CurrYear, 5, 1)
+
+    # Row data as proper datetimes
+    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
+    R = pd.to_datetime(df["Retire Date"], errors="coerce")
+    YearH = H.dt.year
+    YearR = R.dt.year
+
+    # Base months
+    BaseMonths   = yearfrac_30360_us(prodate, EndCurYear) * 12.0
+    RetireMonths = (R.apply(lambda x: yearfrac_30360_us(prodate, x)) * 12.0).astype(float)
+    HireMonths   = (H.apply(lambda x: yearfrac_30360_us(x, EndCurYear)) * 12.0).astype(float)
+    RetireHiring = (pd.Series([yearfrac_30360_us(h, r) for h, r in zip(H, R)]) * 12.0).astype(float)
+
+    # SafeRetire as a pandas Series of Timestamps (no np.where for dates)
+    safe_retire = R.fillna(DecBonusDate)
+
+    # ---------- JulyPart (robust) ----------
+    def _july_part(h: pd.Timestamp, sr: pd.Timestamp) -> float:
+        # Coerce sr to Timestamp just in case
+        if pd.isna(sr) or sr >= DecBonusDate:
+            sr = DecBonusDate
+        else:
+            sr = pd.to_datetime(sr)
+
+        if pd.isna(h):
+            return 0.0
+
+        if h >= AprilVac:
+            # Denominator: yearfrac_30360_us(StartCurrYear, max(DecBonusDate, SafeRetire))
+            denom_end = sr if (sr > DecBonusDate) else DecBonusDate
+            denom = yearfrac_30360_us(StartCurrYear, denom_end)
+
+            if h < JulyBonusDate:
+                num_end = sr if (sr < DecBonusDate) else DecBonusDate
+                num = yearfrac_30360_us(JulyBonusDate, num_end)
+            else:  # h >= JulyBonusDate
+                start = h if (h > StartCurrYear) else StartCurrYear
+                end   = sr if (sr < DecBonusDate) else DecBonusDate
+                num   = yearfrac_30360_us(start, end)
+
+            val = 0.0 if (pd.isna(num) or pd.isna(denom) or denom <= 0) else (num / denom) * 0.5
+            return roundup(val, 2)
+        else:
+            return 0.0
+
+    JulyPart = np.array([_july_part(h, sr) for h, sr in zip(H, safe_retire)], dtype=float)
+
+    # ---------- BonusMonths ----------
+    def _piece(h: pd.Timestamp, r: pd.Timestamp) -> float:
+        start = Christmther if pd.isna(h) else (h if h > Christmther else Christmther)
+        end_lim = eomonth(DecBonusDate, 0)
+        end   = end_lim if (pd.isna(r) or r > end_lim) else r
+        return yearfrac_30360_us(start, end) * 12.0 / 8.0
+
+    H_le_Christ = (H <= Christmther)
+    R_blank_or_after_dec = (R.isna() | (R >= DecBonusDate))
+    piece_vec = np.array([_piece(h, r) for h, r in zip(H, R)], dtype=float)
+
+    BonusMonths = np.where(
+        H_le_Christ & R_blank_or_after_dec,
+        1.0 + JulyPart,
+        np.where(
+            H_le_Christ & ~R_blank_or_after_dec,
+            piece_vec + JulyPart,
+            np.where(
+                (~H_le_Christ) & R_blank_or_after_dec,
+                np.array([
+                    yearfrac_30360_us(h if (not pd.isna(h) and h > Christmther) else Christmther,
+                             eomonth(DecBonusDate, 0)) * 12.0 / 8.0
+                    for h in H
+                ]) + JulyPart,
+                piece_vec + JulyPart
+            )
+        )
+    ).astype(float)
+
+    # ---------- NoRetire ----------
+    NoRetire = np.where(
+        YearH == BudgetYear, 0.0,
+        np.where(
+            (YearH < PrevYear) | (YearH == PrevYear),
+            BaseMonths + BonusMonths,
+            np.where(
+                YearH == CurrYear,
+                np.where(H > prodate, HireMonths + BonusMonths, BaseMonths + BonusMonths),
+                0.0
+            )
+        )
+    ).astype(float)
+
+    # ---------- RetireCalc (IFS) ----------
+    cond1 = (YearH <= CurrYear) & (R <= prodate)
+    cond2 = (YearH < PrevYear) & (YearR == CurrYear)
+    cond3 = (YearH == PrevYear) & (YearR == CurrYear)
+    cond4 = (YearH == CurrYear) & (YearR == CurrYear)
+    cond5 = (YearH == CurrYear) & (YearR == BudgetYear)
+    cond6 = (YearH <= PrevYear) & (YearR == BudgetYear)
+
+    RetireCalc = np.where(
+        cond1, 0.0,
+        np.where(
+            cond2 | cond3, RetireMonths + BonusMonths,
+            np.where(
+                cond4, np.where(H <= prodate, RetireMonths + BonusMonths, RetireHiring + BonusMonths),
+                np.where(
+                    cond5, np.where(H <= prodate, BaseMonths + BonusMonths, HireMonths + BonusMonths),
+                    np.where(
+                        cond6, BaseMonths + BonusMonths,
+                        np.nan
+                    )
+                )
+            )
+        )
+    ).astype(float)
+
+    # ---------- Final ----------
+    result = np.where(
+        YearH == BudgetYear, 0.0,
+        np.where(~R.isna(), RetireCalc, NoRetire)
+    ).astype(float)
+
+    df["Months Projection 25"] = [roundup(x, 1) for x in result]
+    return df
+
+
+
+
+def compute_fy_months_budget_26(df: pd.DataFrame, fy_base_date: pd.Timestamp, full_periods: int, divisor: float = 30.42) -> pd.DataFrame:
+    """
+    Excel -> Python for 'FY Months Budget 26'.
+
+    Mapping:
+      CurrYear = YEAR(fy_base_date)
+      PrevYear = CurrYear - 1
+      StartCurrYear = 1/1/CurrYear
+      EndCurrYear   = 12/31/CurrYear
+      FullPeriods   = 12
+      Divisor       = 30.42  (days per month)
+    """
+    if "Hiring Date" not in df.columns:
+        if "Hire Date" in df.columns:
+            df = df.rename(columns={"Hire Date": "Hiring Date"})
+        else:
+            warnings.warn("⚠️ Missing 'Hiring Date' for FY Months Budget 26.")
+            return df
+    if "Retire Date" not in df.columns:
+        warnings.warn("⚠️ Missing 'Retire Date' for FY Months Budget 26.")
+        return df
+
+    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
+    R = pd.to_datetime(df["Retire Date"], errors="coerce")
+
+    CurrYear = pd.to_datetime(fy_base_date).year
+    PrevYear = CurrYear - 1
+
+    StartCurrYear = pd.Timestamp(CurrYear, 1, 1)
+    EndCurrYear   = pd.Timestamp(CurrYear, 12, 31)
+    AprilDate     = pd.Timestamp(CurrYear, 4, 30)
+    JulyDate      = pd.Timestamp(CurrYear, 7, 1)
+    DecDate       = pd.Timestamp(CurrYear, 12, 31)
+    ChristmasThr  = pd.Timestamp(CurrYear, 5, 1)
+
+    FullPeriods = float(full_periods)
+    Divisor = float(30.42)
+    
+    # Booleans
+    EmployedOnApril = (H <= StartCurrYear) & (R.isna() | (R >= AprilDate))
+    EmployedOnJuly  = (H <= StartCurrYear) & (R.isna() | (R >= JulyDate))
+    EmployedOnDec   = (H <= ChristmasThr)  & (R.isna() | (R >= DecDate))
+
+    # AprilPart
+    # IF(EmployedOnApril; 0.5; IF(H < AprilDate; ROUNDUP( yearfrac_30360_us(MAX(H,Start), MIN(April,R)) / yearfrac_30360_us(Start,April) * 0.5 ;1); 0))
+    april_num = [
+        yearfrac_30360_us(max(h, StartCurrYear) if not pd.isna(h) else StartCurrYear,
+                 min(AprilDate, r) if not pd.isna(r) else AprilDate)
+        for h, r in zip(H, R)
+    ]
+    april_den = yearfrac_30360_us(StartCurrYear, AprilDate)  # constant
+    AprilPart = np.where(
+        EmployedOnApril, 0.5,
+        np.where(
+            (H < AprilDate),
+            [roundup((num / april_den) * 0.5, 1) if (not pd.isna(num) and april_den > 0) else 0.0 for num in april_num],
+            0.0
+        )
+    ).astype(float)
+
+    # JulyPart
+    # IF(EmployedOnJuly; 0.5; IF(H<=DecDate; ROUNDUP(yearfrac_30360_us(MAX(H,Start), MIN(Dec,R)) / yearfrac_30360_us(Start, MAX(Dec,R)) * 0.5;1); 0))
+    july_num = [
+        yearfrac_30360_us(max(h, StartCurrYear) if not pd.isna(h) else StartCurrYear,
+                 min(DecDate, r) if not pd.isna(r) else DecDate)
+        for h, r in zip(H, R)
+    ]
+    july_den = [
+        yearfrac_30360_us(StartCurrYear, max(DecDate, r) if not pd.isna(r) else DecDate)
+        for r in R
+    ]
+    JulyPart = np.where(
+        EmployedOnJuly, 0.5,
+        np.where(
+            (H <= DecDate),
+            [roundup(((n / d) * 0.5) if (not pd.isna(n) and not pd.isna(d) and d > 0) else 0.0, 1)
+             for n, d in zip(july_num, july_den)],
+            0.0
+        )
+    ).astype(float)
+
+    # DecPart
+    # IF(EmployedOnDec; 1; IF(H<=DecDate; ROUNDUP(yearfrac_30360_us(MAX(H,Start), MIN(Dec,R)) / yearfrac_30360_us(ChristmasThr, MAX(Dec,R)) * 1;1); 0))
+    dec_num = july_num  # same numerator as JulyPart: yearfrac_30360_us(MAX(H,Start), MIN(Dec,R))
+    dec_den = [
+        yearfrac_30360_us(ChristmasThr, max(DecDate, r) if not pd.isna(r) else DecDate)
+        for r in R
+    ]
+    DecPart = np.where(
+        EmployedOnDec, 1.0,
+        np.where(
+            (H <= DecDate),
+            [roundup(((n / d) * 1.0) if (not pd.isna(n) and not pd.isna(d) and d > 0) else 0.0, 1)
+             for n, d in zip(dec_num, dec_den)],
+            0.0
+        )
+    ).astype(float)
+
+    BonusMonths = (AprilPart + JulyPart + DecPart).astype(float)
+
+    YearH = H.dt.year
+
+    # NoRetire
+    # IF(H <= Start) THEN
+    #     IF(BonusMonths > 1.89; FullPeriods; (FullPeriods - 2) + BonusMonths)
+    # ELSE IF(YEAR(H) = CurrYear)
+    #     (EndCurrYear - H)/Divisor + BonusMonths
+    # ELSE 0
+    days_end_minus_h = (EndCurrYear - H).dt.days
+    days_end_minus_h = days_end_minus_h.where(~pd.isna(days_end_minus_h), 0)
+
+    NoRetire = np.where(
+        H <= StartCurrYear,
+        np.where(BonusMonths > 1.89, FullPeriods, (FullPeriods - 2.0) + BonusMonths),
+        np.where(
+            YearH == CurrYear,
+            (days_end_minus_h / Divisor) + BonusMonths,
+            0.0
+        )
+    ).astype(float)
+
+    # RetireCalc
+    # IF(R=""; 0; IFS(
+    #   YEAR(H) <= PrevYear & YEAR(R) <= PrevYear → 0
+    #   YEAR(H) <= PrevYear & YEAR(R) = CurrYear → (R - Start)/Div + BonusMonths
+    #   YEAR(H) = CurrYear  & YEAR(R) = CurrYear → (R - H)    /Div + BonusMonths
+    #   TRUE → NA()
+    # ))
+    YearR = R.dt.year
+    days_r_minus_start = (R - StartCurrYear).dt.days
+    days_r_minus_start = days_r_minus_start.where(~pd.isna(days_r_minus_start), np.nan)
+
+    days_r_minus_h = (R - H).dt.days
+    days_r_minus_h = days_r_minus_h.where(~pd.isna(days_r_minus_h), np.nan)
+
+    cond1 = R.isna()
+    cond2 = (~R.isna()) & (YearH <= PrevYear) & (YearR <= PrevYear)
+    cond3 = (~R.isna()) & (YearH <= PrevYear) & (YearR == CurrYear)
+    cond4 = (~R.isna()) & (YearH == CurrYear) & (YearR == CurrYear)
+
+    RetireCalc = np.where(
+        cond1, 0.0,
+        np.where(
+            cond2, 0.0,
+            np.where(
+                cond3, (days_r_minus_start / Divisor) + BonusMonths,
+                np.where(
+                    cond4, (days_r_minus_h / Divisor) + BonusMonths,
+                    np.nan  # TRUE; NA()
+                )
+            )
+        )
+    ).astype(float)
+
+    # Final: ROUND(IF(R<>""; RetireCalc; NoRetire); 1)
+    final_val = np.where(~R.isna(), RetireCalc, NoRetire)
+    df["FY Months Budget 26"] = [round(np.nan if pd.isna(x) else x, 1) for x in final_val]
+    return df
+
+def compute_fy_gross_salary_projection_25(
+    df: pd.DataFrame,
+    projection_date: pd.Timestamp,
+    monthly_cost_col: str = "Monthly Gross Salary (Current)",
+) -> pd.DataFrame:
+    """
+    Excel LET() → Python for 'FY Gross Salary Projection For 25'.
+
+    Depends on:
+      - Hiring Date, Retire Date (datetime columns)
+      - Monthly cost column (default: 'Monthly Gross Salary (Current)')
+
+    Uses the same JulyPart / BonusMonths / ResultMonths logic as Months Projection 25,
+    then computes:
+      TotalCost = ResultMonths * MonthlyCost + XmasOnlyMonths * MonthlyCost * BonusRate
+    with BonusRate = 0.04166 and rounds to 2 decimals.
+    """
+    # ---- Preconditions ----
+    if "Hiring Date" not in df.columns:
+        if "Hire Date" in df.columns:
+            df = df.rename(columns={"Hire Date": "Hiring Date"})
+        else:
+            warnings.warn("⚠️ Missing 'Hiring Date' — cannot compute FY Gross Salary Projection For 25.")
+            return df
+    if "Retire Date" not in df.columns:
+        warnings.warn("⚠️ Missing 'Retire Date' — cannot compute FY Gross Salary Projection For 25.")
+        return df
+    if monthly_cost_col not in df.columns:
+        warnings.warn(f"⚠️ Missing '{monthly_cost_col}' — cannot compute FY Gross Salary Projection For 25.")
+        return df
+
+    # Ensure numeric monthly cost
+    df[monthly_cost_col] = pd.to_numeric(
+        df[monthly_cost_col].astype(str).str.replace(",", ".", regex=False),
+        errors="coerce"
+    )
+
+    # ---- Anchors from projection_date ----
+    prodate    = pd.to_datetime(projection_date)
+    CurrYear   = prodate.year
+    PrevYear   = CurrYear - 1
+    BudgetYear = CurrYear + 1
+
+    StartCurrYear = pd.Timestamp(CurrYear, 1, 1)
+    EndCurYear    = pd.Timestamp(CurrYear, 12, 31)
+    DecBonusDate  = pd.Timestamp(CurrYear, 12, 31)
+    JulyBonusDate = pd.Timestamp(CurrYear, 7, 31)  # end of July (per your sheet)
+    AprilVac      = pd.Timestamp(CurrYear, 4, 1)
+    Christmther   = pd.Timestamp(CurrYear, 5, 1)   # threshold for Christmas bonus logic
+
+    # ---- Row dates ----
+    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
+    R = pd.to_datetime(df["Retire Date"], errors="coerce")
+    YearH = H.dt.year
+    YearR = R.dt.year
+
+    # ---- Base months pieces (ACT/365) ----
+    BaseMonths   = yearfrac_30360_us(prodate, EndCurYear) * 12.0
+    RetireMonths = (R.apply(lambda x: yearfrac_30360_us(prodate, x)) * 12.0).astype(float)
+    HireMonths   = (H.apply(lambda x: yearfrac_30360_us(x, EndCurYear)) * 12.0).astype(float)
+    RetireHiring = (pd.Series([yearfrac_30360_us(h, r) for h, r in zip(H, R)]) * 12.0).astype(float)
+
+    # SafeRetire = R if present else DecBonusDate (keep as Timestamp)
+    safe_retire = R.fillna(DecBonusDate)
+
+    # ---- JulyPart (new piecewise with ROUNDUP(...,2)) ----
+    def _july_part(h: pd.Timestamp, sr: pd.Timestamp) -> float:
+        if pd.isna(h):
+            return 0.0
+        sr = DecBonusDate if pd.isna(sr) else pd.to_datetime(sr)
+
+        if h >= AprilVac:
+            denom_end = sr if (sr > DecBonusDate) else DecBonusDate
+            denom = yearfrac_30360_us(StartCurrYear, denom_end)
+
+            if h < JulyBonusDate:
+                num_end = sr if (sr < DecBonusDate) else DecBonusDate
+                num = yearfrac_30360_us(JulyBonusDate, num_end)
+            else:  # h >= JulyBonusDate
+                start = h if (h > StartCurrYear) else StartCurrYear
+                end   = sr if (sr < DecBonusDate) else DecBonusDate
+                num   = yearfrac_30360_us(start, end)
+
+            val = 0.0 if (pd.isna(num) or pd.isna(denom) or denom <= 0) else (num / denom) * 0.5
+            return roundup(val, 2)
+        return 0.0
+
+    JulyPart = np.array([_july_part(h, sr) for h, sr in zip(H, safe_retire)], dtype=float)
+
+    # ---- BonusMonths (same as Months Projection 25, plus JulyPart) ----
+    def _piece(h: pd.Timestamp, r: pd.Timestamp) -> float:
+        start   = Christmther if pd.isna(h) else (h if h > Christmther else Christmther)
+        end_lim = eomonth(DecBonusDate, 0)
+        end     = end_lim if (pd.isna(r) or r > end_lim) else r
+        return yearfrac_30360_us(start, end) * 12.0 / 8.0
+
+    H_le_Christ = (H <= Christmther)
+    R_blank_or_after_dec = (R.isna() | (R >= DecBonusDate))
+    piece_vec = np.array([_piece(h, r) for h, r in zip(H, R)], dtype=float)
+
+    BonusMonths = np.where(
+        H_le_Christ & R_blank_or_after_dec,
+        1.0 + JulyPart,
+        np.where(
+            H_le_Christ & ~R_blank_or_after_dec,
+            piece_vec + JulyPart,
+            np.where(
+                (~H_le_Christ) & R_blank_or_after_dec,
+                np.array([
+                    yearfrac_30360_us(h if (not pd.isna(h) and h > Christmther) else Christmther,
+                             eomonth(DecBonusDate, 0)) * 12.0 / 8.0
+                    for h in H
+                ]) + JulyPart,
+                piece_vec + JulyPart
+            )
+        )
+    ).astype(float)
+
+    # ---- NoRetire / RetireCalc (same branches as Months Projection 25) ----
+    NoRetire = np.where(
+        YearH == BudgetYear, 0.0,
+        np.where(
+            (YearH < PrevYear) | (YearH == PrevYear),
+            BaseMonths + BonusMonths,
+            np.where(
+                YearH == CurrYear,
+                np.where(H > prodate, HireMonths + BonusMonths, BaseMonths + BonusMonths),
+                0.0
+            )
+        )
+    ).astype(float)
+
+    cond1 = (YearH <= CurrYear) & (R <= prodate)
+    cond2 = (YearH < PrevYear) & (YearR == CurrYear)
+    cond3 = (YearH == PrevYear) & (YearR == CurrYear)
+    cond4 = (YearH == CurrYear) & (YearR == CurrYear)
+    cond5 = (YearH == CurrYear) & (YearR == BudgetYear)
+    cond6 = (YearH <= PrevYear) & (YearR == BudgetYear)
+
+    RetireCalc = np.where(
+        cond1, 0.0,
+        np.where(
+            cond2 | cond3, RetireMonths + BonusMonths,
+            np.where(
+                cond4, np.where(H <= prodate, RetireMonths + BonusMonths, RetireHiring + BonusMonths),
+                np.where(
+                    cond5, np.where(H <= prodate, BaseMonths + BonusMonths, HireMonths + BonusMonths),
+                    np.where(
+                        cond6, BaseMonths + BonusMonths,
+                        np.nan
+                    )
+                )
+            )
+        )
+    ).astype(float)
+
+    # ResultMonths = ROUNDUP(IF(YearH = BudgetYear, 0, IF(R present, RetireCalc, NoRetire)), 1)
+    raw_months = np.where(YearH == BudgetYear, 0.0, np.where(~R.isna(), RetireCalc, NoRetire)).astype(float)
+    ResultMonths = np.array([roundup(x, 1) for x in raw_months], dtype=float)
+
+    # XmasOnlyMonths = BonusMonths - JulyPart
+    XmasOnlyMonths = (BonusMonths - JulyPart).astype(float)
+
+    # ---- Cost calculation ----
+    BonusRate = 0.04166  # from your sheet (0,04166)
+    monthly_cost = df[monthly_cost_col].astype(float)
+
+    TotalCost = np.round(
+        ResultMonths * monthly_cost + XmasOnlyMonths * monthly_cost * BonusRate,
+        2
+    )
+
+    df["FY Gross Salary Projection For 25"] = TotalCost
+    return df
+def compute_annual_gross_salary_fy_budget_2026(
+    df: pd.DataFrame,
+    effective_increase_date: pd.Timestamp,      # IncStart == YearDate
+    no_increase_cutoff: pd.Timestamp,           # H5
+    inc_pct: float,                             # e.g., 0.10
+    inc_pct2: float,                            # 5%
+    active_months_col: str = "FY Months Budget 26",
+    monthly_cost_col: str = "Monthly Gross Salary (Current)",
+    grade_col: str = "Grade",
+) -> pd.DataFrame:
+    # --- Preconditions ---
+    if "Hiring Date" not in df.columns and "Hire Date" in df.columns:
+        df = df.rename(columns={"Hire Date": "Hiring Date"})
+    for col in ["Hiring Date", "Retire Date", active_months_col, monthly_cost_col]:
+        if col not in df.columns:
+            warnings.warn(f"⚠️ Missing '{col}' — cannot compute Annual Gross Salary FY Budget 2026.")
+            return df
+
+    # --- Anchors ---
+    YearDate = pd.to_datetime(effective_increase_date)
+    IncStart = pd.to_datetime(effective_increase_date)
+    H5 = pd.to_datetime(no_increase_cutoff)
+    one_year_after_H5   = H5 + relativedelta(years=1)
+    one_year_after_YrDt = YearDate + relativedelta(years=1)
+
+    CurrYear = YearDate.year
+    StartCurrYear = pd.Timestamp(CurrYear, 1, 1)
+    AprilDate     = pd.Timestamp(CurrYear, 4, 30)
+    DecDate       = pd.Timestamp(CurrYear, 12, 31)
+    ChristmasThr  = pd.Timestamp(CurrYear, 5, 1)
+
+    # --- Row data & numerics ---
+    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
+    R = pd.to_datetime(df["Retire Date"], errors="coerce")
+
+    ActiveMonths = pd.to_numeric(df[active_months_col], errors="coerce").fillna(0.0)
+    MonthlyCost  = pd.to_numeric(
+        df[monthly_cost_col].astype(str).str.replace(",", ".", regex=False),
+        errors="coerce"
+    ).fillna(0.0)
+
+    # Robust Grade coercion: handle '0,1', '0.1', text
+    if grade_col in df.columns:
+        Grade = pd.to_numeric(
+            df[grade_col].astype(str).str.replace(",", ".", regex=False).str.strip(),
+            errors="coerce"
+        )
+    else:
+        Grade = pd.Series(np.nan, index=df.index)
+
+    # Only compute for rows with ActiveMonths > 0
+    mask_active = ActiveMonths > 0
+
+    # Helpers
+    def yearfrac(start, end):
+        if pd.isna(start) or pd.isna(end):
+            return np.nan
+        return (end - start).days / 365.0  # ACT/365
+
+    def roundup(x, decimals=1):
+        if pd.isna(x):
+            return np.nan
+        f = 10**decimals
+        return np.ceil(x * f) / f
+
+    # --- Bonus parts (April/Dec) ---
+    EmployedOnApril = (H <= StartCurrYear) & (R.isna() | (R >= AprilDate))
+    EmployedOnDec   = (H <= ChristmasThr)  & (R.isna() | (R >= DecDate))
+
+    april_num = [
+        yearfrac_30360_us(max(h, StartCurrYear) if not pd.isna(h) else StartCurrYear,
+                 min(AprilDate, r) if not pd.isna(r) else AprilDate)
+        for h, r in zip(H, R)
+    ]
+    april_den = yearfrac_30360_us(StartCurrYear, AprilDate)
+    AprilPart = np.where(
+        EmployedOnApril, 0.5,
+        np.where(
+            (H < AprilDate),
+            [roundup((num / april_den) * 0.5, 1) if (not pd.isna(num) and april_den > 0) else 0.0 for num in april_num],
+            0.0
+        )
+    ).astype(float)
+
+    dec_num = [
+        yearfrac_30360_us(max(h, StartCurrYear) if not pd.isna(h) else StartCurrYear,
+                 min(DecDate, r) if not pd.isna(r) else DecDate)
+        for h, r in zip(H, R)
+    ]
+    dec_den = [
+        yearfrac_30360_us(ChristmasThr, max(DecDate, r) if not pd.isna(r) else DecDate)
+        for r in R
+    ]
+    DecPart = np.where(
+        EmployedOnDec, 1.0,
+        np.where(
+            (H >= StartCurrYear),
+            [roundup(((n / d) * 1.0) if (not pd.isna(n) and not pd.isna(d) and d > 0) else 0.0, 1)
+             for n, d in zip(dec_num, dec_den)],
+            0.0
+        )
+    ).astype(float)
+
+    # --- Per-row increase rule: if Grade == 0.1 -> inc_pct2 else inc_pct ---
+    inc_used = np.where(np.isclose(Grade, 0.1, atol=1e-9), inc_pct2, inc_pct)
+
+    # --- Factors ---
+    AprilFactor = 1.0
+    dec_factor_cond = (H <= H5) & (R.isna() | (R > one_year_after_H5))
+    DecFactor = np.where(dec_factor_cond, 1.0 + inc_used, 1.0)
+
+    # --- BaseCost (split at MONTH(IncStart)-0.5), only for active rows ---
+    inc_split = float(IncStart.month) - 0.5
+    pre_increase_months  = np.minimum(ActiveMonths, inc_split)
+    post_increase_months = np.maximum(ActiveMonths - inc_split, 0.0)
+
+    basecost_condition = (H <= H5) & (R.isna() | (R > one_year_after_YrDt))
+
+    BaseCost_all = np.where(
+        basecost_condition,
+        pre_increase_months * MonthlyCost + post_increase_months * MonthlyCost * (1.0 + inc_used),
+        ActiveMonths * MonthlyCost
+    )
+    BaseCost_all = np.round(BaseCost_all, 2)
+
+    # --- Allowances ---
+    BonusRate = 0.04166
+    Allowances_all = np.round(
+        MonthlyCost * BonusRate * (AprilPart * AprilFactor + DecPart * DecFactor),
+        2
+    )
+
+    # Zero out rows with no active months
+    Total_all = np.round(BaseCost_all + Allowances_all, 2)
+    Total = np.where(mask_active, Total_all, 0.0)
+
+    df["Annual Gross Salary FY Budget 2026"] = Total
+    return df
+
+
+def derive_columns(df: pd.DataFrame, params, contributions=None) -> pd.DataFrame:
+    """The page's derived-column block, from the contributions merge to the meal allowance."""
+    df = df.copy()
+    if contributions is not None:
+        contrib_col = "Contributions"
+        df = df.merge(contributions[["Hrms Id", contrib_col]], on="Hrms Id", how="left")
+        df[contrib_col] = pd.to_numeric(
+            df[contrib_col].astype(str).str.replace(",", ".", regex=False),
+            errors="coerce"
+        )
+        df["Contributions%"] = df.apply(
+            lambda r: OVERRIDE_MAP.get(r["Κωδικός Κράτησης (norm)"], r.get(contrib_col, np.nan)),
+            axis=1
+        )
+        df["Contrib Override Applied"] = df["Κωδικός Κράτησης (norm)"].apply(
+            lambda x: "Yes" if x in OVERRIDE_MAP else "No"
+        )
+        df = df.drop(columns=[contrib_col], errors="ignore")
+    elif "Contributions%" not in df.columns:
+        df["Contributions%"] = np.nan
+
+    projection_date = pd.Timestamp(params.projection_date)
+    df = compute_employer_contrib(df)
+    df = compute_months_projection_25(df, projection_date)
+    df = compute_fy_months_budget_26(df, pd.Timestamp(projection_date.year + 1, 1, 1), params.payroll_periods)
+    df = compute_fy_gross_salary_projection_25(df, projection_date, monthly_cost_col="Monthly Gross Salary (Current)")
+    df = compute_annual_gross_salary_fy_budget_2026(
+        df,
+        effective_increase_date=params.effective_increase_date,
+        no_increase_cutoff=params.no_increase_cutoff,
+        inc_pct=params.inc_pct,
+        inc_pct2=params.inc_pct2,
+    )
+
+    amt = pd.to_numeric(df["Monthly Employer's Contributions"], errors="coerce")
+    months = pd.to_numeric(df["Months Projection 25"], errors="coerce")
+    df["FY Employer's Contributions Projection 25"] = np.round(amt * months, 2)
+
+    df["Total Payroll Projection Cost 25"] = np.round(
+        pd.to_numeric(df["FY Gross Salary Projection For 25"], errors="coerce") +
+        pd.to_numeric(df["FY Employer's Contributions Projection 25"], errors="coerce"),
+        2
+    )
+
+    rate   = pd.to_numeric(df["Contributions%"].astype(str).str.replace(",", ".", regex=False), errors="coerce")
+    annual = pd.to_numeric(df["Annual Gross Salary FY Budget 2026"], errors="coerce").fillna(0.0)
+    months = pd.to_numeric(df["FY Months Budget 26"], errors="coerce").fillna(0.0)
+    base = annual * rate
+    add_30 = np.where(np.isclose(rate, 0.1879, atol=1e-6), 30.0 * months, 0.0)
+    add_25 = np.where(np.isclose(rate, 0.1738, atol=1e-6), 25.0 * months, 0.0)
+    df["Annual Employer's Contributions For 2026"] = np.round(base + add_30 + add_25, 2)
+
+    df["FY PAYROLL COST BUDGET 2026"] = np.round(
+        pd.to_numeric(df["Annual Gross Salary FY Budget 2026"], errors="coerce") +
+        pd.to_numeric(df["Annual Employer's Contributions For 2026"], errors="coerce"),
+        2
+    )
+
+    grade_num = pd.to_numeric(
+        df["Grade"].astype(str).str.replace(",", ".", regex=False).str.strip(),
+        errors="coerce"
+    )
+    df["Annual Training Cost"] = np.select(
+        [
+            grade_num.notna() & (grade_num < 8),
+            grade_num.notna() & (grade_num <= 9),
+            grade_num.notna() & (grade_num <= 13),
+            grade_num.notna() & (grade_num <= 18),
+            grade_num.notna() & (grade_num <= 23),
+        ],
+        [25, 150, 250, 450, 500],
+        default=0
+    ).astype(float)
+
+    meal_val = pd.to_numeric(
+        df["ΚΑΡΤΑ ΣΙΤΙΣΗΣ"].astype(str).str.replace(",", ".", regex=False).str.strip(),
+        errors="coerce"
+    )
+    df["Annual Meal Allowance/ Coupons Cost"] = np.select(
+        [meal_val.eq(3), meal_val.eq(4)],
+        [1488, 744],
+        default=0
+    ).astype(float)
+    return df
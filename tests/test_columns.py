@@ -0,0 +1,43 @@
+"""Column-role detection and its per-layout memo."""
+import pandas as pd
+import pytest
+
+from esg_core import columns, synthetic
+from esg_core.esg_extract import read_esg_extract
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    columns.clear_cache()
+    yield
+    columns.clear_cache()
+
+
+def test_role_missing_from_a_subset_is_found_in_the_full_file(fixtures, tmp_path):
+    raw = fixtures.esg_extract_raw
+    subset = synthetic.write_csv(raw[raw["Πόλη κατοικίας"] != "ΕΥΚΑΡΠΙΑ"], tmp_path / "subset.csv")
+    full = synthetic.write_csv(raw, tmp_path / "full.csv")
+
+    assert "Πόλη" not in read_esg_extract(subset).columns
+    df = read_esg_extract(full)
+    assert "Πόλη" in df.columns and "Πόλη κατοικίας" not in df.columns
+    # and stays found for the next upload of the layout
+    assert "Πόλη" in read_esg_extract(subset).columns
+
+
+def test_found_roles_are_reused():
+    markers = {"ΑΝΔΡΑΣ": "Gender", "DIVISION": "Division"}
+    first = pd.DataFrame({"a": ["ΑΝΔΡΑΣ"], "b": ["SALES DIVISION"]})
+    assert columns.resolve_roles(first, markers) == {"a": "Gender", "b": "Division"}
+    # same headers: the memo answers even when the values no longer carry the markers
+    later = pd.DataFrame({"a": ["ΓΥΝΑΙΚΑ"], "b": ["x"]})
+    assert columns.resolve_roles(later, markers) == {"a": "Gender", "b": "Division"}
+
+
+def test_missing_role_does_not_take_a_resolved_column():
+    markers = {"ΑΝΔΡΑΣ": "Gender", "ΓΥΝΑΙΚΑ": "Other"}
+    first = pd.DataFrame({"a": ["ΑΝΔΡΑΣ"], "b": ["x"]})
+    assert columns.resolve_roles(first, markers) == {"a": "Gender"}
+    later = pd.DataFrame({"a": ["ΓΥΝΑΙΚΑ"], "b": ["ΓΥΝΑΙΚΑ"]})
+    assert columns.resolve_roles(later, markers) == {"a": "Gender", "b": "Other"}
+
@@ -0,0 +1,83 @@
+"""Comp&Ben KPIs and monthly headcount against the page's per-company / per-row loops."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from esg_core import kpis
+from esg_core.esg_extract import COMPANY, DEPARTURE, EMPLOYEE_ID, HIRE
+from esg_core.headcount import ActivityMatrix, monthly_headcount
+from esg_core.salary import parse_decimal
+from tests.reference import comp_ben as ref
+
+YEARS = [2023, 2024, 2025]
+
+
+@pytest.fixture(scope="module")
+def esg(fixtures):
+    return fixtures.esg
+
+
+def excluded(df, share, seed):
+    ids = df[EMPLOYEE_ID].astype(str)
+    return set(ids.sample(frac=share, random_state=seed))
+
+
+def test_gross_earnings_parsed_on_read(fixtures, esg):
+    expected = parse_decimal(fixtures.esg_extract_raw[kpis.GROSS])
+    assert esg[kpis.GROSS].dtype == float
+    assert np.array_equal(esg[kpis.GROSS].to_numpy(), expected.to_numpy(), equal_nan=True)
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_turnover_table_matches_loop(esg, year):
+    exclude_ids, departure_ids = excluded(esg, 0.05, year), excluded(esg, 0.05, year + 1)
+    expected = ref.calculate_combined_metrics(esg.copy(), year, exclude_ids, departure_ids)
+    got = kpis.turnover_table(kpis.company_kpis(esg, year, exclude_ids, departure_ids))
+    expected[COMPANY] = expected[COMPANY].astype(str)
+    got[COMPANY] = got[COMPANY].astype(str)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_pay_gap_table_matches_loops(esg, year):
+    pay_gap = ref.calculate_gender_pay_gap(esg.copy(), year)
+    ratio = ref.calculate_annual_remuneration_ratio(esg.copy(), year)
+    # the page merged the two per-company tables
+    expected = pay_gap.merge(ratio, on=COMPANY)
+    got = kpis.pay_gap_table(kpis.company_kpis(esg, year))
+    assert got[COMPANY].astype(str).tolist() == expected[COMPANY].astype(str).tolist()
+    for col in ["Gender Pay Gap (%)", "Annual Remuneration Ratio"]:
+        assert np.allclose(got[col].astype(float), expected[col].astype(float), rtol=1e-12, atol=0, equal_nan=True), col
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_top_decile_matches_loop(esg, year):
+    expected = ref.get_top_10_percent_employees(esg.copy(), year)
+    got = kpis.company_kpis(esg, year).top_decile
+    # ties in ΜΙΚΤΕΣ ΑΠΟΔ may come out in either order: compare the earnings per company
+    assert got[COMPANY].astype(str).tolist() == expected[COMPANY].astype(str).tolist()
+    assert np.array_equal(got["Συνολικές Αποδοχές"].to_numpy(float), expected["Συνολικές Αποδοχές"].to_numpy(float), equal_nan=True)
+
+
+def test_monthly_headcount_matches_row_flags(esg):
+    flags = ref.calculate_monthly_headcount_year(esg.copy(), 2023, 2025)
+    months = [c for c in flags.columns if c[:4] in {"2023", "2024", "2025"} and len(c) == 7]
+    for group in ([COMPANY], [COMPANY, "Division", "Department"]):
+        expected = flags.groupby(group, observed=True)[months].sum().reset_index()
+        got = monthly_headcount(esg, group, HIRE, DEPARTURE, 2023, 2025)
+        assert list(got.columns) == list(expected.columns)
+        for col in group:
+            assert got[col].astype(str).tolist() == expected[col].astype(str).tolist()
+        assert np.array_equal(got[months].to_numpy(), expected[months].to_numpy())
+
+
+def test_activity_matrix_matches_row_flags(esg):
+    flags = ref.calculate_monthly_headcount_year(esg.copy(), 2024, 2025)
+    matrix = ActivityMatrix.from_frame(esg, HIRE, DEPARTURE, 2024, 2025)
+    wide = matrix.to_frame()
+    assert np.array_equal(wide.to_numpy(), flags[wide.columns].to_numpy(dtype=bool))
+    assert np.array_equal(matrix.month_totals(), flags[wide.columns].sum().to_numpy())
+
+    codes = esg.groupby(COMPANY, observed=True).ngroup().to_numpy()
+    expected = flags.groupby(COMPANY, observed=True)[list(wide.columns)].sum().to_numpy()
+    assert np.array_equal(matrix.group_sum(codes, codes.max() + 1), expected)
@@ -0,0 +1,57 @@
+"""ActiveIndex point-in-time headcounts against the boolean filter the pages used."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from esg_core.esg_extract import COMPANY, DEPARTURE, HIRE
+from esg_core.headcount import ActiveIndex
+
+
+def active_rule(df, date):
+    return ((df[HIRE] <= date) & (df[DEPARTURE].isna() | (df[DEPARTURE] > date))).to_numpy()
+
+
+@pytest.fixture(scope="module")
+def esg(fixtures):
+    return fixtures.esg
+
+
+@pytest.fixture(scope="module")
+def dates(esg):
+    # year ends plus days that are somebody's hire or departure date
+    rng = np.random.default_rng(0)
+    edges = pd.concat([esg[HIRE].dropna().sample(20, random_state=1), esg[DEPARTURE].dropna().sample(20, random_state=2)])
+    ends = pd.to_datetime([f"{y}-12-31" for y in range(2018, 2026)])
+    return list(ends) + list(edges) + list(pd.to_datetime(rng.integers(10_000, 20_500, 10), unit="D"))
+
+
+def test_counts_per_group(esg, dates):
+    index = ActiveIndex(esg[HIRE], esg[DEPARTURE], esg[COMPANY])
+    for date in dates:
+        mask = active_rule(esg, date)
+        expected = esg[mask].groupby(COMPANY, observed=True).size()
+        got = index.counts(date)
+        assert got[got > 0].sort_index().to_dict() == expected[expected > 0].sort_index().to_dict()
+        assert index.count(date) == mask.sum()
+
+
+def test_mask_and_positions(esg, dates):
+    index = ActiveIndex.from_frame(esg, HIRE, DEPARTURE, COMPANY)
+    company = esg[COMPANY].iloc[0]
+    for date in dates:
+        mask = active_rule(esg, date)
+        assert np.array_equal(index.mask(date), mask)
+        in_company = mask & (esg[COMPANY] == company).to_numpy()
+        assert np.array_equal(index.positions(date, company), np.flatnonzero(in_company))
+        assert index.count(date, company) == in_company.sum()
+
+
+def test_without_hire_dates(esg, dates):
+    index = ActiveIndex(None, esg[DEPARTURE])
+    for date in dates:
+        assert np.array_equal(index.mask(date), (esg[DEPARTURE].isna() | (esg[DEPARTURE] > date)).to_numpy())
+
+
+def test_rejects_blank_date(esg):
+    with pytest.raises(ValueError):
+        ActiveIndex(esg[HIRE], esg[DEPARTURE]).count(pd.NaT)
@@ -0,0 +1,52 @@
+"""Role classification and salary normalization against the pages' row-wise rules."""
+import numpy as np
+import pandas as pd
+
+from esg_core.roles import GRADE, JOB_PROPERTY, TITLE, role_categories
+from esg_core.salary import CONTRACT, SALARY, SalaryRules, normalize_salary
+from tests.reference import hr as ref
+
+
+def classify_rows(df):
+    # apply() turns the None of unclassified rows into NaN on some frames
+    roles = df.apply(ref.classify_role, axis=1).astype(object)
+    return roles.where(roles.notna(), None).tolist()
+
+
+def test_role_categories_match_row_wise(fixtures):
+    df = fixtures.esg
+    assert role_categories(df).tolist() == classify_rows(df)
+
+
+def test_role_categories_edge_rows():
+    df = pd.DataFrame({
+        TITLE: ["Sales Manager", "Head of IT", "CEO", "Commercial Unit Developer", "Team Lead", "HR Trainee",
+                "Plant Director", "Operator", None, "Clerk", "Supervisor"],
+        JOB_PROPERTY: ["ADMINISTRATIVE", "administrative", "Operational", "OPERATIONAL", None, "OPERATIONAL",
+                       "", "OPERATIONAL", "ADMINISTRATIVE", "other", "OPERATIONAL"],
+        GRADE: ["20", "19,5", "21", "17,5", "x", "25", None, "0,1", "22", "18", 16],
+    })
+    assert role_categories(df).tolist() == classify_rows(df)
+
+
+def test_normalize_salary_matches_row_wise(fixtures):
+    raw = fixtures.esg_extract_raw
+    # the old rule read only plain decimal-comma amounts and only knew listed contracts
+    text = raw[SALARY].astype(str)
+    plain = ~text.str.contains(".", regex=False) & raw[CONTRACT].notna() & (raw[CONTRACT].astype(str).str.strip() != "")
+    rows = raw[plain]
+    expected = ref.monthly_salary(rows)
+    assert len(rows) > 0.5 * len(raw)
+    assert np.array_equal(normalize_salary(rows).to_numpy(), expected.to_numpy(dtype=float), equal_nan=True)
+
+
+def test_normalize_salary_extensions():
+    df = pd.DataFrame({
+        SALARY: ["1.234,56", "1,234.56", "75,5", "75,5", "2500", "junk", None],
+        CONTRACT: ["ΥΠΑΛΛΗΛΟΙ", "ΥΠΑΛΛΗΛΟΙ", None, "ΥΠΑΛΛΗΛΟΙ", " αλμ - ημερομισθιοι ", "ΑΛΜ - ΗΜΕΡΟΜΙΣΘΙΟΙ", "ΑΛΜ - ΗΜΕΡΟΜΙΣΘΙΟΙ"],
+    })
+    got = normalize_salary(df)
+    # thousands separators parse; an unknown contract with a day-sized amount counts as a day rate
+    assert np.array_equal(got.to_numpy(), [1234.56, 1234.56, 75.5 * 26, 75.5, 2500 * 26, np.nan, np.nan], equal_nan=True)
+    off = normalize_salary(df, rules=SalaryRules(day_rate_below=None))
+    assert off.iloc[2] == 75.5
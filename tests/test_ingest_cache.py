@@ -0,0 +1,155 @@
+"""Upload cache and snapshot store: round trips, invalidation, eviction and the Arrow-only rule."""
+import io
+import os
+import stat
+
+import pandas as pd
+import pytest
+
+from esg_core import frame_io
+from esg_core.esg_extract import read_esg_extract
+from esg_core.ingest_cache import IngestCache
+from esg_core.snapshots import SnapshotStore
+
+
+class CountingLoader:
+    """``read_esg_extract`` that counts its calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, file_like):
+        self.calls += 1
+        return read_esg_extract(file_like)
+
+
+def text_columns(file_like):
+    return pd.read_csv(file_like)
+
+
+def int_columns(file_like):
+    # an Excel header row of numbers gives int column names, which Arrow cannot store
+    return pd.read_csv(file_like).rename(columns=lambda c: len(c))
+
+
+@pytest.fixture(scope="module")
+def upload(fixtures):
+    return fixtures.esg_extract_csv.read_bytes()
+
+
+@pytest.fixture
+def no_pickle(monkeypatch):
+    """Fail the test on any pickle write or read."""
+    def refuse(*args, **kwargs):
+        raise AssertionError("pickle used")
+    monkeypatch.setattr(frame_io.pickle, "dump", refuse)
+    monkeypatch.setattr(frame_io.pickle, "load", refuse)
+
+
+def assert_same_frame(got, expected):
+    pd.testing.assert_frame_equal(got, expected)
+    assert got.attrs == expected.attrs
+
+
+def pickle_files(folder):
+    return [name for name in os.listdir(folder) if frame_io.PICKLE_SUFFIX in name]
+
+
+def test_snapshot_round_trip(fixtures, tmp_path, no_pickle):
+    store = SnapshotStore(str(tmp_path / "snapshots"))
+    assert stat.S_IMODE(os.stat(store.root).st_mode) == 0o700
+    df = fixtures.esg
+    assert df.attrs  # compact_frame's dtype report
+    store.put("esg", df)
+    assert_same_frame(store.get("esg"), df)
+    assert store.entries()["Key"].tolist() == ["esg"]
+
+
+def test_snapshot_skips_frames_arrow_cannot_store(tmp_path, no_pickle):
+    store = SnapshotStore(str(tmp_path / "snapshots"))
+    assert store.put("ints", pd.DataFrame({1: [1, 2]})) is None
+    assert os.listdir(store.root) == []
+
+
+def test_snapshot_never_reads_pickle(tmp_path, no_pickle):
+    store = SnapshotStore(str(tmp_path / "snapshots"))
+    planted = os.path.join(store.root, "planted" + frame_io.PICKLE_SUFFIX)
+    with open(planted, "wb") as fh:
+        fh.write(b"not a frame")
+    assert store.entries().empty
+    assert store.get("planted") is None
+    assert os.path.exists(planted)  # not even opened
+
+
+def test_snapshot_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("ESG_SNAPSHOT_DIR", str(tmp_path / "env"))
+    assert SnapshotStore.from_env().root == str(tmp_path / "env")
+    monkeypatch.setenv("ESG_SNAPSHOT_DIR", "")
+    assert SnapshotStore.from_env() is None
+
+
+def test_snapshot_serves_a_fresh_cache(upload, tmp_path, no_pickle):
+    store = SnapshotStore(str(tmp_path / "snapshots"))
+    loader = CountingLoader()
+    first = IngestCache(snapshots=store).load(upload, loader, name="esg.csv", schema="esg_extract/1")
+
+    # a new process: empty memory, same store
+    cache = IngestCache(snapshots=store)
+    again = cache.load(upload, loader, name="esg.csv", schema="esg_extract/1")
+    assert loader.calls == 1 and cache.stats().snapshot_hits == 1
+    assert_same_frame(again, first)
+
+    # a schema bump parses again and keeps both snapshots
+    IngestCache(snapshots=store).load(upload, loader, name="esg.csv", schema="esg_extract/2")
+    assert loader.calls == 2
+    assert len(store.entries()) == 2
+
+
+def test_key_changes_with_loader_and_options(upload):
+    cache = IngestCache()
+    loader = CountingLoader()
+    cache.load(upload, loader, name="esg.csv")
+    cache.load(upload, loader, name="esg.csv")
+    assert loader.calls == 1
+    assert cache.make_key("h", text_columns, {}) != cache.make_key("h", int_columns, {})
+    assert cache.make_key("h", text_columns, {"sheet_name": 0}) != cache.make_key("h", text_columns, {"sheet_name": 1})
+
+
+def test_eviction_spills_and_reloads(tmp_path, no_pickle):
+    spill = tmp_path / "spill"
+    frames = {name: pd.DataFrame({"x": range(2000), "y": [name] * 2000}) for name in "abc"}
+    data = {name: df.to_csv(index=False).encode() for name, df in frames.items()}
+    budget = max(pd.read_csv(io.BytesIO(b)).memory_usage(deep=True).sum() for b in data.values()) + 1
+    cache = IngestCache(max_bytes=budget, spill_dir=str(spill))
+    assert stat.S_IMODE(os.stat(spill).st_mode) == 0o700
+
+    for name in "abc":
+        cache.load(data[name], text_columns)
+    s = cache.stats()
+    assert s.entries == 1 and s.evictions == 2 and s.spilled_entries == 2
+
+    got = cache.load(data["a"], text_columns)
+    pd.testing.assert_frame_equal(got, frames["a"])
+    assert cache.stats().disk_hits == 1 and cache.stats().misses == 3
+    assert pickle_files(spill) == []
+
+
+def test_frames_arrow_cannot_store_are_not_spilled(tmp_path, no_pickle):
+    spill = tmp_path / "spill"
+    cache = IngestCache(max_bytes=1, spill_dir=str(spill))
+    first = b"aa,bbb\n1,2\n"
+    cache.load(first, int_columns)
+    cache.load(b"c\n3\n", text_columns)
+    assert cache.stats().spilled_entries == 0 and os.listdir(spill) == []
+    # dropped, so parsed again
+    assert list(cache.load(first, int_columns).columns) == [2, 3]
+    assert cache.stats().misses == 3
+
+
+def test_leftover_spill_files_are_removed(tmp_path, no_pickle):
+    spill = tmp_path / "spill"
+    spill.mkdir()
+    for name in ["old" + frame_io.ARROW_SUFFIX, "old" + frame_io.PICKLE_SUFFIX, "keep.txt"]:
+        (spill / name).write_bytes(b"")
+    IngestCache(spill_dir=str(spill))
+    assert os.listdir(spill) == ["keep.txt"]
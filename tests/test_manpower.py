@@ -0,0 +1,113 @@
+"""Manpower budget kernels and the bonus calendars against the page's row-wise formulas."""
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from esg_core import bonus_calendar, manpower
+from esg_core.manpower import ManpowerParams
+from tests.reference import manpower as ref
+
+SALARY = "Monthly Gross Salary (Current)"
+
+# (projection date, effective increase date, no-increase cutoff)
+ANCHORS = [
+    ("2025-10-01", "2026-05-01", "2025-08-01"),
+    ("2025-03-31", "2026-03-01", "2025-12-31"),
+    ("2024-12-31", "2025-07-31", "2024-05-31"),
+    ("2025-07-31", "2026-01-01", "2025-07-31"),
+]
+
+
+def assert_same(expected, got, columns):
+    for col in columns:
+        x = np.asarray(expected[col], dtype=float)
+        y = np.asarray(got[col], dtype=float)
+        assert np.array_equal(x, y, equal_nan=True), f"{col}: {(~((x == y) | (np.isnan(x) & np.isnan(y)))).sum()} rows differ"
+
+
+@pytest.fixture(scope="module")
+def budget_rows(date_pairs):
+    rng = np.random.default_rng(1)
+    n = len(date_pairs)
+    return date_pairs.assign(**{
+        SALARY: rng.uniform(500, 6000, n).round(2),
+        "Grade": rng.choice(["0,1", "0.1", "5", "9", "12", "19", "23", "x", None], n),
+    })
+
+
+def run_kernels(module, df, projection_date, effective, cutoff, periods=14):
+    df = df.copy()
+    budget_base = pd.Timestamp(projection_date.year + 1, 1, 1)
+    df = module.compute_months_projection_25(df, projection_date)
+    df = module.compute_fy_months_budget_26(df, budget_base, periods)
+    df = module.compute_fy_gross_salary_projection_25(df, projection_date)
+    return module.compute_annual_gross_salary_fy_budget_2026(df, effective, cutoff, 0.03, 0.05)
+
+
+@pytest.mark.parametrize("projection_date, effective, cutoff", ANCHORS)
+def test_budget_kernels_match_row_wise(budget_rows, projection_date, effective, cutoff):
+    args = pd.Timestamp(projection_date), pd.Timestamp(effective), pd.Timestamp(cutoff)
+    assert_same(
+        run_kernels(ref, budget_rows, *args), run_kernels(manpower, budget_rows, *args),
+        ["Months Projection 25", "FY Months Budget 26", "FY Gross Salary Projection For 25", "Annual Gross Salary FY Budget 2026"],
+    )
+
+
+@pytest.mark.parametrize("periods", [12, 14])
+def test_fy_months_budget_payroll_periods(budget_rows, periods):
+    base = pd.Timestamp("2026-01-01")
+    expected = ref.compute_fy_months_budget_26(budget_rows.copy(), base, periods)
+    assert_same(expected, manpower.compute_fy_months_budget_26(budget_rows.copy(), base, periods), ["FY Months Budget 26"])
+
+
+def test_calendars_are_memoized_and_read_only(date_pairs):
+    bonus_calendar.clear_cache()
+    hire, retire = date_pairs["Hiring Date"], date_pairs["Retire Date"]
+    first = bonus_calendar.projection_calendar(hire, retire, "2025-10-01")
+    assert bonus_calendar.projection_calendar(hire.copy(), retire.copy(), pd.Timestamp("2025-10-01")) is first
+    assert bonus_calendar.budget_calendar(hire, retire, 2026) is bonus_calendar.budget_calendar(hire, retire, 2026)
+    assert bonus_calendar.projection_calendar(hire, retire, "2025-11-01") is not first
+    with pytest.raises(ValueError):
+        first.months_projection[0] = 1.0
+
+
+def test_projection_calendar_months(date_pairs):
+    expected = ref.compute_months_projection_25(date_pairs.copy(), pd.Timestamp("2025-10-01"))
+    calendar = bonus_calendar.projection_calendar(date_pairs["Hiring Date"], date_pairs["Retire Date"], "2025-10-01")
+    assert np.array_equal(calendar.months_projection, expected["Months Projection 25"].to_numpy(dtype=float), equal_nan=True)
+
+
+PARAMS = [
+    ManpowerParams(pd.Timestamp("2025-10-01"), pd.Timestamp("2025-08-01"), pd.Timestamp("2026-05-01"), 0.03, 0.05),
+    ManpowerParams(pd.Timestamp("2025-11-30"), pd.Timestamp("2025-12-31"), pd.Timestamp("2026-03-01"), 0.045, 0.02, 12),
+    ManpowerParams(pd.Timestamp("2024-12-31"), pd.Timestamp("2024-05-31"), pd.Timestamp("2025-07-31"), 0.0, 0.1),
+]
+
+
+@pytest.mark.parametrize("params", PARAMS)
+@pytest.mark.parametrize("with_contributions", [True, False])
+def test_derive_columns_match_page_block(fixtures, params, with_contributions):
+    contributions = fixtures.contributions if with_contributions else None
+    # the page kept the uncompacted frame; compact dtypes must not change the numbers
+    base = fixtures.base
+    expected = ref.derive_columns(base.astype({c: object for c in base.columns if base[c].dtype.kind not in "fiMb"}), params, contributions)
+    got = manpower.derive_columns(base, params, contributions)
+
+    numeric = [c for c in manpower.FINAL_ORDER if c in got.columns and c not in base.columns] + ["Contributions%"]
+    assert_same(expected, got, numeric)
+    assert (expected["Contrib Override Applied"].astype(str).to_numpy() == got["Contrib Override Applied"].astype(str).to_numpy()).all()
+
+
+def test_derive_columns_reuses_graph(fixtures):
+    graph = manpower.ColumnGraph(manpower.DERIVED_NODES)
+    params = PARAMS[0]
+    first = manpower.derive_columns(fixtures.base, params, fixtures.contributions, graph=graph)
+    changed = dataclasses.replace(params, inc_pct=0.04)
+    again = manpower.derive_columns(fixtures.base, changed, fixtures.contributions, graph=graph)
+    expected = ref.derive_columns(fixtures.base, changed, fixtures.contributions)
+    assert_same(expected, again, ["Annual Gross Salary FY Budget 2026", "FY PAYROLL COST BUDGET 2026", "Months Projection 25"])
+    assert_same(first, again, ["Months Projection 25", "FY Gross Salary Projection For 25"])
+    ran = {step.name for step in graph.last_run if step.ran}
+    assert "Annual Gross Salary 2026" in ran and "Months Projection 25" not in ran
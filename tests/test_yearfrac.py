@@ -0,0 +1,35 @@
+"""esg_core.yearfrac against the page's scalar helpers."""
+import numpy as np
+import pandas as pd
+
+from esg_core import yearfrac
+from tests.reference import manpower as ref
+
+
+def test_yearfrac_30360_matches_scalar(date_pairs):
+    hire, retire = date_pairs["Hiring Date"], date_pairs["Retire Date"]
+    expected = np.array([ref.yearfrac_30360_us(h, r) for h, r in zip(hire, retire)], dtype=float)
+    assert np.array_equal(yearfrac.yearfrac_30360_us(hire, retire), expected, equal_nan=True)
+
+
+def test_yearfrac_30360_scalars():
+    for start, end in [("2025-01-31", "2025-03-31"), ("2025-01-30", "2025-03-31"), ("2024-02-29", "2025-02-28"),
+                       ("2025-12-31", "2025-01-31"), ("2025-05-01", "2025-12-31")]:
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        assert yearfrac.yearfrac_30360_us(start, end) == ref.yearfrac_30360_us(start, end)
+    assert np.isnan(yearfrac.yearfrac_30360_us(pd.NaT, pd.Timestamp("2025-01-01")))
+
+
+def test_eomonth_matches_scalar(date_pairs):
+    hire = date_pairs["Hiring Date"]
+    for months in (-13, -1, 0, 1, 12):
+        expected = pd.to_datetime([ref.eomonth(h, months) for h in hire])
+        got = pd.to_datetime(yearfrac.eomonth(hire, months))
+        assert got.equals(pd.DatetimeIndex(expected).as_unit(got.unit))
+
+
+def test_roundup_matches_scalar():
+    x = np.array([0.0, 0.01, 0.1, 0.11, 0.5, 1.04, 2.0000001, -0.15, 11.999, np.nan])
+    for decimals in (1, 2):
+        expected = np.array([ref.roundup(v, decimals) for v in x], dtype=float)
+        assert np.array_equal(yearfrac.roundup(x, decimals), expected, equal_nan=True)
@@ -1,9 +1,18 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import math
 import io
 
+from esg_core.headcount import ActivityMatrix, monthly_headcount, unpivot_headcount
+from esg_core.kpis import (
+    company_kpis, dataset_token, median_excluding_max, overall_pay_gap, overall_remuneration_ratio,
+    pay_gap_table, turnover_table,
+)
+from esg_core.profiling import stage
+from esg_ui.currency import exchange_rate_inputs
+from esg_ui.esg_extract import esg_extract_uploader
+from esg_ui.ingest import render_memory_report
+
 
 
 # Allow larger styled tables (set it above your largest expected table)
@@ -12,74 +21,10 @@ pd.set_option("styler.render.max_elements", 1_500_000)  # e.g., 1.5M
 # Unique key for the Compensation & Benefits page
 COMP_PAGE_KEY = 'Comp_Ben'
 
-# Function to load and preprocess data
-@st.cache_data
-def load_and_preprocess_data(uploaded_file):
-    df = pd.read_csv(uploaded_file, encoding='iso-8859-7', delimiter=';')
-
-    rename_conditions = {
-        "ΑΝΔΡΑΣ": "Όνομα Φύλου",
-        "OPERATIONAL": "Job Property",
-        "ΕΥΚΑΡΠΙΑ": "Πόλη",
-        "ΑΟΡΙΣΤΟΥ ΧΡΟΝΟΥ": "Σύμβαση",
-        "DIVISION": "Division",
-        "ΕΠΑΝΑΤΙΜΟΛΟΓΗΣΗ": "Department"
-    }
-
-    renamed_columns = set()
-    for value, new_name in rename_conditions.items():
-        for col in df.columns:
-            if df[col].astype(str).str.contains(value).any() and new_name not in renamed_columns:
-                df = df.rename(columns={col: new_name})
-                renamed_columns.add(new_name)
-                break
-
-                
-    
-    df['Ημ/νία γέννησης'] = pd.to_datetime(df['Ημ/νία γέννησης'], format='%d/%m/%Y', errors='coerce')
-    df['Ημ/νία αποχώρησης'] = pd.to_datetime(df['Ημ/νία αποχώρησης'], format='%d/%m/%Y', errors='coerce')
-    df['Ημ/νία πρόσληψης'] = pd.to_datetime(df['Ημ/νία πρόσληψης'], format='%d/%m/%Y', errors='coerce')
-
-    # Rename "Κωδικός εργαζόμενου" to "Αριθμός μητρώου" if it exists
-    if 'Κωδικός εργαζόμενου' in df.columns and 'Αριθμός μητρώου' not in df.columns:
-        df = df.rename(columns={'Κωδικός εργαζόμενου': 'Αριθμός μητρώου'})
-    df['Αριθμός μητρώου'] = df['Αριθμός μητρώου'].astype(str)
-    # Translate contract type values in "Σύμβαση"
-    if 'Σύμβαση' in df.columns:
-        df['Σύμβαση'] = df['Σύμβαση'].replace({
-            'PERMANENT': 'ΑΟΡΙΣΤΟΥ ΧΡΟΝΟΥ',
-            'TEMPORARY': 'ΟΡΙΣΜΕΝΟΥ ΧΡΟΝΟΥ'
-        })
-   
-    if df['Ονομαστικός μισθός'].dtype == 'object':
-        df['Ονομαστικός μισθός'] = pd.to_numeric(
-            df['Ονομαστικός μισθός'].astype(str).str.replace(',', '.', regex=False),
-            errors='coerce'
-        )
-    else:
-        df['Ονομαστικός μισθός'] = pd.to_numeric(df['Ονομαστικός μισθός'], errors='coerce')
-
-
-    # Define all day-rate contract types
-    day_rate_contracts = {
-        'ΑΛΜ - ΗΜΕΡΟΜΙΣΘΙΟΙ',
-        'ΜΕΤΑΛΛΟΥ ΗΜΕΡΟΜΙΣΘΙΟΙ 1Η ΚΑΤΗΓΟΡΙΑ',
-        'ΜΕΤΑΛΛΟΥ ΗΜΕΡΟΜΙΣΘΙΟΙ 2Η ΚΑΤΗΓΟΡΙΑ'
-    }
-    
-    # Multiply nominal salary ×26 only for those
-    df['Ονομαστικός μισθός'] = df.apply(
-        lambda row: row['Ονομαστικός μισθός'] * 26
-        if str(row.get('Περιγραφή Σύμβασης', '')).strip().upper() in day_rate_contracts
-        else row['Ονομαστικός μισθός'],
-        axis=1
-    )
-
-   
-    df['Hire Year'] = df['Ημ/νία πρόσληψης'].dt.year
-    df['Departure Year'] = df['Ημ/νία αποχώρησης'].dt.year
-
-    return df
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_company_kpis(dataset_key, year, exclude_ids, excluded_ids, _df):
+    # _df is not hashed: dataset_key identifies its contents
+    return company_kpis(_df, year, exclude_ids, excluded_ids)
 
 # Page-specific logic
 #st.markdown("### Compensation & Benefits")
@@ -116,14 +61,12 @@ st.sidebar.markdown(
     unsafe_allow_html=True
 )
 
-uploaded_file = st.file_uploader('Choose a CSV file', type='csv', key=f'{COMP_PAGE_KEY}_file_uploader')
+# The ESG extract is shared with the HR Data Analyst page: an upload on either page is used by both
+df = esg_extract_uploader(key=f'{COMP_PAGE_KEY}_file_uploader')
 
-if uploaded_file:
-    st.session_state[f'{COMP_PAGE_KEY}_uploaded_file'] = uploaded_file
-    st.session_state[f'{COMP_PAGE_KEY}_df'] = load_and_preprocess_data(uploaded_file)
+if df is not None:
+    render_memory_report(df, key=f'{COMP_PAGE_KEY}_memory')
 
-if f'{COMP_PAGE_KEY}_df' in st.session_state:
-    df = st.session_state[f'{COMP_PAGE_KEY}_df']
     # Allow user to select start and end years for analysis
     start_year, end_year = st.sidebar.slider(
         "Select Year Range for Monthly Headcount Tab", min_value=2019, max_value=2030, value=(2024, 2025), key="year_range_slider"
@@ -132,32 +75,8 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
     year = st.sidebar.slider("Select Year for Salary & Turnover Analysis Tab", min_value=2020, max_value=2030, value=2025, key="year_slider")
 
 
-    # 🔻 Dynamic exchange rate inputs (INSERT THIS HERE)
-    companies_with_conversion = [
-        'ALUMIL YU INDUSTRY SA',
-        'ALUMIL ALBANIA Sh.P.K',
-        'ALUMIL ROM INDUSTRY SA',
-        'ALUMIL MISR FOR TRADING S.A.E.',
-        'ALPRO VLASENICA A.D.',
-        'ALUMIL MIDDLE EAST JLT'
-    ]
-
-    with st.sidebar.expander("💱 Set Exchange Rates"):
-        exchange_rates = {}
-        for company in companies_with_conversion:
-            exchange_rates[company] = st.number_input(
-                f"{company}", min_value=0.0, format="%.4f", step=0.0001,
-                value={
-                    'ALUMIL YU INDUSTRY SA': 0.0085,
-                    'ALUMIL ALBANIA Sh.P.K': 0.0103,
-                    'ALUMIL ROM INDUSTRY SA': 0.1968,
-                    'ALUMIL MISR FOR TRADING S.A.E.': 0.0176,
-                    'ALPRO VLASENICA A.D.': 0.5100,
-                    'ALUMIL MIDDLE EAST JLT': 0.2300
-                }.get(company, 1.0)
-            )
-
-    # 🔻 Use this exchange_rates dict in any function that requires currency conversion
+    # Exchange rates to EUR per company (optionally dated), used for every currency conversion below
+    fx_rates = exchange_rate_inputs()
 
 
     # Sidebar input for Exclusion - Active Employees
@@ -174,414 +93,53 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
     # Filter dataframe
     df = df[~df['Αριθμός μητρώου'].astype(str).isin(exclude_ids)]
 
-    def calculate_overall_gender_pay_gap(df, year):
-        df['Ονομαστικός μισθός'] = df['Ονομαστικός μισθός'].astype(float)
-        df = df.dropna(subset=['Ονομαστικός μισθός'])  # Remove null salary values
-        df = df[df['Ονομαστικός μισθός'] > 0]  # Exclude zero salaries
-
-        start_of_year = pd.Timestamp(f"{year}-01-01")
-        end_of_year = pd.Timestamp(f"{year}-09-30")
-
-        df_filtered = df[
-            (df['Ημ/νία πρόσληψης'] <= end_of_year) & 
-            ((df['Ημ/νία αποχώρησης'].isna()) | (df['Ημ/νία αποχώρησης'] >= start_of_year))
-        ]
-
-        gender_salary = df_filtered.groupby('Όνομα Φύλου')['Ονομαστικός μισθός'].mean()
-
-        if 'ΑΝΔΡΑΣ' in gender_salary and 'ΓΥΝΑΙΚΑ' in gender_salary:
-            male_avg = gender_salary['ΑΝΔΡΑΣ']
-            female_avg = gender_salary['ΓΥΝΑΙΚΑ']
-            gender_pay_gap = ((male_avg - female_avg) / male_avg) * 100
-        else:
-            gender_pay_gap = None
-
-        return gender_pay_gap
-
-
-    # Function to calculate Gender Pay Gap per company
-    def calculate_gender_pay_gap(df):
-        df['Ονομαστικός μισθός'] = df['Ονομαστικός μισθός'].astype(float)
-        df = df.dropna(subset=['Ονομαστικός μισθός'])  # Remove null salary values
-        df = df[df['Ονομαστικός μισθός'] > 0]  # Exclude zero salaries
-        start_of_2024 = pd.Timestamp(f"{year}-01-01")
-        end_of_2024 = pd.Timestamp(f"{year}-09-30")
-        df_2024 = df[
-            (df['Ημ/νία πρόσληψης'] <= end_of_2024) & 
-            ((df['Ημ/νία αποχώρησης'].isna()) | (df['Ημ/νία αποχώρησης'] >=  start_of_2024))
-        ]
-        
-        results = []
-        for company in df_2024['Περιγραφή εταιρίας'].unique():
-            company_df = df_2024[df_2024['Περιγραφή εταιρίας'] == company]
-            gender_salary = company_df.groupby('Όνομα Φύλου')['Ονομαστικός μισθός'].mean()
-            
-            if 'ΑΝΔΡΑΣ' in gender_salary and 'ΓΥΝΑΙΚΑ' in gender_salary:
-                male_median = gender_salary['ΑΝΔΡΑΣ']
-                female_median = gender_salary['ΓΥΝΑΙΚΑ']
-                gender_pay_gap = ((male_median - female_median) / male_median) * 100
-            else:
-                gender_pay_gap = None
-            
-            results.append({'Περιγραφή εταιρίας': company, 'Gender Pay Gap (%)': gender_pay_gap})
-        
-        return pd.DataFrame(results)
-    
-    def calculate_overall_annual_remuneration_ratio(df, year, exchange_rates):
-       
-
-        # Make a local copy to avoid modifying original df
-        df_local = df.copy()
-        # Safe conversion
-        df_local['ΜΙΚΤΕΣ ΑΠΟΔ'] = pd.to_numeric(
-            df_local['ΜΙΚΤΕΣ ΑΠΟΔ'].apply(lambda x: str(x).replace(',', '.')),
-            errors='coerce'
-        )
-        df_local = df_local.dropna(subset=['ΜΙΚΤΕΣ ΑΠΟΔ'])  # Remove null salary values
-        df_local = df_local[df_local['ΜΙΚΤΕΣ ΑΠΟΔ'] > 0]  # Exclude zero salaries
-
-        # Convert to EUR
-        df_local['Annual Salary EUR'] = df_local.apply(
-            lambda row: row['ΜΙΚΤΕΣ ΑΠΟΔ'] * exchange_rates.get(row['Περιγραφή εταιρίας'], 1.0)
-            if pd.notna(row['ΜΙΚΤΕΣ ΑΠΟΔ']) else None,
-            axis=1
-        )
-        df_local['Annual Salary EUR'] = df_local['Annual Salary EUR'].round(0).astype('Int64')
-
-        # Filter for active employees during the year
-        start_of_year = pd.Timestamp(f"{year}-01-01")
-        end_of_year = pd.Timestamp(f"{year}-12-31")
-
-        df_filtered = df_local[
-            (df_local['Ημ/νία πρόσληψης'] <= start_of_year) &
-            ((df_local['Ημ/νία αποχώρησης'].isna()) | (df_local['Ημ/νία αποχώρησης'] > end_of_year))
-        ]
-
-        valid_salaries = df_filtered['Annual Salary EUR'].dropna()
-        if len(valid_salaries) > 1:
-            highest_salary = valid_salaries.max()
-            median_salary = valid_salaries[valid_salaries != highest_salary].median()
-            annual_rem_ratio = highest_salary / median_salary if median_salary > 0 else None
-        else:
-            annual_rem_ratio = None
+    def calculate_monthly_activity(df, start_year=2020, end_year=2030):
+        # Employee × month active flags, bit-packed and kept beside df instead of one column per month
+        return ActivityMatrix.from_frame(df, 'Ημ/νία πρόσληψης', 'Ημ/νία αποχώρησης', start_year, end_year)
 
-        return annual_rem_ratio, df_filtered
 
-
-
-    # Function to calculate Annual Remuneration Ratio per company
-    def calculate_annual_remuneration_ratio(df, year=year):
-    # Replace commas with dots and convert to numeric safely
-        df['ΜΙΚΤΕΣ ΑΠΟΔ'] = pd.to_numeric(df['ΜΙΚΤΕΣ ΑΠΟΔ'].str.replace(',', '.', regex=False), errors='coerce')
-        
-        # Use 'ΜΙΚΤΕΣ ΑΠΟΔ' as annual salary
-        df['Annual Salary'] = df['ΜΙΚΤΕΣ ΑΠΟΔ']
-
-        # Define the end of 2024
-        end_of_2024 = pd.Timestamp(f"{year}-12-31")
-        start_of_2024 = pd.Timestamp(f"{year}-01-01")
-
-        # Filter employees active in 2024
-        df_2024 = df[
-            (df['Ημ/νία πρόσληψης'] <= start_of_2024) & 
-            ((df['Ημ/νία αποχώρησης'].isna()) | (df['Ημ/νία αποχώρησης'] > end_of_2024))
-        ]
-
-        results = []
-        for company in df_2024['Περιγραφή εταιρίας'].unique():
-            company_df = df_2024[df_2024['Περιγραφή εταιρίας'] == company]
-
-            # Handle cases where there might be missing or non-numeric values
-            valid_salaries = company_df['Annual Salary'].dropna()
-            if len(valid_salaries) > 1:  
-                highest_salary = valid_salaries.max()
-                median_salary = valid_salaries[valid_salaries != highest_salary].median()
-
-                annual_rem_ratio = highest_salary / median_salary if median_salary > 0 else None
-            else:
-                annual_rem_ratio = None  # Not enough valid data for calculation
-
-            results.append({'Περιγραφή εταιρίας': company, 'Annual Remuneration Ratio': annual_rem_ratio})
-
-        return pd.DataFrame(results)
-
-    def calculate_monthly_headcount_year(df, start_year=2020, end_year=2030):
-   
-
-    # Generate all months from start_year to end_year
-        months = pd.date_range(f'{start_year}-01-01', f'{end_year}-12-31', freq='MS')
-
-        # Iterate through months and compute headcount dynamically
-        for month in months:
-            next_month = month + pd.offsets.MonthBegin(1)
-            col_name = month.strftime("%Y-%m")  # e.g., "2024-01"
-            
-            df[col_name] = df.apply(
-                lambda row: (row['Ημ/νία πρόσληψης'] < next_month) and 
-                            (pd.isna(row['Ημ/νία αποχώρησης']) or row['Ημ/νία αποχώρησης'] >= next_month),
-                axis=1
-            )
-
-        return df
-
-
-    
-    # Calculate Monthly Headcount
-    def calculate_monthly_headcount(df, year = year):
-        months = pd.date_range(f'{year}-01-01', f'{year}-12-31', freq='MS')
-        for month in months:
-            next_month = month + pd.offsets.MonthBegin(1)
-            col_name = f'{month.strftime("%Y-%m")}'
-            df[col_name] = df.apply(
-                lambda row: (row['Ημ/νία πρόσληψης'] < next_month) and 
-                            (pd.isna(row['Ημ/νία αποχώρησης']) or row['Ημ/νία αποχώρησης'] >= next_month),
-                axis=1
-            )
-        return df
-    
-
-    df = calculate_monthly_headcount(df)
-
-
-    def calculate_combined_metrics(df, year):
-        start_of_period = pd.Timestamp(f"{year-1}-12-31")
-        end_of_period = pd.Timestamp(f"{year}-12-31")
-
-        # Apply filtering to exclude IDs dynamically
-        df = df[~df['Αριθμός μητρώου'].astype(str).isin(exclude_ids)]
-
-        results = []
-        companies = df['Περιγραφή εταιρίας'].unique()
-
-        for company in companies:
-            company_df = df[df['Περιγραφή εταιρίας'] == company]
-
-            # Headcount at the start of the period (end of previous year)
-            start_headcount = company_df[
-                (company_df['Ημ/νία πρόσληψης'] <= start_of_period) &
-                ((company_df['Ημ/νία αποχώρησης'].isna()) | (company_df['Ημ/νία αποχώρησης'] > start_of_period))
-            ].shape[0]
-
-            # Headcount at the end of the period (end of current year)
-            end_headcount = company_df[
-                (company_df['Ημ/νία πρόσληψης'] <= end_of_period) &
-                ((company_df['Ημ/νία αποχώρησης'].isna()) | (company_df['Ημ/νία αποχώρησης'] > end_of_period))
-            ].shape[0]
-
-            # Calculate average employees
-            average_employees = (start_headcount + end_headcount) / 2
-
-            # Filter departures to exclude specific IDs
-            departures_df = company_df[~company_df['Αριθμός μητρώου'].astype(str).isin(excluded_ids)]
-
-            # Voluntary and involuntary exits
-            voluntary_exits = departures_df[
-                (departures_df['Περιγραφή Αιτ. Αποχώρησης'] == "VOLUNTARY DEPARTURE") &
-                (departures_df['Ημ/νία αποχώρησης'].dt.year == year)
-            ].shape[0]
-
-            involuntary_exits = departures_df[
-                (departures_df['Περιγραφή Αιτ. Αποχώρησης'].str.contains('involuntary', case=False, na=False)) &
-                (departures_df['Ημ/νία αποχώρησης'].dt.year == year)
-            ].shape[0]
-
-            retirements_exits = departures_df[
-                (departures_df['Περιγραφή Αιτ. Αποχώρησης'].str.contains('retirement', case=False, na=False)) &
-                (departures_df['Ημ/νία αποχώρησης'].dt.year == year)
-            ].shape[0]
-
-            # Turnover calculations
-            voluntary_turnover = (voluntary_exits / average_employees * 100) if average_employees > 0 else 0
-            involuntary_turnover = (involuntary_exits / average_employees * 100) if average_employees > 0 else 0
-            retirement_turnover = (retirements_exits / average_employees * 100) if average_employees > 0 else 0
-            total_turnover = voluntary_turnover + involuntary_turnover + retirement_turnover
-
-            # Append results
-            results.append({
-                'Περιγραφή εταιρίας': company,
-                'Start of Period Headcount': start_headcount,
-                'End of Period Headcount': end_headcount,
-                'Average Employees': round(average_employees, 2),
-                'Voluntary Departures': voluntary_exits,
-                'Involuntary Departures': involuntary_exits,
-                'Retirement Departures': retirements_exits,
-                'Voluntary Turnover (%)': round(voluntary_turnover, 2),
-                'Involuntary Turnover (%)': round(involuntary_turnover, 2),
-                'Retirement Turnover (%)': round(retirement_turnover, 2),
-                'Total Turnover (%)': round(total_turnover, 2)
-            })
-
-        #return pd.DataFrame(results)
-        results_df = pd.DataFrame(results)
-        # Calculate totals
-        totals = pd.DataFrame([{
-        'Περιγραφή εταιρίας': 'TOTAL',
-        'Start of Period Headcount': results_df['Start of Period Headcount'].sum(),
-        'End of Period Headcount': results_df['End of Period Headcount'].sum(),
-        'Average Employees': round(results_df['Average Employees'].sum(), 2),
-        'Voluntary Departures': results_df['Voluntary Departures'].sum(),
-        'Involuntary Departures': results_df['Involuntary Departures'].sum(),
-        'Retirement Departures': results_df['Retirement Departures'].sum(),
-        'Voluntary Turnover (%)': round((results_df['Voluntary Departures'].sum() / results_df['Average Employees'].sum()) * 100, 2),
-        'Involuntary Turnover (%)': round((results_df['Involuntary Departures'].sum() / results_df['Average Employees'].sum()) * 100, 2),
-        'Retirement Turnover (%)': round((results_df['Retirement Departures'].sum() / results_df['Average Employees'].sum()) * 100, 2),
-        'Total Turnover (%)': round((
-            (results_df['Voluntary Departures'].sum() +
-            results_df['Involuntary Departures'].sum() +
-            results_df['Retirement Departures'].sum()) / results_df['Average Employees'].sum()) * 100, 2)
-
-    }])
-        # Append totals row
-        results_df = pd.concat([results_df, totals], ignore_index=True)
-
-        return results_df
-    
-
-    def aggregate_headcount_by_employee_and_month(df, start_year, end_year):
-        # Identify the columns for all selected months
-        month_cols = [col for col in df.columns if any(str(y) in col for y in range(start_year, end_year + 1))]
-        
+    def aggregate_headcount_by_employee_and_month(df, activity):
         # Define the fields to include
         employee_fields = ['Περιγραφή εταιρίας', 'Division', 'Department', 'Περιγραφή Θέσης Εργασίας', 'Επώνυμο', 'Ονομα']
         
         # Ensure only columns present in the DataFrame are used
         groupby_fields = [field for field in employee_fields if field in df.columns]
         
-        # Group by employee identifying information and sum the monthly boolean/count columns
-        # The monthly columns contain boolean (True/False) values which sum up to 1 for True (present) and 0 for False (absent).
-        grouped = df.groupby(groupby_fields, dropna=False)[month_cols].sum().reset_index()
-        
-        # Convert month columns to Int64 to display as whole numbers (headcount of 0 or 1 per row)
-        for col in month_cols:
-            grouped[col] = grouped[col].astype('Int64')
-            
-        return grouped
-
-    # Calculate start and end of period headcount for each company
-    def calculate_headcount(df, year=year):
-        start_of_period = pd.Timestamp(f"{year-1}-12-31")
-        end_of_period = pd.Timestamp(f"{year}-12-31")
-
-        results = []
-        companies = df['Περιγραφή εταιρίας'].unique()
-
-        for company in companies:
-            company_df = df[df['Περιγραφή εταιρίας'] == company]
-
-            # Headcount at the start of the period (end of 2023)
-            start_headcount = company_df[
-                (company_df['Ημ/νία πρόσληψης'] <= start_of_period) &
-                ((company_df['Ημ/νία αποχώρησης'].isna()) | (company_df['Ημ/νία αποχώρησης'] > start_of_period))
-            ].shape[0]
-
-            # Headcount at the end of the period (end of 2024)
-            end_headcount = company_df[
-                (company_df['Ημ/νία πρόσληψης'] <= end_of_period) &
-                ((company_df['Ημ/νία αποχώρησης'].isna()) | (company_df['Ημ/νία αποχώρησης'] > end_of_period))
-            ].shape[0]
-
-            results.append({
-                'Περιγραφή εταιρίας': company,
-                'Start of Period Headcount': start_headcount,
-                'End of Period Headcount': end_headcount
-            })
-
-        return pd.DataFrame(results)
+        # Group by employee identifying information and sum the packed monthly activity per group
+        # (1 for present, 0 for absent when the fields identify a single employee).
+        grouper = df.groupby(groupby_fields, dropna=False, observed=True)
+        keys = grouper.size().index
+        counts = activity.group_sum(grouper.ngroup().to_numpy(), len(keys))
 
+        # Whole numbers for display (headcount of 0 or 1 per row)
+        grouped = pd.DataFrame(counts, index=keys, columns=activity.labels).astype('Int64')
+        return grouped.reset_index()
 
     # Aggregate headcount by company
     def aggregate_headcount_by_month(df):
-        months = [col for col in df.columns if col.startswith(str(year))]
-        grouped = df.groupby('Περιγραφή εταιρίας')[months].sum().reset_index()
-        return grouped
+        return monthly_headcount(df, ['Περιγραφή εταιρίας'], 'Ημ/νία πρόσληψης', 'Ημ/νία αποχώρησης', year, year)
 
-    headcount_table = aggregate_headcount_by_month(df)
+    with stage("monthly headcount by company", rows_in=len(df)) as timed:
+        headcount_table = timed.out(aggregate_headcount_by_month(df))
 
     def aggregate_headcount_by_group(df, year=year):
-        # Identify the columns for the specified year
-        months = [col for col in df.columns if col.startswith(str(year))]
-        
         # Fill missing values in 'Div' and 'Τμήμα' with a placeholder (optional: keep as NaN for blanks)
-        df['Division'] = df['Division'].fillna('Blank')
-        df['Department'] = df['Department'].fillna('Blank')
+        # (as plain text: 'Blank' is not one of the extract's categories)
+        df['Division'] = df['Division'].astype(object).fillna('Blank')
+        df['Department'] = df['Department'].astype(object).fillna('Blank')
         
         # Group by the specified columns and sum the selected columns
-        grouped = df.groupby(['Περιγραφή εταιρίας', 'Division', 'Department'])[months].sum().reset_index()
+        grouped = monthly_headcount(
+            df, ['Περιγραφή εταιρίας', 'Division', 'Department'], 'Ημ/νία πρόσληψης', 'Ημ/νία αποχώρησης', year, year
+        )
         
         return grouped
 
     # Usage
-    headcount_Grouped_table = aggregate_headcount_by_group(df, year=year)
-
-
-
-
-
-    def get_top_10_percent_employees(df):
-        results = []
-        companies = df['Περιγραφή εταιρίας'].unique()
-
-        for company in companies:
-            company_df = df[df['Περιγραφή εταιρίας'] == company]
-
-            # Sort by total compensation
-            sorted_df = company_df.sort_values(by='Ονομαστικός μισθός', ascending=False)
-
-            # Calculate the number of employees in the top 10%
-            top_10_percent_count = max(1, int(len(sorted_df) * 0.1))
-
-            # Get the top 10% employees
-            top_10_percent_df = sorted_df.head(top_10_percent_count)
+    with stage("monthly headcount by division / department", rows_in=len(df)) as timed:
+        headcount_Grouped_table = timed.out(aggregate_headcount_by_group(df, year=year))
 
-            # Add to results
-            for _, row in top_10_percent_df.iterrows():
-                results.append({
-                    'Περιγραφή εταιρίας': company,
-                    'Αριθμός μητρώου': row['Αριθμός μητρώου'],
-                    'Επώνυμο': row['Επώνυμο'],
-                    'Ονομα': row['Ονομα'],
-                    'Ονομαστικός μισθός': row['Ονομαστικός μισθός']
-                })
 
-        return pd.DataFrame(results)
-
-
-    def get_top_10_percent_employees_2024(df):
-        results = []
-        companies = df['Περιγραφή εταιρίας'].unique()
-
-        # Filter employees active during 2024
-        start_of_2024 = pd.Timestamp("2024-01-01")
-        end_of_2024 = pd.Timestamp(f"{year}-12-31")
-        df_2024 = df[
-            (df['Ημ/νία πρόσληψης'] <= end_of_2024) & 
-            ((df['Ημ/νία αποχώρησης'].isna()) | (df['Ημ/νία αποχώρησης'] > end_of_2024))
-        ]
-
-
-        for company in companies:
-            company_df = df_2024[df_2024['Περιγραφή εταιρίας'] == company]
-
-            # Sort by total compensation
-            sorted_df = company_df.sort_values(by='ΜΙΚΤΕΣ ΑΠΟΔ', ascending=False)
-
-            # Calculate the number of employees in the top 10%
-            top_10_percent_count = math.ceil(len(sorted_df) * 0.1)
-
-            # Get the top 10% employees
-            top_10_percent_df = sorted_df.head(top_10_percent_count)
-
-            # Add to results
-            for _, row in top_10_percent_df.iterrows():
-                results.append({
-                    'Περιγραφή εταιρίας': company,
-                    'Αριθμός μητρώου': row['Αριθμός μητρώου'],
-                    'Επώνυμο': row['Επώνυμο'],
-                    'Ονομα': row['Ονομα'],
-                    'Συνολικές Αποδοχές': row['ΜΙΚΤΕΣ ΑΠΟΔ']
-                })
-
-        return pd.DataFrame(results)
 
 
 
@@ -594,8 +152,9 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
         groupby_options = ['Περιγραφή εταιρίας', 'Division', 'Department', 'Περιγραφή Θέσης Εργασίας']
         selected_groupby = st.multiselect("🔀 Group by:", groupby_options, default=['Περιγραφή εταιρίας']) 	
 
-        # Compute monthly headcount for multiple years
-        df = calculate_monthly_headcount_year(df, start_year, end_year)
+        # Compute monthly activity for multiple years
+        with stage("activity matrix", rows_in=len(df)):
+            activity = calculate_monthly_activity(df, start_year, end_year)
         
         if not selected_groupby:
             st.warning("⚠️ Please select at least one grouping field to display the headcount table.")
@@ -603,12 +162,13 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
 
         # Aggregate the headcount by company for all selected years
             def aggregate_headcount_by_month(df, groupby_fields, start_year, end_year):
-                months = [col for col in df.columns if any(str(y) in col for y in range(start_year, end_year + 1))]
-                grouped = df.groupby(groupby_fields)[months].sum().reset_index()
-                return grouped
+                return monthly_headcount(
+                    df, groupby_fields, 'Ημ/νία πρόσληψης', 'Ημ/νία αποχώρησης', start_year, end_year
+                )
 
 
-            headcount_table = aggregate_headcount_by_month(df, selected_groupby, start_year, end_year)
+            with stage("monthly headcount", rows_in=len(df)) as timed:
+                headcount_table = timed.out(aggregate_headcount_by_month(df, selected_groupby, start_year, end_year))
 
 
             # Define mapping only for display titles
@@ -643,20 +203,18 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
             with st.expander(f'📋 View Monthly Headcount Table ({start_year} - {end_year}):'):
                 # Convert only numeric columns to a proper numeric format
                 numeric_cols = headcount_table.select_dtypes(include=['number']).columns
-                st.dataframe(headcount_table.style.format({col: "{:,.0f}" for col in numeric_cols}))
+                with stage("render headcount table", rows_in=len(headcount_table)):
+                    st.dataframe(headcount_table.style.format({col: "{:,.0f}" for col in numeric_cols}))
 
 
             def export_and_display_unpivoted_headcount(df, start_year, end_year):
                 # 1. Detect month columns
                 month_cols = [col for col in df.columns if any(str(y) in col for y in range(start_year, end_year + 1))]
 
-                # 2. Melt/unpivot to long format
-                unpivoted_df = df.melt(
-                    id_vars=[col for col in df.columns if col not in month_cols],
-                    value_vars=month_cols,
-                    var_name='Month',
-                    value_name='Headcount'
-                )
+                # 2. Unpivot to long format
+                id_cols = [col for col in df.columns if col not in month_cols]
+                with stage("unpivot headcount", rows_in=len(df)) as timed:
+                    unpivoted_df = timed.out(unpivot_headcount(df[id_cols + month_cols], id_cols))
 
                 # 3. Show in Streamlit table
                 st.markdown(
@@ -664,12 +222,14 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
                     unsafe_allow_html=True
                 )
                 with st.expander(f'📋 View Monthly Headcount Table Unpivoted ({start_year} - {end_year}):'):
-                    st.dataframe(unpivoted_df.style.format({'Headcount': '{:,.0f}'}))
+                    with stage("render unpivoted headcount", rows_in=len(unpivoted_df)):
+                        st.dataframe(unpivoted_df.style.format({'Headcount': '{:,.0f}'}))
 
                 # 4. Export to Excel
                 output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                    unpivoted_df.to_excel(writer, index=False, sheet_name='Unpivoted Headcount')
+                with stage("unpivoted headcount XLSX", rows_in=len(unpivoted_df)):
+                    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+                        unpivoted_df.to_excel(writer, index=False, sheet_name='Unpivoted Headcount')
 
                 # 5. Download button
                 st.download_button(
@@ -699,7 +259,8 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
                 unsafe_allow_html=True
             )
             
-            employee_headcount_table = aggregate_headcount_by_employee_and_month(df, start_year, end_year)
+            with stage("employee headcount table", rows_in=len(df)) as timed:
+                employee_headcount_table = timed.out(aggregate_headcount_by_employee_and_month(df, activity))
             
             with st.expander('📋 View Employee Monthly Headcount Table (1 = Active, 0 = Inactive):'):
                 # Prepare a list of columns for display
@@ -785,24 +346,13 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
         # Ensure the required columns exist
         if 'Ονομαστικός μισθός' in df.columns and 'Περιγραφή εταιρίας' in df.columns and 'Ημ/νία αποχώρησης' in df.columns:
             try:
-                # Convert columns to appropriate data types
-                # Replace commas with dots in the 'Ονομαστικός μισθός' column
-                # Only replace commas if column is not numeric
-                if df['Ονομαστικός μισθός'].dtype == 'object':
-                    df['Ονομαστικός μισθός'] = pd.to_numeric(
-                        df['Ονομαστικός μισθός'].astype(str).str.replace(',', '.', regex=False),
-                        errors='coerce'
-                    )
-                else:
-                    df['Ονομαστικός μισθός'] = pd.to_numeric(df['Ονομαστικός μισθός'], errors='coerce')
-
+                # 'Ονομαστικός μισθός' is already numeric (normalize_salary in the loader)
                 df['Ημ/νία αποχώρησης'] = pd.to_datetime(df['Ημ/νία αποχώρησης'], errors='coerce')
                 # Calculate KPIs per company
                 st.subheader(f"🎯 Overall Gender Pay Gap & Remuneration Ratio for {year}")
-                ratio = calculate_overall_annual_remuneration_ratio(df, year, exchange_rates)
-                gender_pay_gap = calculate_overall_gender_pay_gap(df, year)
-                ratio, filtered_df = calculate_overall_annual_remuneration_ratio(df, year, exchange_rates)
-                gender_pay_gap = calculate_overall_gender_pay_gap(df, year)
+                with stage("overall pay gap & remuneration ratio", rows_in=len(df)):
+                    ratio, filtered_df = overall_remuneration_ratio(df, year, fx_rates)
+                    gender_pay_gap = overall_pay_gap(df, year)
 
                 st.caption(f"✅ Included {len(filtered_df)} employees with valid salaries for the remuneration ratio.")
                 with st.expander("🔎 View filtered rows used for the remuneration ratio"):
@@ -828,49 +378,26 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
                     else:
                         st.warning("⚠️ Not enough data for Annual Remuneration Ratio.")
 
-                gender_pay_gap_df = calculate_gender_pay_gap(df)
-                annual_rem_ratio_df = calculate_annual_remuneration_ratio(df)
-                
-                # Merge the two dataframes for better visualization
-                kpi_df = gender_pay_gap_df.merge(annual_rem_ratio_df, on='Περιγραφή εταιρίας')
+                # All per-company KPIs in one grouped pass, cached per dataset / year / exclusions
+                with stage("company KPIs", rows_in=len(df)):
+                    kpis = cached_company_kpis(
+                        dataset_token(df), year, tuple(sorted(exclude_ids)), tuple(sorted(excluded_ids)), df
+                    )
+
+                # Gender pay gap and remuneration ratio per company
+                kpi_df = pay_gap_table(kpis)
                 
                 # Display results
                 st.subheader("📊 Gender Pay Gap & Annual Remuneration Ratio per Company")
                 with st.expander("📊 Gender Pay Gap & Annual Remuneration Ratio per Company"):
                     st.dataframe(kpi_df.style.format({'Gender Pay Gap (%)': '{:.2f}%', 'Annual Remuneration Ratio': '{:.2f}'}))
-                # Filter rows where 'Ημ/νία αποχώρησης' is blank or in the year 2024
-                filtered_df = df[(df['Ημ/νία αποχώρησης'].isna()) | (df['Ημ/νία αποχώρησης'].dt.year > year)]
-
-                # exchange_rates = {
-                #             'ALUMIL YU INDUSTRY SA': 0.008546,
-                #             'ALUMIL ALBANIA Sh.P.K': 0.01023,
-                #             'ALUMIL ROM INDUSTRY SA': 0.2010,
-                #             'ALUMIL MISR FOR TRADING S.A.E.': 0.019,
-                #             'ALPRO VLASENICA A.D.': 0.5142,
-                #             'ALUMIL MIDDLE EAST JLT': 0.25
-                #         }
-
-                # Exclude the max 'Ονομαστικός μισθός' for each company and calculate the median
-                filtered_df = filtered_df.loc[~filtered_df.index.isin(
-                    filtered_df.groupby('Περιγραφή εταιρίας')['ΜΙΚΤΕΣ ΑΠΟΔ'].idxmax()
-                )]
-                analysis_df = filtered_df.groupby('Περιγραφή εταιρίας')['ΜΙΚΤΕΣ ΑΠΟΔ'].median().reset_index()
-
-                # Rename columns for better readability
-                analysis_df.rename(columns={
-                    'ΜΙΚΤΕΣ ΑΠΟΔ': 'Median Salary (Excluding Max)'
-                }, inplace=True)
-
-                # Sort the DataFrame in descending order and reset the index
-                #analysis_df = analysis_df.sort_values(by='Median Salary (Excluding Max)', ascending=False).reset_index(drop=True)
-                
-                analysis_df['Median Salary (Excluding Max) in EUR'] = analysis_df.apply(
-                    lambda row: row['Median Salary (Excluding Max)'] * exchange_rates.get(row['Περιγραφή εταιρίας'], 1), axis=1
-                )
+                # Median gross earnings per company without its top earner (not departed by year end)
+                with stage("median excluding max", rows_in=len(df)) as timed:
+                    analysis_df = timed.out(median_excluding_max(df, year, fx_rates))
 
 
                 # Calculate the top 10% employees for 2024
-                top_10_percent_df_2024 = get_top_10_percent_employees_2024(df)
+                top_10_percent_df_2024 = kpis.top_decile
                 with st.expander(f"Table: Top 10% Employees by Total Compensation for {year}:"):
                     st.write(top_10_percent_df_2024)
                 # Display the results as a table
@@ -936,7 +463,7 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
                 
 
                 # Call the function and display the results
-                headcount_df = calculate_headcount(df)
+                headcount_df = kpis.metrics[['Περιγραφή εταιρίας', 'Start of Period Headcount', 'End of Period Headcount']]
                 #st.subheader("Table: Start and End of Period Headcount by Company")
                 #st.write(headcount_df)
                 
@@ -960,7 +487,7 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
 
 
                 # Calculate combined metrics
-                combined_metrics_df = calculate_combined_metrics(df, year=year)
+                combined_metrics_df = turnover_table(kpis)
 
                 # Exclude TOTAL row from the heatmap
                 combined_metrics_df_no_total = combined_metrics_df[combined_metrics_df['Περιγραφή εταιρίας'] != 'TOTAL']
@@ -973,7 +500,8 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
                 )
 
                 # Display the styled DataFrame as HTML in Streamlit
-                st.dataframe(styled_df)
+                with stage("render turnover table", rows_in=len(combined_metrics_df_no_total)):
+                    st.dataframe(styled_df)
 
                 st.subheader("Summary (TOTAL)")
                 st.dataframe(combined_metrics_df[combined_metrics_df['Περιγραφή εταιρίας'] == 'TOTAL'])
@@ -981,9 +509,6 @@ if f'{COMP_PAGE_KEY}_df' in st.session_state:
                 #st.write(combined_metrics_df)
 
 
-                # Calculate combined metrics
-                combined_metrics_df = calculate_combined_metrics(df, year=year)
-
                 # Display the table as a heatmap
                 #st.subheader("Heatmap: Combined Metrics by Company")
 
@@ -5,78 +5,11 @@ import matplotlib
 from io import BytesIO
 import os
 
-
-# Function to load and preprocess data
-@st.cache_data
-def load_and_preprocess_data(uploaded_file):
-    file_name = getattr(uploaded_file, 'name', '').lower()
-
-    # Read file based on its extension.
-    if file_name.endswith('.xlsx'):
-        df = pd.read_excel(uploaded_file)
-    elif file_name.endswith('.csv'):
-        # Attempt CSV read with ISO-8859-7; if it fails, try UTF-8.
-        try:
-            df = pd.read_csv(uploaded_file, encoding='iso-8859-7', delimiter=';')
-        except UnicodeDecodeError:
-            df = pd.read_csv(uploaded_file, encoding='utf-8', delimiter=';')
-    else:
-        # When extension is unclear, try CSV first, then Excel.
-        try:
-            df = pd.read_csv(uploaded_file, encoding='iso-8859-7', delimiter=';')
-        except Exception:
-            try:
-                df = pd.read_csv(uploaded_file, encoding='utf-8', delimiter=';')
-            except Exception:
-                df = pd.read_excel(uploaded_file)
-
-    rename_conditions = {
-        "ΑΝΔΡΑΣ": "Όνομα Φύλου",
-        "OPERATIONAL": "Job Property",
-        "ΕΥΚΑΡΠΙΑ": "Πόλη",
-        "ΑΟΡΙΣΤΟΥ ΧΡΟΝΟΥ": "Σύμβαση",
-        "DIVISION": "Division",
-        "ΕΠΑΝΑΤΙΜΟΛΟΓΗΣΗ": "Department"
-    }
-
-    renamed_columns = set()
-    for value, new_name in rename_conditions.items():
-        for col in df.columns:
-            try:
-                if df[col].astype(str).str.contains(value).any() and new_name not in renamed_columns:
-                    df = df.rename(columns={col: new_name})
-                    renamed_columns.add(new_name)
-                    break
-            except Exception as e:
-                print(f"Error with column {col}: {e}")
-
-   
-    df['Ημ/νία γέννησης'] = pd.to_datetime(df['Ημ/νία γέννησης'], format='%d/%m/%Y', errors='coerce')
-    df['Ημ/νία αποχώρησης'] = pd.to_datetime(df['Ημ/νία αποχώρησης'], format='%d/%m/%Y', errors='coerce')
-    df['Ημ/νία πρόσληψης'] = pd.to_datetime(df['Ημ/νία πρόσληψης'], format='%d/%m/%Y', errors='coerce')
-     
-
-    df['Hire Year'] = df['Ημ/νία πρόσληψης'].dt.year
-    df['Departure Year'] = df['Ημ/νία αποχώρησης'].dt.year
-    
-    # Rename "Κωδικός εργαζόμενου" to "Αριθμός μητρώου" if it exists
-    if 'Κωδικός εργαζόμενου' in df.columns and 'Αριθμός μητρώου' not in df.columns:
-        df = df.rename(columns={'Κωδικός εργαζόμενου': 'Αριθμός μητρώου'})
-    df['Αριθμός μητρώου'] = df['Αριθμός μητρώου'].astype(str)
-    # Translate contract type values in "Σύμβαση"
-    if 'Σύμβαση' in df.columns:
-        df['Σύμβαση'] = df['Σύμβαση'].replace({
-            'PERMANENT': 'ΑΟΡΙΣΤΟΥ ΧΡΟΝΟΥ',
-            'TEMPORARY': 'ΟΡΙΣΜΕΝΟΥ ΧΡΟΝΟΥ'
-        })
-        
-    return df
-
-# Initialize session state
-if 'uploaded_file' not in st.session_state:
-    st.session_state.uploaded_file = None
-if 'df' not in st.session_state:
-    st.session_state.df = None
+from esg_core.profiling import stage
+from esg_core.roles import role_categories
+from esg_ui.esg_extract import esg_extract_name, esg_extract_uploader
+from esg_ui.indexes import active_index, filter_index
+from esg_ui.ingest import render_memory_report
 
 # Custom HTML and CSS for the header
 header_html = """
@@ -93,13 +26,9 @@ header_html = """
 # Display the header in the Streamlit app
 st.markdown(header_html, unsafe_allow_html=True)
 
-# File uploader
-uploaded_file = st.file_uploader('Choose a CSV file', type='csv')
+# File uploader (the ESG extract is shared with the Comp&Ben page: an upload on either page is used by both)
+esg_df = esg_extract_uploader()
 
-# Load and store data in session state
-if uploaded_file is not None:
-    st.session_state.uploaded_file = uploaded_file
-    st.session_state.df = load_and_preprocess_data(uploaded_file)
 if 'file_saved' not in st.session_state:
     st.session_state.file_saved = False
 
@@ -107,36 +36,22 @@ if 'file_saved' not in st.session_state:
 # Check if data is available in session state
 import os
 
-if st.session_state.df is not None:
-    df = st.session_state.df.copy()
-    df['Αριθμός μητρώου'] = df['Αριθμός μητρώου'].astype(str).str.strip()
+if esg_df is not None:
+    # Shallow copy: the columns added below stay on this page
+    df = esg_df.copy(deep=False)
+    render_memory_report(esg_df, key='hr_memory')
 
-    # Safe numeric conversion
-    if df['Ονομαστικός μισθός'].dtype == 'object':
-        df['Ονομαστικός μισθός'] = pd.to_numeric(
-            df['Ονομαστικός μισθός'].astype(str).str.replace(',', '.', regex=False),
-            errors='coerce'
-        )
-    else:
-        df['Ονομαστικός μισθός'] = pd.to_numeric(df['Ονομαστικός μισθός'], errors='coerce')
-
-    # Salary adjustment
-    df['Ονομαστικός μισθός'] = df.apply(
-        lambda row: row['Ονομαστικός μισθός'] * 26 if row['Περιγραφή Σύμβασης'] == 'ΑΛΜ - ΗΜΕΡΟΜΙΣΘΙΟΙ' else row['Ονομαστικός μισθός'],
-        axis=1
-    )
-
-    
+    # IDs are stripped text and 'Ονομαστικός μισθός' is numeric and monthly already (esg_core.esg_extract)
 
     # Replace dots with commas in numeric columns before saving
-    df_to_save = df.copy()
-    df_to_save['Ονομαστικός μισθός'] = df_to_save['Ονομαστικός μισθός'].apply(
-        lambda x: f"{x:.2f}".replace('.', ',') if pd.notnull(x) else ''
-    )
-
     from io import BytesIO
     output = BytesIO()
-    df_to_save.to_csv(output, index=False, encoding='iso-8859-7', sep=';')
+    with stage("CSV export", rows_in=len(df)):
+        df_to_save = df.copy()
+        df_to_save['Ονομαστικός μισθός'] = df_to_save['Ονομαστικός μισθός'].apply(
+            lambda x: f"{x:.2f}".replace('.', ',') if pd.notnull(x) else ''
+        )
+        df_to_save.to_csv(output, index=False, encoding='iso-8859-7', sep=';')
     st.download_button(
         label="Download CSV",
         data=output.getvalue(),
@@ -144,7 +59,7 @@ if st.session_state.df is not None:
         mime="text/csv",
     )
 
-    original_filename = getattr(st.session_state.uploaded_file, 'name', 'ESG_2024.csv')
+    original_filename = esg_extract_name('ESG_2024.csv')
 
     # Save locally with commas instead of dots
     local_save_path = r"C:\Users\sy.papadopoulos\OneDrive - Alumil S.A\Desktop\Esg Group"
@@ -207,6 +122,14 @@ if st.session_state.df is not None:
     labels = ['<30', '30-50', '>50']
     df['Age Group'] = pd.cut(df['Age as of Selected Date'], bins=bins, labels=labels)
 
+    # Sidebar filter options and row masks for both tabs, from one bitset index over the filter columns
+    # (blank values stay selectable, as 'nan')
+    with stage("filter index", rows_in=len(df)):
+        filters = filter_index(df, [
+            'Περιγραφή εταιρίας', 'Πόλη', 'Division', 'Department', 'Όνομα Φύλου',
+            'Job Property', 'Σύμβαση', 'Age Group', 'Περιγραφή Αιτ. Αποχώρησης',
+        ], dropna=False)
+
     with tab1:
         st.sidebar.header('Grouping Criteria')
         group_columns = st.sidebar.multiselect(
@@ -215,43 +138,35 @@ if st.session_state.df is not None:
         )
         # Filter Criteria
         st.sidebar.header('Filter Criteria')
-        selected_companies = st.sidebar.multiselect('Select Companies:', options=df['Περιγραφή εταιρίας'].unique(), key='companies_main')
-        selected_cities = st.sidebar.multiselect('Select Cities:', options=df['Πόλη'].unique(), key='cities_main')
-        selected_divisions = st.sidebar.multiselect('Select Division:', options=df['Division'].unique(), key='division_main')
-        selected_departments = st.sidebar.multiselect('Select Department:', options=df['Department'].unique(), key='department_main')
-        selected_genders = st.sidebar.multiselect('Select Genders:', options=df['Όνομα Φύλου'].unique(), key='genders_main')
-        selected_property = st.sidebar.multiselect('Select Job Property:', options=df['Job Property'].unique(), key='property_main')
-        selected_contracts = st.sidebar.multiselect('Select Contracts:', options=df['Σύμβαση'].unique(), key='contracts_main')
-        selected_age_groups = st.sidebar.multiselect('Select Age Groups:', options=df['Age Group'].unique(), key='age_groups_main')
-
-        filtered_df = df[
-    # Exclude rows based on 'Αριθμός μητρώου'
-    ~df['Αριθμός μητρώου'].isin(exclude_set) &
-    
-    # Ensure 'Ημ/νία πρόσληψης' is not null and less than 'year_input'
-    (df['Ημ/νία πρόσληψης'].notna() & (df['Ημ/νία πρόσληψης'].dt.date <= year_input)) &
-
-    # 'Ημ/νία αποχώρησης' is either null or its year is less than 'year_input'
-    (df['Ημ/νία αποχώρησης'].isna() | (df['Ημ/νία αποχώρησης'].dt.date > year_input))
-]
-
-        total_count = filtered_df.shape[0]
-        if selected_companies:
-            filtered_df = filtered_df[filtered_df['Περιγραφή εταιρίας'].isin(selected_companies)]
-        if selected_cities:
-            filtered_df = filtered_df[filtered_df['Πόλη'].isin(selected_cities)]
-        if selected_divisions:
-            filtered_df = filtered_df[filtered_df['Division'].isin(selected_divisions)]
-        if selected_departments:
-            filtered_df = filtered_df[filtered_df['Department'].isin(selected_departments)]
-        if selected_genders:
-            filtered_df = filtered_df[filtered_df['Όνομα Φύλου'].isin(selected_genders)]
-        if selected_property:
-            filtered_df = filtered_df[filtered_df['Job Property'].isin(selected_property)]
-        if selected_contracts:
-            filtered_df = filtered_df[filtered_df['Σύμβαση'].isin(selected_contracts)]
+        selected_companies = st.sidebar.multiselect('Select Companies:', options=filters.options('Περιγραφή εταιρίας'), key='companies_main')
+        selected_cities = st.sidebar.multiselect('Select Cities:', options=filters.options('Πόλη'), key='cities_main')
+        selected_divisions = st.sidebar.multiselect('Select Division:', options=filters.options('Division'), key='division_main')
+        selected_departments = st.sidebar.multiselect('Select Department:', options=filters.options('Department'), key='department_main')
+        selected_genders = st.sidebar.multiselect('Select Genders:', options=filters.options('Όνομα Φύλου'), key='genders_main')
+        selected_property = st.sidebar.multiselect('Select Job Property:', options=filters.options('Job Property'), key='property_main')
+        selected_contracts = st.sidebar.multiselect('Select Contracts:', options=filters.options('Σύμβαση'), key='contracts_main')
+        selected_age_groups = st.sidebar.multiselect('Select Age Groups:', options=filters.options('Age Group'), key='age_groups_main')
+
+        # Active on 'year_input': hired on/before it and not departed on/before it
+        with stage("active on date", rows_in=len(df)) as timed:
+            active_on_date = timed.out(active_index(df, 'Ημ/νία πρόσληψης', 'Ημ/νία αποχώρησης').mask(year_input))
+
+        # Exclude rows based on 'Αριθμός μητρώου'
+        base_mask = ~df['Αριθμός μητρώου'].isin(exclude_set).to_numpy() & active_on_date
+        total_count = int(base_mask.sum())
+
+        with stage("headcount filters", rows_in=len(df)) as timed:
+            filtered_df = timed.out(df[filters.mask({
+                'Περιγραφή εταιρίας': selected_companies,
+                'Πόλη': selected_cities,
+                'Division': selected_divisions,
+                'Department': selected_departments,
+                'Όνομα Φύλου': selected_genders,
+                'Job Property': selected_property,
+                'Σύμβαση': selected_contracts,
+                'Age Group': selected_age_groups,
+            }, within=base_mask)])
         if selected_age_groups:
-            filtered_df = filtered_df[filtered_df['Age Group'].isin(selected_age_groups)]
             filtered_df['Age Group'] = filtered_df['Age Group'].cat.remove_unused_categories()
 
         count = filtered_df.shape[0]
@@ -337,7 +252,8 @@ if st.session_state.df is not None:
         # )
 
         if group_columns:
-            grouped_df = filtered_df.groupby(group_columns)['Αριθμός μητρώου'].count().reset_index()
+            with stage("headcount grouping", rows_in=len(filtered_df)) as timed:
+                grouped_df = timed.out(filtered_df.groupby(group_columns, observed=True)['Αριθμός μητρώου'].count().reset_index())
             grouped_df = grouped_df.sort_values(by='Αριθμός μητρώου', ascending=False)
             grouped_df.rename(columns={'Αριθμός μητρώου': 'Count'}, inplace=True)
             
@@ -392,38 +308,9 @@ if st.session_state.df is not None:
             df_101['Περιγραφή Θέσης Εργασίας'] = df_101['Περιγραφή Θέσης Εργασίας'].astype(str).str.lower()
             df_101['Job Property'] = df_101['Job Property'].astype(str).str.lower()
 
-            # Define role categories
-            def classify_role(row):
-                title = row['Περιγραφή Θέσης Εργασίας'].lower()
-                prop = row['Job Property'].lower()
-                raw_grade = row.get('GRADE', '0')
-
-                try:
-                    grade = float(str(raw_grade).replace(',', '.'))
-                except (ValueError, TypeError):
-                    grade = 0
-
-                if 'trainee' in title:
-                    return 'Trainee'
-                elif 'director' in title:
-                    return 'Director'
-                elif 'commercial unit developer' in title and grade > 17:
-                    return 'Manager'
-                elif ('manager' in title or 'head' in title or 'ceo' in title) and grade >= 20:
-                    return 'Director'
-                elif ('manager' in title or 'head' in title or 'supervisor' in title or 'lead' in title or 'executive' in title) and grade > 16:
-                    return 'Manager'
-                elif prop == 'administrative':
-                    return 'Office Worker'
-                elif prop == 'operational':
-                    return 'Worker'
-                else:
-                    return None
-
-
-
-            # Apply classification
-            df_101['Role Category'] = df_101.apply(classify_role, axis=1)
+            # Apply classification (rules in esg_core.roles)
+            with stage("role classification", rows_in=len(df_101)):
+                df_101['Role Category'] = role_categories(df_101)
 
             # Keep only classified rows
             role_df = df_101[df_101['Role Category'].notnull()]
@@ -431,7 +318,7 @@ if st.session_state.df is not None:
             # Group and count
             role_summary = (
                 role_df
-                .groupby(['Role Category', 'Περιγραφή Θέσης Εργασίας', 'Αριθμός μητρώου', 'Όνομα Φύλου', 'Επώνυμο', 'Ονομα', 'GRADE'])
+                .groupby(['Role Category', 'Περιγραφή Θέσης Εργασίας', 'Αριθμός μητρώου', 'Όνομα Φύλου', 'Επώνυμο', 'Ονομα', 'GRADE'], observed=True)
                 .size()
                 .reset_index(name='Count')
             )
@@ -440,7 +327,7 @@ if st.session_state.df is not None:
             # Group by Gender and Role Category
             gender_total = (
                 role_summary
-                .groupby(['Όνομα Φύλου', 'Role Category'])['Count']
+                .groupby(['Όνομα Φύλου', 'Role Category'], observed=True)['Count']
                 .sum()
                 .reset_index()
                 .rename(columns={'Count': 'Total by Group'})
@@ -483,7 +370,7 @@ if st.session_state.df is not None:
             # Group and count
             group_table = (
                 grade_filtered_df
-                .groupby(['Περιγραφή εταιρίας', "Όνομα Φύλου", 'Επώνυμο', 'Ονομα', 'Αριθμός μητρώου', 'GRADE', 'Περιγραφή Θέσης Εργασίας'])
+                .groupby(['Περιγραφή εταιρίας', "Όνομα Φύλου", 'Επώνυμο', 'Ονομα', 'Αριθμός μητρώου', 'GRADE', 'Περιγραφή Θέσης Εργασίας'], observed=True)
                 .agg({'Ονομα': 'count'})
                 .rename(columns={'Ονομα': 'Count'})
                 .reset_index()
@@ -492,7 +379,7 @@ if st.session_state.df is not None:
             # Compute total by gender
             gender_summary = (
                 group_table
-                .groupby("Όνομα Φύλου")['Count']
+                .groupby("Όνομα Φύλου", observed=True)['Count']
                 .sum()
                 .reset_index()
                 .rename(columns={'Count': 'Total by Gender'})
@@ -537,22 +424,21 @@ if st.session_state.df is not None:
         )
 
         st.sidebar.header('Filter Criteria for Hires and Departures')
-        selected_companies_hd = st.sidebar.multiselect('Select Companies:', options=df['Περιγραφή εταιρίας'].unique(), key='companies_hd')
-        selected_cities_hd = st.sidebar.multiselect('Select Cities:', options=df['Πόλη'].unique(), key='cities_hd')
-        selected_genders_hd = st.sidebar.multiselect('Select Genders:', options=df['Όνομα Φύλου'].unique(), key='genders_hd')
+        selected_companies_hd = st.sidebar.multiselect('Select Companies:', options=filters.options('Περιγραφή εταιρίας'), key='companies_hd')
+        selected_cities_hd = st.sidebar.multiselect('Select Cities:', options=filters.options('Πόλη'), key='cities_hd')
+        selected_genders_hd = st.sidebar.multiselect('Select Genders:', options=filters.options('Όνομα Φύλου'), key='genders_hd')
         selected_age_groups_hd = st.sidebar.multiselect('Select Age Groups:', options=df['Age Group'].cat.categories.tolist(), key='age_groups_hd')
-        selected_departure_reasons = st.sidebar.multiselect('Select Departure Reasons:', options=df['Περιγραφή Αιτ. Αποχώρησης'].unique(), key='departure_reasons_hd')
+        selected_departure_reasons = st.sidebar.multiselect('Select Departure Reasons:', options=filters.options('Περιγραφή Αιτ. Αποχώρησης'), key='departure_reasons_hd')
 
         # General filtering (applied to both hires and departures)
-        filtered_df_hd = df[~df['Αριθμός μητρώου'].isin(exclude_set)]
-        if selected_companies_hd:
-            filtered_df_hd = filtered_df_hd[filtered_df_hd['Περιγραφή εταιρίας'].isin(selected_companies_hd)]
-        if selected_cities_hd:
-            filtered_df_hd = filtered_df_hd[filtered_df_hd['Πόλη'].isin(selected_cities_hd)]
-        if selected_genders_hd:
-            filtered_df_hd = filtered_df_hd[filtered_df_hd['Όνομα Φύλου'].isin(selected_genders_hd)]
+        with stage("hires & departures filters", rows_in=len(df)) as timed:
+            filtered_df_hd = timed.out(df[filters.mask({
+                'Περιγραφή εταιρίας': selected_companies_hd,
+                'Πόλη': selected_cities_hd,
+                'Όνομα Φύλου': selected_genders_hd,
+                'Age Group': selected_age_groups_hd,
+            }, within=~df['Αριθμός μητρώου'].isin(exclude_set).to_numpy())])
         if selected_age_groups_hd:
-            filtered_df_hd = filtered_df_hd[filtered_df_hd['Age Group'].isin(selected_age_groups_hd)]
             filtered_df_hd['Age Group'] = filtered_df_hd['Age Group'].cat.remove_unused_categories()
 
         import pandas as pd
@@ -670,7 +556,7 @@ if st.session_state.df is not None:
         # )
 
         if group_columns_hd_2:
-            hires_grouped_df_hd = hires_df.groupby(group_columns_hd_2)['Αριθμός μητρώου'].count().reset_index()
+            hires_grouped_df_hd = hires_df.groupby(group_columns_hd_2, observed=True)['Αριθμός μητρώου'].count().reset_index()
             hires_grouped_df_hd.rename(columns={'Αριθμός μητρώου': 'Count'}, inplace=True)
             
             with st.expander('Grouped DataFrame for Hires:'):
@@ -693,7 +579,7 @@ if st.session_state.df is not None:
         #   
 
         if group_columns_hd:
-            departures_grouped_df_hd = departures_df.groupby(group_columns_hd)['Αριθμός μητρώου'].count().reset_index()
+            departures_grouped_df_hd = departures_df.groupby(group_columns_hd, observed=True)['Αριθμός μητρώου'].count().reset_index()
             departures_grouped_df_hd.rename(columns={'Αριθμός μητρώου': 'Count'}, inplace=True)
             
             with st.expander('Grouped DataFrame for Departures:'):
@@ -3,9 +3,28 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
 import plotly.express as px
 import io
+import os
+
+from esg_core.attrition import (
+    SimulationConfig, employee_rates, group_labels, historical_attrition_rates, simulate_attrition, simulation_workbook,
+)
+from esg_core.bonus_calendar import clear_cache as clear_calendar_cache
+from esg_core.budget import BudgetInputs, BudgetParams
+from esg_core.columns import clear_cache as clear_column_cache
+from esg_core.dag import ColumnGraph, param_token
+from esg_core.dtypes import compact_frame
+from esg_core.manpower import (
+    BOOKING_CODE_COL, DERIVED_NODES, DIM_COLS, OVERRIDE_CODES, ManpowerParams, clean_table, derive_columns,
+    final_frame, parse_table, prepare_base, with_totals,
+)
+from esg_core.notices import collect
+from esg_core.profiling import stage
+from esg_core.scenarios import comparison_table, comparison_workbook, scenario_grid, sweep_payroll_budget
+from esg_ui.indexes import active_index, filter_index
+from esg_ui.ingest import cached_read, ingest_cache, render_memory_report
+from esg_ui.notices import render_notices
 
 st.title("📊 Manpower Budget Automation for Alumil S.A. & Subsidiaries")
 
@@ -17,6 +36,10 @@ st.sidebar.header("⚙️ Projection Parameters")
 # Cache reset (helps when file contents/dtypes change)
 if st.sidebar.button("♻️ Reset file read cache"):
     st.cache_data.clear()
+    ingest_cache().clear()
+    clear_calendar_cache()
+    clear_column_cache()
+    st.session_state.pop("derived_graph", None)
     st.sidebar.success("Cache cleared. Re-run with your files.")
 
 format_mode = st.sidebar.radio(
@@ -47,7 +70,6 @@ New_Hires = st.sidebar.date_input(
 )
 
 budget_year = projection_date.year + 1
-budget_base_date = pd.Timestamp(budget_year, 1, 1)
 
 salary_increase_pct = st.sidebar.number_input(
     "Average Salary Increase %", value=3.0, step=0.1
@@ -57,789 +79,57 @@ salary_increase_pct2 = st.sidebar.number_input(
     "Average Salary Increase % for 0.1", value=5.0, step=0.1
 ) / 100.0
 
+# Every computation below reads these explicitly (esg_core.manpower)
+params = ManpowerParams(
+    projection_date=projection_date,
+    no_increase_cutoff=no_increase_cutoff,
+    effective_increase_date=effective_increase_date,
+    inc_pct=salary_increase_pct,
+    inc_pct2=salary_increase_pct2,
+    payroll_periods=payroll_periods,
+)
+
 # ───────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ───────────────────────────────────────────────────────────────────────────────
-DATE_CANDIDATES = [
-    "Ημ/νία γέννησης", "Ημ/νία αποχώρησης", "Ημ/νία πρόσληψης",
-    "Hiring Date", "Retire Date", "Date", "Date of Birth", "Hire Date"
-]
-
-@st.cache_data(show_spinner=True)
 def read_any(uploaded_file, sheet_name=None, header_row=0):
-    """Read Excel/CSV robustly (Greek encodings, ; or , delimiters)."""
-    name = getattr(uploaded_file, "name", "").lower()
-
-    if name.endswith(".xlsx") or name.endswith(".xls"):
-        return pd.read_excel(uploaded_file, sheet_name=sheet_name, header=header_row)
-
-    # CSV fallbacks
-    for enc, delim in [("iso-8859-7", ";"), ("utf-8", ";"), ("utf-8", ",")]:
-        try:
-            return pd.read_csv(uploaded_file, encoding=enc, delimiter=delim)
-        except Exception:
-            pass
-    raise ValueError("Could not read the uploaded file as CSV/Excel.")
-
-def coerce_dates(df: pd.DataFrame) -> pd.DataFrame:
-    """Coerce known date columns (Greek & English) with dayfirst=True."""
-    for c in DATE_CANDIDATES:
-        if c in df.columns:
-            df[c] = pd.to_datetime(df[c], errors="coerce", dayfirst=True)
-
-    # Derived years (works regardless of which naming is present)
-    if "Ημ/νία πρόσληψης" in df.columns and "Hire Year" not in df.columns:
-        df["Hire Year"] = pd.to_datetime(df["Ημ/νία πρόσληψης"], errors="coerce", dayfirst=True).dt.year
-    if "Ημ/νία αποχώρησης" in df.columns and "Departure Year" not in df.columns:
-        df["Departure Year"] = pd.to_datetime(df["Ημ/νία αποχώρησης"], errors="coerce", dayfirst=True).dt.year
-    if "Hire Date" in df.columns and "Hire Year" not in df.columns:
-        df["Hire Year"] = pd.to_datetime(df["Hire Date"], errors="coerce").dt.year
-    if "Retire Date" in df.columns and "Departure Year" not in df.columns:
-        df["Departure Year"] = pd.to_datetime(df["Retire Date"], errors="coerce").dt.year
-    return df
-
-def find_and_rename_column_with_exact_value(df: pd.DataFrame, value: str, new_name: str) -> pd.DataFrame:
-    """
-    Find the first column that contains an EXACT row value (stripped) == `value`,
-    then rename that column to `new_name`. Handles mixed dtypes safely.
-    """
-    target = str(value).strip()
-    for col in df.columns:
-        series = df[col]
-        if not isinstance(series, pd.Series):
-            continue
-        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
-            try:
-                if series.dropna().astype(str).str.strip().eq(target).any():
-                    if new_name not in df.columns:
-                        df = df.rename(columns={col: new_name})
-                    break
-            except Exception:
-                pass
-    return df
-
-def to_excel_bytes(dataframe: pd.DataFrame) -> bytes:
-    buf = io.BytesIO()
-    with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
-        dataframe.to_excel(writer, index=False, sheet_name="Data")
-    return buf.getvalue()
-
-def normalize_code(series: pd.Series) -> pd.Series:
-    """
-    Extract the first 5-digit booking code from each cell.
-    Examples:
-      '40,602'     -> '40602'
-      '40602,0'    -> '40602'
-      '40.602,0'   -> '40602'
-      'Κωδ: 40602' -> '40602'
-    """
-    s = series.astype(str).str.strip()
-    # Replace all non-digits with a space, then extract the first 5-digit token
-    s = s.str.replace(r"\D+", " ", regex=True)
-    code5 = s.str.extract(r"(\d{5})", expand=False)
-    return code5
-
-# --- Helper: drop duplicate-named columns, keep first ---
-def drop_dup_named_cols(df: pd.DataFrame) -> pd.DataFrame:
-    return df.loc[:, ~pd.Index(df.columns).duplicated()].copy()
-
-def compute_employer_contrib(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Compute employer contribution amount from Contributions% and Monthly Gross Salary (Current).
-    Rules:
-      - If rate == 0.1738 → rate*salary + 25
-      - If rate == 0.1879 → rate*salary + 30
-      - Else → rate*salary
-    Writes: "Monthly Employer's Contributions" (rounded to 2 decimals).
-    """
-    need = {"Monthly Gross Salary (Current)", "Contributions%"}
-    if not need.issubset(df.columns):
-        st.warning("⚠️ Missing columns to compute employer contributions (need salary & Contributions%).")
-        return df
-
-    rate = pd.to_numeric(df["Contributions%"], errors="coerce")
-    salary = pd.to_numeric(df["Monthly Gross Salary (Current)"], errors="coerce")
-
-    base = rate * salary
-    add_25 = np.isclose(rate, 0.1738, atol=1e-6)
-    add_30 = np.isclose(rate, 0.1879, atol=1e-6)
-
-    amount = np.where(add_25, rate * salary + 25, base)
-    amount = np.where(add_30, rate * salary + 30, amount)
-
-    df["Monthly Employer's Contributions"] = np.round(amount, 2)
-    return df
-
-from calendar import monthrange
-
-def eomonth(dt: pd.Timestamp, months: int = 0) -> pd.Timestamp:
-    """Excel-like EOMONTH(dt, months). Returns last day of month after offset."""
-    if pd.isna(dt):
-        return pd.NaT
-    y = dt.year + (dt.month - 1 + months) // 12
-    m = (dt.month - 1 + months) % 12 + 1
-    last_day = monthrange(y, m)[1]
-    return pd.Timestamp(y, m, last_day)
-
-def yearfrac(start: pd.Timestamp, end: pd.Timestamp) -> float:
-    """
-    Approximate Excel YEARFRAC(start, end) with ACT/365.
-    (If you need exact 30/360 later, we can switch.)
-    """
-    if pd.isna(start) or pd.isna(end):
-        return np.nan
-    return (end - start).days / 365.0
-
-
-def yearfrac_30360_us(start, end):
-    if pd.isna(start) or pd.isna(end):
-        return np.nan
-    y1, m1, d1 = start.year, start.month, start.day
-    y2, m2, d2 = end.year, end.month, end.day
-    # US (NASD) 30/360 rules
-    if d1 == 31: d1 = 30
-    if d2 == 31 and d1 == 30: d2 = 30
-    return ((360*(y2 - y1)) + (30*(m2 - m1)) + (d2 - d1)) / 360.0
-
-
-def roundup(x, decimals=1):
-    if pd.isna(x):
-        return np.nan
-    factor = 10 ** decimals
-    return np.ceil(x * factor) / factor
-
-
-def compute_months_projection_25(df: pd.DataFrame, projection_date: pd.Timestamp) -> pd.DataFrame:
-    """
-    Python translation of your revised Excel LET() for 'Months Projection 25',
-    with robust datetime handling to avoid int↔Timestamp comparisons.
-    """
-    # Ensure expected columns
-    if "Hiring Date" not in df.columns:
-        if "Hire Date" in df.columns:
-            df = df.rename(columns={"Hire Date": "Hiring Date"})
-        else:
-            st.warning("⚠️ Cannot compute 'Months Projection 25' (missing 'Hiring Date').")
-            return df
-    if "Retire Date" not in df.columns:
-        st.warning("⚠️ Cannot compute 'Months Projection 25' (missing 'Retire Date').")
-        return df
-
-    # Scalars from projection_date (prodate)
-    prodate    = pd.to_datetime(projection_date)
-    CurrYear   = prodate.year
-    PrevYear   = CurrYear - 1
-    BudgetYear = CurrYear + 1
-
-    # Anchors
-    StartCurrYear = pd.Timestamp(CurrYear, 1, 1)
-    EndCurYear    = pd.Timestamp(CurrYear, 12, 31)
-    DecBonusDate  = pd.Timestamp(CurrYear, 12, 31)
-    JulyBonusDate = pd.Timestamp(CurrYear, 7, 31)  # end of July
-    AprilVac      = pd.Timestamp(CurrYear, 4, 1)
-    Christmther   = pd.Timestamp(CurrYear, 5, 1)
-
-    # Row data as proper datetimes
-    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
-    R = pd.to_datetime(df["Retire Date"], errors="coerce")
-    YearH = H.dt.year
-    YearR = R.dt.year
-
-    # Base months
-    BaseMonths   = yearfrac_30360_us(prodate, EndCurYear) * 12.0
-    RetireMonths = (R.apply(lambda x: yearfrac_30360_us(prodate, x)) * 12.0).astype(float)
-    HireMonths   = (H.apply(lambda x: yearfrac_30360_us(x, EndCurYear)) * 12.0).astype(float)
-    RetireHiring = (pd.Series([yearfrac_30360_us(h, r) for h, r in zip(H, R)]) * 12.0).astype(float)
-
-    # SafeRetire as a pandas Series of Timestamps (no np.where for dates)
-    safe_retire = R.fillna(DecBonusDate)
-
-    # ---------- JulyPart (robust) ----------
-    def _july_part(h: pd.Timestamp, sr: pd.Timestamp) -> float:
-        # Coerce sr to Timestamp just in case
-        if pd.isna(sr) or sr >= DecBonusDate:
-            sr = DecBonusDate
-        else:
-            sr = pd.to_datetime(sr)
-
-        if pd.isna(h):
-            return 0.0
-
-        if h >= AprilVac:
-            # Denominator: yearfrac_30360_us(StartCurrYear, max(DecBonusDate, SafeRetire))
-            denom_end = sr if (sr > DecBonusDate) else DecBonusDate
-            denom = yearfrac_30360_us(StartCurrYear, denom_end)
-
-            if h < JulyBonusDate:
-                num_end = sr if (sr < DecBonusDate) else DecBonusDate
-                num = yearfrac_30360_us(JulyBonusDate, num_end)
-            else:  # h >= JulyBonusDate
-                start = h if (h > StartCurrYear) else StartCurrYear
-                end   = sr if (sr < DecBonusDate) else DecBonusDate
-                num   = yearfrac_30360_us(start, end)
-
-            val = 0.0 if (pd.isna(num) or pd.isna(denom) or denom <= 0) else (num / denom) * 0.5
-            return roundup(val, 2)
-        else:
-            return 0.0
-
-    JulyPart = np.array([_july_part(h, sr) for h, sr in zip(H, safe_retire)], dtype=float)
-
-    # ---------- BonusMonths ----------
-    def _piece(h: pd.Timestamp, r: pd.Timestamp) -> float:
-        start = Christmther if pd.isna(h) else (h if h > Christmther else Christmther)
-        end_lim = eomonth(DecBonusDate, 0)
-        end   = end_lim if (pd.isna(r) or r > end_lim) else r
-        return yearfrac_30360_us(start, end) * 12.0 / 8.0
-
-    H_le_Christ = (H <= Christmther)
-    R_blank_or_after_dec = (R.isna() | (R >= DecBonusDate))
-    piece_vec = np.array([_piece(h, r) for h, r in zip(H, R)], dtype=float)
-
-    BonusMonths = np.where(
-        H_le_Christ & R_blank_or_after_dec,
-        1.0 + JulyPart,
-        np.where(
-            H_le_Christ & ~R_blank_or_after_dec,
-            piece_vec + JulyPart,
-            np.where(
-                (~H_le_Christ) & R_blank_or_after_dec,
-                np.array([
-                    yearfrac_30360_us(h if (not pd.isna(h) and h > Christmther) else Christmther,
-                             eomonth(DecBonusDate, 0)) * 12.0 / 8.0
-                    for h in H
-                ]) + JulyPart,
-                piece_vec + JulyPart
-            )
-        )
-    ).astype(float)
-
-    # ---------- NoRetire ----------
-    NoRetire = np.where(
-        YearH == BudgetYear, 0.0,
-        np.where(
-            (YearH < PrevYear) | (YearH == PrevYear),
-            BaseMonths + BonusMonths,
-            np.where(
-                YearH == CurrYear,
-                np.where(H > prodate, HireMonths + BonusMonths, BaseMonths + BonusMonths),
-                0.0
-            )
-        )
-    ).astype(float)
-
-    # ---------- RetireCalc (IFS) ----------
-    cond1 = (YearH <= CurrYear) & (R <= prodate)
-    cond2 = (YearH < PrevYear) & (YearR == CurrYear)
-    cond3 = (YearH == PrevYear) & (YearR == CurrYear)
-    cond4 = (YearH == CurrYear) & (YearR == CurrYear)
-    cond5 = (YearH == CurrYear) & (YearR == BudgetYear)
-    cond6 = (YearH <= PrevYear) & (YearR == BudgetYear)
-
-    RetireCalc = np.where(
-        cond1, 0.0,
-        np.where(
-            cond2 | cond3, RetireMonths + BonusMonths,
-            np.where(
-                cond4, np.where(H <= prodate, RetireMonths + BonusMonths, RetireHiring + BonusMonths),
-                np.where(
-                    cond5, np.where(H <= prodate, BaseMonths + BonusMonths, HireMonths + BonusMonths),
-                    np.where(
-                        cond6, BaseMonths + BonusMonths,
-                        np.nan
-                    )
-                )
-            )
-        )
-    ).astype(float)
-
-    # ---------- Final ----------
-    result = np.where(
-        YearH == BudgetYear, 0.0,
-        np.where(~R.isna(), RetireCalc, NoRetire)
-    ).astype(float)
-
-    df["Months Projection 25"] = [roundup(x, 1) for x in result]
-    return df
-
-
-
-
-def compute_fy_months_budget_26(df: pd.DataFrame, fy_base_date: pd.Timestamp, full_periods: int, divisor: float = 30.42) -> pd.DataFrame:
-    """
-    Excel -> Python for 'FY Months Budget 26'.
-
-    Mapping:
-      CurrYear = YEAR(fy_base_date)
-      PrevYear = CurrYear - 1
-      StartCurrYear = 1/1/CurrYear
-      EndCurrYear   = 12/31/CurrYear
-      FullPeriods   = 12
-      Divisor       = 30.42  (days per month)
-    """
-    if "Hiring Date" not in df.columns:
-        if "Hire Date" in df.columns:
-            df = df.rename(columns={"Hire Date": "Hiring Date"})
-        else:
-            st.warning("⚠️ Missing 'Hiring Date' for FY Months Budget 26.")
-            return df
-    if "Retire Date" not in df.columns:
-        st.warning("⚠️ Missing 'Retire Date' for FY Months Budget 26.")
-        return df
-
-    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
-    R = pd.to_datetime(df["Retire Date"], errors="coerce")
-
-    CurrYear = pd.to_datetime(fy_base_date).year
-    PrevYear = CurrYear - 1
-
-    StartCurrYear = pd.Timestamp(CurrYear, 1, 1)
-    EndCurrYear   = pd.Timestamp(CurrYear, 12, 31)
-    AprilDate     = pd.Timestamp(CurrYear, 4, 30)
-    JulyDate      = pd.Timestamp(CurrYear, 7, 1)
-    DecDate       = pd.Timestamp(CurrYear, 12, 31)
-    ChristmasThr  = pd.Timestamp(CurrYear, 5, 1)
-
-    FullPeriods = float(payroll_periods)
-    Divisor = float(30.42)
-    
-    # Booleans
-    EmployedOnApril = (H <= StartCurrYear) & (R.isna() | (R >= AprilDate))
-    EmployedOnJuly  = (H <= StartCurrYear) & (R.isna() | (R >= JulyDate))
-    EmployedOnDec   = (H <= ChristmasThr)  & (R.isna() | (R >= DecDate))
-
-    # AprilPart
-    # IF(EmployedOnApril; 0.5; IF(H < AprilDate; ROUNDUP( yearfrac_30360_us(MAX(H,Start), MIN(April,R)) / yearfrac_30360_us(Start,April) * 0.5 ;1); 0))
-    april_num = [
-        yearfrac_30360_us(max(h, StartCurrYear) if not pd.isna(h) else StartCurrYear,
-                 min(AprilDate, r) if not pd.isna(r) else AprilDate)
-        for h, r in zip(H, R)
-    ]
-    april_den = yearfrac_30360_us(StartCurrYear, AprilDate)  # constant
-    AprilPart = np.where(
-        EmployedOnApril, 0.5,
-        np.where(
-            (H < AprilDate),
-            [roundup((num / april_den) * 0.5, 1) if (not pd.isna(num) and april_den > 0) else 0.0 for num in april_num],
-            0.0
-        )
-    ).astype(float)
-
-    # JulyPart
-    # IF(EmployedOnJuly; 0.5; IF(H<=DecDate; ROUNDUP(yearfrac_30360_us(MAX(H,Start), MIN(Dec,R)) / yearfrac_30360_us(Start, MAX(Dec,R)) * 0.5;1); 0))
-    july_num = [
-        yearfrac_30360_us(max(h, StartCurrYear) if not pd.isna(h) else StartCurrYear,
-                 min(DecDate, r) if not pd.isna(r) else DecDate)
-        for h, r in zip(H, R)
-    ]
-    july_den = [
-        yearfrac_30360_us(StartCurrYear, max(DecDate, r) if not pd.isna(r) else DecDate)
-        for r in R
-    ]
-    JulyPart = np.where(
-        EmployedOnJuly, 0.5,
-        np.where(
-            (H <= DecDate),
-            [roundup(((n / d) * 0.5) if (not pd.isna(n) and not pd.isna(d) and d > 0) else 0.0, 1)
-             for n, d in zip(july_num, july_den)],
-            0.0
-        )
-    ).astype(float)
-
-    # DecPart
-    # IF(EmployedOnDec; 1; IF(H<=DecDate; ROUNDUP(yearfrac_30360_us(MAX(H,Start), MIN(Dec,R)) / yearfrac_30360_us(ChristmasThr, MAX(Dec,R)) * 1;1); 0))
-    dec_num = july_num  # same numerator as JulyPart: yearfrac_30360_us(MAX(H,Start), MIN(Dec,R))
-    dec_den = [
-        yearfrac_30360_us(ChristmasThr, max(DecDate, r) if not pd.isna(r) else DecDate)
-        for r in R
-    ]
-    DecPart = np.where(
-        EmployedOnDec, 1.0,
-        np.where(
-            (H <= DecDate),
-            [roundup(((n / d) * 1.0) if (not pd.isna(n) and not pd.isna(d) and d > 0) else 0.0, 1)
-             for n, d in zip(dec_num, dec_den)],
-            0.0
-        )
-    ).astype(float)
-
-    BonusMonths = (AprilPart + JulyPart + DecPart).astype(float)
-
-    YearH = H.dt.year
-
-    # NoRetire
-    # IF(H <= Start) THEN
-    #     IF(BonusMonths > 1.89; FullPeriods; (FullPeriods - 2) + BonusMonths)
-    # ELSE IF(YEAR(H) = CurrYear)
-    #     (EndCurrYear - H)/Divisor + BonusMonths
-    # ELSE 0
-    days_end_minus_h = (EndCurrYear - H).dt.days
-    days_end_minus_h = days_end_minus_h.where(~pd.isna(days_end_minus_h), 0)
-
-    NoRetire = np.where(
-        H <= StartCurrYear,
-        np.where(BonusMonths > 1.89, FullPeriods, (FullPeriods - 2.0) + BonusMonths),
-        np.where(
-            YearH == CurrYear,
-            (days_end_minus_h / Divisor) + BonusMonths,
-            0.0
-        )
-    ).astype(float)
-
-    # RetireCalc
-    # IF(R=""; 0; IFS(
-    #   YEAR(H) <= PrevYear & YEAR(R) <= PrevYear → 0
-    #   YEAR(H) <= PrevYear & YEAR(R) = CurrYear → (R - Start)/Div + BonusMonths
-    #   YEAR(H) = CurrYear  & YEAR(R) = CurrYear → (R - H)    /Div + BonusMonths
-    #   TRUE → NA()
-    # ))
-    YearR = R.dt.year
-    days_r_minus_start = (R - StartCurrYear).dt.days
-    days_r_minus_start = days_r_minus_start.where(~pd.isna(days_r_minus_start), np.nan)
-
-    days_r_minus_h = (R - H).dt.days
-    days_r_minus_h = days_r_minus_h.where(~pd.isna(days_r_minus_h), np.nan)
-
-    cond1 = R.isna()
-    cond2 = (~R.isna()) & (YearH <= PrevYear) & (YearR <= PrevYear)
-    cond3 = (~R.isna()) & (YearH <= PrevYear) & (YearR == CurrYear)
-    cond4 = (~R.isna()) & (YearH == CurrYear) & (YearR == CurrYear)
-
-    RetireCalc = np.where(
-        cond1, 0.0,
-        np.where(
-            cond2, 0.0,
-            np.where(
-                cond3, (days_r_minus_start / Divisor) + BonusMonths,
-                np.where(
-                    cond4, (days_r_minus_h / Divisor) + BonusMonths,
-                    np.nan  # TRUE; NA()
-                )
-            )
-        )
-    ).astype(float)
-
-    # Final: ROUND(IF(R<>""; RetireCalc; NoRetire); 1)
-    final_val = np.where(~R.isna(), RetireCalc, NoRetire)
-    df["FY Months Budget 26"] = [round(np.nan if pd.isna(x) else x, 1) for x in final_val]
-    return df
-
-def compute_fy_gross_salary_projection_25(
-    df: pd.DataFrame,
-    projection_date: pd.Timestamp,
-    monthly_cost_col: str = "Monthly Gross Salary (Current)",
-) -> pd.DataFrame:
-    """
-    Excel LET() → Python for 'FY Gross Salary Projection For 25'.
-
-    Depends on:
-      - Hiring Date, Retire Date (datetime columns)
-      - Monthly cost column (default: 'Monthly Gross Salary (Current)')
-
-    Uses the same JulyPart / BonusMonths / ResultMonths logic as Months Projection 25,
-    then computes:
-      TotalCost = ResultMonths * MonthlyCost + XmasOnlyMonths * MonthlyCost * BonusRate
-    with BonusRate = 0.04166 and rounds to 2 decimals.
-    """
-    # ---- Preconditions ----
-    if "Hiring Date" not in df.columns:
-        if "Hire Date" in df.columns:
-            df = df.rename(columns={"Hire Date": "Hiring Date"})
-        else:
-            st.warning("⚠️ Missing 'Hiring Date' — cannot compute FY Gross Salary Projection For 25.")
-            return df
-    if "Retire Date" not in df.columns:
-        st.warning("⚠️ Missing 'Retire Date' — cannot compute FY Gross Salary Projection For 25.")
-        return df
-    if monthly_cost_col not in df.columns:
-        st.warning(f"⚠️ Missing '{monthly_cost_col}' — cannot compute FY Gross Salary Projection For 25.")
-        return df
-
-    # Ensure numeric monthly cost
-    df[monthly_cost_col] = pd.to_numeric(
-        df[monthly_cost_col].astype(str).str.replace(",", ".", regex=False),
-        errors="coerce"
-    )
-
-    # ---- Anchors from projection_date ----
-    prodate    = pd.to_datetime(projection_date)
-    CurrYear   = prodate.year
-    PrevYear   = CurrYear - 1
-    BudgetYear = CurrYear + 1
-
-    StartCurrYear = pd.Timestamp(CurrYear, 1, 1)
-    EndCurYear    = pd.Timestamp(CurrYear, 12, 31)
-    DecBonusDate  = pd.Timestamp(CurrYear, 12, 31)
-    JulyBonusDate = pd.Timestamp(CurrYear, 7, 31)  # end of July (per your sheet)
-    AprilVac      = pd.Timestamp(CurrYear, 4, 1)
-    Christmther   = pd.Timestamp(CurrYear, 5, 1)   # threshold for Christmas bonus logic
-
-    # ---- Row dates ----
-    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
-    R = pd.to_datetime(df["Retire Date"], errors="coerce")
-    YearH = H.dt.year
-    YearR = R.dt.year
-
-    # ---- Base months pieces (ACT/365) ----
-    BaseMonths   = yearfrac_30360_us(prodate, EndCurYear) * 12.0
-    RetireMonths = (R.apply(lambda x: yearfrac_30360_us(prodate, x)) * 12.0).astype(float)
-    HireMonths   = (H.apply(lambda x: yearfrac_30360_us(x, EndCurYear)) * 12.0).astype(float)
-    RetireHiring = (pd.Series([yearfrac_30360_us(h, r) for h, r in zip(H, R)]) * 12.0).astype(float)
-
-    # SafeRetire = R if present else DecBonusDate (keep as Timestamp)
-    safe_retire = R.fillna(DecBonusDate)
-
-    # ---- JulyPart (new piecewise with ROUNDUP(...,2)) ----
-    def _july_part(h: pd.Timestamp, sr: pd.Timestamp) -> float:
-        if pd.isna(h):
-            return 0.0
-        sr = DecBonusDate if pd.isna(sr) else pd.to_datetime(sr)
-
-        if h >= AprilVac:
-            denom_end = sr if (sr > DecBonusDate) else DecBonusDate
-            denom = yearfrac_30360_us(StartCurrYear, denom_end)
-
-            if h < JulyBonusDate:
-                num_end = sr if (sr < DecBonusDate) else DecBonusDate
-                num = yearfrac_30360_us(JulyBonusDate, num_end)
-            else:  # h >= JulyBonusDate
-                start = h if (h > StartCurrYear) else StartCurrYear
-                end   = sr if (sr < DecBonusDate) else DecBonusDate
-                num   = yearfrac_30360_us(start, end)
-
-            val = 0.0 if (pd.isna(num) or pd.isna(denom) or denom <= 0) else (num / denom) * 0.5
-            return roundup(val, 2)
-        return 0.0
-
-    JulyPart = np.array([_july_part(h, sr) for h, sr in zip(H, safe_retire)], dtype=float)
-
-    # ---- BonusMonths (same as Months Projection 25, plus JulyPart) ----
-    def _piece(h: pd.Timestamp, r: pd.Timestamp) -> float:
-        start   = Christmther if pd.isna(h) else (h if h > Christmther else Christmther)
-        end_lim = eomonth(DecBonusDate, 0)
-        end     = end_lim if (pd.isna(r) or r > end_lim) else r
-        return yearfrac_30360_us(start, end) * 12.0 / 8.0
-
-    H_le_Christ = (H <= Christmther)
-    R_blank_or_after_dec = (R.isna() | (R >= DecBonusDate))
-    piece_vec = np.array([_piece(h, r) for h, r in zip(H, R)], dtype=float)
-
-    BonusMonths = np.where(
-        H_le_Christ & R_blank_or_after_dec,
-        1.0 + JulyPart,
-        np.where(
-            H_le_Christ & ~R_blank_or_after_dec,
-            piece_vec + JulyPart,
-            np.where(
-                (~H_le_Christ) & R_blank_or_after_dec,
-                np.array([
-                    yearfrac_30360_us(h if (not pd.isna(h) and h > Christmther) else Christmther,
-                             eomonth(DecBonusDate, 0)) * 12.0 / 8.0
-                    for h in H
-                ]) + JulyPart,
-                piece_vec + JulyPart
-            )
-        )
-    ).astype(float)
-
-    # ---- NoRetire / RetireCalc (same branches as Months Projection 25) ----
-    NoRetire = np.where(
-        YearH == BudgetYear, 0.0,
-        np.where(
-            (YearH < PrevYear) | (YearH == PrevYear),
-            BaseMonths + BonusMonths,
-            np.where(
-                YearH == CurrYear,
-                np.where(H > prodate, HireMonths + BonusMonths, BaseMonths + BonusMonths),
-                0.0
-            )
-        )
-    ).astype(float)
-
-    cond1 = (YearH <= CurrYear) & (R <= prodate)
-    cond2 = (YearH < PrevYear) & (YearR == CurrYear)
-    cond3 = (YearH == PrevYear) & (YearR == CurrYear)
-    cond4 = (YearH == CurrYear) & (YearR == CurrYear)
-    cond5 = (YearH == CurrYear) & (YearR == BudgetYear)
-    cond6 = (YearH <= PrevYear) & (YearR == BudgetYear)
-
-    RetireCalc = np.where(
-        cond1, 0.0,
-        np.where(
-            cond2 | cond3, RetireMonths + BonusMonths,
-            np.where(
-                cond4, np.where(H <= prodate, RetireMonths + BonusMonths, RetireHiring + BonusMonths),
-                np.where(
-                    cond5, np.where(H <= prodate, BaseMonths + BonusMonths, HireMonths + BonusMonths),
-                    np.where(
-                        cond6, BaseMonths + BonusMonths,
-                        np.nan
-                    )
-                )
-            )
-        )
-    ).astype(float)
-
-    # ResultMonths = ROUNDUP(IF(YearH = BudgetYear, 0, IF(R present, RetireCalc, NoRetire)), 1)
-    raw_months = np.where(YearH == BudgetYear, 0.0, np.where(~R.isna(), RetireCalc, NoRetire)).astype(float)
-    ResultMonths = np.array([roundup(x, 1) for x in raw_months], dtype=float)
-
-    # XmasOnlyMonths = BonusMonths - JulyPart
-    XmasOnlyMonths = (BonusMonths - JulyPart).astype(float)
-
-    # ---- Cost calculation ----
-    BonusRate = 0.04166  # from your sheet (0,04166)
-    monthly_cost = df[monthly_cost_col].astype(float)
-
-    TotalCost = np.round(
-        ResultMonths * monthly_cost + XmasOnlyMonths * monthly_cost * BonusRate,
-        2
-    )
-
-    df["FY Gross Salary Projection For 25"] = TotalCost
-    return df
-def compute_annual_gross_salary_fy_budget_2026(
-    df: pd.DataFrame,
-    effective_increase_date: pd.Timestamp,      # IncStart == YearDate
-    no_increase_cutoff: pd.Timestamp,           # H5
-    inc_pct: float,                             # e.g., 0.10
-    inc_pct2: float = salary_increase_pct2,                     # 5%
-    active_months_col: str = "FY Months Budget 26",
-    monthly_cost_col: str = "Monthly Gross Salary (Current)",
-    grade_col: str = "Grade",
-) -> pd.DataFrame:
-    # --- Preconditions ---
-    if "Hiring Date" not in df.columns and "Hire Date" in df.columns:
-        df = df.rename(columns={"Hire Date": "Hiring Date"})
-    for col in ["Hiring Date", "Retire Date", active_months_col, monthly_cost_col]:
-        if col not in df.columns:
-            st.warning(f"⚠️ Missing '{col}' — cannot compute Annual Gross Salary FY Budget 2026.")
-            return df
-
-    # --- Anchors ---
-    YearDate = pd.to_datetime(effective_increase_date)
-    IncStart = pd.to_datetime(effective_increase_date)
-    H5 = pd.to_datetime(no_increase_cutoff)
-    one_year_after_H5   = H5 + relativedelta(years=1)
-    one_year_after_YrDt = YearDate + relativedelta(years=1)
-
-    CurrYear = YearDate.year
-    StartCurrYear = pd.Timestamp(CurrYear, 1, 1)
-    AprilDate     = pd.Timestamp(CurrYear, 4, 30)
-    DecDate       = pd.Timestamp(CurrYear, 12, 31)
-    ChristmasThr  = pd.Timestamp(CurrYear, 5, 1)
-
-    # --- Row data & numerics ---
-    H = pd.to_datetime(df["Hiring Date"], errors="coerce")
-    R = pd.to_datetime(df["Retire Date"], errors="coerce")
-
-    ActiveMonths = pd.to_numeric(df[active_months_col], errors="coerce").fillna(0.0)
-    MonthlyCost  = pd.to_numeric(
-        df[monthly_cost_col].astype(str).str.replace(",", ".", regex=False),
-        errors="coerce"
-    ).fillna(0.0)
-
-    # Robust Grade coercion: handle '0,1', '0.1', text
-    if grade_col in df.columns:
-        Grade = pd.to_numeric(
-            df[grade_col].astype(str).str.replace(",", ".", regex=False).str.strip(),
-            errors="coerce"
-        )
-    else:
-        Grade = pd.Series(np.nan, index=df.index)
-
-    # Only compute for rows with ActiveMonths > 0
-    mask_active = ActiveMonths > 0
-
-    # Helpers
-    def yearfrac(start, end):
-        if pd.isna(start) or pd.isna(end):
-            return np.nan
-        return (end - start).days / 365.0  # ACT/365
-
-    def roundup(x, decimals=1):
-        if pd.isna(x):
-            return np.nan
-        f = 10**decimals
-        return np.ceil(x * f) / f
-
-    # --- Bonus parts (April/Dec) ---
-    EmployedOnApril = (H <= StartCurrYear) & (R.isna() | (R >= AprilDate))
-    EmployedOnDec   = (H <= ChristmasThr)  & (R.isna() | (R >= DecDate))
-
-    april_num = [
-        yearfrac_30360_us(max(h, StartCurrYear) if not pd.isna(h) else StartCurrYear,
-                 min(AprilDate, r) if not pd.isna(r) else AprilDate)
-        for h, r in zip(H, R)
-    ]
-    april_den = yearfrac_30360_us(StartCurrYear, AprilDate)
-    AprilPart = np.where(
-        EmployedOnApril, 0.5,
-        np.where(
-            (H < AprilDate),
-            [roundup((num / april_den) * 0.5, 1) if (not pd.isna(num) and april_den > 0) else 0.0 for num in april_num],
-            0.0
-        )
-    ).astype(float)
-
-    dec_num = [
-        yearfrac_30360_us(max(h, StartCurrYear) if not pd.isna(h) else StartCurrYear,
-                 min(DecDate, r) if not pd.isna(r) else DecDate)
-        for h, r in zip(H, R)
-    ]
-    dec_den = [
-        yearfrac_30360_us(ChristmasThr, max(DecDate, r) if not pd.isna(r) else DecDate)
-        for r in R
-    ]
-    DecPart = np.where(
-        EmployedOnDec, 1.0,
-        np.where(
-            (H >= StartCurrYear),
-            [roundup(((n / d) * 1.0) if (not pd.isna(n) and not pd.isna(d) and d > 0) else 0.0, 1)
-             for n, d in zip(dec_num, dec_den)],
-            0.0
-        )
-    ).astype(float)
-
-    # --- Per-row increase rule: if Grade == 0.1 -> inc_pct2 else inc_pct ---
-    inc_used = np.where(np.isclose(Grade, 0.1, atol=1e-9), inc_pct2, inc_pct)
-
-    # --- Factors ---
-    AprilFactor = 1.0
-    dec_factor_cond = (H <= H5) & (R.isna() | (R > one_year_after_H5))
-    DecFactor = np.where(dec_factor_cond, 1.0 + inc_used, 1.0)
-
-    # --- BaseCost (split at MONTH(IncStart)-0.5), only for active rows ---
-    inc_split = float(IncStart.month) - 0.5
-    pre_increase_months  = np.minimum(ActiveMonths, inc_split)
-    post_increase_months = np.maximum(ActiveMonths - inc_split, 0.0)
+    """Read Excel/CSV robustly (Greek encodings, ; or , delimiters), through the shared upload cache."""
+    return cached_read(uploaded_file, _parse_any, sheet_name=sheet_name, header_row=header_row)
 
-    basecost_condition = (H <= H5) & (R.isna() | (R > one_year_after_YrDt))
+# Bump when esg_core.manpower.clean_table changes its output (invalidates stored snapshots)
+CLEAN_SNAPSHOT_SCHEMA = "manpower_clean/3"
 
-    BaseCost_all = np.where(
-        basecost_condition,
-        pre_increase_months * MonthlyCost + post_increase_months * MonthlyCost * (1.0 + inc_used),
-        ActiveMonths * MonthlyCost
+def read_clean(uploaded_file, sheet_name=None, header_row=0):
+    """read_any + clean_table (headers, dates, salaries), snapshotted so later loads skip them all."""
+    return cached_read(
+        uploaded_file, _parse_clean, schema=CLEAN_SNAPSHOT_SCHEMA, sheet_name=sheet_name, header_row=header_row
     )
-    BaseCost_all = np.round(BaseCost_all, 2)
 
-    # --- Allowances ---
-    BonusRate = 0.04166
-    Allowances_all = np.round(
-        MonthlyCost * BonusRate * (AprilPart * AprilFactor + DecPart * DecFactor),
-        2
-    )
+def _parse_any(uploaded_file, sheet_name=None, header_row=0):
+    return parse_table(uploaded_file, sheet_name=sheet_name, header_row=header_row)
 
-    # Zero out rows with no active months
-    Total_all = np.round(BaseCost_all + Allowances_all, 2)
-    Total = np.where(mask_active, Total_all, 0.0)
+def _parse_clean(uploaded_file, sheet_name=None, header_row=0):
+    return clean_table(parse_table(uploaded_file, sheet_name=sheet_name, header_row=header_row))
 
-    df["Annual Gross Salary FY Budget 2026"] = Total
-    return df
+# Columns the scenario sweep / attrition simulation read from the filtered employees
+RUN_INPUT_COLS = [
+    "Hrms Id", "Hiring Date", "Retire Date", "FY Months Budget 26", "Monthly Gross Salary (Current)",
+    "Grade", "Contributions%", "Company", "Division", "Cost Center", "Job Property",
+]
 
+def run_token(frame: pd.DataFrame, *settings) -> str:
+    """Token of the employees and settings a sweep / simulation ran on; a result whose token differs is stale."""
+    cols = [c for c in RUN_INPUT_COLS if c in frame.columns]
+    return param_token((param_token(frame[cols]), *map(param_token, settings)))
 
+def to_excel_bytes(dataframe: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
+        dataframe.to_excel(writer, index=False, sheet_name="Data")
+    return buf.getvalue()
 
 
+# ───────────────────────────────────────────────────────────────────────────────
 # 1) Upload MAIN file
 # ───────────────────────────────────────────────────────────────────────────────
 uploaded = st.file_uploader(
@@ -862,140 +152,26 @@ if uploaded:
                 key="main_header_row",
             )
     uploaded.seek(0)
-    df_raw = read_any(uploaded, sheet_name=sheet_name, header_row=header_row)
-
-    # Heuristic renames (optional + SAFE)
-    rename_conditions = {
-        "DATA ANALYST": "Job Title",
-        "ΠΑΠΑΔΟΠΟΥΛ": "Surname",
-        "ΓΕΩΡΓΙΟΣ": "Name",
-        "DIVISION": "Division",
-        "ΑΛΟΥΜΥΛ Α.Ε.": "Company",
-        "ΕΠΑΝΑΤΙΜΟΛΟΓΗΣΗ": "Department"
-    }
-    for val, new_col in rename_conditions.items():
-        for col in df_raw.columns:
-            series = df_raw[col]
-            if not isinstance(series, pd.Series):
-                continue
-            try:
-                if (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
-                    if series.astype(str).str.contains(val, na=False).any() and new_col not in df_raw.columns:
-                        df_raw = df_raw.rename(columns={col: new_col})
-                        break
-            except Exception:
-                pass
-
-    # Explicit renames (Greek → English)
-    explicit_rename_map = {
-        "Ημ/νία γέννησης": "Date of Birth",
-        "Ημ/νία πρόσληψης": "Hire Date",
-        "Ημ/νία αποχώρησης": "Retire Date",
-        "Κωδικός εργαζόμενου": "Hrms Id",
-        "Κωδικός εργαζομένου": "Hrms Id",      # variant
-        "Εταιρία": "Company_code",
-        "Περιγραφή εταιρίας": "Company",
-        "Επώνυμο": "Surname",
-        "Ονομα": "Name",
-        "Όνομα": "Name",
-        "GRADE": "Grade",
-    }
-    df_raw = df_raw.rename(columns=explicit_rename_map)
-    df_raw = drop_dup_named_cols(df_raw)
-
-    df_raw = find_and_rename_column_with_exact_value(df_raw, "ADMINISTRATIVE", "Job Property")
-    df = coerce_dates(df_raw.copy())
+    df = read_clean(uploaded, sheet_name=sheet_name, header_row=header_row)
 
     # ───────────────────────────────────────────────────────────────────────────────
-    # Filtering rules
+    # Filtering rules, cost center & override flag (esg_core.manpower.prepare_base)
     # ───────────────────────────────────────────────────────────────────────────────
-    # 1) Retire Date
-    if "Retire Date" in df.columns:
-        df = df[(df["Retire Date"].isna()) | (df["Retire Date"] >= projection_date)]
-    else:
-        st.warning("⚠️ 'Retire Date' column not found; skipping retire-date filter.")
-
-    # 2) Είναι το κύριο Κ.Κ. = 1
-    primary_col = "Είναι το κύριο Κ.Κ."
-    if primary_col in df.columns:
-        mask_primary = (df[primary_col] == 1) | (df[primary_col] == True)
-        try:
-            mask_primary = mask_primary | (df[primary_col].astype(str).str.strip() == "1")
-        except Exception:
-            pass
-        df = df[mask_primary]
-    else:
-        st.warning(f"⚠️ '{primary_col}' column not found; skipping primary cost center filter.")
-
-    # 3) Remove duplicates by Hrms Id
-    if "Hrms Id" in df.columns:
-        df["Hrms Id"] = df["Hrms Id"].astype(str).str.strip()
-        df = df.drop_duplicates(subset=["Hrms Id"])
-    else:
-        st.warning("⚠️ 'Hrms Id' column not found after renaming; cannot drop duplicates on it.")
-
-    # ───────────────────────────────────────────────────────────────────────────────
-    # Salary & Cost Center
-    # ───────────────────────────────────────────────────────────────────────────────
-    if "Ονομαστικός μισθός" in df.columns:
-        df = df.rename(columns={"Ονομαστικός μισθός": "Monthly Gross Salary (Current)"})
-        df["Monthly Gross Salary (Current)"] = (
-            df["Monthly Gross Salary (Current)"]
-            .astype(str)
-            .str.replace(",", ".", regex=False)
-            .str.strip()
-        )
-        df["Monthly Gross Salary (Current)"] = pd.to_numeric(
-            df["Monthly Gross Salary (Current)"], errors="coerce"
-        )
-        mask = (df["Monthly Gross Salary (Current)"] > 0) & (df["Monthly Gross Salary (Current)"] < 90)
-        df.loc[mask, "Monthly Gross Salary (Current)"] *= 26
-    else:
-        st.warning("⚠️ Column 'Ονομαστικός μισθός' not found for salary conversion.")
-
-    # Cost Center concat
-    if "Κέντρο Κόστους" in df.columns and "Περιγραφή Κέντρου Κόστους" in df.columns:
-        df["Cost Center"] = (
-            df["Κέντρο Κόστους"].astype(str).str.strip()
-            + " - "
-            + df["Περιγραφή Κέντρου Κόστους"].astype(str).str.strip()
-        )
-    elif "Κέντρο Κόστους" in df.columns:
-        df["Cost Center"] = df["Κέντρο Κόστους"].astype(str).str.strip()
-    elif "Περιγραφή Κέντρου Κόστους" in df.columns:
-        df["Cost Center"] = df["Περιγραφή Κέντρου Κόστους"].astype(str).str.strip()
-
-    # ───────────────────────────────────────────────────────────────────────────────
-    # Override setup (normalized code + initial flag)
-    # ───────────────────────────────────────────────────────────────────────────────
-    booking_code_col = "Κωδικός Κράτησης"
-    override_map = {
-        "40602": 0.1879,
-        "40603": 0.1879,
-        "40380": 0.1879,
-        "40084": 0.1879,
-        "40510": 0.1738,  # new case
-    }
-    override_codes = set(override_map.keys())
-
-    if booking_code_col in df.columns:
-        df["Κωδικός Κράτησης (norm)"] = normalize_code(df[booking_code_col])
-        df["Contrib Override Applied"] = np.where(df["Κωδικός Κράτησης (norm)"].isin(override_codes), "Yes", "No")
-    else:
-        df["Κωδικός Κράτησης (norm)"] = np.nan
-        df["Contrib Override Applied"] = np.nan
-        st.warning("⚠️ 'Κωδικός Κράτησης' not found in MAIN file; override flag cannot be computed.")
+    with collect() as notices, stage("prepare base", rows_in=len(df)) as timed:
+        df = timed.out(prepare_base(df, projection_date, active_index(df, None, "Retire Date") if "Retire Date" in df.columns else None))
+    render_notices(notices)
 
     # --- STORE THE PROCESSED BASE DF IN SESSION STATE ---
-    st.session_state.base_df = df.copy()
+    # Hrms Id as category (codes + ID lookup) where that is smaller. The org
+    # dimensions stay text: the dashboard below concatenates them into treemap ids.
+    st.session_state.base_df = compact_frame(df.reset_index(drop=True), ids=["Hrms Id"])
 
 # --- Stop if base_df is not (yet) in session state ---
 if "base_df" not in st.session_state:
     st.info("Upload the MAIN manpower file to begin. Accepted: .xlsx, .xls, .csv")
     st.stop()
 
-# --- Start every run with the stored base_df ---
-df = st.session_state.base_df.copy()
+render_memory_report(st.session_state.base_df, key="mp_memory")
 
 # ───────────────────────────────────────────────────────────────────────────────
 # 2) Upload CONTRIBUTIONS file and merge
@@ -1038,177 +214,39 @@ if uploaded_contrib:
             # Store the *processed* df in session state
             st.session_state.processed_df_contrib = df_contrib.copy()
 
-# --- Now, check if we have a valid contrib file in state and merge it ---
+# --- Compute all derived columns (only nodes whose inputs changed re-run) ---
 if "processed_df_contrib" in st.session_state:
-    df_contrib = st.session_state.processed_df_contrib
-    contrib_col = "Contributions" 
-    
-    df = df.merge(
-        df_contrib[["Hrms Id", contrib_col]],
-        on="Hrms Id",
-        how="left",
-    )
-    df[contrib_col] = pd.to_numeric(
-        df[contrib_col].astype(str).str.replace(",", ".", regex=False),
-        errors="coerce"
-    )
-
-    if "Κωδικός Κράτησης (norm)" in df.columns:
-        df["Contributions%"] = df.apply(
-            lambda r: override_map.get(r["Κωδικός Κράτησης (norm)"], r.get(contrib_col, np.nan)),
-            axis=1
-        )
-        df["Contrib Override Applied"] = df["Κωδικός Κράτησης (norm)"].apply(
-            lambda x: "Yes" if x in override_map else "No"
-        )
-    else:
-        st.warning("⚠️ Normalized booking code column missing; using contributions as-is.")
-        df["Contributions%"] = df[contrib_col]
-
-    df = df.drop(columns=[contrib_col], errors="ignore")
+    df_contrib = st.session_state.processed_df_contrib[["Hrms Id", "Contributions"]]
 else:
+    df_contrib = None
     st.info("(Optional) Upload the CONTRIBUTIONS file to add 'Contributions%'. Without it, the column stays empty.")
-    if "Contributions%" not in df.columns:
-        df["Contributions%"] = np.nan
-
-# --- Compute all derived columns ---
-df = compute_employer_contrib(df)
-df = compute_months_projection_25(df, projection_date)
-df = compute_fy_months_budget_26(df, budget_base_date, payroll_periods) 
-df = compute_fy_gross_salary_projection_25(df, projection_date, monthly_cost_col="Monthly Gross Salary (Current)")
-df = compute_annual_gross_salary_fy_budget_2026(
-    df,
-    effective_increase_date=effective_increase_date,
-    no_increase_cutoff=no_increase_cutoff,
-    inc_pct=salary_increase_pct,
-    inc_pct2= salary_increase_pct2,
-    active_months_col="FY Months Budget 26",
-    monthly_cost_col="Monthly Gross Salary (Current)",
-    grade_col="Grade",
-)
 
-# --- FY Employer's Contributions Projection 25 ---
-contrib_amount_col = None
-for cand in ["Monthly Employer's Contributions", "Monthly Employer'S Contributions"]:
-    if cand in df.columns:
-        contrib_amount_col = cand
-        break
-if contrib_amount_col is None:
-    st.warning("⚠️ Can't compute FY Employer's Contributions Projection 25 (monthly contribution amount not found).")
-else:
-    if "Months Projection 25" not in df.columns:
-        st.warning("⚠️ Can't compute FY Employer's Contributions Projection 25 (Months Projection 25 missing).")
-    else:
-        amt = pd.to_numeric(df[contrib_amount_col], errors="coerce")
-        months = pd.to_numeric(df["Months Projection 25"], errors="coerce")
-        df["FY Employer's Contributions Projection 25"] = np.round(amt * months, 2)
-
-# --- Total Payroll Projection Cost 25 ---
-gross_col = "FY Gross Salary Projection For 25"
-employer_col = "FY Employer's Contributions Projection 25"
-if gross_col in df.columns and employer_col in df.columns:
-    df["Total Payroll Projection Cost 25"] = np.round(
-        pd.to_numeric(df[gross_col], errors="coerce") +
-        pd.to_numeric(df[employer_col], errors="coerce"),
-        2
-    )
-else:
-    st.warning("⚠️ Missing required columns to compute 'Total Payroll Projection Cost 25'.")
-
-# --- Annual Employer's Contributions For 2026 ---
-need_cols = ["Contributions%", "Annual Gross Salary FY Budget 2026", "FY Months Budget 26"]
-missing = [c for c in need_cols if c not in df.columns]
-if missing:
-    st.warning(f"⚠️ Missing columns for 'Annual Employer's Contributions For 2026': {missing}")
-else:
-    rate   = pd.to_numeric(df["Contributions%"].astype(str).str.replace(",", ".", regex=False), errors="coerce")
-    annual = pd.to_numeric(df["Annual Gross Salary FY Budget 2026"], errors="coerce").fillna(0.0)
-    months = pd.to_numeric(df["FY Months Budget 26"], errors="coerce").fillna(0.0)
-    base = annual * rate
-    add_30 = np.where(np.isclose(rate, 0.1879, atol=1e-6), 30.0 * months, 0.0)
-    add_25 = np.where(np.isclose(rate, 0.1738, atol=1e-6), 25.0 * months, 0.0)
-    df["Annual Employer's Contributions For 2026"] = np.round(base + add_30 + add_25, 2)
-
-# --- FY PAYROLL COST BUDGET 2026 ---
-gross_col = "Annual Gross Salary FY Budget 2026"
-employer_col = "Annual Employer's Contributions For 2026"
-if gross_col in df.columns and employer_col in df.columns:
-    df["FY PAYROLL COST BUDGET 2026"] = np.round(
-        pd.to_numeric(df[gross_col], errors="coerce") +
-        pd.to_numeric(df[employer_col], errors="coerce"),
-        2
-    )
-else:
-    st.warning(f"⚠️ Missing one of the required columns: '{gross_col}' or '{employer_col}'")
-
-# ───────────────────────────────────────────────────────────────────────────────
-# Annual Training Cost (based on Grade)
-# Excel: IF(Grade<>"", IFS(Grade<8,25, Grade<=9,150, Grade<=13,250, Grade<=18,450, Grade<=23,500), 0)
-# ───────────────────────────────────────────────────────────────────────────────
-if "Grade" in df.columns:
-    # coerce grade robustly (handles "0,1", "19", "19.0", text etc.)
-    grade_num = pd.to_numeric(
-        df["Grade"].astype(str).str.replace(",", ".", regex=False).str.strip(),
-        errors="coerce"
-    )
-
-    df["Annual Training Cost"] = np.select(
-        [
-            grade_num.notna() & (grade_num < 8),
-            grade_num.notna() & (grade_num <= 9),
-            grade_num.notna() & (grade_num <= 13),
-            grade_num.notna() & (grade_num <= 18),
-            grade_num.notna() & (grade_num <= 23),
-        ],
-        [
-            25,
-            150,
-            250,
-            450,
-            500,
-        ],
-        default=0
-    ).astype(float)
-else:
-    st.warning("⚠️ 'Grade' column not found; cannot compute Annual Training Cost.")
-    df["Annual Training Cost"] = 0.0
+if "derived_graph" not in st.session_state:
+    st.session_state.derived_graph = ColumnGraph(DERIVED_NODES)
+derived_graph = st.session_state.derived_graph
 
+with collect() as notices, stage("derived columns", rows_in=len(st.session_state.base_df)) as timed:
+    df = timed.out(derive_columns(st.session_state.base_df, params, df_contrib, graph=derived_graph))
+render_notices(notices)
 
-# ───────────────────────────────────────────────────────────────────────────────
-# Annual Meal Allowance / Coupons Cost
-# Rule:
-#   ΚΑΡΤΑ ΣΙΤΙΣΗΣ = 3  -> 1488
-#   ΚΑΡΤΑ ΣΙΤΙΣΗΣ = 4  -> 744
-#   else              -> 0
-# ───────────────────────────────────────────────────────────────────────────────
-meal_col = "ΚΑΡΤΑ ΣΙΤΙΣΗΣ"
-
-if meal_col in df.columns:
-    meal_val = pd.to_numeric(
-        df[meal_col].astype(str).str.replace(",", ".", regex=False).str.strip(),
-        errors="coerce"
+with st.expander("🧮 Derived columns (last rerun)"):
+    runs = derived_graph.last_run_frame()
+    n_ran = int((runs["Status"] == "ran").sum()) if not runs.empty else 0
+    st.caption(
+        f"{n_ran} of {len(runs)} nodes recomputed; the rest were served from cache "
+        "because none of their parameters or input columns changed."
     )
-
-    df["Annual Meal Allowance/ Coupons Cost"] = np.select(
-        [meal_val.eq(3), meal_val.eq(4)],
-        [1488, 744],
-        default=0
-    ).astype(float)
-else:
-    st.warning(f"⚠️ '{meal_col}' column not found; setting Annual Meal Allowance/ Coupons Cost = 0.")
-    df["Annual Meal Allowance/ Coupons Cost"] = 0.0
-
-
+    st.dataframe(runs, use_container_width=True, hide_index=True)
 
 # ───────────────────────────────────────────────────────────────────────────────
 # Diagnostics (helps verify override logic)
 # ───────────────────────────────────────────────────────────────────────────────
 with st.expander("🔎 Diagnostics (first rows with booking code)"):
-    diag_cols = [c for c in ["Hrms Id", booking_code_col, "Κωδικός Κράτησης (norm)", "Contrib Override Applied", "Contributions%"] if c in df.columns]
+    diag_cols = [c for c in ["Hrms Id", BOOKING_CODE_COL, "Κωδικός Κράτησης (norm)", "Contrib Override Applied", "Contributions%"] if c in df.columns]
     if diag_cols:
         st.dataframe(df[diag_cols].head(20), use_container_width=True)
     if {"Κωδικός Κράτησης (norm)", "Contrib Override Applied"}.issubset(df.columns):
-        bad = df[(df["Κωδικός Κράτησης (norm)"].isin(list(override_codes))) & (df["Contrib Override Applied"] != "Yes")]
+        bad = df[(df["Κωδικός Κράτησης (norm)"].isin(list(OVERRIDE_CODES))) & (df["Contrib Override Applied"] != "Yes")]
         if not bad.empty:
             st.error("Found rows that match override codes but flag is not 'Yes'. Showing first 10:")
             st.dataframe(bad.head(10), use_container_width=True)
@@ -1216,72 +254,48 @@ with st.expander("🔎 Diagnostics (first rows with booking code)"):
 # ───────────────────────────────────────────────────────────────────────────────
 # Final column normalization & ordering
 # ───────────────────────────────────────────────────────────────────────────────
-if "Hire Date" in df.columns and "Hiring Date" not in df.columns:
-    df = df.rename(columns={"Hire Date": "Hiring Date"})
-
-final_order = [
-    "Company", "Hrms Id", "Surname", "Name", "Division", "Department",
-    "Job Title", "Job Property", "Grade", "Hiring Date", "Retire Date",
-    "Cost Center", "Monthly Gross Salary (Current)",
-    "Contrib Override Applied", "Contributions%",
-    "Monthly Employer's Contributions", "Months Projection 25",
-    "FY Months Budget 26", "FY Gross Salary Projection For 25",
-    "FY Employer's Contributions Projection 25",
-    "Total Payroll Projection Cost 25",
-    "Annual Gross Salary FY Budget 2026",
-    "Annual Employer's Contributions For 2026",
-    "FY PAYROLL COST BUDGET 2026", "Annual Training Cost", "Annual Meal Allowance/ Coupons Cost"
-]
-df = drop_dup_named_cols(df)
-existing = [c for c in final_order if c in df.columns]
-df_final = df[existing].copy() # This is the full, unfiltered final dataset
+with stage("final frame", rows_in=len(df)) as timed:
+    df_final = timed.out(final_frame(df))  # This is the full, unfiltered final dataset
 
 # ───────────────────────────────────────────────────────────────────────────────
 # Filters (no groupby) + Totals for all numeric calculated columns
 # ───────────────────────────────────────────────────────────────────────────────
 st.subheader("🔎 Filter (Company / Division / Department / Cost Center)")
 
-DIM_COLS = ["Company", "Division", "Department", "Cost Center"]
-
 # --- MODIFIED multiselect_with_all function ---
-def multiselect_with_all(label, series, key):
+def multiselect_with_all(label, options, key):
     """Sidebar multiselect. Returns full list if nothing is selected."""
-    opts = sorted(
-        pd.Series(series, dtype="object").dropna().astype(str).str.strip().unique().tolist()
-    )
+    opts = sorted(options)
     # No "All" token. Default is empty list.
     sel = st.sidebar.multiselect(label, opts, default=[], key=key)
     # Return all options if selection is empty, otherwise return the selection
     return opts if len(sel) == 0 else sel
 
-# Build and apply filters
-filtered = df_final.copy()
+# Build and apply filters: values compared as stripped strings; each filter's options
+# are the values left by the filters before it. One row mask, one subset at the end.
+with stage("filter index", rows_in=len(df_final)):
+    filters = filter_index(df_final, DIM_COLS, as_text=True)
+mask = np.ones(len(df_final), dtype=bool)
 
 for dim in DIM_COLS:
-    if dim in filtered.columns:
-        selected = multiselect_with_all(f"Filter by {dim}", filtered[dim], key=f"flt_{dim}")
-        # compare as strings to be robust
-        filtered = filtered[filtered[dim].astype(str).str.strip().isin([str(x).strip() for x in selected])]
+    if dim in filters:
+        selected = multiselect_with_all(f"Filter by {dim}", filters.options(dim, within=mask), key=f"flt_{dim}")
+        mask = filters.mask({dim: selected}, within=mask)
+
+with stage("filters", rows_in=len(df_final)) as timed:
+    filtered = timed.out(df_final[mask])
 
 st.caption(f"Filtered rows: {len(filtered):,}")
 
 # Compute totals
 numeric_cols = filtered.select_dtypes(include=["number"]).columns.tolist()
-totals_series = filtered[numeric_cols].sum(numeric_only=True)
-totals_row = {c: "" for c in filtered.columns}
-for dim in DIM_COLS:
-    if dim in filtered.columns:
-        totals_row[dim] = "TOTAL"
-        break
-for c in numeric_cols:
-    totals_row[c] = round(float(totals_series.get(c, 0.0)), 2)
-
-filtered_with_totals = pd.concat(
-    [filtered, pd.DataFrame([totals_row])], ignore_index=True
-)
+with stage("totals", rows_in=len(filtered)) as timed:
+    totals_series = filtered[numeric_cols].sum(numeric_only=True)
+    filtered_with_totals = timed.out(with_totals(filtered))
 
 st.markdown("### 📄 Filtered Data (with totals)")
-st.dataframe(filtered_with_totals, use_container_width=True, height=520)
+with stage("render filtered table", rows_in=len(filtered_with_totals)):
+    st.dataframe(filtered_with_totals, use_container_width=True, height=520)
 
 with st.expander("View totals-only summary"):
     totals_only = pd.DataFrame(totals_series.round(2)).T
@@ -1291,7 +305,7 @@ with st.expander("View totals-only summary"):
 # Define the download helper function
 def _to_xlsx_bytes(df_in: pd.DataFrame, sheet_name="Data") -> bytes:
     buf = io.BytesIO()
-    with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
+    with stage(f"{sheet_name} XLSX", rows_in=len(df_in)), pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
         df_in.to_excel(writer, index=False, sheet_name=sheet_name)
     return buf.getvalue()
 
@@ -1311,6 +325,227 @@ with c2:
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
 
+# ───────────────────────────────────────────────────────────────────────────────
+# Scenario sweep: FY PAYROLL COST BUDGET 2026 over a grid of what-if parameters
+# ───────────────────────────────────────────────────────────────────────────────
+with st.expander("🧪 Scenario sweep (2026 payroll budget what-ifs)"):
+    st.caption(
+        "Evaluates every combination of increase %, effective date and no-increase cutoff "
+        "for the currently filtered employees in one pass. The Grade 0.1 increase % comes from the sidebar."
+    )
+    sweep_need = {"Hiring Date", "Retire Date", "FY Months Budget 26", "Monthly Gross Salary (Current)"}
+    if not sweep_need.issubset(filtered.columns):
+        st.warning(f"⚠️ Scenario sweep needs the columns: {sorted(sweep_need - set(filtered.columns))}")
+    else:
+        s1, s2, s3 = st.columns(3)
+        with s1:
+            inc_from = st.number_input("Increase % from", value=2.0, step=0.5, key="sweep_inc_from")
+            inc_to = st.number_input("Increase % to", value=6.0, step=0.5, key="sweep_inc_to")
+            inc_step = st.number_input("Increase % step", value=1.0, min_value=0.1, step=0.1, key="sweep_inc_step")
+        with s2:
+            month_names = {3: "March", 4: "April", 5: "May", 6: "June", 7: "July"}
+            eff_months = st.multiselect(
+                f"Effective month ({budget_year})", options=list(month_names),
+                default=[pd.to_datetime(effective_increase_date).month] if pd.to_datetime(effective_increase_date).month in month_names else [5],
+                format_func=month_names.get, key="sweep_eff_months",
+            )
+        with s3:
+            cutoffs_text = st.text_input(
+                "No-increase cutoffs (dd/mm/yyyy, comma separated)",
+                value=pd.to_datetime(no_increase_cutoff).strftime("%d/%m/%Y"), key="sweep_cutoffs",
+            )
+
+        inc_values = np.round(np.arange(inc_from, inc_to + inc_step / 2, inc_step), 4) / 100.0
+        sweep_cutoffs = pd.to_datetime(
+            [c.strip() for c in cutoffs_text.split(",") if c.strip()], errors="coerce", dayfirst=True
+        ).dropna()
+        sweep_grid = scenario_grid(
+            inc_values,
+            [pd.Timestamp(budget_year, m, 1) for m in sorted(eff_months)],
+            sweep_cutoffs,
+            inc_pct2s=[salary_increase_pct2],
+        )
+        st.caption(f"{len(sweep_grid)} scenarios × {len(filtered):,} employees")
+        sweep_token = run_token(filtered, params, sweep_grid)
+
+        if st.button("▶️ Run scenario sweep", disabled=sweep_grid.empty, key="sweep_run"):
+            sweep_groups = [c for c in ["Company", "Division", "Cost Center"] if c in filtered.columns]
+            with stage("scenario sweep", rows_in=len(filtered)):
+                st.session_state.sweep_result = sweep_payroll_budget(
+                    BudgetInputs.from_frame(filtered),
+                    sweep_grid,
+                    groups=filtered[sweep_groups] if sweep_groups else None,
+                )
+            st.session_state.sweep_token = sweep_token
+
+        sweep_result = st.session_state.get("sweep_result")
+        if sweep_result is not None and st.session_state.get("sweep_token") != sweep_token:
+            st.info("The filters, sidebar parameters, scenarios or uploaded data changed since the last sweep. "
+                    "Run the sweep again to see results for the current selection.")
+        elif sweep_result is not None:
+            st.caption(
+                f"Last sweep: {len(sweep_result.scenarios)} scenarios in {sweep_result.seconds:.2f}s "
+                f"({sweep_result.chunk_size} scenarios per chunk)."
+            )
+            sweep_view = sweep_result.scenarios.rename(columns={
+                "inc_pct": "Increase %", "inc_pct2": "Increase % (Grade 0.1)",
+                "effective_increase_date": "Effective Date", "no_increase_cutoff": "No-Increase Cutoff",
+            })
+            sweep_view["Increase %"] = (sweep_view["Increase %"] * 100).round(2)
+            sweep_view["Increase % (Grade 0.1)"] = (sweep_view["Increase % (Grade 0.1)"] * 100).round(2)
+            st.dataframe(sweep_view, use_container_width=True, hide_index=True)
+            st.plotly_chart(
+                px.bar(sweep_view, x="Scenario", y="FY PAYROLL COST BUDGET 2026",
+                       hover_data=["Increase %", "Effective Date", "No-Increase Cutoff"]),
+                use_container_width=True,
+            )
+            st.markdown("**Comparison by Company / Division / Cost Center**")
+            st.dataframe(comparison_table(sweep_result), use_container_width=True, hide_index=True)
+            st.download_button(
+                "⬇️ Download scenario comparison (XLSX)",
+                data=comparison_workbook(sweep_result),
+                file_name="scenario_sweep_2026.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key="download_sweep",
+            )
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Monte Carlo attrition: P10/P50/P90 of the 2026 budget when people leave
+# ───────────────────────────────────────────────────────────────────────────────
+with st.expander("🎲 Attrition simulation (Monte Carlo)"):
+    st.caption(
+        f"Employees without a Retire Date leave during {budget_year} with an annual probability per "
+        "Division / Job Property; each trial recomputes FY Months Budget 26 and the payroll cost of the leavers. "
+        "Uses the currently filtered employees and the sidebar budget parameters."
+    )
+    sim_need = {"Hiring Date", "Retire Date", "Monthly Gross Salary (Current)"}
+    if not sim_need.issubset(filtered.columns):
+        st.warning(f"⚠️ Attrition simulation needs the columns: {sorted(sim_need - set(filtered.columns))}")
+    else:
+        attr_keys = [c for c in ["Division", "Job Property"] if c in filtered.columns]
+        a1, a2 = st.columns(2)
+        with a1:
+            rate_source = st.radio(
+                "Attrition rates", ("Manual", "From ESG extract history"), horizontal=True, key="attr_source"
+            )
+        with a2:
+            default_rate_pct = st.number_input(
+                "Default annual attrition %", min_value=0.0, max_value=100.0, value=8.0, step=0.5, key="attr_default"
+            )
+
+        hist_rates = None
+        if rate_source == "From ESG extract history":
+            esg_file = st.file_uploader(
+                "📎 ESG extract with hire & departure dates (Excel or CSV)", type=["xlsx", "xls", "csv"], key="attr_extract"
+            )
+            hist_years = st.slider(
+                "History years", min_value=budget_year - 10, max_value=budget_year - 1,
+                value=(budget_year - 3, budget_year - 1), key="attr_years",
+            )
+            if esg_file:
+                esg_file.seek(0)
+                extract = read_clean(esg_file, sheet_name=0)
+                hist_keys = [k for k in attr_keys if k in extract.columns]
+                if not {"Hire Date", "Retire Date"}.issubset(extract.columns):
+                    st.warning("⚠️ The ESG extract needs 'Ημ/νία πρόσληψης' and 'Ημ/νία αποχώρησης' to derive rates.")
+                else:
+                    with stage("historical attrition rates", rows_in=len(extract)) as timed:
+                        hist_rates = timed.out(historical_attrition_rates(
+                            extract, hist_keys, range(hist_years[0], hist_years[1] + 1)
+                        ))
+                    if hist_keys != attr_keys:
+                        st.info(f"Rates derived per {hist_keys or 'company total'}; missing in extract: "
+                                f"{sorted(set(attr_keys) - set(hist_keys))}")
+                        attr_keys = hist_keys
+
+        rate_table = None
+        if attr_keys:
+            rate_table = (
+                group_labels(filtered, attr_keys).drop_duplicates().sort_values(attr_keys).reset_index(drop=True)
+            )
+            rate_table["Rate %"] = float(default_rate_pct)
+            if hist_rates is not None and not hist_rates.empty:
+                hist_pct = group_labels(hist_rates, attr_keys).assign(Hist=hist_rates["Rate"].to_numpy() * 100)
+                rate_table = rate_table.merge(hist_pct, on=attr_keys, how="left")
+                rate_table["Rate %"] = rate_table["Hist"].round(2).fillna(rate_table["Rate %"])
+                rate_table = rate_table.drop(columns="Hist")
+            rate_table = st.data_editor(
+                rate_table, disabled=attr_keys, hide_index=True, use_container_width=True, key="attr_rates"
+            )
+        elif hist_rates is not None and not hist_rates.empty:
+            default_rate_pct = float(hist_rates["Rate"].iloc[0] * 100)
+            st.caption(f"Historical company-wide attrition: {default_rate_pct:.2f}%")
+
+        b1, b2, b3, b4 = st.columns(4)
+        with b1:
+            sim_trials = st.number_input("Trials", min_value=100, max_value=20000, value=1000, step=100, key="attr_trials")
+        with b2:
+            sim_seed = st.number_input("Random seed", min_value=0, value=42, step=1, key="attr_seed")
+        with b3:
+            sim_workers = st.number_input(
+                "Worker processes", min_value=1, max_value=max(1, os.cpu_count() or 1), value=1, step=1, key="attr_workers"
+            )
+        with b4:
+            replace_leavers = st.checkbox("Replace leavers", value=False, key="attr_replace")
+            vacancy_months = st.number_input(
+                "Vacancy (months)", min_value=0.0, max_value=12.0, value=2.0, step=0.5,
+                disabled=not replace_leavers, key="attr_vacancy",
+            )
+
+        sim_config = SimulationConfig(
+            trials=int(sim_trials), seed=int(sim_seed), replace_leavers=replace_leavers,
+            vacancy_months=float(vacancy_months), n_workers=int(sim_workers),
+        )
+        attrition_token = run_token(filtered, params, rate_table, attr_keys, float(default_rate_pct), sim_config)
+
+        if st.button("▶️ Run attrition simulation", key="attr_run"):
+            rates = employee_rates(
+                filtered,
+                None if rate_table is None else rate_table.assign(Rate=pd.to_numeric(rate_table["Rate %"], errors="coerce") / 100.0),
+                attr_keys,
+                default_rate_pct / 100.0,
+            )
+            with st.spinner("Running trials…"), stage("attrition simulation", rows_in=len(filtered)):
+                st.session_state.attrition_result = simulate_attrition(
+                    filtered,
+                    rates,
+                    BudgetParams(
+                        budget_year=budget_year,
+                        full_periods=payroll_periods,
+                        effective_increase_date=pd.to_datetime(effective_increase_date),
+                        no_increase_cutoff=pd.to_datetime(no_increase_cutoff),
+                        inc_pct=salary_increase_pct,
+                        inc_pct2=salary_increase_pct2,
+                    ),
+                    sim_config,
+                    groups=filtered[[c for c in ["Company", "Cost Center"] if c in filtered.columns]],
+                )
+            st.session_state.attrition_token = attrition_token
+
+        attrition_result = st.session_state.get("attrition_result")
+        if attrition_result is not None and st.session_state.get("attrition_token") != attrition_token:
+            st.info("The filters, sidebar parameters, attrition rates or uploaded data changed since the last run. "
+                    "Run the simulation again to see results for the current selection.")
+        elif attrition_result is not None:
+            st.caption(
+                f"Last run: {len(attrition_result.trial_totals):,} trials in {attrition_result.seconds:.2f}s."
+            )
+            st.dataframe(attrition_result.summary, use_container_width=True)
+            st.plotly_chart(
+                px.histogram(attrition_result.trial_totals, x="FY PAYROLL COST BUDGET 2026", nbins=50),
+                use_container_width=True,
+            )
+            for level, table in attrition_result.by_level.items():
+                st.markdown(f"**FY PAYROLL COST BUDGET 2026 by {level}**")
+                st.dataframe(table, use_container_width=True)
+            st.download_button(
+                "⬇️ Download attrition simulation (XLSX)",
+                data=simulation_workbook(attrition_result),
+                file_name="attrition_simulation_2026.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key="download_attrition",
+            )
+
 # ───────────────────────────────────────────────────────────────────────────────
 # NEW: Report for New Active Hires
 # ───────────────────────────────────────────────────────────────────────────────
@@ -1325,13 +560,11 @@ if report_cols_present and proj_date_present:
     try:
         # Ensure dates are datetime objects for comparison
         hire_date_dt = pd.to_datetime(df_final["Hiring Date"], errors='coerce')
-        retire_date_dt = pd.to_datetime(df_final["Retire Date"], errors='coerce')
-
         # Condition 1: Hired in the projection year
         mask_hire_year = (hire_date_dt.dt.date >= New_Hires)
         
         # Condition 2: Active (no retire date OR retire date is in the future)
-        mask_active = (retire_date_dt.isna()) | (retire_date_dt > projection_date)
+        mask_active = active_index(df_final, None, "Retire Date").mask(projection_date)
         
         # --- THIS IS THE MODIFIED LINE ---
         # Apply BOTH conditions using AND (&) instead of OR (|)
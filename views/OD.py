@@ -1,30 +1,38 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+
+from esg_core.cube import ROWS, DISTINCT, SHARED
+from esg_core.distinct import distinct_by
+from esg_core.profiling import stage
+from esg_core.training import missing_columns, prepare_training
+from esg_ui.indexes import facet_index, olap_cube
+from esg_ui.ingest import cached_read, render_memory_report
+
+# Bump when the preprocessing below changes its output (invalidates stored snapshots)
+SNAPSHOT_SCHEMA = 'od_training/2'
+
+# Pre-aggregated cube: every filter / grouping column, the summed measures and unique trainees
+CUBE_DIMENSIONS = ['Country', 'Company', 'Year', 'Division', 'Department', 'Job Property2', 'Status', 'Gender2']
+CUBE_MEASURES = {'Duration in Hours': 'duration_in_hours_sum', 'Cost (€)': 'cost_sum'}
+UNIQUE_MODES = ['Exact', 'Approximate (HyperLogLog)']
 
 # Function to load and preprocess data
-@st.cache_data
 def load_and_preprocess_data(uploaded_file):
+    return cached_read(uploaded_file, _parse_upload, schema=SNAPSHOT_SCHEMA)
+
+
+def _parse_upload(uploaded_file):
     try:
         df = pd.read_excel(uploaded_file)
-        required_columns = [
-            'Country', 'Company', 'Year', 'Division', 'Department',
-            'Job Property', 'Status', 'Duration in Hours', 'Cost (€)', 'Trainee ID', 'Completion Date' # Added Completion Date
-        ]
-        
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            st.error(f"The following required columns are missing: {', '.join(missing_columns)}")
+
+        missing = missing_columns(df)
+        if missing:
+            st.error(f"The following required columns are missing: {', '.join(missing)}")
             return None
 
-        # Convert Completion Date to datetime and drop rows where conversion fails
-        df['Completion Date'] = pd.to_datetime(df['Completion Date'], errors='coerce')
-        df.dropna(subset=['Completion Date'], inplace=True)
-        
-        # Ensure 'Year' is treated as a string for consistent filtering if needed
-        if 'Year' in df.columns:
-            df['Year'] = df['Year'].astype(str)
-            
-        return df
+        # Completion Date parsed (invalid rows dropped), Year as text, dimensions compacted (esg_core.training)
+        return prepare_training(df)
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
@@ -32,7 +40,7 @@ def load_and_preprocess_data(uploaded_file):
 
 # Function to apply filters and collect group by columns
 def apply_filters(df):
-    filtered_df = df.copy()
+    mask = np.ones(len(df), dtype=bool)
     group_by_columns = []
     selected_filters = {}
 
@@ -42,10 +50,10 @@ def apply_filters(df):
     # --- NEW DATE FILTER ---
     st.sidebar.subheader("Date Range Filter")
 
-    if not filtered_df.empty and 'Completion Date' in filtered_df.columns:
+    if not df.empty and 'Completion Date' in df.columns:
         # Determine min/max dates for the selector
-        min_date = filtered_df['Completion Date'].min().date()
-        max_date = filtered_df['Completion Date'].max().date()
+        min_date = df['Completion Date'].min().date()
+        max_date = df['Completion Date'].max().date()
         
         # Date input for the cutoff date
         selected_date = st.sidebar.date_input(
@@ -61,12 +69,10 @@ def apply_filters(df):
             cutoff_datetime = pd.to_datetime(selected_date)
             
             # Filter for dates strictly less than the selected cutoff date
-            mask = filtered_df['Completion Date'] < cutoff_datetime
+            mask = (df['Completion Date'] < cutoff_datetime).to_numpy()
             
             # Store the date filter info for the dynamic title
             selected_filters['Completion Date (Before)'] = [str(selected_date)]
-            
-            filtered_df = filtered_df[mask]
     else:
         st.sidebar.warning("Completion Date column missing or data is empty. Skipping date filter.")
 
@@ -87,31 +93,87 @@ def apply_filters(df):
         'Gender': 'Gender2'
     }
 
+    # Faceted filters: each option shows the rows / unique trainees it would leave under the
+    # other active filters, counted on the index codes (values compared as strings)
+    with stage("facet index", rows_in=len(df)):
+        index = facet_index(df, list(filters.values()), distinct_col='Trainee ID', as_text=True)
+    keys = {column_name: f'od_filter_{column_name}' for column_name in filters.values()}
+    current = {c: list(st.session_state.get(keys[c], [])) for c in index.columns}
+    with stage("facet counts", rows_in=len(df)):
+        facets = index.facets(current, within=mask)
+    selections = {}
+
     for filter_label, column_name in filters.items():
         # Skip gracefully if column is missing
-        if column_name not in filtered_df.columns:
+        if column_name not in index:
             st.sidebar.warning(f"Column '{column_name}' not found; skipping filter '{filter_label}'.")
             continue
 
-        # Build choices as strings to avoid int<->str sort/compare errors
-        raw_vals = filtered_df[column_name].dropna().unique()
-        choices = sorted((str(v) for v in raw_vals), key=str.casefold)
+        # Choices: values with rows left, plus whatever is already selected
+        counts = facets[column_name]
+        counts = counts[(counts['Rows'] > 0) | counts['Value'].isin(current[column_name])]
+        choices = sorted(counts['Value'], key=str.casefold)
+        label_counts = dict(zip(counts['Value'], zip(counts['Rows'], counts['Distinct'])))
 
         selected = st.sidebar.multiselect(
             f"Select {filter_label}",
             options=choices,
             default=[],
+            format_func=lambda v, c=label_counts: f"{v} · {c[v][0]:,} rows · {c[v][1]:,} trainees",
+            key=keys[column_name],
             help=f"Leave empty to include all {filter_label.lower()}s."
         )
 
         if selected:
-            # Compare as strings to match the UI choices; keep original dtypes in the df
-            mask = filtered_df[column_name].astype(str).isin(set(selected))
-            filtered_df = filtered_df[mask]
+            selections[column_name] = selected
             group_by_columns.append(column_name)
             selected_filters[filter_label] = selected
 
-    return filtered_df, group_by_columns, selected_filters
+    # keep original dtypes in the df; one subset for all filters
+    with stage("filters", rows_in=len(df)) as timed:
+        filtered = timed.out(df[index.mask(selections, within=mask)])
+    return filtered, group_by_columns, selected_filters, selections, mask
+
+
+# Sidebar settings for answering the KPIs from the pre-aggregated cube
+def aggregation_settings():
+    st.sidebar.subheader("Aggregation")
+    use_cube = st.sidebar.toggle(
+        "Answer from pre-aggregated cube",
+        value=False,
+        key='od_use_cube',
+        help="Sum hours / cost and count unique trainees from per-combination cells built once per cutoff date, "
+             "instead of grouping the filtered rows on every change."
+    )
+    mode = st.sidebar.radio(
+        "Unique trainees",
+        UNIQUE_MODES,
+        key='od_unique_mode',
+        disabled=not use_cube,
+        help="Approximate counts use HyperLogLog sketches (about 3% error) and stay fast on very large files."
+    )
+    return use_cube, mode != UNIQUE_MODES[0]
+
+
+# Grouped (or single total row) aggregation read from the cube
+def aggregate_from_cube(df, date_mask, selections, group_by_columns, approximate):
+    with stage("cube build", rows_in=len(df)):
+        cube = olap_cube(df, CUBE_DIMENSIONS, list(CUBE_MEASURES), distinct_col='Trainee ID', as_text=True, rows=date_mask)
+    st.sidebar.caption(f"Cube: {cube.n_cells:,} cells · {cube.nbytes / 1e6:,.1f} MB")
+
+    with stage("cube rollup") as timed:
+        grouped_df = timed.out(cube.rollup(selections, group_by_columns, approximate=approximate))
+    grouped_df = grouped_df.drop(columns=ROWS).rename(columns={
+        **CUBE_MEASURES, DISTINCT: 'unique_trainee_id_count', SHARED: 'trainees_in_other_groups',
+    })
+    if group_by_columns:
+        grouped_df['cost_per_unique_trainee'] = grouped_df['cost_sum'] / grouped_df['unique_trainee_id_count']
+        grouped_df['duration_per_unique_trainee'] = grouped_df['duration_in_hours_sum'] / grouped_df['unique_trainee_id_count']
+    else:
+        total_unique = grouped_df['unique_trainee_id_count'].iloc[0]
+        grouped_df['cost_per_unique_trainee'] = grouped_df['cost_sum'] / total_unique if total_unique else 0
+        grouped_df['duration_per_unique_trainee'] = grouped_df['duration_in_hours_sum'] / total_unique if total_unique else 0
+    return grouped_df
 
 
 # Function to create a professional dynamic title with italic categories and bold values
@@ -228,9 +290,11 @@ def main():
     # Check if data is available in session state
     if f'{PAGE_KEY}_df' in st.session_state and st.session_state[f'{PAGE_KEY}_df'] is not None:
         df = st.session_state[f'{PAGE_KEY}_df']
+        render_memory_report(df, key=f'{PAGE_KEY}_memory')
 
         # Apply filters and get group by columns
-        filtered_df, group_by_columns, selected_filters = apply_filters(df)
+        filtered_df, group_by_columns, selected_filters, selections, date_mask = apply_filters(df)
+        use_cube, approximate = aggregation_settings()
         dynamic_title = create_dynamic_title(selected_filters)
         
         # Display dynamic title
@@ -243,14 +307,24 @@ def main():
 
         # Check if filtered data is not empty
         if not filtered_df.empty:
-            if group_by_columns:
+            if use_cube:
+                grouped_df = aggregate_from_cube(df, date_mask, selections, group_by_columns, approximate)
+
+            elif group_by_columns:
                 # Group by the selected columns
-                grouped_df = filtered_df.groupby(group_by_columns).agg(
-                    duration_in_hours_sum=('Duration in Hours', 'sum'),
-                    cost_sum=('Cost (€)', 'sum'),
-                    # Calculate unique trainees within each group
-                    unique_trainee_id_count=('Trainee ID', pd.Series.nunique) 
-                ).reset_index()
+                with stage("grouped aggregation", rows_in=len(filtered_df)) as timed:
+                    grouped_df = timed.out(filtered_df.groupby(group_by_columns, observed=True).agg(
+                        duration_in_hours_sum=('Duration in Hours', 'sum'),
+                        cost_sum=('Cost (€)', 'sum'),
+                    ))
+                # Unique trainees within each group, and those also trained in another group,
+                # counted on factorized Trainee IDs instead of a nunique call per group
+                with stage("unique trainees", rows_in=len(filtered_df)):
+                    trainees = distinct_by(filtered_df, group_by_columns, 'Trainee ID')
+                grouped_df['unique_trainee_id_count'] = trainees['Distinct']
+                grouped_df['trainees_in_other_groups'] = trainees['Shared']
+                grouped_df.attrs['multi_group_items'] = trainees.attrs['multi_group_items']
+                grouped_df = grouped_df.reset_index()
                 
                 # Calculate metrics after grouping
                 grouped_df['cost_per_unique_trainee'] = grouped_df['cost_sum'] / grouped_df['unique_trainee_id_count']
@@ -283,14 +357,21 @@ def main():
             # Display the grouped and aggregated data
             if group_by_columns:
                 st.subheader(f"Grouped Data by: {', '.join(group_by_columns)}")
+                if 'multi_group_items' in grouped_df.attrs:
+                    st.caption(f"{grouped_df.attrs['multi_group_items']:,} unique trainees appear in more than one group.")
                 with st.expander('View Detailed Aggregation Table'):
-                    st.dataframe(grouped_df.style.format({
+                    formats = {
                         'duration_in_hours_sum': "{:,.2f}",
                         'cost_sum': "€{:,.2f}",
                         'unique_trainee_id_count': "{:,}",
+                        'trainees_in_other_groups': "{:,}",
                         'cost_per_unique_trainee': "€{:,.2f}",
                         'duration_per_unique_trainee': "{:,.2f}"
-                    }), use_container_width=True)
+                    }
+                    with stage("render aggregation table", rows_in=len(grouped_df)):
+                        st.dataframe(grouped_df.style.format(
+                            {col: fmt for col, fmt in formats.items() if col in grouped_df.columns}
+                        ), use_container_width=True)
             elif not group_by_columns and len(grouped_df) == 1:
                  st.info("Aggregation performed across the entire filtered dataset (no grouping columns selected).")
                  